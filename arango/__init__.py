@@ -2,17 +2,25 @@
 
 from arango.database import Database
 from arango.api import ArangoAPI
+from arango.singleflight import SingleFlight
+from arango.compression import Compression
+from arango.keys import key_allocator as get_key_allocator
+from arango.slowlog import SlowLog
+from arango.utils import is_string
 from arango.exceptions import *
 
 
 class Arango(object):
     """A wrapper around ArangoDB API.
 
-    :param protocol: the internet transfer protocol (default: http)
+    :param protocol: the internet transfer protocol, or "unix" to connect
+        through a unix domain socket (default: http)
     :type protocol: str
-    :param host: ArangoDB host (default: localhost)
+    :param host: ArangoDB host, or the socket path if the protocol is
+        "unix" (an endpoint like "unix:///tmp/arangodb.sock" is also
+        accepted) (default: localhost)
     :type host: str
-    :param port: ArangoDB port (default: 8529)
+    :param port: ArangoDB port, ignored for unix sockets (default: 8529)
     :type port: int
     :param username: the username
     :type username: str
@@ -20,17 +28,47 @@ class Arango(object):
     :type password: str
     :param client: the custom client object
     :type client: arango.clients.base.BaseArangoClient
+    :param coalesce: whether or not identical concurrent reads (documents,
+        collection and graph properties, collection lists and read-only
+        queries) should share one request (each caller gets its own copy
+        of the result)
+    :type coalesce: bool
+    :param compression: "gzip" or "deflate" to compress large request
+        bodies and accept compressed responses, or a ``Compression`` object
+        to also set the size threshold and the level (default: None)
+    :type compression: str or arango.compression.Compression or None
+    :param slow_log: the threshold (in seconds) above which operations are
+        recorded in a ``SlowLog`` (available as ``self.slow_log``), or a
+        ``SlowLog`` object to also configure sampling and the log file
+        (default: None)
+    :type slow_log: float or arango.slowlog.SlowLog or None
+    :param key_allocator: the scheme ("time" or "uuid7") or the
+        ``KeyAllocator`` of the keys set client-side in the new documents
+        without a ``_key`` (available as ``self.key_allocator``), or None
+        to let the server generate them (default: None)
+    :type key_allocator: str or arango.keys.KeyAllocator or None
     :raises: ArangoConnectionError
     """
 
     def __init__(self, protocol="http", host="localhost", port=8529,
-                 username="root", password="", client=None):
+                 username="root", password="", client=None, coalesce=False,
+                 compression=None, slow_log=None, key_allocator=None):
         self._protocol = protocol
         self._host = host
         self._port = port
         self._username = username
         self._password = password
         self._client = client
+        self._singleflight = SingleFlight() if coalesce else None
+        if is_string(compression):
+            compression = Compression(compression)
+        self._compression = compression
+        if isinstance(slow_log, (int, float)):
+            slow_log = SlowLog(threshold=slow_log)
+        self.slow_log = slow_log
+        if key_allocator is not None:
+            key_allocator = get_key_allocator(key_allocator)
+        self.key_allocator = key_allocator
         self._api = ArangoAPI(
             protocol=self._protocol,
             host=self._host,
@@ -38,6 +76,10 @@ class Arango(object):
             username=self._username,
             password=self._password,
             client=self._client,
+            singleflight=self._singleflight,
+            compression=self._compression,
+            slow_log=self.slow_log,
+            key_allocator=self.key_allocator,
         )
         # Check the connection by requesting a header of the version endpoint
         res = self._api.head("/_api/version")
@@ -78,7 +120,11 @@ class Arango(object):
                     username=self._username,
                     password=self._password,
                     db_name=db_name,
-                    client=self._client
+                    client=self._client,
+                    singleflight=self._singleflight,
+                    compression=self._compression,
+                    slow_log=self.slow_log,
+                    key_allocator=self.key_allocator,
                 )
             )
 
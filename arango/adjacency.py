@@ -0,0 +1,156 @@
+"""Caching of the edges of graph vertices."""
+
+import threading
+from collections import OrderedDict
+from timeit import default_timer
+
+
+class AdjacencyCache(object):
+    """A byte-bounded LRU cache of the edges of vertices.
+
+    Entries are keyed by (vertex ID, direction, edge collection) and hold
+    the edges of the vertex along with the IDs they mention (the edges and
+    their endpoints), so that a write to an edge or a vertex can invalidate
+    every entry it may have changed. Entries older than ``ttl`` seconds are
+    treated as missing, which bounds the staleness due to writes made by
+    other clients. The least recently used entries are evicted once the
+    cached edges take more than ``max_bytes`` (as measured by the size of
+    the responses they came from).
+
+    The cached edges are shared between the callers, so they must be
+    treated as read-only. Edges read while a write invalidated the cache
+    may predate the write, so ``set`` is given the ``generation`` taken
+    before the read and does not cache them if an invalidation happened
+    since.
+
+    :param max_bytes: the maximum size of the cached edges in bytes
+    :type max_bytes: int
+    :param ttl: the seconds an entry stays valid (None for no limit)
+    :type ttl: float or None
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, ttl=60.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (edges, size, expiry, IDs)
+        self._entries = OrderedDict()
+        # edge or vertex ID -> keys of the entries mentioning it
+        self._keys_by_id = {}
+        # Incremented by every invalidation
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached edges of the key (None if not cached).
+
+        :param key: the vertex ID, direction and edge collection name
+        :type key: tuple
+        :returns: the edges or None
+        :rtype: list or None
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry[2] is not None and \
+                    entry[2] <= default_timer():
+                self._forget(key, entry)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def generation(self):
+        """Return the number of invalidations so far.
+
+        :returns: the generation to pass to ``set`` for edges read next
+        :rtype: int
+        """
+        with self._lock:
+            return self._generation
+
+    def set(self, key, edges, size, generation=None):
+        """Cache the edges of the key.
+
+        Edges larger than ``max_bytes`` on their own are not cached, nor
+        are edges read before an invalidation which happened after
+        ``generation``.
+
+        :param key: the vertex ID, direction and edge collection name
+        :type key: tuple
+        :param edges: the edge documents
+        :type edges: list
+        :param size: the size of the edges in bytes
+        :type size: int
+        :param generation: the generation taken before reading the edges
+            (None to cache them regardless)
+        :type generation: int or None
+        """
+        if size > self.max_bytes:
+            return
+        ids = set([key[0]])
+        for edge in edges:
+            ids.update((edge.get("_id"), edge.get("_from"), edge.get("_to")))
+        ids.discard(None)
+        expiry = None if self.ttl is None else default_timer() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._forget(key, entry)
+            self._entries[key] = (edges, size, expiry, ids)
+            self.size += size
+            for item in ids:
+                self._keys_by_id.setdefault(item, set()).add(key)
+            while self.size > self.max_bytes:
+                old_key, old_entry = self._entries.popitem(last=False)
+                self._forget(old_key, old_entry, popped=True)
+                self.evictions += 1
+
+    def _forget(self, key, entry, popped=True):
+        """Account for the removal of an entry (with the lock held)."""
+        if not popped:
+            del self._entries[key]
+        self.size -= entry[1]
+        for item in entry[3]:
+            keys = self._keys_by_id.get(item)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_id[item]
+
+    def invalidate(self, *ids):
+        """Drop the entries mentioning any of the edge or vertex IDs.
+
+        :param ids: the IDs of the written edges or vertices
+        :type ids: str
+        :returns: the number of dropped entries
+        :rtype: int
+        """
+        dropped = 0
+        with self._lock:
+            self._generation += 1
+            for item in ids:
+                for key in list(self._keys_by_id.get(item, ())):
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._forget(key, entry, popped=False)
+                        dropped += 1
+        return dropped
+
+    def clear(self):
+        """Drop all the entries."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_id.clear()
+            self.size = 0
@@ -0,0 +1,265 @@
+"""Graph analytics computed on local graph snapshots.
+
+The functions take an ``arango.snapshot.GraphSnapshot`` and work on NumPy
+views of its compressed sparse rows, so that every step is a vectorized
+operation over all the edges rather than a visit of each vertex (as in a
+traversal visitor script). They return NumPy arrays indexed by the vertex
+index of the snapshot (see ``GraphSnapshot.vertex_ids``); ``write_back``
+stores such values as an attribute of the vertex documents.
+
+Only the vertices of the snapshot are analysed, so the snapshot should be
+taken with ``isolated=True`` for the vertices without edges to count (as
+vertices of degree 0, components of their own, etc.) rather than being
+left out of the results.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from arango.collection import Collection
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("graph analytics require numpy")
+
+
+def _view(values, dtype):
+    """Return an ``array.array`` as a NumPy array (without a copy)."""
+    if not len(values):
+        return numpy.zeros(0, dtype)
+    return numpy.frombuffer(values, values.typecode).astype(dtype, copy=False)
+
+
+def edge_arrays(snapshot):
+    """Return the source and target vertex indexes of every edge.
+
+    :param snapshot: the graph snapshot
+    :type snapshot: arango.snapshot.GraphSnapshot
+    :returns: the sources and the targets (NumPy arrays, in the order of
+        the outbound CSR adjacency)
+    :rtype: tuple
+    """
+    _require_numpy()
+    offsets, neighbors, _ = snapshot.csr("outbound")
+    offsets = _view(offsets, numpy.int64)
+    sources = numpy.repeat(
+        numpy.arange(snapshot.vertex_count, dtype=numpy.int64),
+        numpy.diff(offsets)
+    )
+    return sources, _view(neighbors, numpy.int64)
+
+
+def degrees(snapshot, direction="any"):
+    """Return the degree of every vertex.
+
+    :param snapshot: the graph snapshot
+    :type snapshot: arango.snapshot.GraphSnapshot
+    :param direction: "outbound", "inbound" or "any" (an edge from a vertex
+        to itself counts twice)
+    :type direction: str
+    :returns: the degrees
+    :rtype: numpy.ndarray
+    :raises: ValueError
+    """
+    _require_numpy()
+    if direction == "any":
+        return degrees(snapshot, "outbound") + degrees(snapshot, "inbound")
+    offsets = _view(snapshot.csr(direction)[0], numpy.int64)
+    return numpy.diff(offsets)
+
+
+def degree_distribution(snapshot, direction="any"):
+    """Return the number of vertices of each degree.
+
+    :param snapshot: the graph snapshot
+    :type snapshot: arango.snapshot.GraphSnapshot
+    :param direction: "outbound", "inbound" or "any"
+    :type direction: str
+    :returns: the number of vertices with degree ``d`` at index ``d``
+    :rtype: numpy.ndarray
+    :raises: ValueError
+    """
+    return numpy.bincount(degrees(snapshot, direction))
+
+
+def pagerank(snapshot, damping=0.85, tolerance=1e-6, max_iterations=100):
+    """Return the PageRank of every vertex.
+
+    The ranks of the vertices without outbound edges are spread evenly
+    over all the vertices. The ranks sum up to 1.
+
+    :param snapshot: the graph snapshot
+    :type snapshot: arango.snapshot.GraphSnapshot
+    :param damping: the probability of following an edge
+    :type damping: float
+    :param tolerance: the iterations stop once the ranks change by less
+        than this (sum of the absolute changes)
+    :type tolerance: float
+    :param max_iterations: the maximum number of iterations
+    :type max_iterations: int
+    :returns: the ranks
+    :rtype: numpy.ndarray
+    """
+    count = snapshot.vertex_count
+    sources, targets = edge_arrays(snapshot)
+    if not count:
+        return numpy.zeros(0)
+    out_degrees = numpy.bincount(sources, minlength=count)
+    dangling = out_degrees == 0
+    inverse = numpy.zeros(count)
+    inverse[~dangling] = 1.0 / out_degrees[~dangling]
+    ranks = numpy.full(count, 1.0 / count)
+    for _ in range(max_iterations):
+        shares = (ranks * inverse)[sources]
+        updated = damping * numpy.bincount(
+            targets, weights=shares, minlength=count
+        )
+        updated += (1.0 - damping + damping * ranks[dangling].sum()) / count
+        change = numpy.abs(updated - ranks).sum()
+        ranks = updated
+        if change < tolerance:
+            break
+    return ranks
+
+
+def connected_components(snapshot):
+    """Return the (weakly) connected component of every vertex.
+
+    Edges are followed in both directions. Each component is labelled
+    with the smallest vertex index in it.
+
+    :param snapshot: the graph snapshot
+    :type snapshot: arango.snapshot.GraphSnapshot
+    :returns: the component labels
+    :rtype: numpy.ndarray
+    """
+    sources, targets = edge_arrays(snapshot)
+    labels = numpy.arange(snapshot.vertex_count, dtype=numpy.int64)
+    while True:
+        source_labels, target_labels = labels[sources], labels[targets]
+        if numpy.array_equal(source_labels, target_labels):
+            return labels
+        # Hook the larger label of each edge onto the smaller one, then
+        # shortcut every vertex to the root of its tree
+        numpy.minimum.at(
+            labels,
+            numpy.maximum(source_labels, target_labels),
+            numpy.minimum(source_labels, target_labels)
+        )
+        while True:
+            parents = labels[labels]
+            if numpy.array_equal(parents, labels):
+                break
+            labels = parents
+
+
+def core_numbers(snapshot):
+    """Return the core number of every vertex.
+
+    The core number of a vertex is the largest ``k`` such that it belongs
+    to the k-core, i.e. the largest subgraph in which every vertex has at
+    least ``k`` edges. Edges count in both directions and an edge from a
+    vertex to itself is ignored.
+
+    :param snapshot: the graph snapshot
+    :type snapshot: arango.snapshot.GraphSnapshot
+    :returns: the core numbers
+    :rtype: numpy.ndarray
+    """
+    count = snapshot.vertex_count
+    sources, targets = edge_arrays(snapshot)
+    links = sources != targets
+    # Every edge in both directions: (vertex, neighbor)
+    vertices = numpy.concatenate((sources[links], targets[links]))
+    neighbors = numpy.concatenate((targets[links], sources[links]))
+    remaining = numpy.bincount(vertices, minlength=count)
+    cores = numpy.zeros(count, dtype=numpy.int64)
+    alive = numpy.ones(count, dtype=bool)
+    live_edges = numpy.ones(len(vertices), dtype=bool)
+    k = 0
+    while alive.any():
+        k = max(k, remaining[alive].min())
+        # Peel all the vertices with at most k edges left at once
+        peeled = alive & (remaining <= k)
+        cores[peeled] = k
+        alive &= ~peeled
+        cut = live_edges & peeled[vertices]
+        live_edges &= ~(peeled[vertices] | peeled[neighbors])
+        remaining -= numpy.bincount(neighbors[cut], minlength=count)
+    return cores
+
+
+def k_core(snapshot, k):
+    """Return the IDs of the vertices in the k-core.
+
+    :param snapshot: the graph snapshot
+    :type snapshot: arango.snapshot.GraphSnapshot
+    :param k: the minimum number of edges of each vertex in the core
+    :type k: int
+    :returns: the vertex IDs
+    :rtype: list
+    """
+    ids = snapshot.vertex_ids
+    return [ids[i] for i in numpy.flatnonzero(core_numbers(snapshot) >= k)]
+
+
+def write_back(snapshot, values, attribute, chunk_size=500, max_workers=1,
+               max_details=100):
+    """Store a value of every vertex as an attribute of its document.
+
+    The vertex documents are updated with ``update_many`` (one call per
+    ``chunk_size * max_workers`` vertices of a collection, so that only
+    those requests are held at once). Vertices which have no document are
+    counted as errors.
+
+    :param snapshot: the graph snapshot
+    :type snapshot: arango.snapshot.GraphSnapshot
+    :param values: the values by vertex index (e.g. ranks)
+    :type values: numpy.ndarray or list
+    :param attribute: the name of the attribute to set
+    :type attribute: str
+    :param chunk_size: the maximum number of updates per request
+    :type chunk_size: int
+    :param max_workers: the maximum number of concurrent requests
+    :type max_workers: int
+    :param max_details: the maximum number of failed outcomes kept per
+        collection
+    :type max_details: int
+    :returns: the number of "updated" documents and "errors" and the
+        "details" (failed outcomes of ``update_many``) by collection name
+    :rtype: dict
+    :raises: ValueError, BatchExecuteError
+    """
+    ids = snapshot.vertex_ids
+    if len(values) != len(ids):
+        raise ValueError("expected {} values, got {}".format(
+            len(ids), len(values)
+        ))
+    if hasattr(values, "tolist"):
+        values = values.tolist()
+    by_collection = {}
+    for position, vertex_id in enumerate(ids):
+        name, key = vertex_id.split("/", 1)
+        by_collection.setdefault(name, []).append((key, position))
+    step = chunk_size * max(max_workers, 1)
+    reports = {}
+    for name, vertices in sorted(by_collection.items()):
+        collection = Collection(name, snapshot.graph._api)
+        report = reports[name] = {"updated": 0, "errors": 0, "details": []}
+        for start in range(0, len(vertices), step):
+            outcomes = collection.update_many(
+                [(key, {attribute: values[position]})
+                 for key, position in vertices[start:start + step]],
+                chunk_size=chunk_size, max_workers=max_workers
+            )
+            for outcome in outcomes:
+                if outcome["error"]:
+                    report["errors"] += 1
+                    if len(report["details"]) < max_details:
+                        report["details"].append(outcome)
+                else:
+                    report["updated"] += 1
+    return reports
@@ -1,20 +1,32 @@
 """ArangoDB Request Client."""
 
 import json
+import re
+from timeit import default_timer
+try:
+    from urllib import quote
+except ImportError:
+    from urllib.parse import quote
 
 from arango.clients.default import DefaultArangoClient
 from arango.clients.session import SessionArangoClient
+from arango.clients.unix import UnixSocketArangoClient
+from arango.exceptions import ServerVersionError, VersionGetError
+from arango.response import ArangoResponse
 from arango.utils import is_string
 
 
 class ArangoAPI(object):
     """A simple wrapper for making HTTP clients to ArangoDB.
 
-    :param protocol: the internet transfer protocol (default: http)
+    :param protocol: the internet transfer protocol, or "unix" to connect
+        through a unix domain socket (default: http)
     :type protocol: str
-    :param host: ArangoDB host (default: localhost)
+    :param host: ArangoDB host, or the socket path if the protocol is
+        "unix" (an endpoint like "unix:///tmp/arangodb.sock" is also
+        accepted) (default: localhost)
     :type host: str
-    :param port: ArangoDB port (default: 8529)
+    :param port: ArangoDB port, ignored for unix sockets (default: 8529)
     :type port: int or str
     :param username: username for ArangoDB (default: root)
     :type username: str
@@ -24,18 +36,99 @@ class ArangoAPI(object):
     :type db_name: str
     :param client: HTTP client for the connection to use
     :type client: arango.clients.base.BaseArangoClient
+    :param singleflight: used to coalesce identical concurrent reads
+    :type singleflight: arango.singleflight.SingleFlight or None
+    :param compression: the compression of request and response bodies
+    :type compression: arango.compression.Compression or None
+    :param slow_log: records the operations slower than its threshold
+    :type slow_log: arango.slowlog.SlowLog or None
+    :param key_allocator: sets the keys of new documents client-side
+    :type key_allocator: arango.keys.KeyAllocator or None
     """
 
     def __init__(self, protocol="http", host="localhost", port=8529,
-                 username="root", password="", db_name="_system", client=None):
+                 username="root", password="", db_name="_system", client=None,
+                 singleflight=None, compression=None, slow_log=None,
+                 key_allocator=None):
+        if host.startswith("unix://"):
+            protocol, host = "unix", host[len("unix://"):]
         self.protocol = protocol
         self.host = host
         self.port = port
         self.username = username
         self.password = password
         self.db_name = db_name
-        # self.client = SessionArangoClient() if client is None else client
-        self.client = DefaultArangoClient() if client is None else client
+        self.singleflight = singleflight
+        self.compression = compression
+        self.slow_log = slow_log
+        self.key_allocator = key_allocator
+        self._server_version = None
+        if client is not None:
+            self.client = client
+        elif self.is_unix:
+            self.client = UnixSocketArangoClient()
+        else:
+            # self.client = SessionArangoClient()
+            self.client = DefaultArangoClient()
+
+    @property
+    def is_unix(self):
+        """Return True if the endpoint is a unix domain socket.
+
+        :returns: whether or not the endpoint is a unix domain socket
+        :rtype: bool
+        """
+        return self.protocol == "unix"
+
+    @property
+    def endpoint(self):
+        """Return the URL of the server without the database part.
+
+        e.g. http://localhost:8529 or http+unix://%2Ftmp%2Farangodb.sock
+        (the socket path is percent-encoded into the host part)
+
+        :returns: the server URL
+        :rtype: str
+        """
+        if self.is_unix:
+            return "http+unix://{}".format(quote(self.host, safe=""))
+        return "{protocol}://{host}:{port}".format(
+            protocol=self.protocol,
+            host=self.host,
+            port=self.port,
+        )
+
+    def server_version(self):
+        """Return the version of ArangoDB (read once, then cached).
+
+        :returns: the major, minor and patch version numbers
+        :rtype: tuple
+        :raises: VersionGetError
+        """
+        if self._server_version is None:
+            res = self.get("/_api/version")
+            if res.status_code != 200:
+                raise VersionGetError(res)
+            self._server_version = _version_tuple(res.obj["version"])
+        return self._server_version
+
+    def require_version(self, minimum, feature):
+        """Raise an error if ArangoDB is older than the minimum version.
+
+        :param minimum: the minimum major and minor version, e.g. (2, 8)
+        :type minimum: tuple
+        :param feature: the name of the feature (for the error message)
+        :type feature: str
+        :raises: ServerVersionError, VersionGetError
+        """
+        version = self.server_version()
+        if version < tuple(minimum):
+            raise ServerVersionError(
+                "{} require ArangoDB {} or later (the server is {})".format(
+                    feature, ".".join(map(str, minimum)),
+                    ".".join(map(str, version))
+                )
+            )
 
     @property
     def url_prefix(self):
@@ -46,36 +139,117 @@ class ArangoAPI(object):
         :returns: the URL prefix
         :rtype: str
         """
-        return "{protocol}://{host}:{port}/_db/{db}".format(
-            protocol=self.protocol,
-            host=self.host,
-            port=self.port,
+        return "{endpoint}/_db/{db}".format(
+            endpoint=self.endpoint,
             db=self.db_name,
         )
 
+    def coalesce(self, key, func, copy=None):
+        """Execute ``func`` sharing it with identical concurrent calls.
+
+        This is a no-op (i.e. ``func`` is simply executed) unless request
+        coalescing is enabled. The callers of coalesced calls get their own
+        copy of the result (made with ``copy``), so they may modify it.
+
+        :param key: the identity of the call within this database
+        :type key: tuple
+        :param func: the function to execute (no arguments)
+        :type func: callable
+        :param copy: returns a copy of the result (None shares the result)
+        :type copy: callable or None
+        :returns: the result of ``func``
+        """
+        if self.singleflight is None:
+            return func()
+        return self.singleflight.do(
+            (self.url_prefix,) + tuple(key), func, copy
+        )
+
+    def _headers(self, headers):
+        """Return the request headers with Accept-Encoding if needed."""
+        if self.compression is None:
+            return headers
+        headers = dict(headers) if headers else {}
+        headers.setdefault(
+            "Accept-Encoding", self.compression.accept_encoding
+        )
+        return headers
+
+    def _body(self, data, headers):
+        """Serialize (and compress if needed) the request body.
+
+        :returns: the request body and the request headers
+        :rtype: tuple
+        """
+        data = data if is_string(data) else json.dumps(data)
+        headers = self._headers(headers)
+        if self.compression is not None:
+            data, encoding = self.compression.compress(data)
+            if encoding is not None:
+                headers["Content-Encoding"] = encoding
+        return data, headers
+
+    def _send(self, method, path, obj, request, **kwargs):
+        """Make the request with the client, timing it if needed.
+
+        :param method: the HTTP method (for the slow log)
+        :type method: str
+        :param path: the request path (for the slow log)
+        :type path: str
+        :param obj: the request body before serialization (for the slow log)
+        :type obj: object
+        :param request: the client method to call with ``kwargs``
+        :type request: callable
+        :returns: the response
+        :rtype: arango.response.ArangoResponse
+        """
+        if self.slow_log is None:
+            return request(**kwargs)
+        start = default_timer()
+        res = request(**kwargs)
+        self.slow_log.observe(
+            method, path, self.db_name, default_timer() - start, res, obj
+        )
+        return res
+
     def head(self, path, params=None, headers=None):
         """Execute an HTTP HEAD method."""
-        return self.client.head(
+        return self._send(
+            "HEAD", path, None, self.client.head,
             url=self.url_prefix + path,
             params=params,
-            headers=headers,
+            headers=self._headers(headers),
             auth=(self.username, self.password)
         )
 
-    def get(self, path, params=None, headers=None):
-        """Execute an HTTP GET method."""
-        return self.client.get(
+    def get(self, path, params=None, headers=None, coalesce=False):
+        """Execute an HTTP GET method.
+
+        If ``coalesce`` is True, identical concurrent GET requests share one
+        HTTP call (if request coalescing is enabled); its response body is
+        decoded again for each of the callers.
+        """
+        if coalesce and self.singleflight is not None:
+            return self.coalesce(
+                ("GET", path, _freeze(params), _freeze(headers)),
+                lambda: self.get(path, params, headers),
+                ArangoResponse.copy
+            )
+        return self._send(
+            "GET", path, None, self.client.get,
             url=self.url_prefix + path,
             params=params,
-            headers=headers,
+            headers=self._headers(headers),
             auth=(self.username, self.password),
         )
 
     def put(self, path, data=None, params=None, headers=None):
         """Execute an HTTP PUT method."""
-        return self.client.put(
+        body, headers = self._body(data, headers)
+        return self._send(
+            "PUT", path, data, self.client.put,
             url=self.url_prefix + path,
-            data=data if is_string(data) else json.dumps(data),
+            data=body,
             params=params,
             headers=headers,
             auth=(self.username, self.password)
@@ -83,9 +257,11 @@ class ArangoAPI(object):
 
     def post(self, path, data=None, params=None, headers=None):
         """Execute an HTTP POST method."""
-        return self.client.post(
+        body, headers = self._body(data, headers)
+        return self._send(
+            "POST", path, data, self.client.post,
             url=self.url_prefix + path,
-            data=data if is_string(data) else json.dumps(data),
+            data=body,
             params=params,
             headers=headers,
             auth=(self.username, self.password)
@@ -93,9 +269,11 @@ class ArangoAPI(object):
 
     def patch(self, path, data=None, params=None, headers=None):
         """Execute an HTTP PATCH method."""
-        return self.client.patch(
+        body, headers = self._body(data, headers)
+        return self._send(
+            "PATCH", path, data, self.client.patch,
             url=self.url_prefix + path,
-            data=data if is_string(data) else json.dumps(data),
+            data=body,
             params=params,
             headers=headers,
             auth=(self.username, self.password)
@@ -103,9 +281,23 @@ class ArangoAPI(object):
 
     def delete(self, path, params=None, headers=None):
         """Execute an HTTP DELETE method."""
-        return self.client.delete(
+        return self._send(
+            "DELETE", path, None, self.client.delete,
             url=self.url_prefix + path,
             params=params,
-            headers=headers,
+            headers=self._headers(headers),
             auth=(self.username, self.password)
         )
+
+
+def _freeze(mapping):
+    """Return a hashable version of the ``mapping`` of strings."""
+    return tuple(sorted(mapping.items())) if mapping else ()
+
+
+def _version_tuple(version):
+    """Return the numbers of a version string like "2.8.0-devel"."""
+    match = re.match(r"(\d+)\.(\d+)(?:\.(\d+))?", version)
+    if match is None:
+        return (0, 0, 0)
+    return tuple(int(number or 0) for number in match.groups())
@@ -0,0 +1,369 @@
+"""Fluent builder of AQL queries with bind parameters."""
+
+import json
+import re
+
+from arango.utils import is_string
+
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# The comparison operators usable in FILTER clauses
+OPERATORS = frozenset([
+    "==", "!=", "<", "<=", ">", ">=", "IN", "NOT IN", "LIKE",
+])
+
+# The directions of graph traversals
+DIRECTIONS = frozenset(["OUTBOUND", "INBOUND", "ANY"])
+
+
+def _variable(name):
+    """Validate a variable name and return it."""
+    if not is_string(name) or not IDENTIFIER.match(name):
+        raise ValueError("invalid variable name: {!r}".format(name))
+    return name
+
+
+def _attribute(path):
+    """Return the AQL expression of a dotted attribute path.
+
+    The first name is the variable; the attribute names which are not
+    plain identifiers are quoted with backticks.
+
+    e.g. "d.address.zip-code" becomes d.address.`zip-code`
+    """
+    if not is_string(path):
+        raise ValueError("invalid attribute path: {!r}".format(path))
+    names = path.split(".")
+    parts = [_variable(names[0])]
+    for name in names[1:]:
+        if not name or "`" in name:
+            raise ValueError("invalid attribute path: {!r}".format(path))
+        parts.append(name if IDENTIFIER.match(name) else
+                     "`{}`".format(name))
+    return ".".join(parts)
+
+
+class _Renderer(object):
+    """Assign the bind parameters of a query while rendering its text."""
+
+    def __init__(self):
+        self.bind_vars = {}
+        self._counts = {}
+
+    def bind(self, value, prefix="value"):
+        """Bind a value and return its placeholder."""
+        index = self._counts.get(prefix, 0)
+        self._counts[prefix] = index + 1
+        name = "{}{}".format(prefix, index)
+        if prefix == "collection":
+            self.bind_vars["@" + name] = value
+            return "@@" + name
+        self.bind_vars[name] = value
+        return "@" + name
+
+
+class QueryBuilder(object):
+    """An AQL query built clause by clause.
+
+    Every method returns a new builder, so a partial query can be extended
+    in different ways. Collection names and values are always passed as
+    bind parameters, which are named by their position (@value0, @value1,
+    ... and @@collection0, ...). Queries of the same shape thus have the
+    same text regardless of the values, which lets the server (and the
+    plan cache) reuse their plans.
+
+    e.g. the text of the query::
+
+        db.query().for_("d", "students").filter("d.age", ">=", 18) \\
+            .sort("d.name").limit(10).return_("d.name")
+
+    is ``FOR d IN @@collection0 FILTER d.age >= @value0 SORT d.name ASC
+    LIMIT @value1, @value2 RETURN d.name``.
+
+    :param database: the database to execute the query in
+    :type database: arango.database.Database or None
+    :param clauses: the clauses of the query
+    :type clauses: tuple
+    """
+
+    def __init__(self, database=None, clauses=()):
+        self._database = database
+        self._clauses = tuple(clauses)
+
+    def __repr__(self):
+        return "<ArangoDB query builder \"{}\">".format(self.text)
+
+    def __eq__(self, other):
+        return isinstance(other, QueryBuilder) and \
+            self.cache_key == other.cache_key
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.cache_key)
+
+    def _add(self, kind, *args):
+        return QueryBuilder(self._database, self._clauses + ((kind, args),))
+
+    def for_(self, variable, collection):
+        """Iterate over a collection (or a list of values).
+
+        :param variable: the name of the loop variable
+        :type variable: str
+        :param collection: the collection name, or a list of values
+        :type collection: str or list
+        :returns: the extended query
+        :rtype: arango.aql.QueryBuilder
+        """
+        return self._add("FOR", _variable(variable), collection)
+
+    def traverse(self, start, graph, direction="outbound", min_depth=1,
+                 max_depth=1, vertex="v", edge="e", path=None):
+        """Traverse a graph from a start vertex.
+
+        The AQL traversal syntax needs ArangoDB 2.8 or later, which is
+        checked when the query is executed or explained.
+
+        :param start: the ID of the start vertex
+        :type start: str
+        :param graph: the name of the graph
+        :type graph: str
+        :param direction: "outbound", "inbound" or "any"
+        :type direction: str
+        :param min_depth: the minimum depth of the vertices to visit
+        :type min_depth: int
+        :param max_depth: the maximum depth of the vertices to visit
+        :type max_depth: int
+        :param vertex: the name of the vertex variable
+        :type vertex: str
+        :param edge: the name of the edge variable
+        :type edge: str
+        :param path: the name of the path variable (None for no path)
+        :type path: str or None
+        :returns: the extended query
+        :rtype: arango.aql.QueryBuilder
+        """
+        direction = direction.upper()
+        if direction not in DIRECTIONS:
+            raise ValueError("invalid direction: {!r}".format(direction))
+        variables = [_variable(vertex), _variable(edge)]
+        if path is not None:
+            variables.append(_variable(path))
+        return self._add(
+            "TRAVERSE", tuple(variables), start, graph, direction,
+            int(min_depth), int(max_depth)
+        )
+
+    def filter(self, attribute, operator, value):
+        """Keep the documents whose attribute compares with the value.
+
+        Several filters must all be met.
+
+        :param attribute: the attribute path (e.g. "d.address.city")
+        :type attribute: str
+        :param operator: one of ==, !=, <, <=, >, >=, IN, NOT IN and LIKE
+        :type operator: str
+        :param value: the value to compare with
+        :type value: object
+        :returns: the extended query
+        :rtype: arango.aql.QueryBuilder
+        """
+        operator = operator.upper()
+        if operator not in OPERATORS:
+            raise ValueError("invalid operator: {!r}".format(operator))
+        return self._add("FILTER", _attribute(attribute), operator, value)
+
+    def sort(self, attribute, direction="asc"):
+        """Sort by an attribute (after the attributes sorted by before).
+
+        :param attribute: the attribute path
+        :type attribute: str
+        :param direction: "asc" or "desc"
+        :type direction: str
+        :returns: the extended query
+        :rtype: arango.aql.QueryBuilder
+        """
+        direction = direction.upper()
+        if direction not in ("ASC", "DESC"):
+            raise ValueError("invalid direction: {!r}".format(direction))
+        return self._add("SORT", _attribute(attribute), direction)
+
+    def limit(self, count, offset=0):
+        """Limit the number of results.
+
+        :param count: the maximum number of results
+        :type count: int
+        :param offset: the number of results to skip
+        :type offset: int
+        :returns: the extended query
+        :rtype: arango.aql.QueryBuilder
+        """
+        return self._add("LIMIT", int(offset), int(count))
+
+    def collect(self, variable, attribute, count_into=None):
+        """Group by an attribute.
+
+        :param variable: the name of the group variable
+        :type variable: str
+        :param attribute: the attribute path to group by
+        :type attribute: str
+        :param count_into: the name of the variable holding the group size
+        :type count_into: str or None
+        :returns: the extended query
+        :rtype: arango.aql.QueryBuilder
+        """
+        return self._add(
+            "COLLECT", _variable(variable), _attribute(attribute),
+            None if count_into is None else _variable(count_into)
+        )
+
+    def return_(self, expression, distinct=False):
+        """Return a variable, an attribute or an object of attributes.
+
+        :param expression: the attribute path, or a dict mapping the names
+            of the returned attributes to attribute paths
+        :type expression: str or dict
+        :param distinct: whether or not to remove duplicate results
+        :type distinct: bool
+        :returns: the extended query
+        :rtype: arango.aql.QueryBuilder
+        """
+        if isinstance(expression, dict):
+            for name in expression:
+                _variable(name)
+            expression = tuple(sorted(
+                (name, _attribute(path)) for name, path in expression.items()
+            ))
+        else:
+            expression = _attribute(expression)
+        return self._add("RETURN", expression, bool(distinct))
+
+    def _render(self):
+        renderer = _Renderer()
+        parts = []
+        sorts = []
+
+        def flush_sorts():
+            if sorts:
+                parts.append("SORT " + ", ".join(sorts))
+                del sorts[:]
+
+        for kind, args in self._clauses:
+            if kind != "SORT":
+                flush_sorts()
+            if kind == "FOR":
+                variable, source = args
+                placeholder = renderer.bind(
+                    source, "collection" if is_string(source) else "value"
+                )
+                parts.append("FOR {} IN {}".format(variable, placeholder))
+            elif kind == "TRAVERSE":
+                variables, start, graph, direction, min_depth, max_depth = \
+                    args
+                parts.append("FOR {} IN {}..{} {} {} GRAPH {}".format(
+                    ", ".join(variables),
+                    renderer.bind(min_depth),
+                    renderer.bind(max_depth),
+                    direction,
+                    renderer.bind(start),
+                    renderer.bind(graph),
+                ))
+            elif kind == "FILTER":
+                attribute, operator, value = args
+                parts.append("FILTER {} {} {}".format(
+                    attribute, operator, renderer.bind(value)
+                ))
+            elif kind == "SORT":
+                sorts.append("{} {}".format(*args))
+            elif kind == "LIMIT":
+                offset, count = args
+                parts.append("LIMIT {}, {}".format(
+                    renderer.bind(offset), renderer.bind(count)
+                ))
+            elif kind == "COLLECT":
+                variable, attribute, count_into = args
+                clause = "COLLECT {} = {}".format(variable, attribute)
+                if count_into is not None:
+                    clause += " WITH COUNT INTO {}".format(count_into)
+                parts.append(clause)
+            elif kind == "RETURN":
+                expression, distinct = args
+                if isinstance(expression, tuple):
+                    expression = "{{{}}}".format(", ".join(
+                        "{}: {}".format(name, path)
+                        for name, path in expression
+                    ))
+                parts.append("RETURN {}{}".format(
+                    "DISTINCT " if distinct else "", expression
+                ))
+        flush_sorts()
+        return " ".join(parts), renderer.bind_vars
+
+    @property
+    def text(self):
+        """Return the canonical text of the query.
+
+        :rtype: str
+        """
+        return self._render()[0]
+
+    @property
+    def bind_vars(self):
+        """Return the bind parameters of the query.
+
+        :rtype: dict
+        """
+        return self._render()[1]
+
+    @property
+    def cache_key(self):
+        """Return a key identifying the query and its bind parameters.
+
+        :rtype: tuple
+        """
+        text, bind_vars = self._render()
+        return text, json.dumps(bind_vars, sort_keys=True)
+
+    def params(self):
+        """Return the query and its bind parameters as keyword arguments.
+
+        The result can be passed to ``Database.execute_query`` (or be one
+        of the queries of ``Database.execute_queries``).
+
+        :rtype: dict
+        """
+        text, bind_vars = self._render()
+        return {"query": text, "bind_vars": bind_vars}
+
+    def _require_database(self):
+        if self._database is None:
+            raise ValueError("the query builder has no database")
+        if any(kind == "TRAVERSE" for kind, _ in self._clauses):
+            self._database._api.require_version(
+                (2, 8), "AQL graph traversals"
+            )
+        return self._database
+
+    def execute(self, **kwargs):
+        """Execute the query.
+
+        :param kwargs: further keyword arguments of ``execute_query``
+        :returns: the cursor
+        :rtype: arango.cursor.Cursor
+        :raises: ValueError, ServerVersionError, QueryExecuteError,
+            CursorDeleteError
+        """
+        kwargs.update(self.params())
+        return self._require_database().execute_query(**kwargs)
+
+    def explain(self, **kwargs):
+        """Explain the query.
+
+        :param kwargs: further keyword arguments of ``explain_query``
+        :returns: the query plan or list of plans
+        :rtype: dict or list
+        :raises: ValueError, ServerVersionError, QueryExplainError
+        """
+        kwargs.update(self.params())
+        return self._require_database().explain_query(**kwargs)
@@ -1,9 +1,13 @@
 import json
-import inspect
+try:
+    from inspect import getfullargspec as getargspec
+except ImportError:
+    from inspect import getargspec
 try:
     from urllib import urlencode
 except ImportError:
     from urllib.parse import urlencode
+from arango.utils import filter_keys
 from arango.exceptions import (
     BatchInvalidError,
     BatchExecuteError
@@ -16,7 +20,9 @@ class BatchHandler(object):
         self._api = api
 
     def execute_batch(self, requests):
-        data = ""
+        return self._execute_batch_parts(self._prepare(requests))
+
+    def _prepare(self, requests):
         for content_id, request in enumerate(requests, start=1):
             try:
                 func, args, kwargs = request
@@ -24,25 +30,52 @@ class BatchHandler(object):
                 raise BatchInvalidError(
                     "pos {}: malformed request".format(content_id)
                 )
-            if "_batch" not in inspect.getargspec(func)[0]:
+            if "_batch" not in getargspec(func)[0]:
                 raise BatchInvalidError(
                     "pos {}: ArangoDB method '{}' does not support "
                     "batch execution".format(content_id, func.__name__)
                 )
             kwargs["_batch"] = True
-            res = func(*args, **kwargs)
-            data += "--XXXsubpartXXX\r\n"
-            data += "Content-Type: application/x-arango-batchpart\r\n"
-            data += "Content-Id: {}\r\n\r\n".format(content_id)
-            data += "{}\r\n".format(stringify_request(**res))
-        data += "--XXXsubpartXXX--\r\n\r\n"
-        res = self._api.post(
-            "/_api/batch",
-            headers={
-                "Content-Type": "multipart/form-data; boundary=XXXsubpartXXX"
-            },
-            data=data,
-        )
+            yield func(*args, **kwargs)
+
+    def _execute_batch_parts(self, parts):
+        """Execute the prepared requests (of the ``_batch`` methods).
+
+        The ``on_done`` callable of a part (e.g. to invalidate a cache once
+        the write is done) is called after the batch request, even if it
+        failed.
+
+        :param parts: the method, path, params and data of each request
+        :type parts: iterable
+        :returns: the response bodies
+        :rtype: list
+        :raises: BatchExecuteError
+        """
+        data = []
+        callbacks = []
+        for content_id, part in enumerate(parts, start=1):
+            if part.get("on_done") is not None:
+                callbacks.append(part["on_done"])
+                part = filter_keys(part, ["on_done"])
+            data.append(
+                "--XXXsubpartXXX\r\n"
+                "Content-Type: application/x-arango-batchpart\r\n"
+                "Content-Id: {}\r\n\r\n"
+                "{}\r\n".format(content_id, stringify_request(**part))
+            )
+        data.append("--XXXsubpartXXX--\r\n\r\n")
+        try:
+            res = self._api.post(
+                "/_api/batch",
+                headers={
+                    "Content-Type":
+                        "multipart/form-data; boundary=XXXsubpartXXX"
+                },
+                data="".join(data),
+            )
+        finally:
+            for callback in callbacks:
+                callback()
         if res.status_code != 200:
             raise BatchExecuteError(res)
         return [
@@ -0,0 +1,245 @@
+"""Thread-safe client sharing a bounded pool of sessions across threads."""
+
+import os
+import threading
+import time
+import weakref
+
+import requests
+
+from arango.response import ArangoResponse
+from arango.clients.base import BaseArangoClient
+from arango.exceptions import ConnectionPoolTimeoutError
+
+# Live pools, reset in the child process after os.fork (where supported)
+_pools = weakref.WeakSet()
+
+
+def _reset_pools_after_fork():
+    for pool in list(_pools):
+        pool.reset()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+class SessionPool(object):
+    """A bounded pool of ``requests.Session`` objects.
+
+    A session is only ever used by one thread at a time, so the (not
+    thread-safe) sessions can be shared by any number of threads while the
+    number of open connections stays bounded by ``size``. Sessions are
+    created lazily and idle ones are handed out most recently used first so
+    that their keep-alive connections stay warm.
+
+    With ``thread_affinity`` enabled, a thread gets back the session it used
+    last whenever that session is idle, which keeps each thread on the same
+    connection under light contention.
+
+    The pool is reset in a forked child process: the sessions (and their
+    sockets) inherited from the parent are dropped without being used.
+
+    :param size: the maximum number of sessions (i.e. connections per host)
+    :type size: int
+    :param thread_affinity: whether or not to prefer the thread's last session
+    :type thread_affinity: bool
+    :param timeout: the seconds to wait for an idle session (None waits
+        indefinitely)
+    :type timeout: float or None
+    """
+
+    def __init__(self, size=10, thread_affinity=False, timeout=None):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.size = size
+        self.thread_affinity = thread_affinity
+        self.timeout = timeout
+        self.reset()
+        _pools.add(self)
+
+    def reset(self):
+        """Forget all sessions (e.g. after a fork) without closing them."""
+        self._pid = os.getpid()
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = []
+        self._created = 0
+        self._local = threading.local()
+
+    def _check_pid(self):
+        # Fallback for interpreters without os.register_at_fork
+        if self._pid != os.getpid():
+            self.reset()
+
+    def acquire(self):
+        """Check out a session, waiting for one if the pool is exhausted.
+
+        :returns: the session
+        :rtype: requests.Session
+        :raises: ConnectionPoolTimeoutError
+        """
+        self._check_pid()
+        with self._cond:
+            if not self._idle and self._created >= self.size:
+                if not self._wait():
+                    raise ConnectionPoolTimeoutError(
+                        "no idle connection within {} seconds (pool size "
+                        "{})".format(self.timeout, self.size)
+                    )
+            if self._idle:
+                last = getattr(self._local, "session", None)
+                if self.thread_affinity and last is not None and \
+                        last in self._idle:
+                    self._idle.remove(last)
+                    return last
+                return self._idle.pop()
+            self._created += 1
+        session = requests.Session()
+        if self.thread_affinity:
+            self._local.session = session
+        return session
+
+    def _wait(self):
+        # Condition.wait does not report timeouts on Python 2, so re-check
+        if self.timeout is None:
+            while not self._idle:
+                self._cond.wait()
+            return True
+        remaining = self.timeout
+        while not self._idle and remaining > 0:
+            start = time.time()
+            self._cond.wait(remaining)
+            remaining -= time.time() - start
+        return bool(self._idle)
+
+    def release(self, session, pid=None):
+        """Return a session to the pool.
+
+        :param session: the session to return
+        :type session: requests.Session
+        :param pid: the process ID the session was acquired in
+        :type pid: int
+        """
+        if pid is not None and pid != os.getpid():
+            return
+        with self._cond:
+            if self.thread_affinity:
+                self._local.session = session
+            self._idle.append(session)
+            self._cond.notify()
+
+    def discard(self, session, pid=None):
+        """Close a broken session instead of returning it to the pool.
+
+        :param session: the session to discard
+        :type session: requests.Session
+        :param pid: the process ID the session was acquired in
+        :type pid: int
+        """
+        session.close()
+        if pid is not None and pid != os.getpid():
+            return
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    def close(self):
+        """Close all idle sessions."""
+        with self._cond:
+            for session in self._idle:
+                session.close()
+            self._created -= len(self._idle)
+            self._idle = []
+
+
+class PooledArangoClient(BaseArangoClient):
+    """Thread-safe HTTP client backed by a bounded ``SessionPool``.
+
+    A single instance can be shared by all threads of a process (e.g. the
+    worker threads of a WSGI server) and keeps at most ``pool_size``
+    connections open. It is safe to use across ``os.fork``: the child starts
+    with an empty pool.
+
+    :param pool_size: the maximum number of connections
+    :type pool_size: int
+    :param thread_affinity: whether or not each thread should reuse its own
+        connection whenever it is idle
+    :type thread_affinity: bool
+    :param pool_timeout: the seconds to wait for an idle connection when all
+        of them are in use (None waits indefinitely)
+    :type pool_timeout: float or None
+    """
+
+    def __init__(self, pool_size=10, thread_affinity=False,
+                 pool_timeout=None):
+        self.pool = SessionPool(pool_size, thread_affinity, pool_timeout)
+
+    def _request(self, method, **kwargs):
+        pid = os.getpid()
+        session = self.pool.acquire()
+        try:
+            res = session.request(method, **kwargs)
+        except Exception:
+            self.pool.discard(session, pid)
+            raise
+        self.pool.release(session, pid)
+        return ArangoResponse(res.status_code, res.text)
+
+    def head(self, url, params=None, headers=None, auth=None):
+        return self._request(
+            "HEAD",
+            url=url,
+            params=params,
+            headers=headers,
+            auth=auth,
+        )
+
+    def get(self, url, params=None, headers=None, auth=None):
+        return self._request(
+            "GET",
+            url=url,
+            params=params,
+            headers=headers,
+            auth=auth,
+        )
+
+    def put(self, url, data=None, params=None, headers=None, auth=None):
+        return self._request(
+            "PUT",
+            url=url,
+            data=data,
+            params=params,
+            headers=headers,
+            auth=auth,
+        )
+
+    def post(self, url, data=None, params=None, headers=None, auth=None):
+        return self._request(
+            "POST",
+            url=url,
+            data="" if data is None else data,
+            params={} if params is None else params,
+            headers={} if headers is None else headers,
+            auth=auth
+        )
+
+    def patch(self, url, data=None, params=None, headers=None, auth=None):
+        return self._request(
+            "PATCH",
+            url=url,
+            data=data,
+            params=params,
+            headers=headers,
+            auth=auth,
+        )
+
+    def delete(self, url, params=None, headers=None, auth=None):
+        return self._request(
+            "DELETE",
+            url=url,
+            params=params,
+            headers=headers,
+            auth=auth,
+        )
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,187 @@
+"""Client speaking HTTP over a unix domain socket."""
+
+import base64
+import socket
+import threading
+import weakref
+try:
+    from httplib import BadStatusLine, HTTPConnection, HTTPException
+    from urllib import urlencode, unquote
+    from urlparse import urlsplit
+    RemoteDisconnected = None
+except ImportError:
+    from http.client import HTTPConnection, HTTPException, RemoteDisconnected
+    from urllib.parse import urlencode, unquote, urlsplit
+
+from arango.response import ArangoResponse
+from arango.clients.base import BaseArangoClient
+from arango.compression import read_text
+
+
+def split_unix_url(url):
+    """Split a unix socket URL into the socket path and the request path.
+
+    The socket path is the percent-encoded host part of the URL, e.g.
+    ``http+unix://%2Ftmp%2Farangodb.sock/_api/version``.
+
+    :param url: the request URL
+    :type url: str
+    :returns: the socket path and the request path (with the query string)
+    :rtype: tuple
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "http+unix":
+        raise ValueError("not a unix socket URL: {}".format(url))
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    return unquote(parts.netloc), path
+
+
+def _closed_before_response(error):
+    """Return True if the server closed the connection without answering.
+
+    This is how a keep-alive connection closed by the server while it was
+    idle fails, before the server read anything of the request.
+
+    :param error: the error raised while reading the response
+    :type error: Exception
+    :rtype: bool
+    """
+    if RemoteDisconnected is not None:
+        return isinstance(error, RemoteDisconnected)
+    # Python 2 reports an empty status line
+    return isinstance(error, BadStatusLine) and (
+        error.line in ("", "''") or error.line.startswith("No status line")
+    )
+
+
+class UnixHTTPConnection(HTTPConnection):
+    """An HTTP connection over a unix domain socket.
+
+    :param socket_path: the file path of the socket
+    :type socket_path: str
+    :param timeout: the socket timeout in seconds
+    :type timeout: float or None
+    """
+
+    def __init__(self, socket_path, timeout=None):
+        HTTPConnection.__init__(self, "localhost")
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except socket.error:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class UnixSocketArangoClient(BaseArangoClient):
+    """HTTP client for ArangoDB listening on a unix domain socket.
+
+    Each thread keeps one keep-alive connection open per socket path, so
+    that concurrent requests of several threads do not wait for each other
+    (like the sessions of ``PooledArangoClient``). A request is sent again
+    on a new connection only if the server had closed the reused connection
+    before reading it, i.e. never after a timeout or once any part of the
+    response arrived. Compressed (gzip or deflate) responses are
+    decompressed while they are read.
+
+    :param timeout: the socket timeout in seconds
+    :type timeout: float or None
+    """
+
+    def __init__(self, timeout=None):
+        self._timeout = timeout
+        self._local = threading.local()
+        # The connections of all the threads (to be closed by close)
+        self._connections = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def _connection(self, socket_path):
+        """Return the connection of the current thread to the socket."""
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(socket_path)
+        if conn is None:
+            conn = UnixHTTPConnection(socket_path, self._timeout)
+            connections[socket_path] = conn
+            with self._lock:
+                self._connections.add(conn)
+        return conn
+
+    def _request(self, method, url, data=None, params=None, headers=None,
+                 auth=None):
+        socket_path, path = split_unix_url(url)
+        if params:
+            params = dict(
+                (key, value) for key, value in params.items()
+                if value is not None
+            )
+            if params:
+                path += ("&" if "?" in path else "?") + urlencode(params)
+        headers = dict(headers or {})
+        if auth is not None:
+            credentials = "{}:{}".format(*auth).encode("utf-8")
+            headers["Authorization"] = "Basic {}".format(
+                base64.b64encode(credentials).decode("ascii")
+            )
+        if data is not None and not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        if data is None and method in ("POST", "PUT", "PATCH"):
+            data = b""
+
+        conn = self._connection(socket_path)
+        while True:
+            # An open socket is left over from a previous request
+            reused = conn.sock is not None
+            try:
+                conn.request(method, path, body=data, headers=headers)
+            except socket.timeout:
+                conn.close()
+                raise
+            except (socket.error, HTTPException):
+                # The server closed the idle connection, so nothing of the
+                # request was processed
+                conn.close()
+                if not reused:
+                    raise
+                continue
+            try:
+                res = conn.getresponse()
+                text = read_text(res.read, res.getheader("Content-Encoding"))
+            except (socket.error, HTTPException) as error:
+                conn.close()
+                if reused and _closed_before_response(error):
+                    continue
+                raise
+            return ArangoResponse(res.status, text)
+
+    def head(self, url, params=None, headers=None, auth=None):
+        return self._request("HEAD", url, None, params, headers, auth)
+
+    def get(self, url, params=None, headers=None, auth=None):
+        return self._request("GET", url, None, params, headers, auth)
+
+    def put(self, url, data=None, params=None, headers=None, auth=None):
+        return self._request("PUT", url, data, params, headers, auth)
+
+    def post(self, url, data=None, params=None, headers=None, auth=None):
+        return self._request("POST", url, data, params, headers, auth)
+
+    def patch(self, url, data=None, params=None, headers=None, auth=None):
+        return self._request("PATCH", url, data, params, headers, auth)
+
+    def delete(self, url, params=None, headers=None, auth=None):
+        return self._request("DELETE", url, None, params, headers, auth)
+
+    def close(self):
+        with self._lock:
+            for conn in list(self._connections):
+                conn.close()
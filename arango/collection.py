@@ -2,9 +2,14 @@
 
 import json
 
-from arango.utils import camelify, uncamelify
+from arango.utils import (
+    camelify, chunks, consume_concurrently, is_string, iter_chunks,
+    map_concurrently, uncamelify
+)
 from arango.exceptions import *
 from arango.cursor import CursorFactory
+from arango.batch import BatchHandler
+from arango.document import TrackedDocument
 
 
 class Collection(CursorFactory):
@@ -101,7 +106,8 @@ class Collection(CursorFactory):
         :raises: CollectionPropertyError
         """
         res = self._api.get(
-            "/_api/collection/{}/properties".format(self.name)
+            "/_api/collection/{}/properties".format(self.name),
+            coalesce=True
         )
         if res.status_code != 200:
             raise CollectionPropertyError(res)
@@ -336,11 +342,57 @@ class Collection(CursorFactory):
         else:
             raise DocumentGetError(res)
 
+    def contains_many(self, keys, chunk_size=1000, max_workers=1,
+                      as_mask=False):
+        """Return which of the given documents exist in this collection.
+
+        The keys are checked with one AQL query (``DOCUMENT`` lookups by
+        key) per chunk of ``chunk_size`` keys rather than one request per
+        key, and up to ``max_workers`` chunks are checked concurrently.
+
+        :param keys: the document keys
+        :type keys: iterable
+        :param chunk_size: the maximum number of keys per request
+        :type chunk_size: int
+        :param max_workers: the maximum number of concurrent requests
+        :type max_workers: int
+        :param as_mask: whether or not to return a list of booleans (True
+            where the document exists) in the order of ``keys`` instead of
+            the set of the existing keys
+        :type as_mask: bool
+        :returns: the existing keys, or whether each document exists
+        :rtype: set or list
+        :raises: DocumentGetError
+        """
+        keys = list(keys)
+        found = set()
+        for existing in map_concurrently(
+                self._existing_keys, chunks(set(keys), chunk_size),
+                max_workers):
+            found.update(existing)
+        if as_mask:
+            return [key in found for key in keys]
+        return found
+
+    def _existing_keys(self, keys):
+        """Return the keys of the documents in ``keys`` which exist."""
+        res = self._api.post("/_api/cursor", data={
+            # DOCUMENT looks the keys up in the primary index on every
+            # version, unlike a FILTER on d._key IN @keys
+            "query": "FOR k IN @keys LET d = DOCUMENT(@@collection, k) "
+                     "FILTER d != null RETURN k",
+            "bindVars": {"@collection": self.name, "keys": keys},
+            "batchSize": max(1, len(keys)),
+        })
+        if res.status_code != 201:
+            raise DocumentGetError(res)
+        return list(self.cursor(res))
+
     ######################
     # Handling Documents #
     ######################
 
-    def get_document(self, key, rev=None, match=True):
+    def get_document(self, key, rev=None, match=True, tracked=False):
         """Return the document of the given key.
 
         If the document revision ``rev`` is specified, it is compared
@@ -354,15 +406,19 @@ class Collection(CursorFactory):
         :type rev: str or None
         :param match: whether or not the revision should match
         :type match: bool
+        :param tracked: whether or not to return a ``TrackedDocument`` whose
+            changes can be saved with ``save``
+        :type tracked: bool
         :returns: the requested document or None if not found
-        :rtype: dict or None
+        :rtype: dict or arango.document.TrackedDocument or None
         :raises: RevisionMismatchError, DocumentGetError
         """
         res = self._api.get(
             "/_api/{}/{}/{}".format(self._type, self.name, key),
             headers={
                 "If-Match" if match else "If-None-Match": rev
-            } if rev else {}
+            } if rev else {},
+            coalesce=True
         )
         if res.status_code in {412, 304}:
             raise RevisionMismatchError(res)
@@ -370,14 +426,29 @@ class Collection(CursorFactory):
             return None
         elif res.status_code != 200:
             raise DocumentGetError(res)
+        if tracked:
+            return TrackedDocument(res.obj, self)
         return res.obj
 
+    def track(self, document):
+        """Return a ``TrackedDocument`` of a document of this collection.
+
+        :param document: the document (with its ``_key`` and ``_rev``) as
+            read e.g. by a query
+        :type document: dict
+        :returns: the document recording its changes
+        :rtype: arango.document.TrackedDocument
+        """
+        return TrackedDocument(document, self)
+
     def add_document(self, data, wait_for_sync=False, _batch=False):
         """Add the new document to this collection.
 
         If ``data`` contains the ``_key`` key, its value must be free.
-        If this collection is an edge collection, ``data`` must contain the
-        ``_from`` and ``_to`` keys with valid vertex IDs as their values.
+        Otherwise the key is set in ``data`` by the key allocator of the
+        connection (if any) before the request is sent. If this collection
+        is an edge collection, ``data`` must contain the ``_from`` and
+        ``_to`` keys with valid vertex IDs as their values.
 
         :param data: the body of the new document
         :type data: dict
@@ -387,13 +458,15 @@ class Collection(CursorFactory):
         :rtype: dict
         :raises: DocumentInvalidError, DocumentAddError
         """
-        if self._type is "edge":
+        if self._type == "edge":
             if "_to" not in data:
                 raise DocumentInvalidError(
                     "the new document data is missing the '_to' key")
             if "_from" not in data:
                 raise DocumentInvalidError(
                     "the new document data is missing the '_from' key")
+        if self._api.key_allocator is not None and "_key" not in data:
+            data["_key"] = self._api.key_allocator.next_key()
         path = "/_api/{}".format(self._type)
         params = {
             "collection": self.name,
@@ -552,6 +625,308 @@ class Collection(CursorFactory):
         del res.obj["error"]
         return res.obj
 
+    def update_many(self, documents, keep_none=True, wait_for_sync=False,
+                    chunk_size=500, max_workers=1):
+        """Update many documents of this collection by key.
+
+        The updates are sent in batch requests of ``chunk_size`` documents,
+        up to ``max_workers`` of them at a time. The documents are read
+        lazily, so only the chunks in flight have their requests built. A
+        failed update (e.g. a revision conflict) does not affect the
+        others.
+
+        The outcome of a successful update holds the ``_key``, ``_id`` and
+        new ``_rev`` of the document and ``error`` False. That of a failed
+        update holds the ``_key``, ``error`` True, the HTTP ``code``, the
+        ``error_num`` and ``error_message`` and ``conflict`` (True if the
+        revision did not match).
+
+        :param documents: the (key, data) or (key, data, rev) tuples
+        :type documents: list or collections.Iterable
+        :param keep_none: whether or not to keep the items with value None
+        :type keep_none: bool
+        :param wait_for_sync: wait for the updates to sync to disk
+        :type wait_for_sync: bool
+        :param chunk_size: the maximum number of documents per request
+        :type chunk_size: int
+        :param max_workers: the maximum number of concurrent requests
+        :type max_workers: int
+        :returns: the outcome of each document in the order of ``documents``
+        :rtype: list
+        :raises: BatchExecuteError
+        """
+        def request(document):
+            key, data, rev = _key_data_rev(document)
+            return key, self.update_document(
+                key, data, rev=rev, keep_none=keep_none,
+                wait_for_sync=wait_for_sync, _batch=True
+            )
+
+        return self._bulk_execute(
+            (request(document) for document in documents),
+            chunk_size, max_workers
+        )
+
+    def replace_many(self, documents, wait_for_sync=False, chunk_size=500,
+                     max_workers=1):
+        """Replace many documents of this collection by key.
+
+        Like ``update_many`` but the documents are replaced.
+
+        :param documents: the (key, data) or (key, data, rev) tuples
+        :type documents: list or collections.Iterable
+        :param wait_for_sync: wait for the replacements to sync to disk
+        :type wait_for_sync: bool
+        :param chunk_size: the maximum number of documents per request
+        :type chunk_size: int
+        :param max_workers: the maximum number of concurrent requests
+        :type max_workers: int
+        :returns: the outcome of each document in the order of ``documents``
+        :rtype: list
+        :raises: BatchExecuteError
+        """
+        def request(document):
+            key, data, rev = _key_data_rev(document)
+            return key, self.replace_document(
+                key, data, rev=rev, wait_for_sync=wait_for_sync, _batch=True
+            )
+
+        return self._bulk_execute(
+            (request(document) for document in documents),
+            chunk_size, max_workers
+        )
+
+    def remove_many(self, keys, wait_for_sync=False, chunk_size=500,
+                    max_workers=1):
+        """Remove many documents of this collection by key.
+
+        Like ``update_many`` but the documents are removed.
+
+        :param keys: the keys, or (key, rev) tuples
+        :type keys: list or collections.Iterable
+        :param wait_for_sync: wait for the removals to sync to disk
+        :type wait_for_sync: bool
+        :param chunk_size: the maximum number of documents per request
+        :type chunk_size: int
+        :param max_workers: the maximum number of concurrent requests
+        :type max_workers: int
+        :returns: the outcome of each document in the order of ``keys``
+        :rtype: list
+        :raises: BatchExecuteError
+        """
+        def request(key):
+            key, rev = (
+                (key, None) if not isinstance(key, (tuple, list)) else key
+            )
+            return key, self.remove_document(
+                key, rev=rev, wait_for_sync=wait_for_sync, _batch=True
+            )
+
+        return self._bulk_execute(
+            (request(key) for key in keys), chunk_size, max_workers
+        )
+
+    def save_many(self, documents, wait_for_sync=False, chunk_size=500,
+                  max_workers=1):
+        """Save the changes of many tracked documents in batch requests.
+
+        Each changed document is saved like with ``TrackedDocument.save``
+        but the requests are sent in batches of ``chunk_size`` documents,
+        up to ``max_workers`` of them at a time. The outcomes are those of
+        ``update_many``; a saved document takes its new revision while a
+        failed one (e.g. on a revision conflict) keeps its changes.
+
+        :param documents: the tracked documents (of this database)
+        :type documents: list
+        :param wait_for_sync: wait for the updates to sync to disk
+        :type wait_for_sync: bool
+        :param chunk_size: the maximum number of documents per request
+        :type chunk_size: int
+        :param max_workers: the maximum number of concurrent requests
+        :type max_workers: int
+        :returns: the outcome of each document in the order of
+            ``documents`` (None where there was nothing to save)
+        :rtype: list
+        :raises: DocumentInvalidError, BatchExecuteError
+        """
+        documents = list(documents)
+        changed = []
+        requests = []
+        for i, document in enumerate(documents):
+            request = document._save_request(wait_for_sync)
+            if request is not None:
+                changed.append(i)
+                requests.append((document["_key"], request))
+        outcomes = [None] * len(documents)
+        for i, outcome in zip(changed, self._bulk_execute(
+                requests, chunk_size, max_workers)):
+            outcomes[i] = outcome
+            if not outcome["error"]:
+                documents[i]._saved(outcome["_rev"])
+        return outcomes
+
+    def upsert(self, search, insert, update=None, keep_none=True,
+               wait_for_sync=False):
+        """Update the document matching ``search`` or insert a new one.
+
+        The lookup and the write happen in one AQL UPSERT query (i.e. in
+        one round trip), which needs ArangoDB 2.6 or later. Concurrent
+        upserts of the same new document may still both insert it unless
+        the searched attributes have a unique index.
+
+        :param search: the attribute values identifying the document
+        :type search: dict
+        :param insert: the body of the new document if none matches
+        :type insert: dict
+        :param update: the attributes to update in the matching document
+            (defaults to ``insert``)
+        :type update: dict or None
+        :param keep_none: whether or not to keep the items with value None
+        :type keep_none: bool
+        :param wait_for_sync: wait for the upsert to sync to disk
+        :type wait_for_sync: bool
+        :returns: the id, key and rev of the document and its ``type``
+            ("insert" or "update")
+        :rtype: dict
+        :raises: ServerVersionError, DocumentUpsertError
+        """
+        if not search:
+            raise ValueError("no attributes to search by")
+        self._api.require_version((2, 6), "UPSERT queries")
+        fields = list(search)
+        bind_vars = {
+            "@collection": self.name,
+            "insert": insert,
+            "update": insert if update is None else update,
+            "keepNull": keep_none,
+            "waitForSync": wait_for_sync,
+        }
+        for i, field in enumerate(fields):
+            bind_vars["search{}".format(i)] = search[field]
+        res = self._api.post("/_api/cursor", data={
+            "query": _upsert_query(
+                [(field, "@search{}".format(i))
+                 for i, field in enumerate(fields)],
+                "@insert", "@update"
+            ),
+            "bindVars": bind_vars,
+        })
+        if res.status_code != 201:
+            raise DocumentUpsertError(res)
+        outcome = _upsert_outcome(res.obj["result"][0])
+        del outcome["error"]
+        return outcome
+
+    def upsert_many(self, documents, key_fields, keep_none=True,
+                    wait_for_sync=False, chunk_size=500, max_workers=1):
+        """Upsert many documents of this collection.
+
+        Each document updates the document with the same values of the
+        ``key_fields`` attributes or is inserted if there is none (this
+        needs ArangoDB 2.6 or later). The
+        documents are upserted with one AQL UPSERT query per chunk of
+        ``chunk_size`` documents, up to ``max_workers`` chunks at a time.
+        If a chunk fails (e.g. a unique constraint is violated), its
+        upserts are undone and retried one by one in a batch request, so
+        that a failed upsert does not affect the others.
+
+        The outcome of a successful upsert holds the ``_key``, ``_id``,
+        ``_rev`` and ``type`` ("insert" or "update") of the document and
+        ``error`` False. That of a failed one is like in ``update_many``.
+
+        :param documents: the documents to upsert
+        :type documents: list
+        :param key_fields: the attribute(s) identifying a document
+        :type key_fields: str or list
+        :param keep_none: whether or not to keep the items with value None
+        :type keep_none: bool
+        :param wait_for_sync: wait for the upserts to sync to disk
+        :type wait_for_sync: bool
+        :param chunk_size: the maximum number of documents per request
+        :type chunk_size: int
+        :param max_workers: the maximum number of concurrent requests
+        :type max_workers: int
+        :returns: the outcome of each document in the order of ``documents``
+        :rtype: list
+        :raises: ServerVersionError, BatchExecuteError
+        """
+        if is_string(key_fields):
+            key_fields = [key_fields]
+        if not key_fields:
+            raise ValueError("no attributes to search by")
+        self._api.require_version((2, 6), "UPSERT queries")
+        query = _upsert_query(
+            [(field, "doc.{}".format(_quote_name(field)))
+             for field in key_fields],
+            "doc", "doc", variable="doc"
+        )
+
+        def request(chunk):
+            return {
+                "query": query,
+                "bindVars": {
+                    "@collection": self.name,
+                    "documents": chunk,
+                    "keepNull": keep_none,
+                    "waitForSync": wait_for_sync,
+                },
+                "batchSize": max(1, len(chunk)),
+            }
+
+        def execute(chunk):
+            res = self._api.post("/_api/cursor", data=request(chunk))
+            if res.status_code == 201:
+                return [_upsert_outcome(result) for result in
+                        self.cursor(res)]
+            results = BatchHandler(self._api)._execute_batch_parts(
+                {"method": "post", "path": "/_api/cursor",
+                 "data": request([document])}
+                for document in chunk
+            )
+            return [
+                _bulk_outcome(document.get("_key"), result)
+                if result.get("error") else
+                _upsert_outcome(result["result"][0])
+                for document, result in zip(chunk, results)
+            ]
+
+        outcomes = []
+        for chunk_outcomes in map_concurrently(
+                execute, chunks(list(documents), chunk_size), max_workers):
+            outcomes.extend(chunk_outcomes)
+        return outcomes
+
+    def _bulk_execute(self, requests, chunk_size, max_workers):
+        """Execute the (key, batch request) pairs in chunks.
+
+        The pairs are read lazily, one chunk at a time by whichever worker
+        is free.
+
+        :returns: the outcome of each request
+        :rtype: list
+        """
+        handler = BatchHandler(self._api)
+        outcomes_by_chunk = {}
+
+        def execute(item):
+            index, chunk = item
+            results = handler._execute_batch_parts(
+                request for _, request in chunk
+            )
+            outcomes_by_chunk[index] = [
+                _bulk_outcome(key, result)
+                for (key, _), result in zip(chunk, results)
+            ]
+
+        consume_concurrently(
+            execute, enumerate(iter_chunks(requests, chunk_size)),
+            max_workers
+        )
+        outcomes = []
+        for index in range(len(outcomes_by_chunk)):
+            outcomes.extend(outcomes_by_chunk[index])
+        return outcomes
+
     ##################
     # Simple Queries #
     ##################
@@ -590,7 +965,7 @@ class Collection(CursorFactory):
             raise SimpleQueryLastError(res)
         return res.obj["result"]
 
-    def all(self, skip=None, limit=None):
+    def all(self, skip=None, limit=None, row_factory=None):
         """Return all documents in this collection.
 
         ``skip`` is applied before ``limit`` if both are provided.
@@ -599,6 +974,9 @@ class Collection(CursorFactory):
         :type skip: int
         :param limit: maximum number of documents to return
         :type limit: int
+        :param row_factory: what to turn each document into instead of a
+            dict (see ``Database.execute_query``)
+        :type row_factory: arango.rows.RowFactory or type or callable
         :returns: the list of all documents
         :rtype: list
         :raises: SimpleQueryAllError
@@ -611,7 +989,7 @@ class Collection(CursorFactory):
         res = self._api.put("/_api/simple/all", data=data)
         if res.status_code != 201:
             raise SimpleQueryAllError(res)
-        return self.cursor(res)
+        return self.cursor(res, row_factory=row_factory)
 
     def any(self):
         """Return a random document from this collection.
@@ -645,7 +1023,8 @@ class Collection(CursorFactory):
             raise SimpleQueryFirstExampleError(res)
         return res.obj["document"]
 
-    def get_by_example(self, example, skip=None, limit=None):
+    def get_by_example(self, example, skip=None, limit=None,
+                       row_factory=None):
         """Return all documents matching the given example document body.
 
         ``skip`` is applied before ``limit`` if both are provided.
@@ -656,6 +1035,9 @@ class Collection(CursorFactory):
         :type skip: int
         :param limit: maximum number of documents to return
         :type limit: int
+        :param row_factory: what to turn each document into instead of a
+            dict (see ``Database.execute_query``)
+        :type row_factory: arango.rows.RowFactory or type or callable
         :returns: the list of matching documents
         :rtype: list
         :raises: SimpleQueryGetByExampleError
@@ -668,7 +1050,7 @@ class Collection(CursorFactory):
         res = self._api.put("/_api/simple/by-example", data=data)
         if res.status_code != 201:
             raise SimpleQueryGetByExampleError(res)
-        return self.cursor(res)
+        return self.cursor(res, row_factory=row_factory)
 
     def update_by_example(self, example, new_value, keep_none=True, limit=None,
                           wait_for_sync=False):
@@ -951,8 +1333,12 @@ class Collection(CursorFactory):
         If ``details`` parameter is set to True, the response will also contain
         ``details`` attribute which is a list of detailed error messages.
 
-        :param documents: list of documents to import
-        :type documents: list
+        The documents without a ``_key`` get one from the key allocator of
+        the connection (if any) before they are sent, so their keys are
+        known (e.g. to build edges) without waiting for the import.
+
+        :param documents: the documents to import (e.g. a generator)
+        :type documents: list or collections.Iterable
         :param complete: entire import fails if any document is invalid
         :type complete: bool
         :param details: return details about invalid documents
@@ -961,9 +1347,16 @@ class Collection(CursorFactory):
         :rtype: dict
         :raises: CollectionBulkImportError
         """
+        allocator = self._api.key_allocator
+        lines = []
+        # A single pass, so that the documents may come from a generator
+        for document in documents:
+            if allocator is not None and "_key" not in document:
+                document["_key"] = allocator.next_key()
+            lines.append(json.dumps(document))
         res = self._api.post(
             "/_api/import",
-            data="\r\n".join([json.dumps(d) for d in documents]),
+            data="\r\n".join(lines),
             params={
                 "type": "documents",
                 "collection": self.name,
@@ -1128,3 +1521,79 @@ class Collection(CursorFactory):
         )
         if res.status_code != 200:
             raise IndexRemoveError(res)
+
+
+def _key_data_rev(document):
+    """Return the (key, data, rev) of a (key, data[, rev]) tuple."""
+    if len(document) == 2:
+        return document[0], document[1], None
+    key, data, rev = document
+    return key, data, rev
+
+
+def _bulk_outcome(key, result):
+    """Return the outcome of a document operation in a batch."""
+    if not result.get("error"):
+        return {
+            "_key": result.get("_key", key),
+            "_id": result.get("_id"),
+            "_rev": result.get("_rev"),
+            "error": False,
+        }
+    return {
+        "_key": key,
+        "error": True,
+        "code": result.get("code"),
+        "error_num": result.get("errorNum"),
+        "error_message": result.get("errorMessage"),
+        "conflict": result.get("code") == 412,
+    }
+
+
+def _quote_name(name):
+    """Return the attribute name quoted for AQL."""
+    if not is_string(name) or not name or "`" in name:
+        raise ValueError("invalid attribute name: {!r}".format(name))
+    return "`{}`".format(name)
+
+
+def _upsert_query(search, insert, update, variable=None):
+    """Return the text of an UPSERT query into ``@@collection``.
+
+    :param search: the (attribute name, value expression) pairs to search by
+    :type search: list
+    :param insert: the expression of the document to insert
+    :type insert: str
+    :param update: the expression of the attributes to update
+    :type update: str
+    :param variable: the variable looping over ``@documents`` (if any)
+    :type variable: str or None
+    :returns: the query text
+    :rtype: str
+    """
+    return (
+        "{loop}UPSERT {{{search}}} INSERT {insert} UPDATE {update} "
+        "IN @@collection "
+        "OPTIONS {{keepNull: @keepNull, waitForSync: @waitForSync}} "
+        "RETURN {{_key: NEW._key, _id: NEW._id, _rev: NEW._rev, "
+        "old_rev: OLD._rev}}"
+    ).format(
+        loop="FOR {} IN @documents ".format(variable) if variable else "",
+        search=", ".join(
+            "{}: {}".format(_quote_name(name), value)
+            for name, value in search
+        ),
+        insert=insert,
+        update=update,
+    )
+
+
+def _upsert_outcome(result):
+    """Return the outcome of an upsert from the result of its query."""
+    return {
+        "_key": result["_key"],
+        "_id": result["_id"],
+        "_rev": result["_rev"],
+        "type": "insert" if result.get("old_rev") is None else "update",
+        "error": False,
+    }
@@ -0,0 +1,150 @@
+"""Columnar materialization of documents."""
+
+import array
+from collections import namedtuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The values of a column and its mask (True where the value is missing)
+Column = namedtuple("Column", ["values", "mask"])
+
+# The ``array`` type code of 64 bit integers ("q" is missing on Python 2)
+try:
+    array.array("q")
+    INT64_TYPE = "q"
+except ValueError:
+    INT64_TYPE = "l"
+
+# The ``array`` type codes of the common NumPy type names
+TYPECODES = {
+    "float64": "d", "f8": "d", "float": "d", "d": "d",
+    "float32": "f", "f4": "f", "f": "f",
+    "int64": INT64_TYPE, "i8": INT64_TYPE, "int": INT64_TYPE,
+    "q": INT64_TYPE,
+    "int32": "i", "i4": "i", "i": "i",
+    "int16": "h", "i2": "h", "h": "h",
+    "int8": "b", "i1": "b", "b": "b",
+    "bool": "b", "?": "b",
+}
+
+
+def get_path(document, path):
+    """Return the value of an attribute path in a document.
+
+    :param document: the document
+    :type document: dict
+    :param path: the attribute names, outermost first
+    :type path: list
+    :returns: the value (None if it is missing)
+    :rtype: object
+    """
+    for name in path:
+        if not isinstance(document, dict):
+            return None
+        document = document.get(name)
+    return document
+
+
+class NumpyColumnBuilder(object):
+    """Build a column in a NumPy array grown by doubling its capacity.
+
+    :param dtype: the NumPy dtype of the values (default: float64)
+    :type dtype: str or numpy.dtype
+    :param capacity: the initial capacity
+    :type capacity: int
+    """
+
+    def __init__(self, dtype=None, capacity=1024):
+        self.dtype = numpy.dtype("float64" if dtype is None else dtype)
+        self.fill = None if self.dtype.kind == "O" else \
+            numpy.zeros(1, self.dtype)[0]
+        self.values = numpy.empty(capacity, self.dtype)
+        self.mask = numpy.empty(capacity, bool)
+        self.size = 0
+
+    def extend(self, values):
+        """Append values (None for the missing ones).
+
+        :param values: the values to append
+        :type values: list
+        """
+        end = self.size + len(values)
+        if end > len(self.values):
+            capacity = max(end, 2 * len(self.values))
+            self.values.resize(capacity, refcheck=False)
+            self.mask.resize(capacity, refcheck=False)
+        self.mask[self.size:end] = [value is None for value in values]
+        self.values[self.size:end] = [
+            self.fill if value is None else value for value in values
+        ]
+        self.size = end
+
+    def finish(self):
+        """Return the column, trimmed to its size.
+
+        :returns: the column
+        :rtype: arango.columns.Column
+        """
+        self.values.resize(self.size, refcheck=False)
+        self.mask.resize(self.size, refcheck=False)
+        return Column(self.values, self.mask)
+
+
+class ArrayColumnBuilder(object):
+    """Build a column in an ``array.array`` (used when NumPy is missing).
+
+    Values of the "object" dtype are collected in a list.
+
+    :param dtype: the NumPy type name or the array type code of the values
+        (default: float64)
+    :type dtype: str
+    """
+
+    def __init__(self, dtype=None):
+        dtype = "float64" if dtype is None else str(dtype)
+        if dtype in ("object", "O"):
+            self.values = []
+            self.fill = None
+        elif dtype in TYPECODES:
+            self.values = array.array(TYPECODES[dtype])
+            self.fill = 0
+        else:
+            raise ValueError("unsupported dtype without numpy: {}".format(
+                dtype
+            ))
+        self.mask = array.array("b")
+
+    def extend(self, values):
+        """Append values (None for the missing ones).
+
+        :param values: the values to append
+        :type values: list
+        """
+        self.mask.extend([value is None for value in values])
+        self.values.extend([
+            self.fill if value is None else value for value in values
+        ])
+
+    def finish(self):
+        """Return the column.
+
+        :returns: the column
+        :rtype: arango.columns.Column
+        """
+        return Column(self.values, self.mask)
+
+
+def column_builder(dtype=None):
+    """Return a column builder, backed by NumPy if it is installed.
+
+    :param dtype: the dtype of the values (default: float64)
+    :type dtype: str
+    :returns: the column builder
+    :rtype: NumpyColumnBuilder or ArrayColumnBuilder
+    """
+    if numpy is not None:
+        return NumpyColumnBuilder(dtype)
+    return ArrayColumnBuilder(dtype)
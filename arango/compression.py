@@ -0,0 +1,152 @@
+"""HTTP compression of request and response bodies."""
+
+import codecs
+import zlib
+
+# Supported content codings and their zlib window bits
+WINDOW_BITS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+# Window bits which accept both zlib and gzip headers
+AUTO_WINDOW_BITS = 32 + zlib.MAX_WBITS
+
+
+class Compression(object):
+    """Compression settings of a connection.
+
+    Request bodies of at least ``threshold`` bytes are compressed with the
+    given algorithm and sent with the matching ``Content-Encoding`` header.
+    Every request advertises the supported algorithms in ``Accept-Encoding``
+    so that the server can compress its responses.
+
+    :param algorithm: "gzip" or "deflate"
+    :type algorithm: str
+    :param threshold: the minimum body size (in bytes) to compress
+    :type threshold: int
+    :param level: the compression level (1 is fastest, 9 is smallest)
+    :type level: int
+    """
+
+    def __init__(self, algorithm="gzip", threshold=1024, level=6):
+        if algorithm not in WINDOW_BITS:
+            raise ValueError("unsupported algorithm: {}".format(algorithm))
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self.level = level
+
+    @property
+    def accept_encoding(self):
+        """Return the value of the Accept-Encoding header.
+
+        :returns: the supported content codings, preferred one first
+        :rtype: str
+        """
+        others = [name for name in sorted(WINDOW_BITS) if
+                  name != self.algorithm]
+        return ", ".join([self.algorithm] + others)
+
+    def compress(self, data):
+        """Compress ``data`` if it is large enough.
+
+        :param data: the request body
+        :type data: str or bytes
+        :returns: the (possibly compressed) body and the content coding
+            (None if it was not compressed)
+        :rtype: tuple
+        """
+        if data is None or len(data) < self.threshold:
+            return data, None
+        return compress(data, self.algorithm, self.level), self.algorithm
+
+
+def compress(data, algorithm="gzip", level=6):
+    """Return ``data`` compressed with the given algorithm.
+
+    :param data: the data to compress
+    :type data: str or bytes
+    :param algorithm: "gzip" or "deflate"
+    :type algorithm: str
+    :param level: the compression level
+    :type level: int
+    :returns: the compressed data
+    :rtype: bytes
+    """
+    if not isinstance(data, bytes):
+        data = data.encode("utf-8")
+    compressor = zlib.compressobj(
+        level, zlib.DEFLATED, WINDOW_BITS[algorithm]
+    )
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data, algorithm):
+    """Return ``data`` decompressed.
+
+    :param data: the compressed data
+    :type data: bytes
+    :param algorithm: "gzip" or "deflate"
+    :type algorithm: str
+    :returns: the decompressed data
+    :rtype: bytes
+    """
+    return b"".join(iter_decompress([data], algorithm))
+
+
+def iter_decompress(chunks, algorithm):
+    """Decompress an iterable of compressed chunks incrementally.
+
+    A "deflate" body may be either a zlib stream (as the RFC says) or a raw
+    deflate stream (as some servers send it); both are accepted.
+
+    :param chunks: the compressed chunks
+    :type chunks: iterable
+    :param algorithm: "gzip" or "deflate"
+    :type algorithm: str
+    :returns: the decompressed chunks
+    :rtype: generator
+    """
+    if algorithm not in WINDOW_BITS:
+        raise ValueError("unsupported content coding: {}".format(algorithm))
+    decompressor = zlib.decompressobj(AUTO_WINDOW_BITS)
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if first and algorithm == "deflate":
+            first = False
+            try:
+                yield decompressor.decompress(chunk)
+                continue
+            except zlib.error:
+                decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        first = False
+        yield decompressor.decompress(chunk)
+    yield decompressor.flush()
+
+
+def read_text(read, encoding=None, chunk_size=65536):
+    """Read a whole response body as text, decompressing it on the fly.
+
+    The body is read, decompressed and UTF-8 decoded chunk by chunk, so
+    the compressed body is never held in memory as a whole.
+
+    :param read: a function returning at most the given number of bytes
+        (an empty string at the end of the body)
+    :type read: callable
+    :param encoding: the Content-Encoding of the body (None or "identity"
+        if it is not compressed)
+    :type encoding: str or None
+    :param chunk_size: the number of bytes read at once
+    :type chunk_size: int
+    :returns: the body text
+    :rtype: str
+    """
+    chunks = iter(lambda: read(chunk_size), b"")
+    if encoding and encoding.lower() != "identity":
+        chunks = iter_decompress(chunks, encoding.lower().strip())
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts = [decoder.decode(chunk) for chunk in chunks]
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
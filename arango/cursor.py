@@ -1,6 +1,334 @@
 """ArangoDB Cursor object."""
 
+import bz2
+import csv
+import gzip
+import io
+import json
+import threading
+from collections import OrderedDict
+from timeit import default_timer
+
+from arango.columns import column_builder, get_path
 from arango.exceptions import *
+from arango.rows import batch_converter
+from arango.utils import is_string
+
+# The file formats and compressions supported by ``Cursor.export``
+EXPORT_FORMATS = ("jsonl", "csv")
+EXPORT_COMPRESSIONS = {"gzip": gzip.GzipFile, "bz2": bz2.BZ2File}
+
+
+class BatchSizer(object):
+    """Tune the cursor batch size of repeated queries.
+
+    The fetch latency and the size of every batch of a query are recorded
+    and the batch size used for the next execution of the same query is
+    scaled towards the one which would take ``target_latency`` seconds per
+    batch, without a batch exceeding ``memory_budget`` bytes. The size
+    changes by at most ``max_step`` times per batch so that a single slow
+    round trip does not throw the tuned value off. The latency of the first
+    batch is not used since it includes the time the server took to run
+    the query; only its size counts against the memory budget.
+
+    Tuned sizes are remembered per query string (bind variables aside) for
+    the ``max_queries`` most recently executed queries.
+
+    :param target_latency: the seconds a batch should take to fetch
+    :type target_latency: float
+    :param memory_budget: the maximum size of a batch in bytes (None for no
+        limit)
+    :type memory_budget: int or None
+    :param initial: the batch size of queries not tuned yet
+    :type initial: int
+    :param minimum: the smallest batch size
+    :type minimum: int
+    :param maximum: the largest batch size
+    :type maximum: int
+    :param max_step: the largest factor between consecutive sizes
+    :type max_step: float
+    :param max_queries: the number of queries to remember
+    :type max_queries: int
+    """
+
+    def __init__(self, target_latency=0.1, memory_budget=8 * 1024 * 1024,
+                 initial=1000, minimum=10, maximum=100000, max_step=4.0,
+                 max_queries=1024):
+        if not minimum <= initial <= maximum:
+            raise ValueError("initial batch size out of bounds")
+        self.target_latency = target_latency
+        self.memory_budget = memory_budget
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_step = max_step
+        self.max_queries = max_queries
+        self._sizes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def batch_size(self, key):
+        """Return the batch size to execute the query with.
+
+        :param key: the query
+        :type key: str
+        :returns: the tuned batch size (or the initial one)
+        :rtype: int
+        """
+        with self._lock:
+            size = self._sizes.get(key)
+            if size is None:
+                return self.initial
+            # Keep recently used queries from being evicted
+            del self._sizes[key]
+            self._sizes[key] = size
+            return int(size)
+
+    def observer(self, key):
+        """Return the ``on_batch`` callback of a cursor of the query.
+
+        :param key: the query
+        :type key: str
+        :returns: the callback
+        :rtype: callable
+        """
+        first = [True]
+
+        def on_batch(res, seconds):
+            # The first batch comes with the execution of the query
+            if first[0]:
+                first[0] = False
+                seconds = None
+            self.observe(
+                key, len(res.obj["result"]), seconds, len(res.text)
+            )
+        return on_batch
+
+    def observe(self, key, documents, seconds, size):
+        """Record the fetch of one batch of the query.
+
+        :param key: the query
+        :type key: str
+        :param documents: the number of documents in the batch
+        :type documents: int
+        :param seconds: the time it took to fetch the batch (None if it is
+            unknown, in which case the batch size can only shrink)
+        :type seconds: float or None
+        :param size: the size of the batch in bytes
+        :type size: int
+        """
+        if documents == 0:
+            return
+        with self._lock:
+            current = self._sizes.pop(key, self.initial)
+            if seconds is None:
+                factor = 1.0
+            else:
+                # The latency and size projected onto a full batch
+                latency = seconds * current / documents
+                factor = self.target_latency / latency if latency > 0 else \
+                    self.max_step
+            if self.memory_budget is not None and size > 0:
+                factor = min(
+                    factor, float(self.memory_budget) / size * documents /
+                    current
+                )
+            factor = max(1.0 / self.max_step, min(self.max_step, factor))
+            self._sizes[key] = max(
+                self.minimum, min(self.maximum, current * factor)
+            )
+            while len(self._sizes) > self.max_queries:
+                self._sizes.popitem(last=False)
+
+    def clear(self):
+        """Forget all tuned batch sizes."""
+        with self._lock:
+            self._sizes.clear()
+
+
+class Cursor(object):
+    """An iterator over the documents of an AQL query result.
+
+    The documents are fetched from the server batch by batch as they are
+    consumed and the server-side cursor is deleted once the last batch has
+    been fetched.
+
+    :param batches: the batches of documents (lists), fetched lazily
+    :type batches: iterable
+    :param count: the total number of documents (if it was requested)
+    :type count: int or None
+    :param profile: the profile of the query execution (if requested)
+    :type profile: arango.profile.QueryProfile or None
+    :param row_factory: what to turn each document into (see
+        ``arango.rows.batch_converter``); the batches are converted as
+        they are fetched
+    :type row_factory: arango.rows.RowFactory or type or callable
+    """
+
+    def __init__(self, batches, count=None, profile=None, row_factory=None):
+        if row_factory is not None:
+            convert = batch_converter(row_factory)
+            batches = (convert(batch) for batch in batches)
+        self._batches = iter(batches)
+        self._documents = iter(())
+        self.count = count
+        self.profile = profile
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            try:
+                return next(self._documents)
+            except StopIteration:
+                self._documents = iter(next(self._batches))
+
+    next = __next__
+
+    def batches(self):
+        """Yield the documents not consumed yet batch by batch.
+
+        :returns: the lists of documents
+        :rtype: generator
+        """
+        rest = list(self._documents)
+        self._documents = iter(())
+        if rest:
+            yield rest
+        for batch in self._batches:
+            yield batch
+
+    def to_columns(self, fields, dtypes=None):
+        """Read the remaining documents into one array per field.
+
+        The documents are converted batch by batch, so only a single batch
+        of them exists at a time. The arrays are NumPy arrays if NumPy is
+        installed and ``array.array`` objects (lists for the "object" dtype)
+        otherwise. Missing (or null) values are set to zero (or None) in the
+        values and flagged in the mask of the column.
+
+        :param fields: the attribute names (dotted for nested attributes)
+        :type fields: list
+        :param dtypes: the dtypes of the fields (default: float64)
+        :type dtypes: dict
+        :returns: the columns of the fields, in the given order
+        :rtype: collections.OrderedDict
+        :raises: ValueError, QueryExecuteError, CursorDeleteError
+        """
+        dtypes = dtypes or {}
+        paths = [field.split(".") for field in fields]
+        builders = [column_builder(dtypes.get(field)) for field in fields]
+        for batch in self.batches():
+            for path, builder in zip(paths, builders):
+                builder.extend([get_path(doc, path) for doc in batch])
+        return OrderedDict(
+            (field, builder.finish())
+            for field, builder in zip(fields, builders)
+        )
+
+    def export(self, path, format="jsonl", compress=None, fields=None,
+               progress=None):
+        """Write the remaining documents to a file.
+
+        Each batch is encoded (as UTF-8) and written as a whole once it is
+        fetched, so only a single batch is held in memory at a time.
+
+        In the "jsonl" format every document is written on its own line.
+        In the "csv" format the first row holds the field names and
+        nested values (objects, arrays and booleans) are written as JSON,
+        null and missing values as empty strings.
+
+        :param path: the path of the file to write
+        :type path: str
+        :param format: "jsonl" or "csv"
+        :type format: str
+        :param compress: None, "gzip" or "bz2"
+        :type compress: str or None
+        :param fields: the attribute names (dotted for nested attributes)
+            to write as CSV columns (default: those of the first document,
+            which must then be an object)
+        :type fields: list
+        :param progress: called with the number of documents written so far
+            after every batch
+        :type progress: callable
+        :returns: the number of documents written
+        :rtype: int
+        :raises: ValueError, QueryExecuteError, CursorDeleteError
+        """
+        if format not in EXPORT_FORMATS:
+            raise ValueError("unsupported format: {}".format(format))
+        if compress is not None and compress not in EXPORT_COMPRESSIONS:
+            raise ValueError("unsupported compression: {}".format(compress))
+        if compress is None:
+            raw = io.open(path, "wb")
+        else:
+            raw = EXPORT_COMPRESSIONS[compress](path, "wb")
+        written = 0
+        with raw as out:
+            encode = json.JSONEncoder(
+                ensure_ascii=False, separators=(",", ":")
+            ).encode
+            paths = None
+            for batch in self.batches():
+                if not batch:
+                    continue
+                if format == "jsonl":
+                    out.write(_utf8(
+                        "".join(encode(doc) + "\n" for doc in batch)
+                    ))
+                else:
+                    rows = []
+                    if paths is None:
+                        if not fields and not isinstance(batch[0], dict):
+                            raise ValueError(
+                                "the results are not objects, so the CSV "
+                                "fields must be given"
+                            )
+                        fields = fields or list(batch[0])
+                        paths = [field.split(".") for field in fields]
+                        rows.append(fields)
+                    rows.extend(
+                        [_csv_value(get_path(doc, path), encode)
+                         for path in paths]
+                        for doc in batch
+                    )
+                    out.write(_csv_lines(rows))
+                written += len(batch)
+                if progress is not None:
+                    progress(written)
+            if format == "csv" and paths is None and fields:
+                out.write(_csv_lines([fields]))
+        return written
+
+
+def _utf8(text):
+    """Return the text (str or unicode) encoded as UTF-8."""
+    if isinstance(text, bytes):
+        return text
+    return text.encode("utf-8")
+
+
+def _csv_lines(rows):
+    """Return the rows as CSV lines encoded as UTF-8."""
+    if str is bytes:
+        # The csv module of Python 2 only writes byte strings
+        buf = io.BytesIO()
+        csv.writer(buf).writerows([[_utf8(v) for v in row] for row in rows])
+        return buf.getvalue()
+    buf = io.StringIO(newline="")
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def _csv_value(value, encode):
+    """Return the CSV representation of a document value."""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list, bool)):
+        return encode(value)
+    if is_string(value):
+        return value
+    return repr(value) if isinstance(value, float) else str(value)
 
 
 class CursorFactory(object):
@@ -8,23 +336,35 @@ class CursorFactory(object):
     def __init__(self, api):
         self._api = api
 
-    def cursor(self, res):
-        """Continuously read from the cursor and yield the result.
+    def cursor(self, res, on_batch=None, row_factory=None):
+        """Return the cursor continuously reading the result.
 
         :param res: ArangoDB response object
         :type res: arango.response.ArangoResponse
+        :param on_batch: called with the response and the fetch time (in
+            seconds) of every subsequent batch
+        :type on_batch: callable
+        :param row_factory: what to turn each document into
+        :type row_factory: arango.rows.RowFactory or type or callable
+        :returns: the cursor
+        :rtype: arango.cursor.Cursor
         """
-        for item in res.obj["result"]:
-            yield item
+        return Cursor(self._batches(res, on_batch), res.obj.get("count"),
+                      row_factory=row_factory)
+
+    def _batches(self, res, on_batch=None):
+        yield res.obj["result"]
         cursor_id = None
         while res.obj["hasMore"]:
             if cursor_id is None:
                 cursor_id = res.obj["id"]
+            start = default_timer()
             res = self._api.put("/_api/cursor/{}".format(cursor_id))
             if res.status_code != 200:
                 raise QueryExecuteError(res)
-            for item in res.obj["result"]:
-                yield item
+            if on_batch is not None:
+                on_batch(res, default_timer() - start)
+            yield res.obj["result"]
         if cursor_id is not None:
             res = self._api.delete("/api/cursor/{}".format(cursor_id))
             if res.status_code not in {404, 202}:
@@ -1,11 +1,26 @@
 """ArangoDB Database."""
 
-from arango.utils import uncamelify
+import copy
+import json
+import re
+import threading
+import time
+from timeit import default_timer
+
+from arango.aql import QueryBuilder
+from arango.utils import is_string, uncamelify
 from arango.batch import BatchHandler
 from arango.graph import Graph
 from arango.collection import Collection
 from arango.exceptions import *
-from arango.cursor import CursorFactory
+from arango.cursor import BatchSizer, Cursor, CursorFactory
+from arango.plans import PlanCache, compare_plans
+from arango.profile import QueryProfile
+
+# Queries which may have side effects are never coalesced
+MODIFYING_QUERY = re.compile(
+    r"\b(INSERT|UPDATE|REPLACE|REMOVE|UPSERT)\b", re.IGNORECASE
+)
 
 
 class Database(CursorFactory, BatchHandler):
@@ -15,12 +30,19 @@ class Database(CursorFactory, BatchHandler):
     :type name: str
     :param api: ArangoDB API object
     :type api: arango.api.ArangoAPI
+    :ivar batch_sizer: tunes the batch size of queries executed with
+        ``batch_size="auto"``
+    :vartype batch_sizer: arango.cursor.BatchSizer
+    :ivar plan_cache: the plans of the queries explained with ``cache=True``
+    :vartype plan_cache: arango.plans.PlanCache
     """
 
     def __init__(self, name, api):
         super(Database, self).__init__(api)
         self.name = name
         self._api = api
+        self.batch_sizer = BatchSizer()
+        self.plan_cache = PlanCache()
         self._collection_cache = {}
         self._graph_cache = {}
 
@@ -93,8 +115,16 @@ class Database(CursorFactory, BatchHandler):
     # Queries #
     ###########
 
+    def query(self):
+        """Return a builder of an AQL query to execute in this database.
+
+        :returns: the (empty) query builder
+        :rtype: arango.aql.QueryBuilder
+        """
+        return QueryBuilder(self)
+
     def explain_query(self, query, all_plans=False, max_plans=None,
-                      optimizer_rules=None):
+                      optimizer_rules=None, bind_vars=None, cache=False):
         """Explain the AQL query.
 
         This method does not execute the query, but only inspect it and
@@ -106,6 +136,11 @@ class Database(CursorFactory, BatchHandler):
         For more information on optimizer_rules, please refer to:
         https://docs.arangodb.com/HttpAqlQuery/README.html
 
+        If ``cache`` is True, the plan is taken from (or stored in)
+        ``self.plan_cache``; cached plans are shared and must not be
+        modified. ``check_plans`` compares the cached plans with the
+        current ones.
+
         :param query: the AQL query to explain
         :type query: str
         :param all_plans: whether or not to return all execution plans
@@ -114,6 +149,10 @@ class Database(CursorFactory, BatchHandler):
         :type max_plans: None or int
         :param optimizer_rules: list of optimizer rules
         :type optimizer_rules: list
+        :param bind_vars: key-value pairs of bind parameters
+        :type bind_vars: dict
+        :param cache: whether or not to use the plan cache
+        :type cache: bool
         :returns: the query plan or list of plans (if all_plans is True)
         :rtype: dict or list
         :raises: QueryExplainError
@@ -123,9 +162,20 @@ class Database(CursorFactory, BatchHandler):
             options["maxNumberOfPlans"] = max_plans
         if optimizer_rules is not None:
             options["optimizer"] = {"rules": optimizer_rules}
-        res = self._api.post(
-            "/_api/explain", data={"query": query, "options": options}
-        )
+        if not cache:
+            return self._explain_query(query, options, bind_vars)
+        key = self.plan_cache.key(query, options, bind_vars)
+        plan = self.plan_cache.get(key)
+        if plan is None:
+            plan = self._explain_query(query, options, bind_vars)
+            self.plan_cache.set(key, plan, query, options, bind_vars)
+        return plan
+
+    def _explain_query(self, query, options, bind_vars=None):
+        data = {"query": query, "options": options}
+        if bind_vars is not None:
+            data["bindVars"] = bind_vars
+        res = self._api.post("/_api/explain", data=data)
         if res.status_code != 200:
             raise QueryExplainError(res)
         if "plan" in res.obj:
@@ -133,6 +183,50 @@ class Database(CursorFactory, BatchHandler):
         else:
             return uncamelify(res.obj["plans"])
 
+    def check_plans(self, cost_tolerance=0.1, update=False):
+        """Re-explain the cached queries and report plan regressions.
+
+        Run this after changing indexes or upgrading the server to find the
+        queries whose plan got worse: an index no longer used, a collection
+        now read in full or an estimated cost higher by more than
+        ``cost_tolerance`` (a fraction of the cached cost).
+
+        :param cost_tolerance: the fraction the estimated cost may go up by
+        :type cost_tolerance: float
+        :param update: whether or not to replace the cached plans with the
+            current ones
+        :type update: bool
+        :returns: the regressions, each with the query, options, bind_vars,
+            the reasons and the old and new plans (None if the query could
+            not be explained)
+        :rtype: list
+        """
+        regressions = []
+        for key, entry in self.plan_cache.entries():
+            try:
+                plan = self._explain_query(
+                    entry["query"], entry["options"], entry["bind_vars"]
+                )
+            except QueryExplainError as err:
+                plan, reasons = None, ["explain failed: {}".format(err)]
+            else:
+                reasons = compare_plans(entry["plan"], plan, cost_tolerance)
+                if update:
+                    self.plan_cache.set(
+                        key, plan, entry["query"], entry["options"],
+                        entry["bind_vars"]
+                    )
+            if reasons:
+                regressions.append({
+                    "query": entry["query"],
+                    "options": entry["options"],
+                    "bind_vars": entry["bind_vars"],
+                    "reasons": reasons,
+                    "old": entry["plan"],
+                    "new": plan,
+                })
+        return regressions
+
     def validate_query(self, query):
         """Validate the AQL query.
 
@@ -146,18 +240,34 @@ class Database(CursorFactory, BatchHandler):
 
     def execute_query(self, query, count=False, batch_size=None, ttl=None,
                       bind_vars=None, full_count=None, max_plans=None,
-                      optimizer_rules=None):
+                      optimizer_rules=None, profile=False, explain=False,
+                      row_factory=None):
         """Execute the AQL query and return the result.
 
         For more information on ``full_count`` please refer to:
         https://docs.arangodb.com/HttpAqlQueryCursor/AccessingCursors.html
 
+        If request coalescing is enabled, identical read-only queries
+        executed concurrently share one cursor: it is read to the end up
+        front and a copy of its results is returned to every caller.
+
+        With ``batch_size="auto"`` the batch size is tuned by
+        ``self.batch_sizer`` from the fetch latency and the size of the
+        batches of earlier executions of the same query.
+
+        With ``profile`` set to True, the returned cursor has a
+        ``QueryProfile`` in its ``profile`` attribute which records the time
+        to the first batch, the fetch and decode time and the size of every
+        batch and the server statistics. Profiled queries are never
+        coalesced.
+
         :param query: the AQL query to execute
         :type query: str
         :param count: whether or not the document count should be returned
         :type count: bool
-        :param batch_size: maximum number of documents in one round trip
-        :type batch_size: int
+        :param batch_size: maximum number of documents in one round trip,
+            or "auto" to tune it
+        :type batch_size: int or str
         :param ttl: time-to-live for the cursor (in seconds)
         :type ttl: int
         :param bind_vars: key-value pairs of bind parameters
@@ -167,8 +277,18 @@ class Database(CursorFactory, BatchHandler):
         :type max_plans: None or int
         :param optimizer_rules: list of optimizer rules
         :type optimizer_rules: list
+        :param profile: whether or not to profile the execution
+        :type profile: bool
+        :param explain: whether or not to also store the execution plan of
+            the query in the profile (implies ``profile``)
+        :type explain: bool
+        :param row_factory: what to turn each document into instead of a
+            dict, e.g. a namedtuple or ``__slots__`` class (see
+            ``arango.rows.RowFactory``)
+        :type row_factory: arango.rows.RowFactory or type or callable
         :returns: the cursor from executing the query
-        :raises: QueryExecuteError, CursorDeleteError
+        :rtype: arango.cursor.Cursor
+        :raises: QueryExecuteError, CursorDeleteError, QueryExplainError
         """
         options = {}
         if full_count is not None:
@@ -182,6 +302,10 @@ class Database(CursorFactory, BatchHandler):
             "query": query,
             "count": count,
         }
+        observers = []
+        if batch_size == "auto":
+            batch_size = self.batch_sizer.batch_size(query)
+            observers.append(self.batch_sizer.observer(query))
         if batch_size is not None:
             data["batchSize"] = batch_size
         if ttl is not None:
@@ -191,10 +315,132 @@ class Database(CursorFactory, BatchHandler):
         if options:
             data["options"] = options
 
+        query_profile = None
+        if profile or explain:
+            query_profile = QueryProfile(query, bind_vars)
+            if explain:
+                query_profile.plan = self.explain_query(
+                    query, max_plans=max_plans,
+                    optimizer_rules=optimizer_rules, bind_vars=bind_vars
+                )
+            observers.append(query_profile.record)
+        on_batch = None
+        if len(observers) == 1:
+            on_batch = observers[0]
+        elif observers:
+            def on_batch(res, seconds):
+                for observer in observers:
+                    observer(res, seconds)
+
+        if self._api.singleflight is not None and query_profile is None \
+                and not MODIFYING_QUERY.search(query):
+            results = self._api.coalesce(
+                ("POST", "/_api/cursor", json.dumps(data, sort_keys=True)),
+                lambda: list(self._execute_query(data, on_batch)),
+                copy.deepcopy
+            )
+            return Cursor([results], len(results) if count else None,
+                          row_factory=row_factory)
+        cursor = self._execute_query(data, on_batch, row_factory)
+        cursor.profile = query_profile
+        return cursor
+
+    def execute_queries(self, queries, max_workers=8, timeout=None):
+        """Execute independent AQL queries concurrently.
+
+        The queries are executed (and their cursors read to the end) by up
+        to ``max_workers`` threads sharing the connection, so the client
+        should be thread-safe (e.g. the default or the pooled client).
+
+        A query which fails does not affect the others: the exception it
+        raised is returned in place of its documents. So is a
+        ``QueryTimeoutError`` for every query not done within ``timeout``
+        seconds; the queries not started by then are not executed at all.
+        Those still running are not waited for and stop once their current
+        request returns, without fetching their remaining batches (their
+        server-side cursors are left to expire).
+
+        :param queries: the queries, each either the AQL query string or a
+            dict of the keyword arguments of ``execute_query``
+        :type queries: list
+        :param max_workers: the maximum number of queries executed at once
+        :type max_workers: int
+        :param timeout: the seconds to wait for all queries (None waits
+            until they are all done)
+        :type timeout: float or None
+        :returns: the list of documents (or the exception) of each query, in
+            the order of ``queries``
+        :rtype: list
+        :raises: ValueError
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        queries = [
+            {"query": query} if is_string(query) else query
+            for query in queries
+        ]
+        results = [None] * len(queries)
+        done = [False] * len(queries)
+        pending = iter(range(len(queries)))
+        cond = threading.Condition(threading.Lock())
+        state = {"remaining": len(queries), "expired": False}
+
+        def work():
+            while True:
+                with cond:
+                    index = next(pending, None)
+                    if index is None or state["expired"]:
+                        return
+                try:
+                    result = []
+                    cursor = self.execute_query(**queries[index])
+                    for batch in cursor.batches():
+                        # Nobody waits for the documents anymore
+                        if state["expired"]:
+                            break
+                        result.extend(batch)
+                except Exception as err:
+                    result = err
+                with cond:
+                    if not state["expired"]:
+                        results[index] = result
+                        done[index] = True
+                    state["remaining"] -= 1
+                    cond.notify_all()
+
+        for _ in range(min(max_workers, len(queries))):
+            worker = threading.Thread(target=work)
+            worker.daemon = True
+            worker.start()
+
+        deadline = None if timeout is None else time.time() + timeout
+        with cond:
+            while state["remaining"] > 0:
+                if deadline is None:
+                    cond.wait()
+                    continue
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                cond.wait(remaining)
+            state["expired"] = True
+            return [
+                result if finished else QueryTimeoutError(
+                    "query {} not done within {} seconds".format(
+                        index, timeout
+                    )
+                )
+                for index, (result, finished) in enumerate(zip(results, done))
+            ]
+
+    def _execute_query(self, data, on_batch=None, row_factory=None):
+        start = default_timer()
         res = self._api.post("/_api/cursor", data=data)
         if res.status_code != 201:
             raise QueryExecuteError(res)
-        return self.cursor(res)
+        if on_batch is not None:
+            on_batch(res, default_timer() - start)
+        return self.cursor(res, on_batch, row_factory)
 
     ########################
     # Handling Collections #
@@ -208,7 +454,7 @@ class Database(CursorFactory, BatchHandler):
         :rtype: dict
         :raises: CollectionListError
         """
-        res = self._api.get("/_api/collection")
+        res = self._api.get("/_api/collection", coalesce=True)
         if res.status_code != 200:
             raise CollectionListError(res)
 
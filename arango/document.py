@@ -0,0 +1,371 @@
+"""Documents tracking their own changes."""
+
+from arango.exceptions import DocumentInvalidError
+
+# Attributes which are never part of an update body
+SYSTEM_ATTRIBUTES = frozenset(["_id", "_key", "_rev", "_from", "_to"])
+
+# Kinds of change recorded for an attribute path
+SET = "set"
+REMOVE = "remove"
+
+
+def _wrap(value, root, path, whole):
+    """Return ``value`` wrapped for change tracking (if it is a container).
+
+    :param root: the document recording the changes
+    :type root: TrackedDocument
+    :param path: the attribute path of the value
+    :type path: tuple
+    :param whole: whether or not any change replaces the value at ``path``
+        as a whole (i.e. the value is inside a list)
+    :type whole: bool
+    """
+    if isinstance(value, dict):
+        return _TrackedDict(value, root, path, whole)
+    if isinstance(value, list):
+        return _TrackedList(value, root, path)
+    return value
+
+
+def _detach(value):
+    """Stop tracking the changes of a value removed from its container."""
+    if isinstance(value, (_TrackedDict, _TrackedList)):
+        value._root = None
+
+
+def _plain(value):
+    """Return a copy of ``value`` made of plain dicts and lists."""
+    if isinstance(value, dict):
+        return dict((k, _plain(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _with_dropped(value, original):
+    """Return ``value`` as sent in a PATCH replacing ``original`` in full.
+
+    The server merges the objects of a PATCH into the stored ones, so the
+    keys of ``original`` which are not in ``value`` are added as None (to
+    be removed with ``keep_none`` disabled), at every level.
+
+    :returns: the plain value and whether or not any key was dropped
+    :rtype: tuple
+    """
+    if not isinstance(value, dict) or not isinstance(original, dict):
+        return _plain(value), False
+    result = {}
+    dropped = False
+    for key, item in value.items():
+        result[key], item_dropped = _with_dropped(item, original.get(key))
+        dropped = dropped or item_dropped
+    for key in original:
+        if key not in value:
+            result[key] = None
+            dropped = True
+    return result, dropped
+
+
+def _has_none(value):
+    """Return True if ``value`` is or contains None."""
+    if value is None:
+        return True
+    if isinstance(value, dict):
+        return any(_has_none(v) for v in value.values())
+    return False
+
+
+class _TrackedDict(dict):
+    """A dict reporting its changes to the document it belongs to."""
+
+    def __init__(self, data, root, path, whole=False):
+        dict.__init__(self)
+        self._root = root
+        self._path = path
+        self._whole = whole
+        for key, value in data.items():
+            dict.__setitem__(self, key, _wrap(
+                value, root, path if whole else path + (key,), whole
+            ))
+
+    def _record(self, key, kind):
+        if self._root is None:
+            return
+        if self._whole:
+            self._root._record_change(self._path, SET)
+        else:
+            self._root._record_change(self._path + (key,), kind)
+
+    def _before_change(self, key):
+        if self._root is not None and not self._whole:
+            self._root._keep_original(self._path + (key,))
+
+    def __setitem__(self, key, value):
+        self._before_change(key)
+        if key in self:
+            _detach(dict.__getitem__(self, key))
+        dict.__setitem__(self, key, _wrap(
+            value, self._root,
+            self._path if self._whole else self._path + (key,), self._whole
+        ))
+        self._record(key, SET)
+
+    def __delitem__(self, key):
+        self._before_change(key)
+        _detach(dict.__getitem__(self, key))
+        dict.__delitem__(self, key)
+        self._record(key, REMOVE)
+
+    def pop(self, key, *default):
+        if key not in self:
+            return dict.pop(self, key, *default)
+        value = dict.__getitem__(self, key)
+        del self[key]
+        return value
+
+    def popitem(self):
+        key = next(iter(self))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def __reduce__(self):
+        return dict, (_plain(self),)
+
+
+class _TrackedList(list):
+    """A list marking itself as changed as a whole on any change.
+
+    Items cannot be patched individually, so the list is sent in full.
+    """
+
+    def __init__(self, data, root, path):
+        list.__init__(self, (_wrap(v, root, path, True) for v in data))
+        self._root = root
+        self._path = path
+
+    def _changed(self):
+        if self._root is not None:
+            self._root._record_change(self._path, SET)
+
+    def __reduce__(self):
+        return list, (_plain(self),)
+
+
+def _mutator(name):
+    method = getattr(list, name)
+
+    def mutate(self, *args):
+        result = method(self, *args)
+        self._changed()
+        return result
+    mutate.__name__ = name
+    return mutate
+
+for _name in ("__setitem__", "__delitem__", "__setslice__", "__delslice__",
+              "__iadd__", "__imul__", "append", "extend", "insert", "pop",
+              "remove", "reverse", "sort"):
+    if hasattr(list, _name):
+        setattr(_TrackedList, _name, _mutator(_name))
+
+
+class TrackedDocument(_TrackedDict):
+    """A document recording which of its attributes were changed.
+
+    It is a dict (nested dicts and lists included) which remembers the
+    attribute paths assigned or removed since it was read or last saved,
+    so that ``save`` can send only those in an update (PATCH) request
+    rather than the whole document. Lists are always sent in full if
+    anything in them changed. The update only succeeds if the document
+    was not modified in the meantime (its ``_rev`` still matches).
+
+    :param data: the document with its ``_key`` and ``_rev``
+    :type data: dict
+    :param collection: the collection the document belongs to
+    :type collection: arango.collection.Collection
+    """
+
+    def __init__(self, data, collection):
+        self._changes = {}
+        # The saved value of each top-level attribute changed since (plain)
+        self._originals = {}
+        self.collection = collection
+        _TrackedDict.__init__(self, data, self, ())
+
+    def __repr__(self):
+        return "<ArangoDB tracked document {}>".format(self.get("_id"))
+
+    def _record_change(self, path, kind):
+        if path:
+            self._changes[path] = kind
+
+    def _keep_original(self, path):
+        """Keep the saved value of the attribute before it is changed."""
+        name = path[0]
+        if name not in self._originals:
+            self._originals[name] = _plain(dict.get(self, name))
+
+    @property
+    def dirty(self):
+        """Return True if the document has unsaved changes.
+
+        :returns: whether or not anything was changed
+        :rtype: bool
+        """
+        return bool(self._changes)
+
+    @property
+    def changes(self):
+        """Return the attribute paths changed since the last save.
+
+        :returns: the changed paths (as tuples) and the kind of each change
+            ("set" or "remove"), leaving out the paths inside changed ones
+        :rtype: dict
+        """
+        changes = {}
+        for path in sorted(self._changes, key=len):
+            if not any(path[:i] in changes for i in range(1, len(path))):
+                changes[path] = self._changes[path]
+        return changes
+
+    def _value(self, path):
+        value = self
+        for name in path:
+            value = value.get(name) if isinstance(value, dict) else None
+        return value
+
+    def _original(self, path):
+        value = self._originals.get(path[0])
+        for name in path[1:]:
+            value = value.get(name) if isinstance(value, dict) else None
+        return value
+
+    def _patch(self):
+        """Return the patch and whether or not it removes any attribute."""
+        patch = {}
+        removes = False
+        for path, kind in self.changes.items():
+            if path[0] in SYSTEM_ATTRIBUTES:
+                continue
+            target = patch
+            for name in path[:-1]:
+                target = target.setdefault(name, {})
+            if kind == REMOVE:
+                target[path[-1]] = None
+                removes = True
+            else:
+                # An object set as a whole must not keep the saved keys
+                target[path[-1]], dropped = _with_dropped(
+                    self._value(path), self._original(path)
+                )
+                removes = removes or dropped
+        return patch, removes
+
+    def patch(self):
+        """Return the body of the update request saving the changes.
+
+        The keys of an object which was set as a whole are removed from the
+        saved object as well, as if it was replaced.
+
+        :returns: the changed attributes (None where they were removed)
+        :rtype: dict
+        """
+        return self._patch()[0]
+
+    def _save_args(self):
+        """Return how to save the changes, or None if there are none.
+
+        Removed attributes (and the keys dropped from objects set as a
+        whole) are sent as None with ``keep_none`` disabled.
+        If the changes also set attributes to None (which would then be
+        removed as well), the whole document is sent in a replace instead.
+
+        :returns: whether or not to replace the document, the request body
+            and the value of ``keep_none``
+        :rtype: tuple or None
+        :raises: DocumentInvalidError
+        """
+        if "_key" not in self or "_rev" not in self:
+            raise DocumentInvalidError(
+                "the tracked document is missing the '_key' or '_rev' key"
+            )
+        patch, removes = self._patch()
+        if not patch:
+            return None
+        changes = self.changes
+        if not removes:
+            return False, patch, True
+        if not any(_has_none(self._value(path))
+                   for path, kind in changes.items() if kind == SET):
+            return False, patch, False
+        body = dict(
+            (key, value) for key, value in _plain(self).items()
+            if key not in SYSTEM_ATTRIBUTES
+        )
+        return True, body, True
+
+    def _save_request(self, wait_for_sync=False):
+        """Return the batch request saving the changes, or None."""
+        args = self._save_args()
+        if args is None:
+            return None
+        replace, body, keep_none = args
+        if replace:
+            return self.collection.replace_document(
+                self["_key"], body, rev=self["_rev"],
+                wait_for_sync=wait_for_sync, _batch=True
+            )
+        return self.collection.update_document(
+            self["_key"], body, rev=self["_rev"], keep_none=keep_none,
+            wait_for_sync=wait_for_sync, _batch=True
+        )
+
+    def _saved(self, rev):
+        """Forget the changes, which were saved as revision ``rev``."""
+        dict.__setitem__(self, "_rev", rev)
+        self._changes = {}
+        self._originals = {}
+
+    def save(self, wait_for_sync=False):
+        """Save the changes of this document.
+
+        Nothing is sent if the document was not changed.
+
+        :param wait_for_sync: wait for the update to sync to disk
+        :type wait_for_sync: bool
+        :returns: the id, rev and key of the updated document (None if there
+            was nothing to save)
+        :rtype: dict or None
+        :raises: DocumentInvalidError, RevisionMismatchError,
+            DocumentUpdateError, DocumentReplaceError
+        """
+        args = self._save_args()
+        if args is None:
+            self._changes = {}
+            self._originals = {}
+            return None
+        replace, body, keep_none = args
+        if replace:
+            result = self.collection.replace_document(
+                self["_key"], body, rev=self["_rev"],
+                wait_for_sync=wait_for_sync
+            )
+        else:
+            result = self.collection.update_document(
+                self["_key"], body, rev=self["_rev"], keep_none=keep_none,
+                wait_for_sync=wait_for_sync
+            )
+        self._saved(result["_rev"])
+        return result
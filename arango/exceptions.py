@@ -34,10 +34,18 @@ class ArangoConnectionError(Exception):
     """Failed to connect to ArangoDB."""
 
 
+class ConnectionPoolTimeoutError(ArangoConnectionError):
+    """Timed out waiting for an idle connection in the pool."""
+
+
 class VersionGetError(ArangoRequestError):
     """Failed to retrieve the version."""
 
 
+class ServerVersionError(Exception):
+    """The version of ArangoDB does not support the operation."""
+
+
 #############
 # Databases #
 #############
@@ -155,6 +163,10 @@ class DocumentRemoveError(ArangoRequestError):
     """Failed to remove the ArangoDB document(s)."""
 
 
+class DocumentUpsertError(ArangoRequestError):
+    """Failed to upsert the ArangoDB document(s)."""
+
+
 #########
 # Edges #
 #########
@@ -244,6 +256,10 @@ class QueryExecuteError(ArangoRequestError):
     """Failed to execute the query."""
 
 
+class QueryTimeoutError(Exception):
+    """Timed out executing the query."""
+
+
 class CursorDeleteError(ArangoRequestError):
     """Failed to remove the query cursor."""
 
@@ -371,6 +387,10 @@ class GraphPropertiesError(ArangoRequestError):
 class GraphTraversalError(ArangoRequestError):
     """Failed to traverse the graph."""
 
+
+class GraphBulkLoadError(Exception):
+    """The documents to load are not in collections of the graph."""
+
 ######################
 # Vertex Collections #
 ######################
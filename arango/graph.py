@@ -1,7 +1,60 @@
 """ArangoDB Graph."""
 
-from arango.utils import uncamelify
+import re
+import threading
+import time
+
+from functools import partial
+from timeit import default_timer
+
+from arango.utils import (
+    consume_concurrently, is_string, iter_chunks, uncamelify
+)
 from arango.exceptions import *
+from arango.adjacency import AdjacencyCache
+from arango.collection import Collection
+from arango.cursor import CursorFactory
+from arango.snapshot import GraphSnapshot
+
+# The edge directions of graphs and those of the edges API
+EDGE_DIRECTIONS = {"outbound": "out", "inbound": "in", "any": "any"}
+
+# The AQL graph traversal of streamed traversals
+TRAVERSAL_QUERY = (
+    "FOR v, e, p IN @minDepth..@maxDepth {direction} @startVertex "
+    "GRAPH @graph OPTIONS {{bfs: @bfs, uniqueVertices: @uniqueVertices, "
+    "uniqueEdges: @uniqueEdges}} RETURN {result}"
+)
+
+# The position in the error details of the import API
+_DETAIL_POSITION = re.compile(r"^at position (\d+)")
+
+
+def _position(positions, position):
+    """Map a position in an import request to one in the loaded documents.
+
+    :param positions: the positions (counted from 1) of the sent documents
+    :type positions: list
+    :param position: the position (counted from 1) in the import request
+    :type position: int
+    """
+    if 1 <= position <= len(positions):
+        return positions[position - 1]
+    return position
+
+
+def _edge_violation(edge, definition):
+    """Return why ``edge`` breaks its edge definition, or None."""
+    if not isinstance(edge, dict):
+        return None
+    for attr, allowed in (("_from", definition["from"]),
+                          ("_to", definition["to"])):
+        value = edge.get(attr)
+        if not is_string(value) or value.split("/", 1)[0] not in allowed:
+            return "'{}' is not a vertex of {}".format(
+                attr, ", ".join(allowed)
+            )
+    return None
 
 
 class Graph(object):
@@ -11,11 +64,17 @@ class Graph(object):
     :type name: str
     :param api: ArangoDB API object
     :type api: arango.api.ArangoAPI
+    :ivar adjacency_cache: the edges of the vertices read with
+        ``get_edges`` (or ``neighbors``)
+    :vartype adjacency_cache: arango.adjacency.AdjacencyCache
     """
 
     def __init__(self, name, api):
         self.name = name
         self._api = api
+        self.adjacency_cache = AdjacencyCache()
+        # The edge collection names and when to read them again
+        self._edge_collections = None
 
     @property
     def properties(self):
@@ -26,7 +85,8 @@ class Graph(object):
         :raises: GraphPropertiesError
         """
         res = self._api.get(
-            "/_api/gharial/{}".format(self.name)
+            "/_api/gharial/{}".format(self.name),
+            coalesce=True
         )
         if res.status_code != 200:
             raise GraphPropertiesError(res)
@@ -155,6 +215,7 @@ class Graph(object):
                 "to": to_vertex_collections
             }
         )
+        self._edge_collections = None
         if res.status_code != 201:
             raise EdgeDefinitionAddError(res)
         return res.obj["graph"]["edgeDefinitions"]
@@ -184,6 +245,7 @@ class Graph(object):
                 "to": to_vertex_collections
             }
         )
+        self._edge_collections = None
         if res.status_code != 200:
             raise EdgeDefinitionReplaceError(res)
         return res.obj["graph"]["edgeDefinitions"]
@@ -204,6 +266,7 @@ class Graph(object):
             "/_api/gharial/{}/edge/{}".format(self.name, collection),
             params={"dropCollection": drop_collection}
         )
+        self._edge_collections = None
         if res.status_code != 200:
             raise EdgeDefinitionRemoveError(res)
         return res.obj["graph"]["edgeDefinitions"]
@@ -243,7 +306,8 @@ class Graph(object):
         """Add a vertex to the specified vertex collection if this graph.
 
         If ``data`` contains the ``_key`` key, its value must be unused
-        in the collection.
+        in the collection. Otherwise the key is set in ``data`` by the key
+        allocator of the connection (if any) before the request is sent.
 
         :param collection: the name of the vertex collection
         :type collection: str
@@ -255,6 +319,8 @@ class Graph(object):
         :rtype: dict
         :raises: VertexAddError
         """
+        if self._api.key_allocator is not None and "_key" not in data:
+            data["_key"] = self._api.key_allocator.next_key()
         path = "/_api/gharial/{}/vertex/{}".format(self.name, collection)
         params = {"waitForSync": wait_for_sync}
         if _batch:
@@ -376,12 +442,17 @@ class Graph(object):
         if rev is not None:
             params["rev"] = rev
         if _batch:
+            invalidate = partial(self.adjacency_cache.invalidate, vertex_id)
+            invalidate()
             return {
                 "method": "delete",
                 "path": path,
                 "params": params,
+                "on_done": invalidate,
             }
         res = self._api.delete(path=path, params=params)
+        # The edges of the vertex are removed along with it
+        self.adjacency_cache.invalidate(vertex_id)
         if res.status_code == 412:
             raise RevisionMismatchError(res)
         if res.status_code not in {200, 202}:
@@ -443,13 +514,19 @@ class Graph(object):
         path = "/_api/gharial/{}/edge/{}".format(self.name, collection)
         params = {"waitForSync": wait_for_sync}
         if _batch:
+            invalidate = partial(
+                self.adjacency_cache.invalidate, data["_from"], data["_to"]
+            )
+            invalidate()
             return {
                 "method": "post",
                 "path": path,
                 "data": data,
                 "params": params,
+                "on_done": invalidate,
             }
         res = self._api.post(path=path, data=data, params=params)
+        self.adjacency_cache.invalidate(data["_from"], data["_to"])
         if res.status_code not in {201, 202}:
             raise EdgeAddError(res)
         return res.obj["edge"]
@@ -494,13 +571,17 @@ class Graph(object):
         elif "_rev" in data:
             params["rev"] = data["_rev"]
         if _batch:
+            invalidate = partial(self.adjacency_cache.invalidate, edge_id)
+            invalidate()
             return {
                 "method": "patch",
                 "path": path,
                 "data": data,
                 "params": params,
+                "on_done": invalidate,
             }
         res = self._api.patch(path=path, data=data, params=params)
+        self.adjacency_cache.invalidate(edge_id)
         if res.status_code == 412:
             raise RevisionMismatchError(res)
         elif res.status_code not in {200, 202}:
@@ -539,13 +620,17 @@ class Graph(object):
         elif "_rev" in data:
             params["rev"] = data["_rev"]
         if _batch:
+            invalidate = partial(self.adjacency_cache.invalidate, edge_id)
+            invalidate()
             return {
                 "method": "put",
                 "path": path,
                 "data": data,
                 "params": params,
+                "on_done": invalidate,
             }
         res = self._api.put(path=path, params=params, data=data)
+        self.adjacency_cache.invalidate(edge_id)
         if res.status_code == 412:
             raise RevisionMismatchError(res)
         elif res.status_code not in {200, 202}:
@@ -565,33 +650,293 @@ class Graph(object):
         path = "/_api/gharial/{}/edge/{}".format(self.name, edge_id)
         params = {"waitForSync": wait_for_sync}
         if _batch:
+            invalidate = partial(self.adjacency_cache.invalidate, edge_id)
+            invalidate()
             return {
                 "method": "delete",
                 "path": path,
                 "params": params,
+                "on_done": invalidate,
             }
         if rev is not None:
             params["rev"] = rev
         res = self._api.delete(path=path, params=params)
+        self.adjacency_cache.invalidate(edge_id)
         if res.status_code == 412:
             raise RevisionMismatchError(res)
         elif res.status_code not in {200, 202}:
             raise EdgeRemoveError(res)
 
+    def _edge_collection_names(self):
+        """Return the edge collection names (cached like the edges)."""
+        cached = self._edge_collections
+        if cached is not None and (cached[1] is None or
+                                   cached[1] > default_timer()):
+            return cached[0]
+        names = [
+            definition["collection"]
+            for definition in self.edge_definitions
+        ]
+        ttl = self.adjacency_cache.ttl
+        self._edge_collections = (
+            names, None if ttl is None else default_timer() + ttl
+        )
+        return names
+
+    def get_edges(self, vertex_id, direction="any", collection=None,
+                  cached=True):
+        """Return the edges of a vertex in this graph.
+
+        The edges of each (vertex, direction, edge collection) are kept in
+        ``self.adjacency_cache``. Writes through the edge and vertex
+        methods of this graph invalidate the entries they affect (edges read
+        while such a write happens are not cached), and other writes are
+        picked up once the entries expire. Cached edges are shared and must
+        not be modified.
+
+        :param vertex_id: the ID of the vertex
+        :type vertex_id: str
+        :param direction: "outbound", "inbound" or "any"
+        :type direction: str
+        :param collection: the name of the edge collection (default: all
+            the edge collections of this graph)
+        :type collection: str or None
+        :param cached: whether or not to use (and fill) the cache
+        :type cached: bool
+        :returns: the edges
+        :rtype: list
+        :raises: ValueError, GraphPropertiesError, EdgeGetError
+        """
+        if direction not in EDGE_DIRECTIONS:
+            raise ValueError("invalid direction: {!r}".format(direction))
+        if collection is None:
+            collections = self._edge_collection_names()
+        else:
+            collections = [collection]
+        edges = []
+        for name in collections:
+            key = (vertex_id, direction, name)
+            found = self.adjacency_cache.get(key) if cached else None
+            if found is None:
+                generation = self.adjacency_cache.generation()
+                res = self._api.get(
+                    "/_api/edges/{}".format(name),
+                    params={
+                        "vertex": vertex_id,
+                        "direction": EDGE_DIRECTIONS[direction]
+                    }
+                )
+                if res.status_code != 200:
+                    raise EdgeGetError(res)
+                found = res.obj["edges"]
+                if cached:
+                    self.adjacency_cache.set(key, found, len(res.text),
+                                             generation)
+            edges.extend(found)
+        return edges
+
+    def neighbors(self, vertex_id, direction="any", collection=None,
+                  cached=True):
+        """Return the IDs of the vertices adjacent to a vertex.
+
+        A vertex is listed once per edge, and the vertex itself for an edge
+        to itself. See ``get_edges`` for the caching of the edges.
+
+        :param vertex_id: the ID of the vertex
+        :type vertex_id: str
+        :param direction: "outbound", "inbound" or "any"
+        :type direction: str
+        :param collection: the name of the edge collection (default: all
+            the edge collections of this graph)
+        :type collection: str or None
+        :param cached: whether or not to use (and fill) the cache
+        :type cached: bool
+        :returns: the vertex IDs
+        :rtype: list
+        :raises: ValueError, GraphPropertiesError, EdgeGetError
+        """
+        return [
+            edge["_to"] if edge["_from"] == vertex_id else edge["_from"]
+            for edge in self.get_edges(vertex_id, direction, collection,
+                                       cached)
+        ]
+
+    ################
+    # Bulk Loading #
+    ################
+
+    def bulk_load(self, vertices, edges=None, chunk_size=1000,
+                  max_workers=1, max_details=100):
+        """Import vertices and edges into the collections of this graph.
+
+        The documents of each collection are read lazily in chunks of
+        ``chunk_size`` which are imported by up to ``max_workers`` threads,
+        so at most ``chunk_size * max_workers`` documents are held at once
+        and the documents can come from generators. All the vertices are
+        imported before any edge. Documents rejected by the server (or
+        edges whose ``_from`` or ``_to`` is not in a vertex collection of
+        their edge definition, which are not sent) are counted as errors
+        and the import goes on.
+
+        The report of each collection has the number of ``documents`` read,
+        ``created``, ``errors`` and ``empty``, the ``seconds`` spent and
+        ``documents_per_second``, and the ``details`` of up to
+        ``max_details`` errors ("at position N: ..." where N counts from 1
+        in the documents of the collection).
+
+        :param vertices: the vertices (iterable of dicts) by the name of
+            their vertex collection
+        :type vertices: dict
+        :param edges: the edges (iterable of dicts) by the name of their
+            edge collection
+        :type edges: dict or None
+        :param chunk_size: the number of documents per import request
+        :type chunk_size: int
+        :param max_workers: the maximum number of concurrent requests
+        :type max_workers: int
+        :param max_details: the maximum number of error details kept per
+            collection
+        :type max_details: int
+        :returns: the reports by collection name
+        :rtype: dict
+        :raises: GraphBulkLoadError, GraphPropertiesError,
+            CollectionBulkImportError
+        """
+        edges = edges or {}
+        if chunk_size < 1:
+            raise ValueError("chunk size must be at least 1")
+        properties = self.properties
+        definitions = dict(
+            (definition["collection"], definition)
+            for definition in properties["edge_definitions"]
+        )
+        vertex_collections = set(properties["orphan_collections"])
+        for definition in definitions.values():
+            vertex_collections.update(definition["from"])
+            vertex_collections.update(definition["to"])
+        for names, allowed, kind in ((vertices, vertex_collections, "vertex"),
+                                     (edges, definitions, "edge")):
+            unknown = sorted(set(names) - set(allowed))
+            if unknown:
+                raise GraphBulkLoadError(
+                    "not {} collections of graph '{}': {}".format(
+                        kind, self.name, ", ".join(unknown)
+                    )
+                )
+
+        reports = {}
+        lock = threading.Lock()
+
+        def load(item):
+            name, collection, start, chunk = item
+            definition = definitions.get(name)
+            positions, documents, details = [], [], []
+            for position, document in enumerate(chunk, start=start):
+                violation = definition and _edge_violation(
+                    document, definition
+                )
+                if violation:
+                    details.append("at position {}: {}".format(
+                        position, violation
+                    ))
+                else:
+                    positions.append(position)
+                    documents.append(document)
+            started = time.time()
+            result = {}
+            if documents:
+                result = collection.bulk_import(
+                    documents, complete=False, details=True
+                )
+            finished = time.time()
+            for detail in result.get("details", []):
+                details.append(_DETAIL_POSITION.sub(
+                    lambda match: "at position {}".format(
+                        _position(positions, int(match.group(1)))
+                    ), detail
+                ))
+            with lock:
+                report = reports[name]
+                report["documents"] += len(chunk)
+                report["created"] += result.get("created", 0)
+                report["errors"] += (result.get("errors", 0) +
+                                     len(chunk) - len(documents))
+                report["empty"] += result.get("empty", 0)
+                report["started"] = min(report["started"], started)
+                report["finished"] = max(report["finished"], finished)
+                space = max_details - len(report["details"])
+                report["details"].extend(details[:max(space, 0)])
+
+        def read(documents_by_name):
+            for name, documents in documents_by_name.items():
+                collection = Collection(name, self._api)
+                reports[name] = {
+                    "documents": 0, "created": 0, "errors": 0, "empty": 0,
+                    "started": float("inf"), "finished": 0.0, "details": [],
+                }
+                start = 1
+                for chunk in iter_chunks(documents, chunk_size):
+                    yield name, collection, start, chunk
+                    start += len(chunk)
+
+        consume_concurrently(load, read(vertices), max_workers)
+        consume_concurrently(load, read(edges), max_workers)
+        for report in reports.values():
+            started, finished = report.pop("started"), report.pop("finished")
+            seconds = max(finished - started, 0.0)
+            report["seconds"] = seconds
+            report["documents_per_second"] = (
+                report["documents"] / seconds if seconds else 0.0
+            )
+        return reports
+
     ###################
     # Graph Traversal #
     ###################
 
+    def snapshot(self, batch_size=10000, isolated=False):
+        """Return a local snapshot of the adjacency of this graph.
+
+        The edges of all the edge collections of this graph are streamed
+        into compact arrays, which can then be traversed in-process (e.g.
+        with ``GraphSnapshot.traverse``) without any request. Call
+        ``refresh`` on the snapshot to reload the edge collections modified
+        since.
+
+        :param batch_size: the number of edges per batch of the edge queries
+        :type batch_size: int
+        :param isolated: whether or not to include the vertices without
+            edges (by loading the IDs of all the vertices as well)
+        :type isolated: bool
+        :returns: the snapshot
+        :rtype: arango.snapshot.GraphSnapshot
+        :raises: GraphPropertiesError, VertexCollectionListError,
+            CollectionPropertyError, QueryExecuteError
+        """
+        return GraphSnapshot(self, batch_size, isolated)
+
     def execute_traversal(self, start_vertex, direction=None,
             strategy=None, order=None, item_order=None, uniqueness=None,
             max_iterations=None, min_depth=None, max_depth=None, init=None,
-            filters=None, visitor=None, expander=None, sort=None):
+            filters=None, visitor=None, expander=None, sort=None,
+            stream=False, paths=True, batch_size=None):
         """Execute a graph traversal and return the visited vertices.
 
         For more details on ``init``, ``filter``, ``visitor``, ``expander``
         and ``sort`` please refer to the ArangoDB HTTP API documentation:
         https://docs.arangodb.com/HttpTraversal/README.html
 
+        If ``stream`` is set to True, the traversal runs as an AQL graph
+        traversal instead and a cursor is returned, which fetches the
+        visited vertices batch by batch as they are consumed rather than
+        all at once. Each item is ``{"vertex": ..., "path": {"vertices":
+        [...], "edges": [...]}}``, or only the vertex if ``paths`` is set
+        to False (then the paths are not even sent). A streamed traversal
+        needs ArangoDB 2.8 or later (for the AQL traversal syntax) and a
+        ``max_depth``, and does not support the JavaScript callbacks,
+        ``max_iterations``, "postorder" ``order``, "backward"
+        ``item_order`` or "global" uniqueness of the edges.
+
         :param start_vertex: the ID of the start vertex
         :type start_vertex: str
         :param direction: "outbound" or "inbound" or "any"
@@ -620,10 +965,37 @@ class Graph(object):
         :type expander: str
         :param sort: custom sorting function in Javascript
         :type sort: str
-        :returns: the traversal results
-        :rtype: dict
-        :raises: GraphTraversalError
+        :param stream: whether or not to stream the visited vertices
+        :type stream: bool
+        :param paths: whether or not to stream the paths as well
+        :type paths: bool
+        :param batch_size: the number of vertices per streamed batch
+        :type batch_size: int or None
+        :returns: the traversal results (a cursor if ``stream`` is True)
+        :rtype: dict or arango.cursor.Cursor
+        :raises: ValueError, GraphTraversalError, ServerVersionError
         """
+        if stream:
+            unsupported = [
+                name for name, value in (
+                    ("init", init), ("filters", filters),
+                    ("visitor", visitor), ("expander", expander),
+                    ("sort", sort), ("max_iterations", max_iterations),
+                    ("order", None if order == "preorder" else order),
+                    ("item_order",
+                     None if item_order == "forward" else item_order),
+                ) if value is not None
+            ]
+            if unsupported:
+                raise ValueError(
+                    "not supported by streamed traversals: {}".format(
+                        ", ".join(unsupported)
+                    )
+                )
+            return self._stream_traversal(
+                start_vertex, direction, strategy, uniqueness, min_depth,
+                max_depth, paths, batch_size
+            )
         data = {
             "startVertex": start_vertex,
             "graphName": self.name,
@@ -645,4 +1017,46 @@ class Graph(object):
         res = self._api.post("/_api/traversal", data=data)
         if res.status_code != 200:
             raise GraphTraversalError(res)
-        return res.obj["result"]
\ No newline at end of file
+        return res.obj["result"]
+
+    def _stream_traversal(self, start_vertex, direction, strategy,
+                          uniqueness, min_depth, max_depth, paths,
+                          batch_size):
+        """Return the cursor of an AQL traversal (see execute_traversal)."""
+        if direction not in ("outbound", "inbound", "any"):
+            raise ValueError("invalid direction: {!r}".format(direction))
+        if strategy not in (None, "depthfirst", "breadthfirst"):
+            raise ValueError("invalid strategy: {!r}".format(strategy))
+        if max_depth is None:
+            raise ValueError("streamed traversals need a max_depth")
+        uniqueness = uniqueness or {}
+        if uniqueness.get("edges") == "global":
+            raise ValueError(
+                "streamed traversals do not support global edge uniqueness"
+            )
+        self._api.require_version((2, 8), "streamed traversals")
+        data = {
+            "query": TRAVERSAL_QUERY.format(
+                direction=direction.upper(), result="p" if paths else "v"
+            ),
+            "bindVars": {
+                "minDepth": min_depth or 0,
+                "maxDepth": max_depth,
+                "startVertex": start_vertex,
+                "graph": self.name,
+                "bfs": strategy == "breadthfirst",
+                "uniqueVertices": uniqueness.get("vertices", "none"),
+                "uniqueEdges": uniqueness.get("edges", "path"),
+            },
+        }
+        if batch_size is not None:
+            data["batchSize"] = batch_size
+        res = self._api.post("/_api/cursor", data=data)
+        if res.status_code != 201:
+            raise GraphTraversalError(res)
+        row_factory = None
+        if paths:
+            row_factory = lambda path: {
+                "vertex": path["vertices"][-1], "path": path
+            }
+        return CursorFactory(self._api).cursor(res, row_factory=row_factory)
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""Client-side allocation of document keys.
+
+An allocator hands out keys before the documents are inserted, so that
+e.g. the edges between new vertices can be built (and imported) without
+waiting for the keys returned by the server.
+"""
+
+import binascii
+import os
+import random
+import threading
+import time
+
+from arango.utils import is_string
+
+
+def _milliseconds():
+    return int(time.time() * 1000)
+
+
+class KeyAllocator(object):
+    """Base class of the allocators of document keys.
+
+    Allocators are thread-safe; subclasses implement ``_next_key`` which
+    is called with the lock held. The random state of an allocator is
+    renewed in a forked child process so that it does not repeat the keys
+    of its parent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _next_key(self):
+        raise NotImplementedError
+
+    def _reseed(self):
+        """Renew the random state (in a forked child process)."""
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._reseed()
+
+    def next_key(self):
+        """Return a new key.
+
+        :returns: the key
+        :rtype: str
+        """
+        with self._lock:
+            self._check_pid()
+            return self._next_key()
+
+    def allocate(self, count):
+        """Return ``count`` new keys.
+
+        :param count: the number of keys
+        :type count: int
+        :returns: the keys, in allocation order
+        :rtype: list
+        """
+        with self._lock:
+            self._check_pid()
+            return [self._next_key() for _ in range(count)]
+
+    def assign(self, documents):
+        """Set a new ``_key`` in each of the documents which have none.
+
+        :param documents: the documents (modified in place)
+        :type documents: list
+        :returns: the documents
+        :rtype: list
+        """
+        missing = [doc for doc in documents if "_key" not in doc]
+        for doc, key in zip(missing, self.allocate(len(missing))):
+            doc["_key"] = key
+        return documents
+
+
+class TimeOrderedKeys(KeyAllocator):
+    """Keys ordered by their allocation time.
+
+    A key is the milliseconds since the epoch (11 hex digits), a sequence
+    number within the millisecond (4 hex digits) and the node ID of the
+    allocator, e.g. "18f4c1d2e3a0000a1b2c3". The keys of one allocator
+    sort in allocation order even if the clock goes backwards, and those
+    of allocators with distinct node IDs never collide.
+
+    :param node: the hex node ID (default: 6 random hex digits, renewed in
+        forked child processes, i.e. a collision between two allocators is
+        unlikely but possible)
+    :type node: str or None
+    """
+
+    def __init__(self, node=None):
+        super(TimeOrderedKeys, self).__init__()
+        if node is not None and (not is_string(node) or not node or
+                                 node.strip("0123456789abcdef")):
+            raise ValueError("invalid node ID: {!r}".format(node))
+        self._random_node = node is None
+        self.node = node
+        self._reseed()
+
+    def _reseed(self):
+        if self._random_node:
+            self.node = binascii.hexlify(os.urandom(3)).decode("ascii")
+        self._last = 0
+        self._sequence = 0
+
+    def _next_key(self):
+        now = _milliseconds()
+        if now > self._last:
+            self._last, self._sequence = now, 0
+        else:
+            self._sequence += 1
+            if self._sequence > 0xffff:
+                # Borrow from the next millisecond to stay ordered
+                self._last, self._sequence = self._last + 1, 0
+        return "{:011x}{:04x}{}".format(
+            self._last, self._sequence, self.node
+        )
+
+
+class ShardedCounterKeys(KeyAllocator):
+    """Keys made of a shard ID and a counter, e.g. "loader3-000000000042".
+
+    Keys never collide as long as every concurrent allocator (e.g. every
+    loader process) has its own shard ID and a restarted allocator either
+    gets a new one or resumes with ``start`` beyond its last key (a forked
+    child process continues the counter of its parent, so it needs an
+    allocator of its own). The
+    counter is zero-padded so that the keys of a shard sort in allocation
+    order.
+
+    :param shard: the shard ID
+    :type shard: str or int
+    :param start: the first counter value
+    :type start: int
+    :param width: the number of digits of the counter
+    :type width: int
+    :param separator: the separator of the shard ID and the counter
+    :type separator: str
+    """
+
+    def __init__(self, shard, start=0, width=12, separator="-"):
+        super(ShardedCounterKeys, self).__init__()
+        self.prefix = "{}{}".format(shard, separator)
+        self.width = width
+        self._counter = start
+
+    def _next_key(self):
+        key = "{}{:0{}d}".format(self.prefix, self._counter, self.width)
+        self._counter += 1
+        return key
+
+
+class UUID7Keys(KeyAllocator):
+    """UUIDv7 keys (RFC 9562), e.g. "0190163d-8694-739b-aea5-966c26f8ad91".
+
+    A UUIDv7 holds the milliseconds since the epoch followed by random
+    bits, so keys sort roughly by time and are unique without any
+    coordination between allocators. The 12 bits after the timestamp are a
+    counter (seeded randomly every millisecond) which keeps the keys of one
+    allocator in allocation order. The random bits come from a generator
+    seeded from ``os.urandom``: they need to be unique, not unpredictable.
+    """
+
+    def __init__(self):
+        super(UUID7Keys, self).__init__()
+        self._reseed()
+
+    def _reseed(self):
+        self._random = random.Random(os.urandom(16))
+        self._last = 0
+        self._counter = 0
+
+    def _next_key(self):
+        now = _milliseconds()
+        if now > self._last:
+            self._last = now
+            self._counter = self._random.getrandbits(11)
+        else:
+            self._counter += 1
+            if self._counter > 0xfff:
+                self._last += 1
+                self._counter = 0
+        value = "{:012x}{:04x}{:016x}".format(
+            self._last & 0xffffffffffff,
+            0x7000 | self._counter,
+            0x8000000000000000 | self._random.getrandbits(62)
+        )
+        return "{}-{}-{}-{}-{}".format(
+            value[:8], value[8:12], value[12:16], value[16:20], value[20:]
+        )
+
+
+# The allocators which can be chosen by name
+KEY_SCHEMES = {
+    "time": TimeOrderedKeys,
+    "uuid7": UUID7Keys,
+}
+
+
+def key_allocator(scheme):
+    """Return the key allocator of the given scheme.
+
+    :param scheme: "time", "uuid7" or a ``KeyAllocator`` (returned as is)
+    :type scheme: str or arango.keys.KeyAllocator
+    :returns: the key allocator
+    :rtype: arango.keys.KeyAllocator
+    :raises: ValueError
+    """
+    if isinstance(scheme, KeyAllocator):
+        return scheme
+    if scheme not in KEY_SCHEMES:
+        raise ValueError("unknown key scheme: {!r}".format(scheme))
+    return KEY_SCHEMES[scheme]()
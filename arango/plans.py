@@ -0,0 +1,160 @@
+"""Caching of AQL execution plans and detection of plan regressions."""
+
+import json
+import threading
+from collections import OrderedDict
+
+# The (uncamelified) plan nodes reading a whole collection and those using
+# indexes
+FULL_SCAN_NODES = frozenset(["enumerate_collection_node"])
+INDEX_NODES = frozenset(["index_range_node", "index_node"])
+
+
+class PlanCache(object):
+    """A bounded cache of explained plans keyed by query and options.
+
+    The plans are shared between the callers, so they must be treated as
+    read-only.
+
+    :param max_size: the maximum number of cached plans
+    :type max_size: int
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._plans)
+
+    @staticmethod
+    def key(query, options, bind_vars=None):
+        """Return the cache key of a query explained with the options.
+
+        :param query: the AQL query
+        :type query: str
+        :param options: the explain options (e.g. allPlans, optimizer)
+        :type options: dict
+        :param bind_vars: the bind parameters of the query
+        :type bind_vars: dict or None
+        :returns: the cache key
+        :rtype: tuple
+        """
+        return (
+            query,
+            json.dumps(options, sort_keys=True),
+            json.dumps(bind_vars, sort_keys=True),
+        )
+
+    def get(self, key):
+        """Return the cached plan of the key (None if it is not cached)."""
+        with self._lock:
+            entry = self._plans.pop(key, None)
+            if entry is None:
+                return None
+            self._plans[key] = entry
+            return entry["plan"]
+
+    def set(self, key, plan, query, options, bind_vars=None):
+        """Cache the plan of the key."""
+        with self._lock:
+            self._plans.pop(key, None)
+            self._plans[key] = {
+                "query": query,
+                "options": options,
+                "bind_vars": bind_vars,
+                "plan": plan,
+            }
+            while len(self._plans) > self.max_size:
+                self._plans.popitem(last=False)
+
+    def entries(self):
+        """Return the cached entries (query, options, bind_vars and plan).
+
+        :rtype: list
+        """
+        with self._lock:
+            return [(key, dict(entry)) for key, entry in self._plans.items()]
+
+    def clear(self):
+        """Forget all cached plans."""
+        with self._lock:
+            self._plans.clear()
+
+
+def _optimal(plan):
+    """Return the optimal plan of an explain result (a plan or a list)."""
+    if isinstance(plan, list):
+        return plan[0] if plan else {}
+    return plan
+
+
+def plan_indexes(plan):
+    """Return the indexes used by the plan.
+
+    :param plan: the (uncamelified) execution plan
+    :type plan: dict
+    :returns: the collection name and index (type and fields) pairs
+    :rtype: set
+    """
+    used = set()
+    for node in _optimal(plan).get("nodes", []):
+        if node.get("type") not in INDEX_NODES:
+            continue
+        indexes = node.get("indexes") or [node.get("index") or {}]
+        for index in indexes:
+            used.add((
+                node.get("collection"),
+                index.get("type"),
+                tuple(index.get("fields") or ()),
+            ))
+    return used
+
+
+def plan_full_scans(plan):
+    """Return the collections read in full by the plan.
+
+    :param plan: the (uncamelified) execution plan
+    :type plan: dict
+    :returns: the collection names
+    :rtype: set
+    """
+    return set(
+        node.get("collection") for node in _optimal(plan).get("nodes", [])
+        if node.get("type") in FULL_SCAN_NODES
+    )
+
+
+def compare_plans(old, new, cost_tolerance=0.1):
+    """Return the regressions of the new plan compared to the old one.
+
+    A regression is an index which is no longer used, a collection which
+    is now read in full, or an estimated cost higher than the old one by
+    more than the ``cost_tolerance`` fraction.
+
+    :param old: the previous (uncamelified) plan
+    :type old: dict or list
+    :param new: the current (uncamelified) plan
+    :type new: dict or list
+    :param cost_tolerance: the fraction the cost may go up by
+    :type cost_tolerance: float
+    :returns: the descriptions of the regressions
+    :rtype: list
+    """
+    reasons = []
+    for collection, index_type, fields in sorted(
+            plan_indexes(old) - plan_indexes(new), key=str):
+        reasons.append("{} index on {} of {} no longer used".format(
+            index_type, ", ".join(fields), collection
+        ))
+    for collection in sorted(plan_full_scans(new) - plan_full_scans(old)):
+        reasons.append("full scan of {}".format(collection))
+    old_cost = _optimal(old).get("estimated_cost")
+    new_cost = _optimal(new).get("estimated_cost")
+    if old_cost is not None and new_cost is not None and \
+            new_cost > old_cost * (1 + cost_tolerance):
+        reasons.append("estimated cost up from {} to {}".format(
+            old_cost, new_cost
+        ))
+    return reasons
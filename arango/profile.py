@@ -0,0 +1,128 @@
+"""Profiling of AQL query executions."""
+
+import time
+
+
+class QueryProfile(object):
+    """The timing breakdown of an AQL query execution.
+
+    Every batch of the query result is recorded with its number of
+    documents, its size in bytes, the time spent fetching it (server
+    execution and network) and the time spent decoding its JSON.
+
+    :param query: the AQL query
+    :type query: str
+    :param bind_vars: the bind parameters of the query
+    :type bind_vars: dict or None
+    :ivar extra: the ``extra`` attribute (statistics and warnings) of the
+        server response
+    :vartype extra: dict or None
+    :ivar plan: the execution plan (if it was requested)
+    :vartype plan: dict or None
+    :ivar batches: the documents, bytes, fetch and decode time of each batch
+    :vartype batches: list
+    """
+
+    def __init__(self, query, bind_vars=None):
+        self.query = query
+        self.bind_vars = bind_vars
+        self.extra = None
+        self.plan = None
+        self.batches = []
+        self.started = time.time()
+        self.finished = None
+
+    def __repr__(self):
+        return "<ArangoDB query profile ({} documents in {} batches)>".format(
+            self.documents, len(self.batches)
+        )
+
+    def record(self, res, seconds):
+        """Record the fetch of a batch.
+
+        :param res: the response holding the batch
+        :type res: arango.response.ArangoResponse
+        :param seconds: the time it took to get the response
+        :type seconds: float
+        """
+        decode_time = getattr(res, "decode_time", 0.0)
+        self.batches.append({
+            "documents": len(res.obj["result"]),
+            "bytes": len(res.text),
+            "fetch_time": max(0.0, seconds - decode_time),
+            "decode_time": decode_time,
+        })
+        if res.obj.get("extra"):
+            self.extra = res.obj["extra"]
+        if not res.obj.get("hasMore"):
+            self.finished = time.time()
+
+    @property
+    def time_to_first_batch(self):
+        """Return the seconds it took to get the first batch.
+
+        :rtype: float or None
+        """
+        if not self.batches:
+            return None
+        return self.batches[0]["fetch_time"] + self.batches[0]["decode_time"]
+
+    @property
+    def total_time(self):
+        """Return the seconds from the execution to the last batch.
+
+        This includes the time the caller spent between batches.
+
+        :rtype: float or None
+        """
+        if self.finished is None:
+            return None
+        return self.finished - self.started
+
+    @property
+    def documents(self):
+        """Return the number of documents fetched so far.
+
+        :rtype: int
+        """
+        return sum(batch["documents"] for batch in self.batches)
+
+    @property
+    def bytes(self):
+        """Return the number of bytes fetched so far.
+
+        :rtype: int
+        """
+        return sum(batch["bytes"] for batch in self.batches)
+
+    @property
+    def fetch_time(self):
+        """Return the seconds spent fetching batches so far.
+
+        :rtype: float
+        """
+        return sum(batch["fetch_time"] for batch in self.batches)
+
+    @property
+    def decode_time(self):
+        """Return the seconds spent decoding batches so far.
+
+        :rtype: float
+        """
+        return sum(batch["decode_time"] for batch in self.batches)
+
+    def summary(self):
+        """Return the totals of the profile.
+
+        :returns: the documents, batches, bytes and times
+        :rtype: dict
+        """
+        return {
+            "documents": self.documents,
+            "batches": len(self.batches),
+            "bytes": self.bytes,
+            "time_to_first_batch": self.time_to_first_batch,
+            "fetch_time": self.fetch_time,
+            "decode_time": self.decode_time,
+            "total_time": self.total_time,
+        }
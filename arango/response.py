@@ -1,6 +1,7 @@
 """Base class for HTTP responses"""
 
 import json
+from timeit import default_timer
 
 
 class ArangoResponse(object):
@@ -10,12 +11,24 @@ class ArangoResponse(object):
     :type status_code: int
     :param text: HTTP response text
     :type text: basestring
+    :ivar decode_time: the seconds it took to decode the JSON body
+    :vartype decode_time: float
     """
 
     def __init__(self, status_code, text=""):
         self.status_code = status_code
         self.text = text
+        start = default_timer()
         try:
             self.obj = json.loads(text) if text else None
         except ValueError:
             self.obj = text
+        self.decode_time = default_timer() - start
+
+    def copy(self):
+        """Return a copy of this response with its own decoded body.
+
+        :returns: the copy
+        :rtype: arango.response.ArangoResponse
+        """
+        return ArangoResponse(self.status_code, self.text)
@@ -0,0 +1,123 @@
+"""Compact representations of documents."""
+
+from arango.utils import is_string
+
+
+def _is_namedtuple(cls):
+    return (isinstance(cls, type) and issubclass(cls, tuple) and
+            hasattr(cls, "_fields"))
+
+
+def _slots(cls):
+    """Return the slots of ``cls`` and its bases, or None if it has none."""
+    slots = []
+    for klass in reversed(cls.__mro__):
+        names = klass.__dict__.get("__slots__", ())
+        if is_string(names):
+            names = (names,)
+        slots.extend(
+            name for name in names
+            if name not in ("__dict__", "__weakref__") and name not in slots
+        )
+    return slots or None
+
+
+class RowFactory(object):
+    """Turn documents into instances of a namedtuple or ``__slots__`` class.
+
+    Each field (or slot) is set to the document attribute of the same name
+    (None if it is missing) unless ``attributes`` maps it to another one,
+    e.g. ``{"key": "_key"}`` since namedtuple fields cannot start with an
+    underscore. Other attributes of the documents are dropped.
+
+    Rows of a ``__slots__`` class are created without calling its
+    ``__init__``. Either kind of row takes a fraction of the memory of the
+    document as a dict.
+
+    :param cls: the namedtuple or ``__slots__`` class
+    :type cls: type
+    :param attributes: the document attribute of the fields whose name
+        differs from it
+    :type attributes: dict
+    :raises: ValueError
+    """
+
+    def __init__(self, cls, attributes=None):
+        if _is_namedtuple(cls):
+            fields = list(cls._fields)
+        elif isinstance(cls, type):
+            fields = _slots(cls)
+        else:
+            fields = None
+        if fields is None:
+            raise ValueError(
+                "not a namedtuple or __slots__ class: {!r}".format(cls)
+            )
+        attributes = attributes or {}
+        unknown = set(attributes) - set(fields)
+        if unknown:
+            raise ValueError("unknown fields: {}".format(
+                ", ".join(sorted(unknown))
+            ))
+        self.cls = cls
+        self.fields = fields
+        self.attributes = tuple(attributes.get(f, f) for f in fields)
+        if _is_namedtuple(cls):
+            self.convert = self._tuple_converter()
+        else:
+            self.convert = self._slots_converter()
+
+    def __repr__(self):
+        return "<ArangoDB row factory {}>".format(self.cls.__name__)
+
+    def __call__(self, document):
+        """Return the row of a document.
+
+        :param document: the document
+        :type document: dict
+        :returns: the row
+        """
+        return self.convert([document])[0]
+
+    def _tuple_converter(self):
+        cls, attributes, new = self.cls, self.attributes, tuple.__new__
+
+        def convert(documents):
+            return [new(cls, map(doc.get, attributes)) for doc in documents]
+        return convert
+
+    def _slots_converter(self):
+        cls, new = self.cls, object.__new__
+        setters = [
+            (attribute, getattr(cls, field).__set__)
+            for field, attribute in zip(self.fields, self.attributes)
+        ]
+
+        def convert(documents):
+            rows = []
+            for doc in documents:
+                row = new(cls)
+                get = doc.get
+                for attribute, set_field in setters:
+                    set_field(row, get(attribute))
+                rows.append(row)
+            return rows
+        return convert
+
+
+def batch_converter(row_factory):
+    """Return a function turning a batch (list) of documents into rows.
+
+    :param row_factory: a ``RowFactory``, a namedtuple or ``__slots__``
+        class (turned into a ``RowFactory``) or any other callable, which is
+        called with each document
+    :type row_factory: arango.rows.RowFactory or type or callable
+    :returns: the converter of batches
+    :rtype: callable
+    """
+    if isinstance(row_factory, RowFactory):
+        return row_factory.convert
+    if _is_namedtuple(row_factory) or (
+            isinstance(row_factory, type) and _slots(row_factory)):
+        return RowFactory(row_factory).convert
+    return lambda documents: [row_factory(doc) for doc in documents]
@@ -0,0 +1,74 @@
+"""Coalescing of identical concurrent calls."""
+
+import threading
+
+
+class _Call(object):
+    """A call in flight."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight(object):
+    """Share one execution between identical concurrent calls.
+
+    While a call for a given key is in flight, any other caller asking for
+    the same key waits for it and gets its result (or its exception) instead
+    of executing the call again. Once the call is done the key is forgotten,
+    so results are never cached beyond the lifetime of the call.
+
+    If a ``copy`` function is given and the call was shared, every caller
+    gets its own copy of the result (made from the untouched original), so
+    that none of them sees the changes another one makes to its result.
+    Otherwise the result is shared as is.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, func, copy=None):
+        """Execute ``func`` unless a call for ``key`` is already in flight.
+
+        :param key: the hashable identity of the call
+        :type key: tuple
+        :param func: the function to execute (no arguments)
+        :type func: callable
+        :param copy: returns a copy of the result for each waiting caller
+        :type copy: callable or None
+        :returns: the result of ``func`` (possibly from another thread)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                call.waiters += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            if copy is not None:
+                return copy(call.result)
+            return call.result
+        try:
+            call.result = func()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        # No caller can join the call anymore
+        if copy is not None and call.waiters:
+            return copy(call.result)
+        return call.result
@@ -0,0 +1,176 @@
+"""Client-side log of slow HTTP operations."""
+
+import json
+import logging
+import logging.handlers
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from arango.utils import is_string
+
+# Path segments which are part of the endpoint rather than parameters
+LITERAL_SEGMENTS = frozenset([
+    "_api", "_admin", "_db", "vertex", "edge", "properties", "count",
+    "figures", "revision", "checksum", "load", "unload", "truncate",
+    "rotate", "rename", "user", "current", "import", "batch", "cursor",
+    "simple", "query", "explain", "index", "gharial", "traversal",
+    "transaction", "version", "database", "collection", "document",
+    "aqlfunction", "all", "by-example", "first-example", "any", "range",
+    "near", "within", "fulltext", "remove-by-example",
+    "replace-by-example", "update-by-example", "first", "last",
+    "lookup-by-keys", "remove-by-keys",
+])
+
+# The endpoints whose request body holds an AQL query
+QUERY_PATH = re.compile(r"^/_api/(cursor|explain|query)$")
+
+
+def template_path(path):
+    """Return ``path`` with its parameters (names, keys, IDs) replaced.
+
+    e.g. /_api/document/students/12345 becomes /_api/document/{}/{}
+
+    :param path: the request path
+    :type path: str
+    :returns: the templated path
+    :rtype: str
+    """
+    return "/".join(
+        segment if not segment or segment in LITERAL_SEGMENTS else "{}"
+        for segment in path.split("/")
+    )
+
+
+def shape(value):
+    """Return the shape of a bind variable (its type, not its value).
+
+    :param value: the bind variable value
+    :type value: object
+    :returns: the type name (with the length of arrays and objects)
+    :rtype: str
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if is_string(value):
+        return "string"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, (list, tuple)):
+        return "array[{}]".format(len(value))
+    if isinstance(value, dict):
+        return "object[{}]".format(len(value))
+    return type(value).__name__
+
+
+class SlowLog(object):
+    """Record the HTTP operations slower than a threshold.
+
+    The most recent ``capacity`` records are kept in memory and, if a
+    ``path`` is given, appended as JSON lines to a file rotated once it
+    reaches ``max_bytes``. Only ``sample_rate`` of the slow operations are
+    recorded, which bounds the overhead when many operations are slow.
+
+    A record holds the time, the method, the templated path (e.g.
+    /_api/document/{}/{}), the database, the status code, the size of the
+    response (in bytes) and the duration (in seconds) of the operation, and
+    for queries the query text and the shape of its bind variables.
+
+    :param threshold: the minimum duration (in seconds) to record
+    :type threshold: float
+    :param sample_rate: the fraction of slow operations to record
+    :type sample_rate: float
+    :param capacity: the number of records kept in memory
+    :type capacity: int
+    :param path: the file to write the records to (None for no file)
+    :type path: str or None
+    :param max_bytes: the size at which the file is rotated
+    :type max_bytes: int
+    :param backup_count: the number of rotated files to keep
+    :type backup_count: int
+    """
+
+    def __init__(self, threshold=0.1, sample_rate=1.0, capacity=1000,
+                 path=None, max_bytes=10 * 1024 * 1024, backup_count=5):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self._records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self._handler = None
+        if path is not None:
+            self._handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count,
+                encoding="utf-8", delay=True
+            )
+
+    @property
+    def records(self):
+        """Return the records kept in memory, oldest first.
+
+        :rtype: list
+        """
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        """Forget the records kept in memory."""
+        with self._lock:
+            self._records.clear()
+
+    def observe(self, method, path, db_name, seconds, res, data=None):
+        """Record the operation if it is slow (and sampled).
+
+        :param method: the HTTP method
+        :type method: str
+        :param path: the request path (relative to the database)
+        :type path: str
+        :param db_name: the name of the database
+        :type db_name: str
+        :param seconds: the duration of the operation
+        :type seconds: float
+        :param res: the response
+        :type res: arango.response.ArangoResponse
+        :param data: the request body (before serialization)
+        :type data: object
+        :returns: the record or None if the operation was not recorded
+        :rtype: dict or None
+        """
+        if seconds < self.threshold:
+            return None
+        if self.sample_rate < 1 and \
+                self._random.random() >= self.sample_rate:
+            return None
+        record = {
+            "time": time.time(),
+            "method": method,
+            "path": template_path(path),
+            "database": db_name,
+            "status": res.status_code,
+            "bytes": len(res.text) if res.text else 0,
+            "duration": seconds,
+        }
+        if isinstance(data, dict) and QUERY_PATH.match(path):
+            record["query"] = data.get("query")
+            record["bind_vars"] = dict(
+                (name, shape(value))
+                for name, value in (data.get("bindVars") or {}).items()
+            )
+        with self._lock:
+            self._records.append(record)
+        if self._handler is not None:
+            self._handler.handle(logging.makeLogRecord({
+                "msg": json.dumps(record, sort_keys=True),
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+            }))
+        return record
+
+    def close(self):
+        """Close the log file."""
+        if self._handler is not None:
+            self._handler.close()
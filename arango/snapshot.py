@@ -0,0 +1,526 @@
+"""Local snapshots of the adjacency of graphs."""
+
+import array
+from bisect import bisect_right
+from collections import deque
+from operator import itemgetter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from arango.collection import Collection
+from arango.exceptions import *
+
+# The query streaming the edges of a collection
+EDGES_QUERY = "FOR e IN @@collection RETURN [e._key, e._from, e._to]"
+
+# The query streaming the vertex IDs of a collection
+VERTICES_QUERY = "FOR v IN @@collection RETURN v._id"
+
+DIRECTIONS = ("outbound", "inbound", "any")
+STRATEGIES = ("depthfirst", "breadthfirst")
+UNIQUENESS = ("none", "global", "path")
+
+# The array type codes of vertex/edge indexes and of CSR offsets
+INDEX_TYPE = "i"
+try:
+    array.array("q")
+    OFFSET_TYPE = "q"
+except ValueError:
+    OFFSET_TYPE = "l"
+
+
+def _csr(count, sources, targets):
+    """Return the compressed sparse rows of edges grouped by source.
+
+    :param count: the number of vertices
+    :type count: int
+    :param sources: the source vertex index of each edge
+    :type sources: array.array
+    :param targets: the target vertex index of each edge
+    :type targets: array.array
+    :returns: the offsets (``count + 1`` of them) of the edges of each
+        vertex, the neighbor vertices and the edge indexes, where the
+        edges of vertex ``i`` are at ``offsets[i]:offsets[i + 1]`` (in
+        the order of ``sources``)
+    :rtype: tuple
+    """
+    if numpy is not None:
+        source_view = numpy.frombuffer(sources, INDEX_TYPE) \
+            if len(sources) else numpy.zeros(0, INDEX_TYPE)
+        target_view = numpy.frombuffer(targets, INDEX_TYPE) \
+            if len(targets) else numpy.zeros(0, INDEX_TYPE)
+        order = numpy.argsort(source_view, kind="stable")
+        offsets = numpy.zeros(count + 1, OFFSET_TYPE)
+        numpy.cumsum(
+            numpy.bincount(source_view, minlength=count), out=offsets[1:]
+        )
+        return (
+            _to_array(OFFSET_TYPE, offsets),
+            _to_array(INDEX_TYPE, target_view[order]),
+            _to_array(INDEX_TYPE, order),
+        )
+    offsets = array.array(OFFSET_TYPE, [0]) * (count + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    fill = array.array(OFFSET_TYPE, offsets)
+    neighbors = array.array(INDEX_TYPE, [0]) * len(sources)
+    edges = array.array(INDEX_TYPE, [0]) * len(sources)
+    for edge, source in enumerate(sources):
+        position = fill[source]
+        neighbors[position] = targets[edge]
+        edges[position] = edge
+        fill[source] = position + 1
+    return offsets, neighbors, edges
+
+
+def _to_array(typecode, values):
+    """Copy a NumPy array into an ``array.array``."""
+    result = array.array(typecode)
+    data = values.astype(typecode).tobytes()
+    if hasattr(result, "frombytes"):
+        result.frombytes(data)
+    else:
+        result.fromstring(data)
+    return result
+
+
+class GraphSnapshot(object):
+    """The adjacency of a graph, held locally for in-process traversals.
+
+    The edges of all the edge collections of the graph are streamed into
+    compressed sparse rows (CSR) of integer vertex indexes in
+    ``array.array`` buffers, one set for the outbound and one for the
+    inbound edges. Only the keys of the edges and the IDs of the vertices
+    with at least one edge are kept as strings. Traversals of the snapshot
+    need no request; ``refresh`` reloads the edge collections which were
+    modified since they were loaded.
+
+    The vertices without any edge are only part of the snapshot if
+    ``isolated`` is set to True, in which case the IDs of all the vertices
+    of the vertex collections of the graph are loaded as well (e.g. so
+    that the analytics of ``arango.analytics`` cover the whole graph).
+
+    :param graph: the graph
+    :type graph: arango.graph.Graph
+    :param batch_size: the number of edges per batch of the edge queries
+    :type batch_size: int
+    :param isolated: whether or not to include the vertices without edges
+    :type isolated: bool
+    :raises: GraphPropertiesError, VertexCollectionListError,
+        CollectionPropertyError, QueryExecuteError
+    """
+
+    def __init__(self, graph, batch_size=10000, isolated=False):
+        self.graph = graph
+        self.batch_size = batch_size
+        self.isolated = isolated
+        self._ids = []
+        self._index = {}
+        # Edge collection name -> (revision, keys, sources, targets)
+        self._collections = {}
+        # Vertex collection name -> (revision, vertex indexes)
+        self._vertex_collections = {}
+        self.refresh()
+
+    def __repr__(self):
+        return "<ArangoDB graph snapshot {} ({} vertices, {} edges)>".format(
+            self.graph.name, self.vertex_count, self.edge_count
+        )
+
+    ###########
+    # Loading #
+    ###########
+
+    def refresh(self):
+        """Reload the collections modified since they were loaded.
+
+        The edge definitions of the graph are read again, and an edge
+        collection is only reloaded if its revision changed (or it was
+        added to the graph). The same goes for the vertex collections if
+        the snapshot includes the vertices without edges. The vertex
+        indexes may change if anything was reloaded.
+
+        :returns: the names of the reloaded vertex and edge collections
+        :rtype: list
+        :raises: GraphPropertiesError, VertexCollectionListError,
+            CollectionPropertyError, QueryExecuteError
+        """
+        reloaded, removed = [], []
+        if self.isolated:
+            reloaded, removed = self._refresh_vertices()
+        names = sorted(
+            definition["collection"]
+            for definition in self.graph.edge_definitions
+        )
+        for name in list(self._collections):
+            if name not in names:
+                del self._collections[name]
+                removed.append(name)
+        for name in names:
+            collection = Collection(name, self.graph._api)
+            revision = collection.revision
+            loaded = self._collections.get(name)
+            if loaded is None or loaded[0] != revision:
+                self._collections[name] = (revision,) + self._load(collection)
+                reloaded.append(name)
+        if not hasattr(self, "_out"):
+            self._build(compact=False)
+        elif reloaded or removed:
+            self._build()
+        return reloaded
+
+    def _refresh_vertices(self):
+        """Reload the vertex collections modified since they were loaded.
+
+        :returns: the names of the reloaded and of the removed collections
+        :rtype: tuple
+        """
+        names = sorted(self.graph.vertex_collections)
+        removed = [
+            name for name in self._vertex_collections if name not in names
+        ]
+        for name in removed:
+            del self._vertex_collections[name]
+        reloaded = []
+        for name in names:
+            collection = Collection(name, self.graph._api)
+            revision = collection.revision
+            loaded = self._vertex_collections.get(name)
+            if loaded is None or loaded[0] != revision:
+                self._vertex_collections[name] = (
+                    revision, self._load_vertices(collection)
+                )
+                reloaded.append(name)
+        return reloaded, removed
+
+    def _cursor(self, collection, query):
+        """Return the cursor of a query on a collection."""
+        res = self.graph._api.post("/_api/cursor", data={
+            "query": query,
+            "bindVars": {"@collection": collection.name},
+            "batchSize": self.batch_size,
+        })
+        if res.status_code != 201:
+            raise QueryExecuteError(res)
+        return collection.cursor(res)
+
+    def _load_vertices(self, collection):
+        """Stream the vertex IDs of a collection.
+
+        :returns: the vertex indexes
+        :rtype: array.array
+        """
+        indexes = array.array(INDEX_TYPE)
+        ids, index = self._ids, self._index
+        for batch in self._cursor(collection, VERTICES_QUERY).batches():
+            for vertex_id in batch:
+                position = index.get(vertex_id)
+                if position is None:
+                    position = index[vertex_id] = len(ids)
+                    ids.append(vertex_id)
+                indexes.append(position)
+        return indexes
+
+    def _load(self, collection):
+        """Stream the edges of a collection.
+
+        :returns: the keys, source indexes and target indexes of the edges
+        :rtype: tuple
+        """
+        keys = []
+        sources = array.array(INDEX_TYPE)
+        targets = array.array(INDEX_TYPE)
+        ids, index = self._ids, self._index
+        for batch in self._cursor(collection, EDGES_QUERY).batches():
+            for key, source, target in batch:
+                for vertex_id, indexes in ((source, sources),
+                                           (target, targets)):
+                    position = index.get(vertex_id)
+                    if position is None:
+                        position = index[vertex_id] = len(ids)
+                        ids.append(vertex_id)
+                    indexes.append(position)
+                keys.append(key)
+        return keys, sources, targets
+
+    def _build(self, compact=True):
+        """Build the CSR adjacency of the loaded edge collections.
+
+        If ``compact`` is True, the vertices left without any edge (after a
+        reload) are dropped unless they are in a loaded vertex collection,
+        and the remaining ones are renumbered.
+        """
+        self._names = sorted(self._collections)
+        self._starts = []
+        self._keys = []
+        sources = array.array(INDEX_TYPE)
+        targets = array.array(INDEX_TYPE)
+        for name in self._names:
+            _, keys, col_sources, col_targets = self._collections[name]
+            self._starts.append(len(self._keys))
+            self._keys.extend(keys)
+            sources.extend(col_sources)
+            targets.extend(col_targets)
+        if compact:
+            used = bytearray(len(self._ids))
+            vertex_indexes = [
+                indexes for _, indexes in self._vertex_collections.values()
+            ]
+            for indexes in [sources, targets] + vertex_indexes:
+                for position in indexes:
+                    used[position] = 1
+            if not all(used):
+                self._compact(used)
+                return self._build(compact=False)
+        count = len(self._ids)
+        self._out = _csr(count, sources, targets)
+        self._in = _csr(count, targets, sources)
+
+    def _compact(self, used):
+        """Drop the vertices which are not ``used`` and renumber the rest."""
+        mapping = array.array(INDEX_TYPE, [-1]) * len(self._ids)
+        ids = []
+        for position, vertex_id in enumerate(self._ids):
+            if used[position]:
+                mapping[position] = len(ids)
+                ids.append(vertex_id)
+        self._ids = ids
+        self._index = dict((vertex_id, i) for i, vertex_id in enumerate(ids))
+        for name, (revision, keys, sources, targets) in \
+                list(self._collections.items()):
+            self._collections[name] = (
+                revision, keys,
+                array.array(INDEX_TYPE, [mapping[i] for i in sources]),
+                array.array(INDEX_TYPE, [mapping[i] for i in targets]),
+            )
+        for name, (revision, indexes) in \
+                list(self._vertex_collections.items()):
+            self._vertex_collections[name] = (
+                revision,
+                array.array(INDEX_TYPE, [mapping[i] for i in indexes]),
+            )
+
+    ############
+    # Contents #
+    ############
+
+    @property
+    def vertex_count(self):
+        """Return the number of vertices.
+
+        Those are the vertices with at least one edge, plus the vertices
+        without edges if ``isolated`` is set.
+
+        :returns: the number of vertices
+        :rtype: int
+        """
+        return len(self._ids)
+
+    @property
+    def edge_count(self):
+        """Return the number of edges.
+
+        :returns: the number of edges
+        :rtype: int
+        """
+        return len(self._keys)
+
+    @property
+    def vertex_ids(self):
+        """Return the vertex IDs, by vertex index.
+
+        :returns: the vertex IDs
+        :rtype: list
+        """
+        return self._ids
+
+    def index(self, vertex_id):
+        """Return the index of a vertex in the CSR adjacency.
+
+        :param vertex_id: the ID of the vertex
+        :type vertex_id: str
+        :returns: the vertex index (None if the vertex is not in the
+            snapshot, e.g. it has no edge)
+        :rtype: int or None
+        """
+        return self._index.get(vertex_id)
+
+    def edge_id(self, edge):
+        """Return the ID of an edge.
+
+        :param edge: the edge index (as in the CSR adjacency)
+        :type edge: int
+        :returns: the edge ID
+        :rtype: str
+        """
+        position = bisect_right(self._starts, edge) - 1
+        return "{}/{}".format(self._names[position], self._keys[edge])
+
+    def csr(self, direction="outbound"):
+        """Return the CSR adjacency of the edges in a direction.
+
+        The neighbors of vertex ``i`` are ``neighbors[offsets[i]:offsets[i
+        + 1]]`` and ``edges`` has the edge indexes at the same positions.
+
+        :param direction: "outbound" or "inbound"
+        :type direction: str
+        :returns: the offsets, neighbors and edges (``array.array``)
+        :rtype: tuple
+        :raises: ValueError
+        """
+        if direction == "outbound":
+            return self._out
+        if direction == "inbound":
+            return self._in
+        raise ValueError("invalid direction: {!r}".format(direction))
+
+    def _adjacent(self, vertex, direction):
+        """Return the (neighbor, edge) pairs of a vertex index.
+
+        The pairs are in the order of the edges; in the "any" direction an
+        edge from the vertex to itself is listed once.
+        """
+        if direction == "inbound":
+            offsets, neighbors, edges = self._in
+        else:
+            offsets, neighbors, edges = self._out
+        start, end = offsets[vertex], offsets[vertex + 1]
+        pairs = list(zip(neighbors[start:end], edges[start:end]))
+        if direction == "any":
+            offsets, neighbors, edges = self._in
+            start, end = offsets[vertex], offsets[vertex + 1]
+            pairs.extend(
+                pair for pair in zip(neighbors[start:end], edges[start:end])
+                if pair[0] != vertex
+            )
+            pairs.sort(key=itemgetter(1))
+        return pairs
+
+    def neighbors(self, vertex_id, direction="outbound"):
+        """Return the IDs of the vertices adjacent to a vertex.
+
+        A vertex is listed once per edge (in the order of the edges).
+
+        :param vertex_id: the ID of the vertex
+        :type vertex_id: str
+        :param direction: "outbound", "inbound" or "any"
+        :type direction: str
+        :returns: the IDs of the adjacent vertices
+        :rtype: list
+        :raises: ValueError
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError("invalid direction: {!r}".format(direction))
+        vertex = self._index.get(vertex_id)
+        if vertex is None:
+            return []
+        ids = self._ids
+        return [ids[n] for n, _ in self._adjacent(vertex, direction)]
+
+    #############
+    # Traversal #
+    #############
+
+    def traverse(self, start_vertex, direction="outbound",
+                 strategy="depthfirst", min_depth=0, max_depth=None,
+                 uniqueness=None, paths=True):
+        """Traverse the snapshot from a vertex.
+
+        The semantics of the parameters are those of
+        ``Graph.execute_traversal``: vertices are visited in preorder and
+        by default every vertex may be visited more than once but an edge
+        only once per path (``{"vertices": "none", "edges": "path"}``).
+        The result has the same shape as well, except that it holds the
+        IDs of the vertices and edges rather than the documents (and that
+        the vertices an edge points to are visited whether or not their
+        document exists).
+
+        :param start_vertex: the ID of the start vertex
+        :type start_vertex: str
+        :param direction: "outbound", "inbound" or "any"
+        :type direction: str
+        :param strategy: "depthfirst" or "breadthfirst"
+        :type strategy: str
+        :param min_depth: the minimum depth of the visited vertices
+        :type min_depth: int
+        :param max_depth: the maximum traversal depth (None for no limit)
+        :type max_depth: int or None
+        :param uniqueness: the uniqueness ("none", "global" or "path") of
+            the "vertices" and the "edges"
+        :type uniqueness: dict
+        :param paths: whether or not to return the path to each vertex
+        :type paths: bool
+        :returns: the visited vertex IDs ("vertices") and their paths
+            ("paths", each with the "vertices" and "edges" IDs) under
+            "visited"
+        :rtype: dict
+        :raises: ValueError
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError("invalid direction: {!r}".format(direction))
+        if strategy not in STRATEGIES:
+            raise ValueError("invalid strategy: {!r}".format(strategy))
+        uniqueness = dict({"vertices": "none", "edges": "path"},
+                          **(uniqueness or {}))
+        unique_vertices = uniqueness["vertices"]
+        unique_edges = uniqueness["edges"]
+        for value in (unique_vertices, unique_edges):
+            if value not in UNIQUENESS:
+                raise ValueError("invalid uniqueness: {!r}".format(value))
+
+        ids = self._ids
+        visited = {"vertices": [], "paths": []} if paths else \
+            {"vertices": []}
+        start = self._index.get(start_vertex)
+        if start is None:
+            # The vertex has no edge (or does not exist)
+            if min_depth == 0:
+                visited["vertices"].append(start_vertex)
+                if paths:
+                    visited["paths"].append(
+                        {"vertices": [start_vertex], "edges": []}
+                    )
+            return {"visited": visited}
+
+        seen_vertices = set([start])
+        seen_edges = set()
+        pending = deque([(start, 0, (start,), ())])
+        take = pending.pop if strategy == "depthfirst" else pending.popleft
+        while pending:
+            vertex, depth, path_vertices, path_edges = take()
+            if depth >= min_depth:
+                visited["vertices"].append(ids[vertex])
+                if paths:
+                    visited["paths"].append({
+                        "vertices": [ids[v] for v in path_vertices],
+                        "edges": [self.edge_id(e) for e in path_edges],
+                    })
+            if max_depth is not None and depth >= max_depth:
+                continue
+            expanded = []
+            for neighbor, edge in self._adjacent(vertex, direction):
+                if unique_edges == "path" and edge in path_edges:
+                    continue
+                if unique_edges == "global":
+                    if edge in seen_edges:
+                        continue
+                    seen_edges.add(edge)
+                if unique_vertices == "path" and neighbor in path_vertices:
+                    continue
+                if unique_vertices == "global":
+                    if neighbor in seen_vertices:
+                        continue
+                    seen_vertices.add(neighbor)
+                expanded.append((
+                    neighbor, depth + 1,
+                    path_vertices + (neighbor,), path_edges + (edge,)
+                ))
+            if strategy == "depthfirst":
+                expanded.reverse()
+            pending.extend(expanded)
+        return {"visited": visited}
@@ -0,0 +1,2670 @@
+"""In-process stand-in for the ArangoDB HTTP API.
+
+``FakeArangoServer`` implements the endpoints used by this driver on top of
+plain in-memory storage so that tests and load tests can run without a real
+ArangoDB instance. It listens on a real TCP socket, which means the driver is
+exercised end to end (HTTP client, serialization, batch encoding etc.), and it
+can inject artificial latency into every request so that throughput and
+latency measurements are reproducible.
+
+Only a small subset of AQL is understood natively, namely queries shaped like
+``FOR d IN <collection or @bind> [FILTER d.attr <op> <value> [AND ...]]
+[SORT d.attr [ASC|DESC]] [LIMIT [offset,] count] RETURN d[.attr]`` (or
+``RETURN [d.attr, ...]``),
+the ``[FOR d IN @bind] UPSERT ...`` queries of ``Collection.upsert`` and the
+``DOCUMENT`` key lookups of ``Collection.contains_many``. Any
+other query can be served by registering a handler with
+:meth:`FakeArangoServer.add_query_handler`. JavaScript (transactions and
+traversal callbacks) is not supported, but AQL graph traversals shaped like
+those of ``Graph.execute_traversal(stream=True)`` are. Like the real server,
+the fake one rejects UPSERT queries unless the reported ``version`` is 2.6
+or later, and AQL graph traversals unless it is 2.8 or later.
+
+Example::
+
+    with FakeArangoServer(latency=0.001) as server:
+        arango = server.connect()
+        arango.add_database("db0")
+
+The server can also be run standalone (e.g. to point the test suite at it)::
+
+    python -m arango.tests.server --port 8529
+"""
+
+import collections
+import itertools
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+import zlib
+import os
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn, UnixStreamServer
+    from urlparse import urlsplit, parse_qsl
+    from urllib import unquote
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn, UnixStreamServer
+    from urllib.parse import urlsplit, parse_qsl, unquote
+
+from arango import Arango
+from arango.utils import is_string
+
+
+DATABASE_NAME = re.compile(r"^[a-zA-Z][a-zA-Z0-9_\-]{0,63}$")
+COLLECTION_NAME = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_\-]{0,63}$")
+DOCUMENT_KEY = re.compile(r"^[a-zA-Z0-9_\-:.@()+,=;$!*'%]{1,254}$")
+FUNCTION_NAME = re.compile(r"^[a-zA-Z0-9_]+(::[a-zA-Z0-9_]+)+$")
+
+# Attributes that can never be changed through a document body
+SYSTEM_ATTRIBUTES = ("_id", "_key", "_rev", "_from", "_to")
+
+# Revisions are unique across all the servers of this process
+_revisions = itertools.count(1000000)
+
+
+def _next_rev():
+    return str(next(_revisions))
+
+
+class ArangoServerError(Exception):
+    """An ArangoDB style error which is turned into an error response.
+
+    :param code: the HTTP status code
+    :type code: int
+    :param error_num: the ArangoDB error number
+    :type error_num: int
+    :param message: the error message
+    :type message: str
+    :param extra: additional attributes for the response body
+    :type extra: dict or None
+    """
+
+    def __init__(self, code, error_num, message, extra=None):
+        super(ArangoServerError, self).__init__(message)
+        self.code = code
+        self.error_num = error_num
+        self.message = message
+        self.extra = extra or {}
+
+    def body(self):
+        body = {
+            "error": True,
+            "code": self.code,
+            "errorNum": self.error_num,
+            "errorMessage": self.message,
+        }
+        body.update(self.extra)
+        return body
+
+
+def _ok(body=None, code=200):
+    """Return ``body`` with the standard ``error`` and ``code`` attributes."""
+    body = {} if body is None else body
+    body["error"] = False
+    body["code"] = code
+    return body
+
+
+def _flag(value, default=False):
+    """Interpret a query parameter or a JSON attribute as a boolean."""
+    if value is None:
+        return default
+    if is_string(value):
+        return value.lower() in ("true", "1", "yes", "on")
+    return bool(value)
+
+
+def _get_path(document, path):
+    """Return the value at the dotted attribute ``path`` or None."""
+    value = document
+    for name in path.split("."):
+        if not isinstance(value, dict) or name not in value:
+            return None
+        value = value[name]
+    return value
+
+
+def _sort_key(value):
+    """Return a key ordering values the way AQL does across types."""
+    if value is None:
+        return 0, 0
+    elif isinstance(value, bool):
+        return 1, value
+    elif isinstance(value, (int, float)):
+        return 2, value
+    elif is_string(value):
+        return 3, value
+    elif isinstance(value, list):
+        return 4, [_sort_key(item) for item in value]
+    return 5, json.dumps(value, sort_keys=True)
+
+
+def _merge(target, patch, keep_null=True):
+    """Return a copy of ``target`` with ``patch`` merged into it."""
+    result = dict(target)
+    for key, value in patch.items():
+        if value is None and not keep_null:
+            result.pop(key, None)
+        elif isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _merge(result[key], value, keep_null)
+        else:
+            result[key] = value
+    return result
+
+
+class FakeCollection(object):
+    """An in-memory collection.
+
+    Documents are never mutated in place: every write stores a new dict,
+    so a shallow copy of ``documents`` is a consistent snapshot.
+
+    :param cid: the collection ID
+    :type cid: str
+    :param name: the collection name
+    :type name: str
+    :param is_edge: whether or not this is an edge collection
+    :type is_edge: bool
+    """
+
+    def __init__(self, cid, name, is_edge=False, wait_for_sync=False,
+                 do_compact=True, journal_size=33554432, is_system=False,
+                 is_volatile=False, key_options=None):
+        self.id = cid
+        self.name = name
+        self.is_edge = is_edge
+        self.wait_for_sync = wait_for_sync
+        self.do_compact = do_compact
+        self.journal_size = journal_size
+        self.is_system = is_system
+        self.is_volatile = is_volatile
+        self.key_options = {"type": "traditional", "allowUserKeys": True}
+        self.key_options.update(key_options or {})
+        self.status = 3
+        self.revision = "0"
+        self.documents = collections.OrderedDict()
+        self.indexes = collections.OrderedDict()
+        self.indexes["0"] = {
+            "type": "primary",
+            "fields": ["_key"],
+            "unique": True,
+            "sparse": False,
+            "selectivityEstimate": 1,
+        }
+        if is_edge:
+            self.indexes["1"] = {
+                "type": "edge",
+                "fields": ["_from", "_to"],
+                "unique": False,
+                "sparse": False,
+                "selectivityEstimate": 1,
+            }
+        self._index_ids = itertools.count(len(self.indexes))
+        self._last_key = 0
+
+    def info(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "isSystem": self.is_system,
+            "status": self.status,
+            "type": 3 if self.is_edge else 2,
+        }
+
+    def properties(self):
+        info = self.info()
+        info.update({
+            "doCompact": self.do_compact,
+            "isVolatile": self.is_volatile,
+            "journalSize": self.journal_size,
+            "waitForSync": self.wait_for_sync,
+            "keyOptions": dict(self.key_options),
+        })
+        return info
+
+    def add_index(self, index):
+        """Add ``index`` (or return the identical existing one).
+
+        :returns: the index ID and whether or not it was newly created
+        :rtype: tuple
+        """
+        for index_id, existing in self.indexes.items():
+            if existing == index:
+                return index_id, False
+        if index.get("unique") and index["type"] in ("hash", "skiplist"):
+            seen = set()
+            for document in self.documents.values():
+                values = self._index_values(index, document)
+                if values is None:
+                    continue
+                if values in seen:
+                    raise ArangoServerError(
+                        400, 1210, "unique constraint violated"
+                    )
+                seen.add(values)
+        index_id = str(next(self._index_ids))
+        self.indexes[index_id] = index
+        return index_id, True
+
+    def get(self, key):
+        """Return the document of the given key.
+
+        :raises: ArangoServerError
+        """
+        if key not in self.documents:
+            raise ArangoServerError(404, 1202, "document not found")
+        return self.documents[key]
+
+    def insert(self, data, from_id=None, to_id=None, overwrite=False):
+        """Insert a new document and return it.
+
+        :raises: ArangoServerError
+        """
+        if not isinstance(data, dict):
+            raise ArangoServerError(400, 1227, "invalid document type")
+        document = dict(
+            (k, v) for k, v in data.items() if k not in ("_id", "_rev")
+        )
+        if self.is_edge:
+            document["_from"] = from_id or data.get("_from")
+            document["_to"] = to_id or data.get("_to")
+            if not (is_string(document["_from"]) and
+                    is_string(document["_to"])):
+                raise ArangoServerError(400, 1233, "edge attribute missing")
+        key = document.get("_key")
+        if key is None:
+            key = self._generate_key()
+        else:
+            if not self.key_options.get("allowUserKeys", True):
+                raise ArangoServerError(
+                    400, 1222, "collection does not allow using "
+                               "user-defined keys"
+                )
+            if not is_string(key) or not DOCUMENT_KEY.match(key):
+                raise ArangoServerError(400, 1221, "illegal document key")
+            if key in self.documents and not overwrite:
+                raise ArangoServerError(
+                    409, 1210, "unique constraint violated"
+                )
+        document["_key"] = key
+        document["_id"] = "{}/{}".format(self.name, key)
+        return self._store(document)
+
+    def update(self, key, patch, keep_null=True):
+        """Merge ``patch`` into the document of the given key.
+
+        :raises: ArangoServerError
+        """
+        if not isinstance(patch, dict):
+            raise ArangoServerError(400, 1227, "invalid document type")
+        old = self.get(key)
+        patch = dict(
+            (k, v) for k, v in patch.items() if k not in SYSTEM_ATTRIBUTES
+        )
+        return self._store(_merge(old, patch, keep_null), old)
+
+    def replace(self, key, data):
+        """Replace the body of the document of the given key.
+
+        :raises: ArangoServerError
+        """
+        if not isinstance(data, dict):
+            raise ArangoServerError(400, 1227, "invalid document type")
+        old = self.get(key)
+        document = dict(
+            (k, v) for k, v in data.items() if k not in SYSTEM_ATTRIBUTES
+        )
+        for attr in SYSTEM_ATTRIBUTES:
+            if attr in old and attr != "_rev":
+                document[attr] = old[attr]
+        return self._store(document, old)
+
+    def remove(self, key):
+        """Remove the document of the given key and return it.
+
+        :raises: ArangoServerError
+        """
+        document = self.get(key)
+        del self.documents[key]
+        self.revision = _next_rev()
+        return document
+
+    def truncate(self):
+        self.documents = collections.OrderedDict()
+        self.revision = _next_rev()
+
+    def _generate_key(self):
+        if self.key_options["type"] == "autoincrement":
+            increment = self.key_options.get("increment", 1)
+            offset = self.key_options.get("offset", 0)
+            self._last_key = max(self._last_key + increment, offset)
+        else:
+            self._last_key += 1
+        while str(self._last_key) in self.documents:
+            self._last_key += 1
+        return str(self._last_key)
+
+    @staticmethod
+    def _index_values(index, document):
+        values = tuple(_get_path(document, f) for f in index["fields"])
+        if all(value is None for value in values):
+            return None
+        return json.dumps(values, sort_keys=True)
+
+    def _store(self, document, old=None):
+        for index in self.indexes.values():
+            if not index.get("unique"):
+                continue
+            if index["type"] not in ("hash", "skiplist"):
+                continue
+            values = self._index_values(index, document)
+            if values is None:
+                continue
+            for other in self.documents.values():
+                if other["_key"] == document["_key"]:
+                    continue
+                if self._index_values(index, other) == values:
+                    raise ArangoServerError(
+                        409, 1210, "unique constraint violated"
+                    )
+        document["_rev"] = _next_rev()
+        self.documents[document["_key"]] = document
+        self.revision = document["_rev"]
+        for index in self.indexes.values():
+            if index["type"] == "cap" and "size" in index:
+                while len(self.documents) > index["size"]:
+                    self.documents.popitem(last=False)
+        return document
+
+
+class FakeGraph(object):
+    """An in-memory graph definition.
+
+    :param name: the name of the graph
+    :type name: str
+    :param edge_definitions: the edge definitions
+    :type edge_definitions: list
+    :param orphan_collections: names of additional vertex collections
+    :type orphan_collections: list
+    """
+
+    def __init__(self, name, edge_definitions=None, orphan_collections=None):
+        self.name = name
+        self.edge_definitions = list(edge_definitions or [])
+        self.orphan_collections = list(orphan_collections or [])
+        self.revision = _next_rev()
+
+    def body(self):
+        return {
+            "name": self.name,
+            "_id": "_graphs/{}".format(self.name),
+            "_rev": self.revision,
+            "edgeDefinitions": self.edge_definitions,
+            "orphanCollections": self.orphan_collections,
+        }
+
+    @property
+    def edge_collections(self):
+        return [d["collection"] for d in self.edge_definitions]
+
+    @property
+    def vertex_collections(self):
+        names = set(self.orphan_collections)
+        for definition in self.edge_definitions:
+            names.update(definition["from"])
+            names.update(definition["to"])
+        return sorted(names)
+
+    def edge_definition(self, collection):
+        for definition in self.edge_definitions:
+            if definition["collection"] == collection:
+                return definition
+        return None
+
+    def adopt_orphans(self, previous):
+        """Turn the vertex collections no longer in use into orphans."""
+        self.revision = _next_rev()
+        used = set(self.vertex_collections)
+        for name in previous:
+            if name not in used:
+                self.orphan_collections.append(name)
+        covered = set()
+        for definition in self.edge_definitions:
+            covered.update(definition["from"])
+            covered.update(definition["to"])
+        self.orphan_collections = [
+            name for name in self.orphan_collections if name not in covered
+        ]
+
+
+class FakeDatabase(object):
+    """An in-memory database.
+
+    :param did: the database ID
+    :type did: str
+    :param name: the database name
+    :type name: str
+    """
+
+    def __init__(self, did, name):
+        self.id = did
+        self.name = name
+        self.collections = collections.OrderedDict()
+        self.graphs = collections.OrderedDict()
+        self.functions = collections.OrderedDict()
+
+    def collection(self, name):
+        """Return the collection of the given name or ID.
+
+        :raises: ArangoServerError
+        """
+        if name in self.collections:
+            return self.collections[name]
+        for collection in self.collections.values():
+            if collection.id == name:
+                return collection
+        raise ArangoServerError(404, 1203, "collection not found")
+
+    def document(self, handle):
+        """Return the document of the given handle (e.g. "col/key").
+
+        :raises: ArangoServerError
+        """
+        if not is_string(handle) or "/" not in handle:
+            raise ArangoServerError(400, 1205, "illegal document handle")
+        name, key = handle.split("/", 1)
+        return self.collection(name).get(key)
+
+    def graph(self, name):
+        if name not in self.graphs:
+            raise ArangoServerError(404, 1924, "graph not found")
+        return self.graphs[name]
+
+
+class _Request(object):
+    """A request as seen by the route handlers."""
+
+    def __init__(self, method, path, params, headers, body):
+        self.method = method
+        self.path = path
+        self.params = params
+        self.headers = dict((k.lower(), v) for k, v in headers.items())
+        self.body = body
+
+    def json(self):
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            raise ArangoServerError(400, 600, "invalid JSON object")
+
+    def json_object(self):
+        data = self.json()
+        if not isinstance(data, dict):
+            raise ArangoServerError(400, 600, "expecting a JSON object")
+        return data
+
+    def flag(self, name, default=False):
+        return _flag(self.params.get(name), default)
+
+    def header(self, name):
+        value = self.headers.get(name.lower())
+        return value.strip('"') if value is not None else None
+
+
+class _Cursor(object):
+
+    def __init__(self, results, batch_size, count):
+        self.results = results
+        self.position = 0
+        self.batch_size = batch_size
+        self.count = count
+
+
+#########################
+# Minimal AQL execution #
+#########################
+
+AQL_KEYWORDS = {
+    "FOR", "LET", "RETURN", "INSERT", "UPDATE", "REPLACE", "REMOVE",
+    "UPSERT", "WITH", "COLLECT",
+}
+
+_AQL_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<operator>==|!=|<=|>=|<|>|,|\[|\])
+      | (?P<bind>@@?\w+)
+      | (?P<name>`[^`]+`|[A-Za-z_][\w.]*)
+    )""", re.VERBOSE)
+
+_AQL_COMPARATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: _sort_key(a) < _sort_key(b),
+    "<=": lambda a, b: _sort_key(a) <= _sort_key(b),
+    ">": lambda a, b: _sort_key(a) > _sort_key(b),
+    ">=": lambda a, b: _sort_key(a) >= _sort_key(b),
+    "IN": lambda a, b: isinstance(b, list) and a in b,
+}
+
+
+class _UnsupportedQuery(Exception):
+    """The query is outside of the AQL subset understood natively."""
+
+
+def _tokenize(query):
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = _AQL_TOKEN.match(query, position)
+        if match is None or match.end() == position:
+            raise _UnsupportedQuery(query)
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class _Query(object):
+    """A parsed query of the natively supported shape."""
+
+    def __init__(self, query):
+        tokens = _tokenize(query)
+        self.filters = []
+        self.sort = []
+        self.limit = None
+        self._tokens = tokens
+        self._position = 0
+        self._expect("FOR")
+        self.variable = self._next("name")
+        self._expect("IN")
+        kind, self.source = self._next()
+        if kind not in ("bind", "name"):
+            raise _UnsupportedQuery(query)
+        self.source = self.source.strip("`")
+        while True:
+            keyword = self._next("name").upper()
+            if keyword == "FILTER":
+                self.filters.append(self._condition())
+                while self._peek().upper() == "AND":
+                    self._next()
+                    self.filters.append(self._condition())
+            elif keyword == "SORT":
+                path = self._attribute()
+                ascending = True
+                if self._peek().upper() in ("ASC", "DESC"):
+                    ascending = self._next()[1].upper() == "ASC"
+                self.sort.append((path, ascending))
+            elif keyword == "LIMIT":
+                offset, count = ("number", "0"), self._next()
+                if self._peek() == ",":
+                    self._next()
+                    offset, count = count, self._next()
+                self.limit = offset, count
+            elif keyword == "RETURN":
+                if self._peek() == "[":
+                    self._next()
+                    self.result = [self._attribute()]
+                    while self._peek() == ",":
+                        self._next()
+                        self.result.append(self._attribute())
+                    if self._next()[1] != "]":
+                        raise _UnsupportedQuery(query)
+                else:
+                    self.result = self._attribute()
+                break
+            else:
+                raise _UnsupportedQuery(query)
+        if self._position != len(self._tokens):
+            raise _UnsupportedQuery(query)
+
+    def _peek(self):
+        if self._position < len(self._tokens):
+            return self._tokens[self._position][1]
+        return ""
+
+    def _next(self, kind=None):
+        if self._position >= len(self._tokens):
+            raise _UnsupportedQuery()
+        token = self._tokens[self._position]
+        self._position += 1
+        if kind is not None and token[0] != kind:
+            raise _UnsupportedQuery()
+        return token if kind is None else token[1]
+
+    def _expect(self, keyword):
+        if self._next("name").upper() != keyword:
+            raise _UnsupportedQuery()
+
+    def _attribute(self):
+        """Parse ``var`` or ``var.path`` and return the path (or "")."""
+        name = self._next("name")
+        if name == self.variable:
+            return ""
+        if not name.startswith(self.variable + "."):
+            raise _UnsupportedQuery()
+        return name[len(self.variable) + 1:]
+
+    def _condition(self):
+        path = self._attribute()
+        operator = self._next()[1].upper()
+        if operator not in _AQL_COMPARATORS:
+            raise _UnsupportedQuery()
+        return path, operator, self._next()
+
+    @property
+    def collection(self):
+        """Return the collection name (or bind parameter) or None."""
+        if self.source.startswith("@") and not self.source.startswith("@@"):
+            return None
+        return self.source
+
+    def execute(self, db, bind_vars):
+        """Run the query against ``db``.
+
+        :returns: the results, the count before LIMIT and the scan count
+        :rtype: tuple
+        """
+        if self.source.startswith("@@"):
+            name = _bind_value(bind_vars, self.source[2:], "@")
+            documents = list(db.collection(name).documents.values())
+        elif self.source.startswith("@"):
+            documents = _bind_value(bind_vars, self.source[1:])
+            if not isinstance(documents, list):
+                raise ArangoServerError(
+                    400, 1563, "list expected in FOR loop"
+                )
+        else:
+            documents = list(db.collection(self.source).documents.values())
+        scanned = len(documents)
+        for path, operator, token in self.filters:
+            value = _token_value(token, bind_vars)
+            compare = _AQL_COMPARATORS[operator]
+            documents = [
+                d for d in documents
+                if compare(_item_value(d, path), value)
+            ]
+        for path, ascending in reversed(self.sort):
+            documents.sort(
+                key=lambda d: _sort_key(_item_value(d, path)),
+                reverse=not ascending
+            )
+        full_count = len(documents)
+        if self.limit is not None:
+            offset = int(_token_value(self.limit[0], bind_vars))
+            count = int(_token_value(self.limit[1], bind_vars))
+            documents = documents[offset:offset + count]
+        if isinstance(self.result, list):
+            results = [
+                [_item_value(d, path) for path in self.result]
+                for d in documents
+            ]
+        else:
+            results = [_item_value(d, self.result) for d in documents]
+        return results, full_count, scanned
+
+
+_AQL_UPSERT = re.compile(r"""^\s*
+    (?:FOR\s+(?P<variable>\w+)\s+IN\s+@(?P<source>\w+)\s+)?
+    UPSERT\s+\{(?P<search>[^{}]*)\}\s+
+    INSERT\s+(?P<insert>\S+)\s+
+    UPDATE\s+(?P<update>\S+)\s+
+    IN\s+(?P<collection>@@\w+|`[^`]+`|\w+)
+    (?:\s+OPTIONS\s+\{(?P<options>[^{}]*)\})?
+    \s+RETURN\s+\{(?P<result>[^{}]*)\}\s*$""", re.VERBOSE | re.IGNORECASE)
+
+_AQL_TRAVERSAL = re.compile(r"""^\s*
+    FOR\s+(?P<vertex>\w+)\s*,\s*\w+\s*,\s*(?P<path>\w+)\s+
+    IN\s+@(?P<min>\w+)\s*\.\.\s*@(?P<max>\w+)\s+
+    (?P<direction>OUTBOUND|INBOUND|ANY)\s+@(?P<start>\w+)\s+
+    GRAPH\s+@(?P<graph>\w+)
+    (?:\s+OPTIONS\s+\{(?P<options>[^{}]*)\})?
+    \s+RETURN\s+(?P<result>\w+)\s*$""", re.VERBOSE | re.IGNORECASE)
+
+_AQL_KEY_LOOKUP = re.compile(r"""^\s*
+    FOR\s+(?P<key>\w+)\s+IN\s+@(?P<keys>\w+)\s+
+    LET\s+(?P<document>\w+)\s*=\s*
+    DOCUMENT\(\s*(?P<collection>@@\w+|`[^`]+`|\w+)\s*,\s*(?P=key)\s*\)\s+
+    FILTER\s+(?P=document)\s*!=\s*null\s+
+    RETURN\s+(?P=key)\s*$""", re.VERBOSE | re.IGNORECASE)
+
+_AQL_OBJECT_ITEM = re.compile(r"""
+    \s*(?P<name>`[^`]+`|"[^"]*"|\w+)\s*:\s*
+    (?P<value>(?:`[^`]*`|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^,])+)
+    \s*(?:,|$)""", re.VERBOSE)
+
+
+class _Upsert(object):
+    """A parsed query shaped like ``[FOR v IN @bind] UPSERT {a: <value>,
+    ...} INSERT <value> UPDATE <value> IN <collection> [OPTIONS {...}]
+    RETURN {a: NEW.a | OLD.a, ...}``.
+
+    The values are bind parameters, literals or attribute paths of the loop
+    variable. Like a real query, the upserts are undone if one of them fails.
+    """
+
+    def __init__(self, match):
+        self.variable = match.group("variable")
+        self.source = match.group("source")
+        self.search = self._object(match.group("search"))
+        self.insert = match.group("insert")
+        self.update = match.group("update")
+        self.collection = match.group("collection").strip("`")
+        self.options = self._object(match.group("options") or "")
+        self.result = self._object(match.group("result"))
+
+    @staticmethod
+    def _object(text):
+        items = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = _AQL_OBJECT_ITEM.match(text, position)
+            if match is None:
+                raise _UnsupportedQuery(text)
+            name = match.group("name")
+            if name[0] in "`\"":
+                name = name[1:-1]
+            items.append((name, match.group("value").strip()))
+            position = match.end()
+        return items
+
+    def _value(self, expression, bind_vars, item=None, new=None, old=None):
+        names = [
+            name.strip("`") for name in
+            re.findall(r"`[^`]+`|[^.`]+", expression)
+        ]
+        scopes = {"NEW": new, "OLD": old}
+        if self.variable is not None:
+            scopes[self.variable] = item
+        if names[0] in scopes:
+            value = scopes[names[0]]
+            for name in names[1:]:
+                value = value.get(name) if isinstance(value, dict) else None
+            return value
+        return _token_value(_tokenize(expression)[0], bind_vars)
+
+    def execute(self, db, bind_vars):
+        """Run the upserts against ``db``.
+
+        :returns: the results, their count and the scan count
+        :rtype: tuple
+        """
+        if self.collection.startswith("@@"):
+            name = _bind_value(bind_vars, self.collection[2:], "@")
+        else:
+            name = self.collection
+        col = db.collection(name)
+        options = dict(
+            (name, self._value(value, bind_vars))
+            for name, value in self.options
+        )
+        if self.source is None:
+            items = [None]
+        else:
+            items = _bind_value(bind_vars, self.source)
+            if not isinstance(items, list):
+                raise ArangoServerError(
+                    400, 1563, "list expected in FOR loop"
+                )
+        documents, revision = col.documents.copy(), col.revision
+        results = []
+        scanned = 0
+        try:
+            for item in items:
+                search = [
+                    (name, self._value(value, bind_vars, item))
+                    for name, value in self.search
+                ]
+                old = None
+                for document in col.documents.values():
+                    scanned += 1
+                    if all(document.get(name) == value
+                           for name, value in search):
+                        old = document
+                        break
+                if old is None:
+                    new = col.insert(
+                        self._value(self.insert, bind_vars, item)
+                    )
+                else:
+                    new = col.update(
+                        old["_key"],
+                        self._value(self.update, bind_vars, item),
+                        _flag(options.get("keepNull"), True)
+                    )
+                results.append(dict(
+                    (name, self._value(value, bind_vars, item, new, old))
+                    for name, value in self.result
+                ))
+        except ArangoServerError:
+            col.documents, col.revision = documents, revision
+            raise
+        return results, len(results), scanned
+
+
+def _bind_value(bind_vars, name, prefix=""):
+    if prefix + name not in bind_vars:
+        raise ArangoServerError(
+            400, 1551, "no value specified for declared bind parameter "
+                       "'{}'".format(name)
+        )
+    return bind_vars[prefix + name]
+
+
+def _token_value(token, bind_vars):
+    kind, text = token
+    if kind == "bind":
+        return _bind_value(bind_vars, text[1:])
+    elif kind in ("string", "number"):
+        if kind == "string" and text.startswith("'"):
+            text = '"{}"'.format(text[1:-1].replace('"', '\\"'))
+        return json.loads(text)
+    elif text.lower() in ("true", "false", "null"):
+        return json.loads(text.lower())
+    raise _UnsupportedQuery()
+
+
+def _item_value(item, path):
+    return item if not path else _get_path(item, path)
+
+
+def _check_syntax(query):
+    """Roughly validate the AQL query.
+
+    :raises: ArangoServerError
+    """
+    if not is_string(query) or not query.strip():
+        raise ArangoServerError(400, 1502, "query is empty")
+    words = re.findall(r"[A-Za-z_]+", query)
+    if not words or words[0].upper() not in AQL_KEYWORDS:
+        raise ArangoServerError(
+            400, 1501, "syntax error, unexpected '{}'".format(
+                query.split()[0]
+            )
+        )
+    for opening, closing in ("()", "[]", "{}"):
+        if query.count(opening) != query.count(closing):
+            raise ArangoServerError(
+                400, 1501, "syntax error, unbalanced '{}'".format(opening)
+            )
+
+
+############
+# Geo Math #
+############
+
+def _distance(lat1, lon1, lat2, lon2):
+    """Return the distance between two coordinates in meters."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) *
+         math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 6371000 * 2 * math.asin(min(1, math.sqrt(a)))
+
+
+def _coordinates(index, document):
+    """Return the (latitude, longitude) of ``document`` per geo ``index``."""
+    try:
+        if index["type"] == "geo1":
+            value = _get_path(document, index["fields"][0])
+            if index.get("geoJson"):
+                return float(value[1]), float(value[0])
+            return float(value[0]), float(value[1])
+        return (
+            float(_get_path(document, index["fields"][0])),
+            float(_get_path(document, index["fields"][1]))
+        )
+    except (TypeError, ValueError, IndexError, KeyError):
+        return None
+
+
+##########
+# Server #
+##########
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send the headers and the body in one segment so that keep-alive
+    # clients do not stall on delayed ACKs
+    wbufsize = -1
+
+    def setup(self):
+        if self.server.address_family != socket.AF_UNIX:
+            self.disable_nagle_algorithm = True
+        BaseHTTPRequestHandler.setup(self)
+
+    def _respond(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        fake.transfer(len(body), received=True)
+        encoding = (self.headers.get("Content-Encoding") or "").lower()
+        if encoding in ("gzip", "deflate"):
+            body = zlib.decompress(body, 32 + zlib.MAX_WBITS)
+        status, headers, text = fake.handle(
+            method=self.command,
+            target=self.path,
+            headers=dict(self.headers.items()),
+            body=body.decode("utf-8"),
+        )
+        payload = text.encode("utf-8")
+        encoding = fake.response_encoding(
+            self.headers.get("Accept-Encoding"), len(payload)
+        )
+        if encoding is not None:
+            compressor = zlib.compressobj(
+                6, zlib.DEFLATED,
+                zlib.MAX_WBITS + (16 if encoding == "gzip" else 0)
+            )
+            payload = compressor.compress(payload) + compressor.flush()
+            headers["Content-Encoding"] = encoding
+        if self.command != "HEAD":
+            fake.transfer(len(payload))
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD" and status != 304:
+            self.wfile.write(payload)
+
+    do_HEAD = do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeArangoServer(object):
+    """An in-process ArangoDB HTTP stand-in backed by in-memory storage.
+
+    ``latency`` is added to every request before it is processed. It can be
+    a number of seconds or a callable which takes the HTTP method and the
+    request path and returns the number of seconds. ``jitter`` adds a random
+    delay of up to the given number of seconds on top of it, drawn from a
+    generator seeded with ``seed`` so that runs are reproducible.
+
+    :param host: the host to listen on
+    :type host: str
+    :param port: the port to listen on (0 picks a free port)
+    :type port: int
+    :param latency: the delay injected into every request (in seconds)
+    :type latency: float or callable
+    :param jitter: the maximum random delay added to ``latency``
+    :type jitter: float
+    :param seed: the seed of the jitter generator
+    :type seed: int
+    :param batch_size: the default cursor batch size
+    :type batch_size: int
+    :param version: the ArangoDB version to report
+    :type version: str
+    :param unix_socket: listen on this unix socket path instead of TCP
+    :type unix_socket: str or None
+    :param bandwidth: simulate a link of this many bytes per second
+    :type bandwidth: int or None
+    :param compression_threshold: compress response bodies of at least
+        this many bytes if the client accepts it (None never compresses)
+    :type compression_threshold: int or None
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0, jitter=0,
+                 seed=0, batch_size=1000, version="2.4.0", unix_socket=None,
+                 bandwidth=None, compression_threshold=None):
+        self.host = host
+        self.unix_socket = unix_socket
+        self.bandwidth = bandwidth
+        self.compression_threshold = compression_threshold
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.latency = latency
+        self.jitter = jitter
+        self.batch_size = batch_size
+        self.version = version
+        self.request_count = 0
+        self.history = collections.deque(maxlen=10000)
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._databases = {}
+        self._cursors = {}
+        self._query_handlers = []
+        self._routes = [
+            (method, re.compile(pattern), getattr(self, name))
+            for method, pattern, name in self.ROUTES
+        ]
+        if unix_socket is not None:
+            if os.path.exists(unix_socket):
+                os.remove(unix_socket)
+            self._httpd = _ThreadingUnixHTTPServer(
+                unix_socket, _RequestHandler
+            )
+        else:
+            self._httpd = _ThreadingHTTPServer((host, port), _RequestHandler)
+        self._httpd.fake = self
+        self._thread = None
+        self.reset()
+
+    ROUTES = [
+        ("GET", r"^/_api/version$", "_version"),
+        ("GET", r"^/_api/database$", "_list_databases"),
+        ("GET", r"^/_api/database/user$", "_list_databases"),
+        ("GET", r"^/_api/database/current$", "_current_database"),
+        ("POST", r"^/_api/database$", "_add_database"),
+        ("DELETE", r"^/_api/database/([^/]+)$", "_remove_database"),
+        ("GET", r"^/_api/collection$", "_list_collections"),
+        ("POST", r"^/_api/collection$", "_add_collection"),
+        ("GET", r"^/_api/collection/([^/]+)$", "_get_collection"),
+        ("GET", r"^/_api/collection/([^/]+)/"
+                r"(properties|count|figures|revision|checksum)$",
+         "_collection_attribute"),
+        ("PUT", r"^/_api/collection/([^/]+)/properties$",
+         "_modify_collection"),
+        ("PUT", r"^/_api/collection/([^/]+)/"
+                r"(load|unload|truncate|rotate)$", "_collection_action"),
+        ("PUT", r"^/_api/collection/([^/]+)/rename$", "_rename_collection"),
+        ("DELETE", r"^/_api/collection/([^/]+)$", "_remove_collection"),
+        ("POST", r"^/_api/(document|edge)$", "_add_document"),
+        ("GET", r"^/_api/(document|edge)/([^/]+)/([^/]+)$",
+         "_get_document"),
+        ("PUT", r"^/_api/(document|edge)/([^/]+)/([^/]+)$",
+         "_replace_document"),
+        ("PATCH", r"^/_api/(document|edge)/([^/]+)/([^/]+)$",
+         "_update_document"),
+        ("DELETE", r"^/_api/(document|edge)/([^/]+)/([^/]+)$",
+         "_remove_document"),
+        ("GET", r"^/_api/edges/([^/]+)$", "_list_edges"),
+        ("POST", r"^/_api/import$", "_import"),
+        ("POST", r"^/_api/batch$", "_batch"),
+        ("PUT", r"^/_api/simple/([a-z\-]+)$", "_simple_query"),
+        ("POST", r"^/_api/cursor$", "_create_cursor"),
+        ("PUT", r"^/_api/cursor/([^/]+)$", "_read_cursor"),
+        ("DELETE", r"^/_api/cursor/([^/]+)$", "_delete_cursor"),
+        ("POST", r"^/_api/explain$", "_explain"),
+        ("POST", r"^/_api/query$", "_parse_query"),
+        ("GET", r"^/_api/index$", "_list_indexes"),
+        ("POST", r"^/_api/index$", "_add_index"),
+        ("DELETE", r"^/_api/index/([^/]+)/([^/]+)$", "_remove_index"),
+        ("GET", r"^/_api/aqlfunction$", "_list_functions"),
+        ("POST", r"^/_api/aqlfunction$", "_add_function"),
+        ("DELETE", r"^/_api/aqlfunction/([^/]+)$", "_remove_function"),
+        ("POST", r"^/_api/traversal$", "_traversal"),
+        ("POST", r"^/_api/transaction$", "_transaction"),
+        ("GET", r"^/_api/gharial$", "_list_graphs"),
+        ("POST", r"^/_api/gharial$", "_add_graph"),
+        ("GET", r"^/_api/gharial/([^/]+)$", "_get_graph"),
+        ("DELETE", r"^/_api/gharial/([^/]+)$", "_remove_graph"),
+        ("GET", r"^/_api/gharial/([^/]+)/vertex$",
+         "_list_vertex_collections"),
+        ("POST", r"^/_api/gharial/([^/]+)/vertex$",
+         "_add_vertex_collection"),
+        ("DELETE", r"^/_api/gharial/([^/]+)/vertex/([^/]+)$",
+         "_remove_vertex_collection"),
+        ("GET", r"^/_api/gharial/([^/]+)/edge$", "_list_edge_definitions"),
+        ("POST", r"^/_api/gharial/([^/]+)/edge$", "_add_edge_definition"),
+        ("PUT", r"^/_api/gharial/([^/]+)/edge/([^/]+)$",
+         "_replace_edge_definition"),
+        ("DELETE", r"^/_api/gharial/([^/]+)/edge/([^/]+)$",
+         "_remove_edge_definition"),
+        ("POST", r"^/_api/gharial/([^/]+)/(vertex|edge)/([^/]+)$",
+         "_add_graph_document"),
+        ("GET", r"^/_api/gharial/([^/]+)/(vertex|edge)/([^/]+)/([^/]+)$",
+         "_get_graph_document"),
+        ("PUT", r"^/_api/gharial/([^/]+)/(vertex|edge)/([^/]+)/([^/]+)$",
+         "_replace_graph_document"),
+        ("PATCH", r"^/_api/gharial/([^/]+)/(vertex|edge)/([^/]+)/([^/]+)$",
+         "_update_graph_document"),
+        ("DELETE", r"^/_api/gharial/([^/]+)/(vertex|edge)/([^/]+)/([^/]+)$",
+         "_remove_graph_document"),
+    ]
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def port(self):
+        """Return the port the server is listening on (None for sockets)."""
+        if self.unix_socket is not None:
+            return None
+        return self._httpd.server_address[1]
+
+    @property
+    def url(self):
+        """Return the base URL (or the unix endpoint) of the server."""
+        if self.unix_socket is not None:
+            return "unix://{}".format(self.unix_socket)
+        return "http://{}:{}".format(self.host, self.port)
+
+    def start(self):
+        """Start serving requests in a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever)
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests and release the socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+        if self.unix_socket is not None and os.path.exists(self.unix_socket):
+            os.remove(self.unix_socket)
+
+    def serve_forever(self):
+        """Serve requests in the calling thread."""
+        self._httpd.serve_forever()
+
+    def connect(self, **kwargs):
+        """Return an ``Arango`` connection to this server."""
+        if self.unix_socket is not None:
+            return Arango(protocol="unix", host=self.unix_socket, **kwargs)
+        return Arango(host=self.host, port=self.port, **kwargs)
+
+    def reset(self):
+        """Drop all data and statistics."""
+        with self._lock:
+            self._databases = {"_system": FakeDatabase("1", "_system")}
+            self._cursors = {}
+            self.request_count = 0
+            self.bytes_received = 0
+            self.bytes_sent = 0
+            self.history.clear()
+
+    def database(self, name="_system"):
+        """Return the in-memory database of the given name."""
+        return self._databases[name]
+
+    def add_query_handler(self, pattern, handler):
+        """Serve the AQL queries matching ``pattern`` with ``handler``.
+
+        ``handler`` is called with the ``FakeDatabase``, the query string
+        and the bind variables, and must return an iterable of results. It
+        runs while the storage is locked, so it may modify documents through
+        the ``FakeCollection`` methods. Handlers are tried in the order they
+        were added, before the native AQL subset.
+
+        :param pattern: the regular expression searched for in the query
+        :type pattern: str
+        :param handler: the query handler
+        :type handler: callable
+        """
+        self._query_handlers.append((re.compile(pattern), handler))
+
+    def handle(self, method, target, headers=None, body="", db_name=None):
+        """Process one HTTP request.
+
+        :param method: the HTTP method
+        :type method: str
+        :param target: the request path with the query string
+        :type target: str
+        :param headers: the request headers
+        :type headers: dict
+        :param body: the request body
+        :type body: str
+        :param db_name: the database used if the path has no "/_db" prefix
+        :type db_name: str
+        :returns: the status code, the response headers and the body
+        :rtype: tuple
+        """
+        url = urlsplit(target)
+        path = url.path
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        match = re.match(r"^/_db/([^/]+)(/.*)?$", path)
+        if match is not None:
+            db_name = unquote(match.group(1))
+            path = match.group(2) or "/"
+        db_name = db_name or "_system"
+        self._delay(method, path)
+        request = _Request(method, path, params, headers or {}, body)
+        with self._lock:
+            self.request_count += 1
+            self.history.append((method, target))
+            try:
+                if db_name not in self._databases:
+                    raise ArangoServerError(404, 1228, "database not found")
+                result = self._dispatch(request, self._databases[db_name])
+            except ArangoServerError as err:
+                result = err.code, err.body()
+        status, body = result[:2]
+        headers = result[2] if len(result) > 2 else {}
+        if is_string(body):
+            text = body
+        else:
+            text = "" if body is None else json.dumps(body)
+            headers.setdefault(
+                "Content-Type", "application/json; charset=utf-8"
+            )
+        return status, headers, text
+
+    def transfer(self, size, received=False):
+        """Account for ``size`` bytes on the wire (and simulate bandwidth).
+
+        :param size: the number of bytes
+        :type size: int
+        :param received: whether the bytes were received (or sent)
+        :type received: bool
+        """
+        with self._lock:
+            if received:
+                self.bytes_received += size
+            else:
+                self.bytes_sent += size
+        if self.bandwidth:
+            time.sleep(float(size) / self.bandwidth)
+
+    def response_encoding(self, accept_encoding, size):
+        """Return the content coding to compress a response with.
+
+        :param accept_encoding: the Accept-Encoding request header
+        :type accept_encoding: str or None
+        :param size: the size of the response body
+        :type size: int
+        :returns: "gzip", "deflate" or None
+        :rtype: str or None
+        """
+        if self.compression_threshold is None or not accept_encoding or \
+                size < self.compression_threshold:
+            return None
+        for coding in accept_encoding.split(","):
+            coding = coding.split(";")[0].strip().lower()
+            if coding in ("gzip", "deflate"):
+                return coding
+        return None
+
+    def _delay(self, method, path):
+        latency = self.latency
+        if callable(latency):
+            latency = latency(method, path)
+        if self.jitter:
+            with self._lock:
+                latency += self._random.uniform(0, self.jitter)
+        if latency:
+            time.sleep(latency)
+
+    def _dispatch(self, request, db):
+        method = "GET" if request.method == "HEAD" else request.method
+        allowed = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            allowed = True
+            if route_method == method:
+                args = [unquote(group) for group in match.groups()]
+                return handler(request, db, *args)
+        if allowed:
+            raise ArangoServerError(405, 405, "method not supported")
+        raise ArangoServerError(404, 404, "unknown path")
+
+    ###########
+    # Version #
+    ###########
+
+    def _version(self, request, db):
+        return 200, {"server": "arango", "version": self.version}
+
+    #############
+    # Databases #
+    #############
+
+    def _list_databases(self, request, db):
+        return 200, _ok({"result": sorted(self._databases)})
+
+    def _current_database(self, request, db):
+        return 200, _ok({"result": {
+            "name": db.name,
+            "id": db.id,
+            "path": "/tmp/databases/database-{}".format(db.id),
+            "isSystem": db.name == "_system",
+        }})
+
+    def _add_database(self, request, db):
+        if db.name != "_system":
+            raise ArangoServerError(
+                403, 1230, "operation only allowed in system database"
+            )
+        name = request.json_object().get("name")
+        if not is_string(name) or not DATABASE_NAME.match(name):
+            raise ArangoServerError(400, 1229, "database name invalid")
+        if name in self._databases:
+            raise ArangoServerError(409, 1207, "duplicate name")
+        self._databases[name] = FakeDatabase(str(next(self._ids)), name)
+        return 201, _ok({"result": True}, 201)
+
+    def _remove_database(self, request, db, name):
+        if db.name != "_system" or name == "_system":
+            raise ArangoServerError(
+                403, 1230, "operation only allowed in system database"
+            )
+        if name not in self._databases:
+            raise ArangoServerError(404, 1228, "database not found")
+        del self._databases[name]
+        return 200, _ok({"result": True})
+
+    ###############
+    # Collections #
+    ###############
+
+    def _list_collections(self, request, db):
+        infos = [col.info() for col in db.collections.values()]
+        return 200, _ok({
+            "collections": infos,
+            "names": dict((info["name"], info) for info in infos),
+        })
+
+    def _add_collection(self, request, db):
+        data = request.json_object()
+        name = data.get("name")
+        is_system = _flag(data.get("isSystem"))
+        if (not is_string(name) or not COLLECTION_NAME.match(name) or
+                (name.startswith("_") and not is_system)):
+            raise ArangoServerError(400, 1208, "illegal name")
+        if name in db.collections:
+            raise ArangoServerError(409, 1207, "duplicate name")
+        key_options = data.get("keyOptions") or {}
+        if key_options.get("type", "traditional") not in (
+                "traditional", "autoincrement"):
+            raise ArangoServerError(400, 10, "invalid key generator type")
+        col = FakeCollection(
+            cid=str(next(self._ids)),
+            name=name,
+            is_edge=data.get("type") == 3,
+            wait_for_sync=_flag(data.get("waitForSync")),
+            do_compact=_flag(data.get("doCompact"), True),
+            journal_size=data.get("journalSize", 33554432),
+            is_system=is_system,
+            is_volatile=_flag(data.get("isVolatile")),
+            key_options=key_options,
+        )
+        db.collections[name] = col
+        info = col.info()
+        info.update({
+            "waitForSync": col.wait_for_sync,
+            "isVolatile": col.is_volatile,
+        })
+        return 200, _ok(info)
+
+    def _get_collection(self, request, db, name):
+        return 200, _ok(db.collection(name).info())
+
+    def _collection_attribute(self, request, db, name, attribute):
+        col = db.collection(name)
+        body = col.properties()
+        if attribute == "count":
+            body["count"] = len(col.documents)
+        elif attribute == "figures":
+            size = sum(len(json.dumps(d)) for d in col.documents.values())
+            body["count"] = len(col.documents)
+            body["figures"] = {
+                "alive": {"count": len(col.documents), "size": size},
+                "dead": {"count": 0, "size": 0, "deletion": 0},
+                "datafiles": {"count": 0, "fileSize": 0},
+                "journals": {"count": 1, "fileSize": col.journal_size},
+                "shapes": {"count": 0, "size": 0},
+                "attributes": {"count": 0, "size": 0},
+                "indexes": {"count": len(col.indexes), "size": 0},
+            }
+        elif attribute == "revision":
+            body["revision"] = col.revision
+        elif attribute == "checksum":
+            checksum = 0
+            for document in col.documents.values():
+                text = document["_key"]
+                if request.flag("withRevision"):
+                    text += document["_rev"]
+                if request.flag("withData"):
+                    text += json.dumps(document, sort_keys=True)
+                checksum ^= zlib.crc32(text.encode("utf-8")) & 0xffffffff
+            body["checksum"] = checksum
+            body["revision"] = col.revision
+        return 200, _ok(body)
+
+    def _modify_collection(self, request, db, name):
+        col = db.collection(name)
+        data = request.json_object()
+        if "waitForSync" in data:
+            col.wait_for_sync = _flag(data["waitForSync"])
+        if "journalSize" in data:
+            col.journal_size = data["journalSize"]
+        return 200, _ok(col.properties())
+
+    def _collection_action(self, request, db, name, action):
+        col = db.collection(name)
+        if action == "load":
+            col.status = 3
+        elif action == "unload":
+            col.status = 2
+        elif action == "truncate":
+            col.truncate()
+        elif action == "rotate":
+            if not col.documents:
+                raise ArangoServerError(
+                    400, 1105, "could not rotate journal: no journal"
+                )
+            return 200, _ok({"result": True})
+        return 200, _ok(col.info())
+
+    def _rename_collection(self, request, db, name):
+        col = db.collection(name)
+        new_name = request.json_object().get("name")
+        if not is_string(new_name) or not COLLECTION_NAME.match(new_name):
+            raise ArangoServerError(400, 1208, "illegal name")
+        if new_name in db.collections:
+            raise ArangoServerError(409, 1207, "duplicate name")
+        del db.collections[col.name]
+        col.name = new_name
+        db.collections[new_name] = col
+        return 200, _ok(col.info())
+
+    def _remove_collection(self, request, db, name):
+        col = db.collection(name)
+        del db.collections[col.name]
+        return 200, _ok({"id": col.id})
+
+    #############
+    # Documents #
+    #############
+
+    def _check_rev(self, request, document, use_policy=True):
+        """Check the revision preconditions of a document request."""
+        if_none_match = request.header("If-None-Match")
+        if if_none_match is not None and if_none_match == document["_rev"]:
+            raise ArangoServerError(304, 1200, "not modified")
+        rev = request.params.get("rev") or request.header("If-Match")
+        if rev is None:
+            return
+        if use_policy and request.params.get("policy") == "last":
+            return
+        if "rev" in request.params and not rev.isdigit():
+            raise ArangoServerError(400, 1239, "illegal document revision")
+        if rev != document["_rev"]:
+            raise ArangoServerError(412, 1200, "precondition failed", {
+                "_id": document["_id"],
+                "_rev": document["_rev"],
+                "_key": document["_key"],
+            })
+
+    def _collection_of_type(self, db, name, kind):
+        col = db.collection(name)
+        if kind == "edge" and not col.is_edge:
+            raise ArangoServerError(400, 1218, "collection type invalid")
+        return col
+
+    def _sync_code(self, request, col, synced=201):
+        return synced if request.flag("waitForSync", col.wait_for_sync) \
+            else 202
+
+    @staticmethod
+    def _header(document, old=None):
+        header = {
+            "_id": document["_id"],
+            "_rev": document["_rev"],
+            "_key": document["_key"],
+        }
+        if old is not None:
+            header["_oldRev"] = old["_rev"]
+        return header
+
+    def _add_document(self, request, db, kind):
+        col = self._collection_of_type(db, request.params.get("collection"),
+                                       kind)
+        document = col.insert(
+            request.json(),
+            from_id=request.params.get("from"),
+            to_id=request.params.get("to"),
+        )
+        code = self._sync_code(request, col)
+        return code, _ok(self._header(document), code), {
+            "Etag": '"{}"'.format(document["_rev"])
+        }
+
+    def _get_document(self, request, db, kind, name, key):
+        document = self._collection_of_type(db, name, kind).get(key)
+        self._check_rev(request, document)
+        return 200, document, {"Etag": '"{}"'.format(document["_rev"])}
+
+    def _replace_document(self, request, db, kind, name, key):
+        col = self._collection_of_type(db, name, kind)
+        old = col.get(key)
+        self._check_rev(request, old)
+        document = col.replace(key, request.json())
+        code = self._sync_code(request, col)
+        return code, _ok(self._header(document, old), code)
+
+    def _update_document(self, request, db, kind, name, key):
+        col = self._collection_of_type(db, name, kind)
+        old = col.get(key)
+        self._check_rev(request, old)
+        document = col.update(
+            key, request.json(), keep_null=request.flag("keepNull", True)
+        )
+        code = self._sync_code(request, col)
+        return code, _ok(self._header(document, old), code)
+
+    def _remove_document(self, request, db, kind, name, key):
+        col = self._collection_of_type(db, name, kind)
+        self._check_rev(request, col.get(key))
+        document = col.remove(key)
+        code = self._sync_code(request, col, 200)
+        return code, _ok(self._header(document), code)
+
+    def _list_edges(self, request, db, name):
+        col = self._collection_of_type(db, name, "edge")
+        vertex = request.params.get("vertex")
+        direction = request.params.get("direction", "any")
+        edges = [
+            edge for edge in col.documents.values()
+            if (direction in ("out", "any") and edge["_from"] == vertex) or
+               (direction in ("in", "any") and edge["_to"] == vertex)
+        ]
+        return 200, _ok({"edges": edges})
+
+    def _import(self, request, db):
+        col = db.collection(request.params.get("collection"))
+        kind = request.params.get("type", "documents")
+        body = request.body or ""
+        if kind == "auto":
+            kind = "list" if body.lstrip().startswith("[") else "documents"
+        if kind == "list":
+            documents = request.json()
+            if not isinstance(documents, list):
+                raise ArangoServerError(400, 400, "expecting a JSON array")
+        else:
+            documents = []
+            for line in body.splitlines():
+                try:
+                    documents.append(json.loads(line) if line.strip()
+                                     else None)
+                except ValueError:
+                    documents.append(line)
+        on_duplicate = request.params.get("onDuplicate", "error")
+        prefixes = {
+            "_from": request.params.get("fromPrefix"),
+            "_to": request.params.get("toPrefix"),
+        }
+        snapshot = collections.OrderedDict(col.documents)
+        result = {"created": 0, "errors": 0, "empty": 0, "updated": 0,
+                  "ignored": 0}
+        details = []
+        first_error = None
+        for position, document in enumerate(documents, start=1):
+            if document is None:
+                result["empty"] += 1
+                continue
+            try:
+                if isinstance(document, dict):
+                    for attr, prefix in prefixes.items():
+                        value = document.get(attr)
+                        if prefix and is_string(value) and "/" not in value:
+                            document[attr] = "{}/{}".format(prefix, value)
+                key = document.get("_key") if isinstance(document, dict) \
+                    else None
+                if is_string(key) and key in col.documents and \
+                        on_duplicate != "error":
+                    if on_duplicate == "update":
+                        col.update(key, document)
+                        result["updated"] += 1
+                    elif on_duplicate == "replace":
+                        col.replace(key, document)
+                        result["updated"] += 1
+                    else:
+                        result["ignored"] += 1
+                    continue
+                col.insert(document)
+                result["created"] += 1
+            except ArangoServerError as err:
+                first_error = first_error or err
+                result["errors"] += 1
+                details.append(
+                    "at position {}: creating document failed with error "
+                    "'{}', offending document: {}".format(
+                        position, err.message, json.dumps(document)
+                    )
+                )
+        if first_error is not None and request.flag("complete"):
+            col.documents = snapshot
+            raise ArangoServerError(
+                400, first_error.error_num, first_error.message
+            )
+        if request.flag("details"):
+            result["details"] = details
+        return 201, _ok(result, 201)
+
+    ###########
+    # Batches #
+    ###########
+
+    def _batch(self, request, db):
+        content_type = request.headers.get("content-type", "")
+        match = re.search(r"boundary=([^;\s]+)", content_type)
+        if match is None:
+            raise ArangoServerError(400, 400, "invalid content-type")
+        boundary = "--" + match.group(1).strip('"')
+        parts = []
+        for chunk in request.body.split(boundary)[1:]:
+            if chunk.startswith("--"):
+                break
+            part_headers, _, inner = chunk.strip("\r\n").partition(
+                "\r\n\r\n"
+            )
+            content_id = None
+            for line in part_headers.split("\r\n"):
+                name, _, value = line.partition(":")
+                if name.strip().lower() == "content-id":
+                    content_id = value.strip()
+            head, _, inner_body = inner.partition("\r\n\r\n")
+            lines = head.split("\r\n")
+            try:
+                method, target = lines[0].split(" ")[:2]
+            except ValueError:
+                raise ArangoServerError(400, 400, "invalid multipart message")
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip()] = value.strip()
+            parts.append((content_id, method.upper(), target, headers,
+                          inner_body.rstrip("\r\n")))
+
+        errors = 0
+        response = ""
+        for content_id, method, target, headers, body in parts:
+            status, _, text = self.handle(
+                method, target, headers, body, db_name=db.name
+            )
+            if status >= 400:
+                errors += 1
+            response += boundary + "\r\n"
+            response += "Content-Type: application/x-arango-batchpart\r\n"
+            if content_id is not None:
+                response += "Content-Id: {}\r\n".format(content_id)
+            response += "\r\nHTTP/1.1 {} {}\r\n".format(
+                status, BaseHTTPRequestHandler.responses.get(
+                    status, ("Unknown",)
+                )[0]
+            )
+            response += "Content-Type: application/json; charset=utf-8\r\n"
+            response += "Content-Length: {}\r\n\r\n{}\r\n".format(
+                len(text), text
+            )
+        response += boundary + "--\r\n"
+        return 200, response, {
+            "Content-Type": "multipart/form-data; boundary={}".format(
+                boundary[2:]
+            ),
+            "X-Arango-Errors": str(errors),
+        }
+
+    ###########
+    # Cursors #
+    ###########
+
+    def _open_cursor(self, results, batch_size=None, count=False,
+                     extra=None):
+        batch_size = batch_size or self.batch_size
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ArangoServerError(400, 10, "batchSize must be positive")
+        results = list(results)
+        body = {
+            "result": results[:batch_size],
+            "hasMore": len(results) > batch_size,
+            "cached": False,
+        }
+        if count:
+            body["count"] = len(results)
+        if extra is not None:
+            body["extra"] = extra
+        if body["hasMore"]:
+            cursor_id = str(next(self._ids))
+            self._cursors[cursor_id] = _Cursor(
+                results[batch_size:], batch_size, len(results)
+            )
+            body["id"] = cursor_id
+        return 201, _ok(body, 201)
+
+    def _read_cursor(self, request, db, cursor_id):
+        cursor = self._cursors.get(cursor_id)
+        if cursor is None:
+            raise ArangoServerError(404, 1600, "cursor not found")
+        end = cursor.position + cursor.batch_size
+        batch = cursor.results[cursor.position:end]
+        cursor.position = end
+        has_more = end < len(cursor.results)
+        if not has_more:
+            del self._cursors[cursor_id]
+        return 200, _ok({
+            "result": batch,
+            "hasMore": has_more,
+            "id": cursor_id,
+            "count": cursor.count,
+            "cached": False,
+        })
+
+    def _delete_cursor(self, request, db, cursor_id):
+        if self._cursors.pop(cursor_id, None) is None:
+            raise ArangoServerError(404, 1600, "cursor not found")
+        return 202, _ok({"id": cursor_id}, 202)
+
+    ###########
+    # Queries #
+    ###########
+
+    def _execute(self, db, query, bind_vars):
+        """Execute the AQL query.
+
+        :returns: the results, the count before LIMIT and the scan count
+        :rtype: tuple
+        """
+        for pattern, handler in self._query_handlers:
+            if pattern.search(query):
+                results = list(handler(db, query, bind_vars))
+                return results, len(results), 0
+        match = _AQL_UPSERT.match(query)
+        if match is not None:
+            self._check_version((2, 6), "UPSERT")
+            return _Upsert(match).execute(db, bind_vars)
+        match = _AQL_TRAVERSAL.match(query)
+        if match is not None:
+            self._check_version((2, 8), "graph traversal")
+            return self._execute_traversal(db, match, bind_vars)
+        match = _AQL_KEY_LOOKUP.match(query)
+        if match is not None:
+            return self._execute_key_lookup(db, match, bind_vars)
+        try:
+            parsed = _Query(query)
+        except _UnsupportedQuery:
+            _check_syntax(query)
+            raise ArangoServerError(
+                501, 9, "query not supported by the fake server (register "
+                        "a query handler)"
+            )
+        return parsed.execute(db, bind_vars)
+
+    def _check_version(self, minimum, syntax):
+        """Reject the AQL syntax the reported version does not know."""
+        version = tuple(
+            int(number) for number in
+            re.findall(r"\d+", self.version)[:len(minimum)]
+        )
+        if version < minimum:
+            raise ArangoServerError(
+                400, 1501, "syntax error: {} needs ArangoDB {}".format(
+                    syntax, ".".join(map(str, minimum))
+                )
+            )
+
+    def _execute_traversal(self, db, match, bind_vars):
+        """Execute a query shaped like ``FOR v, e, p IN @min..@max
+        <DIRECTION> @start GRAPH @graph [OPTIONS {bfs: <value>,
+        uniqueVertices: <value>, uniqueEdges: <value>}] RETURN v|p``.
+        """
+        options = {}
+        for item in _AQL_OBJECT_ITEM.finditer(match.group("options") or ""):
+            options[item.group("name").strip("`\"")] = _token_value(
+                _tokenize(item.group("value"))[0], bind_vars
+            )
+        uniqueness = {}
+        if options.get("uniqueVertices") is not None:
+            uniqueness["vertices"] = options["uniqueVertices"]
+        if options.get("uniqueEdges") is not None:
+            uniqueness["edges"] = options["uniqueEdges"]
+        result = match.group("result")
+        if result not in (match.group("vertex"), match.group("path")):
+            raise ArangoServerError(
+                501, 9, "query not supported by the fake server"
+            )
+        graph = db.graph(_bind_value(bind_vars, match.group("graph")))
+        visited = self._traverse(
+            db, graph.edge_collections,
+            _bind_value(bind_vars, match.group("start")),
+            {
+                "direction": match.group("direction").lower(),
+                "strategy": "breadthfirst" if options.get("bfs") else
+                            "depthfirst",
+                "uniqueness": uniqueness,
+                "minDepth": _bind_value(bind_vars, match.group("min")),
+                "maxDepth": _bind_value(bind_vars, match.group("max")),
+            }
+        )
+        if result == match.group("vertex"):
+            results = visited["vertices"]
+        else:
+            results = visited["paths"]
+        return results, len(results), 0
+
+    def _execute_key_lookup(self, db, match, bind_vars):
+        """Execute a query shaped like ``FOR k IN @keys LET d =
+        DOCUMENT(<collection>, k) FILTER d != null RETURN k``.
+        """
+        collection = match.group("collection").strip("`")
+        if collection.startswith("@@"):
+            collection = _bind_value(bind_vars, collection[2:], "@")
+        documents = db.collection(collection).documents
+        keys = _bind_value(bind_vars, match.group("keys"))
+        if not isinstance(keys, list):
+            raise ArangoServerError(400, 1563, "list expected in FOR loop")
+        results = [
+            key for key in keys if is_string(key) and key in documents
+        ]
+        return results, len(results), 0
+
+    def _create_cursor(self, request, db):
+        data = request.json_object()
+        query = data.get("query")
+        if not is_string(query) or not query.strip():
+            raise ArangoServerError(400, 1502, "query is empty")
+        options = data.get("options") or {}
+        results, full_count, scanned = self._execute(
+            db, query, data.get("bindVars") or {}
+        )
+        stats = {
+            "writesExecuted": 0,
+            "writesIgnored": 0,
+            "scannedFull": scanned,
+            "scannedIndex": 0,
+            "filtered": max(0, scanned - full_count),
+        }
+        if options.get("fullCount"):
+            stats["fullCount"] = full_count
+        return self._open_cursor(
+            results,
+            batch_size=data.get("batchSize"),
+            count=data.get("count"),
+            extra={"stats": stats, "warnings": []},
+        )
+
+    def _plan(self, db, query):
+        """Return a plausible execution plan of the query."""
+        nodes = [{
+            "type": "SingletonNode",
+            "dependencies": [],
+            "id": 1,
+            "estimatedCost": 1,
+            "estimatedNrItems": 1,
+        }]
+        rules = []
+        cost, items = 1, 1
+        collections_used = []
+        variables = []
+        try:
+            parsed = _Query(query)
+        except _UnsupportedQuery:
+            parsed = None
+        if parsed is not None and parsed.collection is not None and \
+                not parsed.collection.startswith("@"):
+            # Like the server, fail on collections which do not exist
+            db.collection(parsed.collection)
+        if parsed is not None and parsed.collection in db.collections:
+            col = db.collections[parsed.collection]
+            collections_used.append(col.name)
+            variables.append({"id": 0, "name": parsed.variable})
+            total = len(col.documents)
+            index = self._usable_index(col, parsed.filters)
+            if index is not None:
+                items = max(1, total // 10)
+                cost += 1 + items
+                rules.extend(["use-index-range",
+                              "remove-filter-covered-by-index"])
+                nodes.append({
+                    "type": "IndexRangeNode",
+                    "dependencies": [1],
+                    "id": 2,
+                    "collection": col.name,
+                    "database": db.name,
+                    "index": index,
+                    "outVariable": variables[0],
+                    "estimatedCost": cost,
+                    "estimatedNrItems": items,
+                })
+            else:
+                items = total
+                cost += total
+                nodes.append({
+                    "type": "EnumerateCollectionNode",
+                    "dependencies": [1],
+                    "id": 2,
+                    "collection": col.name,
+                    "database": db.name,
+                    "outVariable": variables[0],
+                    "estimatedCost": cost,
+                    "estimatedNrItems": items,
+                })
+                for _ in parsed.filters:
+                    cost += items
+                    nodes.append({
+                        "type": "FilterNode",
+                        "dependencies": [nodes[-1]["id"]],
+                        "id": nodes[-1]["id"] + 1,
+                        "estimatedCost": cost,
+                        "estimatedNrItems": items,
+                    })
+            if parsed.sort:
+                cost += items * max(1, int(math.log(items + 1, 2)))
+                nodes.append({
+                    "type": "SortNode",
+                    "dependencies": [nodes[-1]["id"]],
+                    "id": nodes[-1]["id"] + 1,
+                    "estimatedCost": cost,
+                    "estimatedNrItems": items,
+                })
+        else:
+            for name in re.findall(r"\bIN\s+`?(\w+)`?", query, re.I):
+                if name in db.collections and name not in collections_used:
+                    collections_used.append(name)
+                    items += len(db.collections[name].documents)
+            cost += items
+            nodes.append({
+                "type": "CalculationNode",
+                "dependencies": [1],
+                "id": 2,
+                "estimatedCost": cost,
+                "estimatedNrItems": items,
+            })
+        cost += items
+        nodes.append({
+            "type": "ReturnNode",
+            "dependencies": [nodes[-1]["id"]],
+            "id": nodes[-1]["id"] + 1,
+            "estimatedCost": cost,
+            "estimatedNrItems": items,
+        })
+        return {
+            "nodes": nodes,
+            "rules": rules,
+            "collections": [
+                {"name": name, "type": "read"} for name in collections_used
+            ],
+            "variables": variables,
+            "estimatedCost": cost,
+            "estimatedNrItems": items,
+        }
+
+    @staticmethod
+    def _usable_index(col, filters):
+        equal = set(path for path, op, _ in filters if op == "==")
+        ranged = set(path for path, _, _ in filters)
+        for index_id, index in col.indexes.items():
+            fields = index.get("fields", [])
+            if index["type"] == "hash" and set(fields) <= equal:
+                pass
+            elif index["type"] == "skiplist" and fields[0] in ranged:
+                pass
+            elif index["type"] == "primary" and "_key" in equal:
+                pass
+            else:
+                continue
+            details = dict(index, id="{}/{}".format(col.name, index_id))
+            return details
+        return None
+
+    def _explain(self, request, db):
+        data = request.json_object()
+        query = data.get("query")
+        _check_syntax(query)
+        options = data.get("options") or {}
+        plan = self._plan(db, query)
+        if options.get("allPlans"):
+            return 200, _ok({"plans": [plan], "warnings": []})
+        return 200, _ok({
+            "plan": plan,
+            "warnings": [],
+            "stats": {"rulesExecuted": len(plan["rules"]),
+                      "rulesSkipped": 0, "plansCreated": 1},
+        })
+
+    def _parse_query(self, request, db):
+        query = request.json_object().get("query")
+        _check_syntax(query)
+        return 200, _ok({
+            "bindVars": sorted(set(re.findall(r"@(\w+)", query))),
+            "collections": sorted(
+                name for name in re.findall(r"\bIN\s+`?(\w+)`?", query, re.I)
+                if name in db.collections
+            ),
+        })
+
+    def _simple_query(self, request, db, name):
+        data = request.json_object()
+        col = db.collection(data.get("collection"))
+        documents = list(col.documents.values())
+        skip = data.get("skip") or 0
+        limit = data.get("limit")
+
+        def window(items):
+            items = items[skip:]
+            return items if limit is None else items[:limit]
+
+        if name == "all":
+            return self._open_cursor(window(documents), data.get("batchSize"))
+        elif name == "any":
+            return 200, _ok({
+                "document": self._random.choice(documents)
+                if documents else None
+            })
+        elif name in ("first", "last"):
+            count = data.get("count")
+            if name == "last":
+                documents.reverse()
+            if count is None:
+                return 200, _ok({
+                    "result": documents[0] if documents else None
+                })
+            return 200, _ok({"result": documents[:count]})
+        elif name in ("by-example", "first-example", "update-by-example",
+                      "replace-by-example", "remove-by-example"):
+            example = data.get("example")
+            if not isinstance(example, dict):
+                raise ArangoServerError(400, 10, "invalid example")
+            matches = [
+                d for d in documents
+                if all(_get_path(d, k) == v for k, v in example.items())
+            ]
+            if name == "by-example":
+                return self._open_cursor(window(matches),
+                                         data.get("batchSize"))
+            elif name == "first-example":
+                if not matches:
+                    raise ArangoServerError(404, 1202, "no match")
+                return 200, _ok({"document": matches[0]})
+            if limit is not None:
+                matches = matches[:limit]
+            for document in matches:
+                if name == "update-by-example":
+                    col.update(document["_key"], data.get("newValue") or {},
+                               keep_null=_flag(data.get("keepNull"), True))
+                elif name == "replace-by-example":
+                    col.replace(document["_key"], data.get("newValue") or {})
+                else:
+                    col.remove(document["_key"])
+            attribute = {
+                "update-by-example": "updated",
+                "replace-by-example": "replaced",
+                "remove-by-example": "deleted",
+            }[name]
+            return 200, _ok({attribute: len(matches)})
+        elif name == "range":
+            attribute = data.get("attribute")
+            if not any(i["type"] == "skiplist" and i["fields"][0] == attribute
+                       for i in col.indexes.values()):
+                raise ArangoServerError(404, 1209, "no suitable index known")
+            left, right = data.get("left"), data.get("right")
+            closed = _flag(data.get("closed"))
+            matches = [
+                d for d in documents
+                if _sort_key(left) <= _sort_key(_get_path(d, attribute)) and
+                (_sort_key(_get_path(d, attribute)) <= _sort_key(right)
+                 if closed else
+                 _sort_key(_get_path(d, attribute)) < _sort_key(right))
+            ]
+            matches.sort(key=lambda d: _sort_key(_get_path(d, attribute)))
+            return self._open_cursor(window(matches), data.get("batchSize"))
+        elif name in ("near", "within"):
+            index = None
+            for index_id, candidate in col.indexes.items():
+                if candidate["type"] in ("geo1", "geo2") and \
+                        data.get("geo") in (None, index_id, "{}/{}".format(
+                            col.name, index_id)):
+                    index = candidate
+                    break
+            if index is None:
+                raise ArangoServerError(400, 1570, "no suitable geo index")
+            latitude = float(data.get("latitude"))
+            longitude = float(data.get("longitude"))
+            located = []
+            for document in documents:
+                coordinates = _coordinates(index, document)
+                if coordinates is not None:
+                    located.append((_distance(latitude, longitude,
+                                              *coordinates), document))
+            located.sort(key=lambda item: item[0])
+            if name == "within":
+                located = [
+                    item for item in located
+                    if item[0] <= float(data.get("radius"))
+                ]
+            elif limit is None:
+                limit = 100
+            results = []
+            for distance, document in located:
+                if data.get("distance"):
+                    document = dict(document)
+                    document[data["distance"]] = distance
+                results.append(document)
+            return self._open_cursor(window(results), data.get("batchSize"))
+        elif name == "fulltext":
+            attribute = data.get("attribute")
+            if not any(i["type"] == "fulltext" and i["fields"] == [attribute]
+                       for i in col.indexes.values()):
+                raise ArangoServerError(
+                    400, 1571, "no suitable fulltext index"
+                )
+            matches = self._fulltext(documents, attribute,
+                                     data.get("query") or "")
+            return self._open_cursor(window(matches), data.get("batchSize"))
+        raise ArangoServerError(404, 404, "unknown simple query")
+
+    @staticmethod
+    def _fulltext(documents, attribute, query):
+        def words(document):
+            value = _get_path(document, attribute)
+            values = value if isinstance(value, list) else [value]
+            found = set()
+            for text in values:
+                if is_string(text):
+                    found.update(re.findall(r"\w+", text.lower()))
+            return found
+
+        indexed = [(document, words(document)) for document in documents]
+        selected = None
+        for token in query.split(","):
+            token = token.strip().lower()
+            operation = "+"
+            if token[:1] in ("+", "|", "-"):
+                operation, token = token[0], token[1:]
+            prefix = token.startswith("prefix:")
+            token = token[len("prefix:"):] if prefix else token
+            matches = set(
+                i for i, (_, found) in enumerate(indexed)
+                if any(w.startswith(token) if prefix else w == token
+                       for w in found)
+            )
+            if selected is None:
+                selected = matches if operation != "-" else set()
+            elif operation == "|":
+                selected |= matches
+            elif operation == "-":
+                selected -= matches
+            else:
+                selected &= matches
+        return [indexed[i][0] for i in sorted(selected or ())]
+
+    ###########
+    # Indexes #
+    ###########
+
+    def _list_indexes(self, request, db):
+        col = db.collection(request.params.get("collection"))
+        identifiers = collections.OrderedDict()
+        for index_id, index in col.indexes.items():
+            full_id = "{}/{}".format(col.name, index_id)
+            identifiers[full_id] = dict(index, id=full_id)
+        return 200, _ok({
+            "indexes": list(identifiers.values()),
+            "identifiers": identifiers,
+        })
+
+    def _add_index(self, request, db):
+        col = db.collection(request.params.get("collection"))
+        data = request.json_object()
+        kind = data.get("type")
+        fields = data.get("fields")
+        if kind != "cap" and (not isinstance(fields, list) or not fields or
+                              not all(is_string(f) for f in fields)):
+            raise ArangoServerError(400, 10, "invalid index fields")
+        unique = _flag(data.get("unique"))
+        if kind in ("hash", "skiplist"):
+            index = {"type": kind, "fields": fields, "unique": unique,
+                     "sparse": _flag(data.get("sparse"))}
+            if kind == "hash":
+                index["selectivityEstimate"] = 1
+        elif kind == "cap":
+            index = {"type": "cap", "unique": False}
+            if "size" in data:
+                index["size"] = data["size"]
+            if "byteSize" in data:
+                if data["byteSize"] < 16384:
+                    raise ArangoServerError(400, 10, "invalid byteSize")
+                index["byteSize"] = data["byteSize"]
+            if len(index) == 2:
+                raise ArangoServerError(400, 10, "expecting size or byteSize")
+        elif kind == "geo":
+            if len(fields) > 2:
+                raise ArangoServerError(400, 10, "too many geo fields")
+            index = {"type": "geo{}".format(len(fields)), "fields": fields,
+                     "unique": unique, "constraint": unique, "sparse": True,
+                     "ignoreNull": _flag(data.get("ignoreNull"), True)}
+            if len(fields) == 1:
+                index["geoJson"] = _flag(data.get("geoJson"))
+        elif kind == "fulltext":
+            if len(fields) != 1:
+                raise ArangoServerError(400, 10, "fulltext index needs one "
+                                                 "field")
+            index = {"type": "fulltext", "fields": fields, "unique": False,
+                     "sparse": True, "minLength": data.get("minLength", 2)}
+        else:
+            raise ArangoServerError(400, 10, "invalid index type")
+        index_id, created = col.add_index(index)
+        body = dict(index, id="{}/{}".format(col.name, index_id),
+                    isNewlyCreated=created)
+        code = 201 if created else 200
+        return code, _ok(body, code)
+
+    def _remove_index(self, request, db, name, index_id):
+        col = db.collection(name)
+        if index_id not in col.indexes:
+            raise ArangoServerError(404, 1212, "index not found")
+        if col.indexes[index_id]["type"] in ("primary", "edge"):
+            raise ArangoServerError(403, 11, "cannot drop this index")
+        del col.indexes[index_id]
+        return 200, _ok({"id": "{}/{}".format(col.name, index_id)})
+
+    #################
+    # AQL Functions #
+    #################
+
+    JS_KEYWORDS = {
+        "return", "var", "new", "typeof", "instanceof", "in", "of", "else",
+        "case", "throw", "delete", "void", "function", "let", "const", "do",
+    }
+
+    def _list_functions(self, request, db):
+        namespace = request.params.get("namespace")
+        return 200, [
+            {"name": name, "code": code}
+            for name, code in db.functions.items()
+            if namespace is None or name.startswith(namespace + "::")
+        ]
+
+    def _add_function(self, request, db):
+        data = request.json_object()
+        name, code = data.get("name"), data.get("code")
+        if not is_string(name) or not FUNCTION_NAME.match(name):
+            raise ArangoServerError(400, 1580, "invalid user function name")
+        body = re.match(r"^\s*function\s*\w*\s*\([^)]*\)\s*\{(.*)\}\s*$",
+                        code or "", re.S)
+        # Two bare identifiers in a row is the most common syntax error
+        if body is None or any(
+                first not in self.JS_KEYWORDS
+                for first, _ in re.findall(r"\b([A-Za-z_]\w*)\s+([A-Za-z_]\w*)",
+                                           body.group(1))):
+            raise ArangoServerError(400, 1581, "invalid user function code")
+        replaced = name.lower() in (n.lower() for n in db.functions)
+        db.functions[name] = code
+        code = 200 if replaced else 201
+        return code, _ok(None, code)
+
+    def _remove_function(self, request, db, name):
+        if request.flag("group"):
+            names = [
+                n for n in db.functions
+                if n.lower() == name.lower() or
+                n.lower().startswith(name.lower() + "::")
+            ]
+        else:
+            names = [n for n in db.functions if n.lower() == name.lower()]
+        if not names:
+            raise ArangoServerError(404, 1582, "user function not found")
+        for function_name in names:
+            del db.functions[function_name]
+        return 200, _ok()
+
+    ##############################
+    # Traversals & Transactions #
+    ##############################
+
+    def _transaction(self, request, db):
+        raise ArangoServerError(
+            501, 9, "javascript transactions are not supported by the fake "
+                    "server"
+        )
+
+    def _traversal(self, request, db):
+        data = request.json_object()
+        for callback in ("init", "filter", "visitor", "expander", "sort"):
+            if data.get(callback):
+                raise ArangoServerError(
+                    501, 9, "javascript callbacks are not supported by the "
+                            "fake server"
+                )
+        if data.get("graphName") is not None:
+            edge_cols = db.graph(data["graphName"]).edge_collections
+        elif data.get("edgeCollection") is not None:
+            edge_cols = [data["edgeCollection"]]
+        else:
+            raise ArangoServerError(400, 10, "missing graphName")
+        visited = self._traverse(
+            db, edge_cols, data.get("startVertex"), data
+        )
+        return 200, _ok({"result": {"visited": visited}})
+
+    def _traverse(self, db, edge_cols, start_vertex, data):
+        """Traverse the edge collections from a vertex.
+
+        :param data: the traversal options (as in the traversal API)
+        :type data: dict
+        :returns: the visited vertices and paths
+        :rtype: dict
+        """
+        direction = data.get("direction")
+        if direction not in ("outbound", "inbound", "any"):
+            raise ArangoServerError(400, 10, "invalid direction value")
+        try:
+            start = db.document(start_vertex)
+        except ArangoServerError:
+            raise ArangoServerError(404, 1202, "invalid startVertex")
+
+        adjacency = collections.defaultdict(list)
+        for name in edge_cols:
+            for edge in db.collection(name).documents.values():
+                if direction in ("outbound", "any"):
+                    adjacency[edge["_from"]].append((edge, edge["_to"]))
+                if direction in ("inbound", "any") and \
+                        (direction == "inbound" or
+                         edge["_from"] != edge["_to"]):
+                    adjacency[edge["_to"]].append((edge, edge["_from"]))
+        if data.get("itemOrder") == "backward":
+            for neighbours in adjacency.values():
+                neighbours.reverse()
+
+        uniqueness = data.get("uniqueness") or {}
+        vertex_uniqueness = uniqueness.get("vertices", "none")
+        edge_uniqueness = uniqueness.get("edges", "path")
+        min_depth = data.get("minDepth") or 0
+        max_depth = data.get("maxDepth")
+        max_iterations = data.get("maxIterations")
+        postorder = data.get("order") == "postorder"
+        seen_vertices = {start["_id"]}
+        seen_edges = set()
+        visited = {"vertices": [], "paths": []}
+        iterations = [0]
+
+        def visit(vertices, edges):
+            if len(edges) >= min_depth:
+                visited["vertices"].append(vertices[-1])
+                visited["paths"].append({
+                    "edges": list(edges), "vertices": list(vertices)
+                })
+
+        def expand(vertices, edges):
+            iterations[0] += 1
+            if max_iterations is not None and iterations[0] > max_iterations:
+                raise ArangoServerError(
+                    500, 1909, "too many iterations"
+                )
+            if max_depth is not None and len(edges) >= max_depth:
+                return []
+            steps = []
+            for edge, vertex_id in adjacency.get(vertices[-1]["_id"], []):
+                if edge_uniqueness == "path" and edge in edges:
+                    continue
+                if edge_uniqueness == "global":
+                    if edge["_id"] in seen_edges:
+                        continue
+                    seen_edges.add(edge["_id"])
+                if vertex_uniqueness == "path" and \
+                        any(v["_id"] == vertex_id for v in vertices):
+                    continue
+                if vertex_uniqueness == "global":
+                    if vertex_id in seen_vertices:
+                        continue
+                    seen_vertices.add(vertex_id)
+                try:
+                    vertex = db.document(vertex_id)
+                except ArangoServerError:
+                    continue
+                steps.append((vertices + [vertex], edges + [edge]))
+            return steps
+
+        if data.get("strategy") == "breadthfirst":
+            queue = collections.deque([([start], [])])
+            while queue:
+                vertices, edges = queue.popleft()
+                visit(vertices, edges)
+                queue.extend(expand(vertices, edges))
+        else:
+            def walk(vertices, edges):
+                if not postorder:
+                    visit(vertices, edges)
+                for step in expand(vertices, edges):
+                    walk(*step)
+                if postorder:
+                    visit(vertices, edges)
+            walk([start], [])
+        return visited
+
+    ##########
+    # Graphs #
+    ##########
+
+    def _list_graphs(self, request, db):
+        return 200, _ok({
+            "graphs": [
+                dict(graph.body(), _key=graph.name)
+                for graph in db.graphs.values()
+            ]
+        })
+
+    def _ensure_collection(self, db, name, is_edge=False):
+        if name not in db.collections:
+            if not is_string(name) or not COLLECTION_NAME.match(name):
+                raise ArangoServerError(400, 1208, "illegal name")
+            db.collections[name] = FakeCollection(
+                str(next(self._ids)), name, is_edge=is_edge
+            )
+        return db.collections[name]
+
+    def _validate_edge_definition(self, db, definition):
+        if not isinstance(definition, dict) or \
+                not is_string(definition.get("collection")) or \
+                not isinstance(definition.get("from"), list) or \
+                not isinstance(definition.get("to"), list):
+            raise ArangoServerError(400, 1923, "invalid edge definition")
+        edge_col = self._ensure_collection(db, definition["collection"],
+                                           is_edge=True)
+        if not edge_col.is_edge:
+            raise ArangoServerError(400, 1218, "collection type invalid")
+        for name in definition["from"] + definition["to"]:
+            self._ensure_collection(db, name)
+        return {
+            "collection": definition["collection"],
+            "from": list(definition["from"]),
+            "to": list(definition["to"]),
+        }
+
+    def _add_graph(self, request, db):
+        data = request.json_object()
+        name = data.get("name")
+        if not is_string(name) or not COLLECTION_NAME.match(name):
+            raise ArangoServerError(400, 1208, "illegal name")
+        if name in db.graphs:
+            raise ArangoServerError(409, 1925, "graph already exists")
+        definitions = [
+            self._validate_edge_definition(db, definition)
+            for definition in data.get("edgeDefinitions") or []
+        ]
+        orphans = data.get("orphanCollections") or []
+        for orphan in orphans:
+            self._ensure_collection(db, orphan)
+        graph = FakeGraph(name, definitions, orphans)
+        db.graphs[name] = graph
+        return 201, _ok({"graph": graph.body()}, 201)
+
+    def _get_graph(self, request, db, name):
+        return 200, _ok({"graph": db.graph(name).body()})
+
+    def _remove_graph(self, request, db, name):
+        graph = db.graph(name)
+        del db.graphs[name]
+        if request.flag("dropCollections"):
+            for col_name in graph.edge_collections + graph.vertex_collections:
+                db.collections.pop(col_name, None)
+        return 200, _ok({"removed": True})
+
+    def _list_vertex_collections(self, request, db, name):
+        return 200, _ok({"collections": db.graph(name).vertex_collections})
+
+    def _add_vertex_collection(self, request, db, name):
+        graph = db.graph(name)
+        col_name = request.json_object().get("collection")
+        if col_name in graph.vertex_collections:
+            raise ArangoServerError(400, 1938, "collection already used in "
+                                               "graph")
+        self._ensure_collection(db, col_name)
+        graph.orphan_collections.append(col_name)
+        graph.revision = _next_rev()
+        return 201, _ok({"graph": graph.body()}, 201)
+
+    def _remove_vertex_collection(self, request, db, name, col_name):
+        graph = db.graph(name)
+        if col_name not in graph.orphan_collections:
+            raise ArangoServerError(400, 1928, "not in orphan collection")
+        graph.orphan_collections.remove(col_name)
+        graph.revision = _next_rev()
+        if request.flag("dropCollection"):
+            db.collections.pop(col_name, None)
+        return 200, _ok({"graph": graph.body()})
+
+    def _list_edge_definitions(self, request, db, name):
+        return 200, _ok({"collections": db.graph(name).edge_collections})
+
+    def _add_edge_definition(self, request, db, name):
+        graph = db.graph(name)
+        definition = self._validate_edge_definition(db, request.json())
+        if graph.edge_definition(definition["collection"]) is not None:
+            raise ArangoServerError(400, 1920, "multi use of edge "
+                                               "collection in edge def")
+        previous = graph.vertex_collections
+        graph.edge_definitions.append(definition)
+        graph.adopt_orphans(previous)
+        return 201, _ok({"graph": graph.body()}, 201)
+
+    def _replace_edge_definition(self, request, db, name, col_name):
+        graph = db.graph(name)
+        definition = self._validate_edge_definition(db, request.json())
+        existing = graph.edge_definition(col_name)
+        if existing is None or definition["collection"] != col_name:
+            raise ArangoServerError(404, 1930, "edge collection not used in "
+                                               "graph")
+        previous = graph.vertex_collections
+        graph.edge_definitions[graph.edge_definitions.index(existing)] = \
+            definition
+        graph.adopt_orphans(previous)
+        return 200, _ok({"graph": graph.body()})
+
+    def _remove_edge_definition(self, request, db, name, col_name):
+        graph = db.graph(name)
+        existing = graph.edge_definition(col_name)
+        if existing is None:
+            raise ArangoServerError(404, 1930, "edge collection not used in "
+                                               "graph")
+        previous = graph.vertex_collections
+        graph.edge_definitions.remove(existing)
+        graph.adopt_orphans(previous)
+        if request.flag("dropCollection"):
+            db.collections.pop(col_name, None)
+        return 200, _ok({"graph": graph.body()})
+
+    def _graph_collection(self, db, name, kind, col_name):
+        graph = db.graph(name)
+        if kind == "vertex" and col_name not in graph.vertex_collections:
+            raise ArangoServerError(404, 1926, "collection does not exist "
+                                               "in graph")
+        if kind == "edge" and col_name not in graph.edge_collections:
+            raise ArangoServerError(404, 1930, "edge collection not used in "
+                                               "graph")
+        return graph, db.collection(col_name)
+
+    def _add_graph_document(self, request, db, name, kind, col_name):
+        graph, col = self._graph_collection(db, name, kind, col_name)
+        data = request.json()
+        if kind == "edge":
+            if not isinstance(data, dict) or \
+                    not is_string(data.get("_from")) or \
+                    not is_string(data.get("_to")):
+                raise ArangoServerError(400, 1233, "edge attribute missing")
+            definition = graph.edge_definition(col_name)
+            if data["_from"].split("/")[0] not in definition["from"] or \
+                    data["_to"].split("/")[0] not in definition["to"]:
+                raise ArangoServerError(400, 1906, "invalid edge")
+        document = col.insert(data)
+        code = self._sync_code(request, col)
+        return code, _ok({kind: self._header(document)}, code)
+
+    def _get_graph_document(self, request, db, name, kind, col_name, key):
+        _, col = self._graph_collection(db, name, kind, col_name)
+        document = col.get(key)
+        self._check_rev(request, document, use_policy=False)
+        return 200, _ok({kind: document})
+
+    def _replace_graph_document(self, request, db, name, kind, col_name,
+                                key):
+        _, col = self._graph_collection(db, name, kind, col_name)
+        old = col.get(key)
+        self._check_rev(request, old, use_policy=False)
+        document = col.replace(key, request.json())
+        code = self._sync_code(request, col, 200)
+        return code, _ok({kind: self._header(document, old)}, code)
+
+    def _update_graph_document(self, request, db, name, kind, col_name,
+                               key):
+        _, col = self._graph_collection(db, name, kind, col_name)
+        old = col.get(key)
+        self._check_rev(request, old, use_policy=False)
+        document = col.update(key, request.json(),
+                              keep_null=request.flag("keepNull", True))
+        code = self._sync_code(request, col, 200)
+        return code, _ok({kind: self._header(document, old)}, code)
+
+    def _remove_graph_document(self, request, db, name, kind, col_name,
+                               key):
+        graph, col = self._graph_collection(db, name, kind, col_name)
+        self._check_rev(request, col.get(key), use_policy=False)
+        document = col.remove(key)
+        if kind == "vertex":
+            for edge_col_name in graph.edge_collections:
+                edge_col = db.collection(edge_col_name)
+                for edge in list(edge_col.documents.values()):
+                    if document["_id"] in (edge["_from"], edge["_to"]):
+                        edge_col.remove(edge["_key"])
+        code = self._sync_code(request, col, 200)
+        return code, _ok({"removed": True}, code)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8529)
+    parser.add_argument("--latency", type=float, default=0,
+                        help="delay injected into every request (seconds)")
+    parser.add_argument("--jitter", type=float, default=0,
+                        help="maximum random delay added to the latency")
+    parser.add_argument("--unix-socket",
+                        help="listen on this unix socket path instead")
+    parser.add_argument("--bandwidth", type=int,
+                        help="simulated bandwidth in bytes per second")
+    parser.add_argument("--compression-threshold", type=int,
+                        help="compress responses of at least this many bytes")
+    parser.add_argument("--version", default="2.4.0",
+                        help="the ArangoDB version to report")
+    args = parser.parse_args()
+    server = FakeArangoServer(args.host, args.port, args.latency, args.jitter,
+                              version=args.version,
+                              unix_socket=args.unix_socket,
+                              bandwidth=args.bandwidth,
+                              compression_threshold=args.compression_threshold)
+    print("Serving on {}".format(server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,210 @@
+"""Tests for the caching of the edges of graph vertices."""
+
+import time
+import unittest
+
+from arango import Arango
+from arango.adjacency import AdjacencyCache
+from arango.tests.utils import (
+    get_next_graph_name,
+    get_next_col_name,
+    get_next_db_name
+)
+
+
+def edge(key, source, target):
+    return {"_id": "e/" + key, "_from": source, "_to": target}
+
+
+class AdjacencyCacheTest(unittest.TestCase):
+
+    def test_get_and_set(self):
+        cache = AdjacencyCache()
+        key = ("v/1", "any", "e")
+        self.assertIsNone(cache.get(key))
+        edges = [edge("1", "v/1", "v/2")]
+        cache.set(key, edges, 100)
+        self.assertIs(cache.get(key), edges)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual((len(cache), cache.size), (1, 100))
+        cache.set(key, [], 10)
+        self.assertEqual((len(cache), cache.size), (1, 10))
+        cache.clear()
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    def test_byte_bound(self):
+        cache = AdjacencyCache(max_bytes=250)
+        for i in range(3):
+            cache.set(("v/{}".format(i), "any", "e"), [], 100)
+        self.assertEqual((len(cache), cache.size, cache.evictions),
+                         (2, 200, 1))
+        self.assertIsNone(cache.get(("v/0", "any", "e")))
+        # v/1 is used, so v/2 is the least recently used one
+        cache.get(("v/1", "any", "e"))
+        cache.set(("v/3", "any", "e"), [], 100)
+        self.assertIsNotNone(cache.get(("v/1", "any", "e")))
+        self.assertIsNone(cache.get(("v/2", "any", "e")))
+        # Too large to be cached at all
+        cache.set(("v/4", "any", "e"), [], 300)
+        self.assertIsNone(cache.get(("v/4", "any", "e")))
+        self.assertEqual(cache.size, 200)
+
+    def test_ttl(self):
+        cache = AdjacencyCache(ttl=0.05)
+        cache.set(("v/1", "any", "e"), [], 10)
+        self.assertIsNotNone(cache.get(("v/1", "any", "e")))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get(("v/1", "any", "e")))
+        self.assertEqual(cache.size, 0)
+
+    def test_invalidate(self):
+        cache = AdjacencyCache()
+        cache.set(("v/1", "outbound", "e"), [edge("12", "v/1", "v/2")], 10)
+        cache.set(("v/2", "inbound", "e"), [edge("12", "v/1", "v/2")], 10)
+        cache.set(("v/3", "any", "e"), [edge("34", "v/3", "v/4")], 10)
+        self.assertEqual(cache.invalidate("e/12"), 2)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.invalidate("v/4", "v/5"), 1)
+        self.assertEqual((len(cache), cache.size), (0, 0))
+        self.assertEqual(cache.invalidate("e/12"), 0)
+
+    def test_set_after_invalidate(self):
+        cache = AdjacencyCache()
+        key = ("v/1", "any", "e")
+        generation = cache.generation()
+        cache.invalidate("e/12")
+        # Read before the invalidation, so possibly stale
+        cache.set(key, [edge("12", "v/1", "v/2")], 10, generation)
+        self.assertIsNone(cache.get(key))
+        generation = cache.generation()
+        cache.clear()
+        cache.set(key, [], 10, generation)
+        self.assertIsNone(cache.get(key))
+        cache.set(key, [], 10, cache.generation())
+        self.assertEqual(cache.get(key), [])
+
+
+class GraphEdgeCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.arango = Arango()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.vertex_col_name = get_next_col_name(self.db)
+        self.db.add_collection(self.vertex_col_name)
+        self.edge_col_name = get_next_col_name(self.db)
+        self.edge_col = self.db.add_collection(
+            self.edge_col_name, is_edge=True
+        )
+        self.graph = self.db.add_graph(
+            name=get_next_graph_name(self.db),
+            edge_definitions=[{
+                "collection": self.edge_col_name,
+                "from": [self.vertex_col_name],
+                "to": [self.vertex_col_name]
+            }],
+        )
+        for key in "abc":
+            self.graph.add_vertex(self.vertex_col_name, {"_key": key})
+        self.graph.add_edge(self.edge_col_name, self.edge("ab", "a", "b"))
+        self.cache = self.graph.adjacency_cache
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def vertex(self, key):
+        return "{}/{}".format(self.vertex_col_name, key)
+
+    def edge(self, key, source, target):
+        return {"_key": key, "_from": self.vertex(source),
+                "_to": self.vertex(target)}
+
+    def test_get_edges(self):
+        edges = self.graph.get_edges(self.vertex("a"), "outbound")
+        self.assertEqual([e["_key"] for e in edges], ["ab"])
+        self.assertEqual(self.cache.misses, 1)
+        self.graph.get_edges(self.vertex("a"), "outbound")
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(
+            self.graph.get_edges(self.vertex("a"), "inbound",
+                                 collection=self.edge_col_name),
+            []
+        )
+        self.assertEqual(
+            self.graph.neighbors(self.vertex("b")), [self.vertex("a")]
+        )
+        self.assertRaises(ValueError, self.graph.get_edges,
+                          self.vertex("a"), "out")
+
+    def test_write_during_read(self):
+        a, c = self.vertex("a"), self.vertex("c")
+        api = self.graph._api
+        get = api.get
+
+        def get_then_write(path, *args, **kwargs):
+            res = get(path, *args, **kwargs)
+            if not path.startswith("/_api/edges/"):
+                return res
+            # A concurrent write invalidating the cache before the set
+            del api.get
+            self.graph.add_edge(self.edge_col_name,
+                                self.edge("ca", "c", "a"))
+            return res
+
+        api.get = get_then_write
+        self.assertEqual(self.graph.neighbors(a), [self.vertex("b")])
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.graph.neighbors(a), [self.vertex("b"), c])
+
+    def test_read_during_batch(self):
+        a, b, c = self.vertex("a"), self.vertex("b"), self.vertex("c")
+        api = self.db._api
+        post = api.post
+
+        def read_then_post(path, *args, **kwargs):
+            if path == "/_api/batch":
+                # A read after the batch part is built, before it is sent
+                self.assertEqual(self.graph.neighbors(a), [b])
+            return post(path, *args, **kwargs)
+
+        api.post = read_then_post
+        try:
+            self.db.execute_batch([(
+                self.graph.add_edge,
+                [self.edge_col_name, self.edge("ca", "c", "a")], {}
+            )])
+        finally:
+            del api.post
+        self.assertEqual(self.graph.neighbors(a), [b, c])
+
+    def test_edge_writes_invalidate(self):
+        a, b, c = self.vertex("a"), self.vertex("b"), self.vertex("c")
+        self.assertEqual(self.graph.neighbors(a), [b])
+        self.assertEqual(self.graph.neighbors(c), [])
+        self.graph.add_edge(self.edge_col_name, self.edge("ca", "c", "a"))
+        self.assertEqual(self.graph.neighbors(a), [b, c])
+        self.assertEqual(self.graph.neighbors(c), [a])
+        self.graph.update_edge(
+            "{}/ab".format(self.edge_col_name), {"weight": 2}
+        )
+        edges = self.graph.get_edges(a, "outbound")
+        self.assertEqual(edges[0]["weight"], 2)
+        self.graph.remove_edge("{}/ca".format(self.edge_col_name))
+        self.assertEqual(self.graph.neighbors(a), [b])
+        self.graph.remove_vertex(b)
+        self.assertEqual(self.graph.neighbors(a), [])
+
+    def test_ttl(self):
+        self.graph.adjacency_cache = AdjacencyCache(ttl=0.05)
+        a = self.vertex("a")
+        self.assertEqual(len(self.graph.neighbors(a)), 1)
+        # Not written through the graph, so seen once the entry expires
+        self.edge_col.add_document(self.edge("ac", "a", "c"))
+        self.assertEqual(len(self.graph.neighbors(a)), 1)
+        self.assertEqual(len(self.graph.neighbors(a, cached=False)), 2)
+        time.sleep(0.1)
+        self.assertEqual(len(self.graph.neighbors(a)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
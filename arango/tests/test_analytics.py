@@ -0,0 +1,147 @@
+"""Tests for the analytics of graph snapshots."""
+
+import unittest
+
+from arango import Arango
+from arango import analytics
+from arango.tests.utils import (
+    get_next_graph_name,
+    get_next_col_name,
+    get_next_db_name
+)
+
+
+@unittest.skipIf(analytics.numpy is None, "numpy is not installed")
+class GraphAnalyticsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.arango = Arango()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.vertex_col_name = get_next_col_name(self.db)
+        self.vertex_col = self.db.add_collection(self.vertex_col_name)
+        self.edge_col_name = get_next_col_name(self.db)
+        self.edge_col = self.db.add_collection(
+            self.edge_col_name, is_edge=True
+        )
+        self.graph = self.db.add_graph(
+            name=get_next_graph_name(self.db),
+            edge_definitions=[{
+                "collection": self.edge_col_name,
+                "from": [self.vertex_col_name],
+                "to": [self.vertex_col_name]
+            }],
+        )
+        # A triangle a-b-c with a tail c-d, a separate pair e-f and an
+        # isolated vertex g
+        self.vertex_col.bulk_import([{"_key": key} for key in "abcdefg"])
+        self.edge_col.bulk_import([
+            {"_from": self.vertex(source), "_to": self.vertex(target)}
+            for source, target in (
+                ("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("e", "f"),
+                ("d", "d"),
+            )
+        ])
+        self.snapshot = self.graph.snapshot(isolated=True)
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def vertex(self, key):
+        return "{}/{}".format(self.vertex_col_name, key)
+
+    def by_key(self, values):
+        return dict(
+            (vertex_id.split("/")[1], value) for vertex_id, value
+            in zip(self.snapshot.vertex_ids, values.tolist())
+        )
+
+    def test_degrees(self):
+        self.assertEqual(
+            self.by_key(analytics.degrees(self.snapshot)),
+            {"a": 2, "b": 2, "c": 3, "d": 3, "e": 1, "f": 1, "g": 0}
+        )
+        self.assertEqual(
+            self.by_key(analytics.degrees(self.snapshot, "outbound")),
+            {"a": 1, "b": 1, "c": 2, "d": 1, "e": 1, "f": 0, "g": 0}
+        )
+        self.assertEqual(
+            analytics.degree_distribution(self.snapshot).tolist(),
+            [1, 2, 2, 2]
+        )
+        self.assertRaises(ValueError, analytics.degrees, self.snapshot, "up")
+
+    def test_pagerank(self):
+        ranks = analytics.pagerank(self.snapshot, tolerance=1e-12)
+        self.assertAlmostEqual(ranks.sum(), 1.0)
+        # The same computation, one vertex at a time
+        ids = self.snapshot.vertex_ids
+        count = len(ids)
+        edges = [(e["_from"], e["_to"]) for e in self.edge_col]
+        out_degree = dict((v, 0) for v in ids)
+        for source, _ in edges:
+            out_degree[source] += 1
+        expected = dict((v, 1.0 / count) for v in ids)
+        for _ in range(200):
+            dangling = sum(expected[v] for v in ids if not out_degree[v])
+            updated = dict(
+                (v, (0.15 + 0.85 * dangling) / count) for v in ids
+            )
+            for source, target in edges:
+                updated[target] += 0.85 * expected[source] / \
+                    out_degree[source]
+            expected = updated
+        for vertex_id, rank in zip(ids, ranks.tolist()):
+            self.assertAlmostEqual(rank, expected[vertex_id], places=8)
+
+    def test_connected_components(self):
+        labels = self.by_key(analytics.connected_components(self.snapshot))
+        self.assertEqual(len(set(labels[k] for k in "abcd")), 1)
+        self.assertEqual(labels["e"], labels["f"])
+        self.assertNotEqual(labels["a"], labels["e"])
+        self.assertEqual(len(set(labels.values())), 3)
+        self.assertEqual(
+            labels["a"], min(self.snapshot.index(self.vertex(k))
+                             for k in "abcd")
+        )
+
+    def test_core_numbers(self):
+        self.assertEqual(
+            self.by_key(analytics.core_numbers(self.snapshot)),
+            {"a": 2, "b": 2, "c": 2, "d": 1, "e": 1, "f": 1, "g": 0}
+        )
+        self.assertEqual(
+            sorted(analytics.k_core(self.snapshot, 2)),
+            [self.vertex(k) for k in "abc"]
+        )
+
+    def test_isolated_vertices(self):
+        snapshot = self.graph.snapshot()
+        self.assertIsNone(snapshot.index(self.vertex("g")))
+        self.assertEqual(
+            analytics.degree_distribution(snapshot).tolist(), [0, 2, 2, 2]
+        )
+        self.assertEqual(self.snapshot.vertex_count, 7)
+        ranks = self.by_key(analytics.pagerank(self.snapshot))
+        self.assertAlmostEqual(ranks["g"], min(ranks.values()))
+
+    def test_write_back(self):
+        self.vertex_col.remove_document("f")
+        ranks = analytics.pagerank(self.snapshot)
+        reports = analytics.write_back(
+            self.snapshot, ranks, "rank", chunk_size=2, max_workers=2
+        )
+        report = reports[self.vertex_col_name]
+        self.assertEqual((report["updated"], report["errors"]), (6, 1))
+        self.assertEqual(report["details"][0]["_key"], "f")
+        self.assertAlmostEqual(
+            self.vertex_col["a"]["rank"],
+            ranks[self.snapshot.index(self.vertex("a"))]
+        )
+        self.assertRaises(
+            ValueError, analytics.write_back, self.snapshot, [1], "rank"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
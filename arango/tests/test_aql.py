@@ -0,0 +1,144 @@
+"""Tests for the AQL query builder."""
+
+import unittest
+
+from arango import Arango
+from arango.aql import QueryBuilder
+from arango.exceptions import ServerVersionError
+from arango.tests.server import FakeArangoServer
+from arango.tests.utils import (
+    get_next_col_name,
+    get_next_db_name
+)
+
+
+class QueryBuilderTest(unittest.TestCase):
+
+    def test_text_and_bind_vars(self):
+        query = QueryBuilder().for_("d", "students") \
+            .filter("d.age", ">=", 18) \
+            .filter("d.address.zip-code", "not in", ["1", "2"]) \
+            .sort("d.name").sort("d.age", "desc") \
+            .limit(10, 20) \
+            .return_({"name": "d.name", "age": "d.age"})
+        self.assertEqual(
+            query.text,
+            "FOR d IN @@collection0 FILTER d.age >= @value0 "
+            "FILTER d.address.`zip-code` NOT IN @value1 "
+            "SORT d.name ASC, d.age DESC LIMIT @value2, @value3 "
+            "RETURN {age: d.age, name: d.name}"
+        )
+        self.assertEqual(query.bind_vars, {
+            "@collection0": "students",
+            "value0": 18,
+            "value1": ["1", "2"],
+            "value2": 20,
+            "value3": 10,
+        })
+        self.assertEqual(query.params(), {
+            "query": query.text, "bind_vars": query.bind_vars
+        })
+
+    def test_same_shape_same_text(self):
+        def query(collection, age):
+            return QueryBuilder().for_("d", collection) \
+                .filter("d.age", "==", age).return_("d")
+        self.assertEqual(query("a", 1).text, query("b", 2).text)
+        self.assertEqual(query("a", 1), query("a", 1))
+        self.assertEqual(hash(query("a", 1)), hash(query("a", 1)))
+        self.assertNotEqual(query("a", 1), query("a", 2))
+        self.assertNotEqual(query("a", 1).cache_key, query("a", 2).cache_key)
+
+    def test_builders_are_immutable(self):
+        base = QueryBuilder().for_("d", "students")
+        adults = base.filter("d.age", ">=", 18).return_("d")
+        names = base.return_("d.name")
+        self.assertEqual(base.text, "FOR d IN @@collection0")
+        self.assertEqual(adults.text, "FOR d IN @@collection0 "
+                                      "FILTER d.age >= @value0 RETURN d")
+        self.assertEqual(names.text, "FOR d IN @@collection0 RETURN d.name")
+
+    def test_collect_and_list(self):
+        query = QueryBuilder().for_("x", [1, 2, 2]) \
+            .collect("value", "x", count_into="n") \
+            .return_({"value": "value", "n": "n"})
+        self.assertEqual(
+            query.text,
+            "FOR x IN @value0 COLLECT value = x WITH COUNT INTO n "
+            "RETURN {n: n, value: value}"
+        )
+        self.assertEqual(query.bind_vars, {"value0": [1, 2, 2]})
+
+    def test_traverse(self):
+        query = QueryBuilder().traverse(
+            "students/1", "school", direction="any", max_depth=3, path="p"
+        ).filter("v.age", ">", 18).return_("v", distinct=True)
+        self.assertEqual(
+            query.text,
+            "FOR v, e, p IN @value0..@value1 ANY @value2 GRAPH @value3 "
+            "FILTER v.age > @value4 RETURN DISTINCT v"
+        )
+        self.assertEqual(
+            query.bind_vars,
+            {"value0": 1, "value1": 3, "value2": "students/1",
+             "value3": "school", "value4": 18}
+        )
+
+    def test_invalid_clauses(self):
+        query = QueryBuilder()
+        self.assertRaises(ValueError, query.for_, "d d", "students")
+        self.assertRaises(ValueError, query.filter, "d.age", "=~", 1)
+        self.assertRaises(ValueError, query.filter, "1d.age", "==", 1)
+        self.assertRaises(ValueError, query.filter, "d.a`b", "==", 1)
+        self.assertRaises(ValueError, query.filter, "d..a", "==", 1)
+        self.assertRaises(ValueError, query.sort, "d.age", "up")
+        self.assertRaises(ValueError, query.traverse, "v/1", "g", "sideways")
+        self.assertRaises(ValueError, query.return_, {"a b": "d"})
+        self.assertRaises(ValueError, query.execute)
+
+
+class QueryBuilderExecuteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.arango = Arango()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.db.add_collection(self.col_name).bulk_import([
+            {"name": "student{:02d}".format(i), "age": i} for i in range(30)
+        ])
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def test_execute(self):
+        query = self.db.query().for_("d", self.col_name) \
+            .filter("d.age", ">=", 18).sort("d.name", "desc").limit(3, 1) \
+            .return_("d.name")
+        self.assertEqual(
+            list(query.execute(batch_size=2)),
+            ["student28", "student27", "student26"]
+        )
+        self.assertEqual(
+            self.db.execute_queries([query.params()]),
+            [["student28", "student27", "student26"]]
+        )
+
+    def test_traverse_old_server(self):
+        with FakeArangoServer(version="2.4.0") as server:
+            db = server.connect().db("_system")
+            query = db.query().traverse("v/1", "g").return_("v")
+            self.assertRaises(ServerVersionError, query.execute)
+            self.assertRaises(ServerVersionError, query.explain)
+
+    def test_explain(self):
+        query = self.db.query().for_("d", self.col_name) \
+            .filter("d.age", "==", 1).return_("d")
+        plan = query.explain(cache=True)
+        self.assertIn("nodes", plan)
+        self.assertIs(query.explain(cache=True), plan)
+        self.assertEqual(len(self.db.plan_cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Tests for the compression of request and response bodies."""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+from arango.compression import (
+    Compression,
+    compress,
+    decompress,
+    read_text,
+)
+from arango.tests.server import FakeArangoServer
+from arango.tests.utils import (
+    get_next_db_name,
+    get_next_col_name,
+)
+
+
+class CompressionTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        data = json.dumps([{"value": i} for i in range(100)])
+        for algorithm in ("gzip", "deflate"):
+            compressed = compress(data, algorithm)
+            self.assertLess(len(compressed), len(data))
+            self.assertEqual(
+                decompress(compressed, algorithm).decode("utf-8"), data
+            )
+
+    def test_raw_deflate(self):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        data = b"raw deflate " * 100
+        raw = compressor.compress(data) + compressor.flush()
+        self.assertEqual(decompress(raw, "deflate"), data)
+
+    def test_threshold(self):
+        compression = Compression("deflate", threshold=10)
+        self.assertEqual(compression.compress("short"), ("short", None))
+        body, encoding = compression.compress("long enough to compress")
+        self.assertEqual(encoding, "deflate")
+        self.assertEqual(
+            decompress(body, "deflate"), b"long enough to compress"
+        )
+        self.assertEqual(compression.accept_encoding, "deflate, gzip")
+        self.assertRaises(ValueError, Compression, "brotli")
+
+    def test_read_text_in_chunks(self):
+        text = u"héllo wörld ☃ " * 50
+        stream = io.BytesIO(compress(text, "gzip"))
+        # Tiny chunks split both the gzip stream and multi-byte characters
+        self.assertEqual(read_text(stream.read, "gzip", chunk_size=3), text)
+        stream = io.BytesIO(text.encode("utf-8"))
+        self.assertEqual(read_text(stream.read, None, chunk_size=5), text)
+
+
+class CompressedTransportTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.socket_path = os.path.join(cls.tmp_dir, "arangodb.sock")
+        cls.server = FakeArangoServer(compression_threshold=100).start()
+        cls.unix_server = FakeArangoServer(
+            unix_socket=cls.socket_path, compression_threshold=100
+        ).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        cls.unix_server.stop()
+        shutil.rmtree(cls.tmp_dir)
+
+    def check_round_trip(self, server, arango):
+        db_name = get_next_db_name(arango)
+        db = arango.add_database(db_name)
+        try:
+            col = db.add_collection(get_next_col_name(db))
+            documents = [
+                {"_key": str(i), "text": u"döcument {}".format(i)}
+                for i in range(500)
+            ]
+            received = server.bytes_received
+            col.bulk_import(documents)
+            # The import body was sent compressed
+            self.assertLess(
+                server.bytes_received - received,
+                len(json.dumps(documents)) // 2
+            )
+            sent = server.bytes_sent
+            cursor = db.execute_query(
+                "FOR d IN {} SORT d._key RETURN d.text".format(col.name)
+            )
+            self.assertEqual(
+                sorted(cursor), sorted(d["text"] for d in documents)
+            )
+            # ...and so was the response
+            self.assertLess(
+                server.bytes_sent - sent,
+                len(json.dumps([d["text"] for d in documents])) // 2
+            )
+        finally:
+            arango.remove_database(db_name)
+
+    def test_tcp(self):
+        self.check_round_trip(
+            self.server, self.server.connect(compression="gzip")
+        )
+
+    def test_unix_socket(self):
+        self.check_round_trip(
+            self.unix_server,
+            self.unix_server.connect(compression=Compression("deflate", 64))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,320 @@
+"""Tests for ArangoDB cursors."""
+
+import array
+import bz2
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from arango import columns
+from arango.cursor import BatchSizer, Cursor
+from arango.tests.server import FakeArangoServer
+from arango.tests.utils import (
+    get_next_col_name,
+    get_next_db_name
+)
+
+
+class BatchSizerTest(unittest.TestCase):
+
+    def test_grows_towards_target_latency(self):
+        sizer = BatchSizer(target_latency=0.1, memory_budget=None,
+                           initial=100)
+        # 100 documents in 10ms: 1000 documents would take 100ms
+        sizer.observe("q", 100, 0.01, 1000)
+        self.assertEqual(sizer.batch_size("q"), 400)
+        sizer.observe("q", 400, 0.04, 4000)
+        self.assertEqual(sizer.batch_size("q"), 1000)
+        sizer.observe("q", 1000, 0.1, 10000)
+        self.assertEqual(sizer.batch_size("q"), 1000)
+        # Other queries are not affected
+        self.assertEqual(sizer.batch_size("other"), 100)
+
+    def test_shrinks_to_memory_budget(self):
+        sizer = BatchSizer(target_latency=10, memory_budget=10000,
+                           initial=1000)
+        # 100 bytes per document: at most 100 documents per batch
+        sizer.observe("q", 1000, 0.001, 100000)
+        self.assertEqual(sizer.batch_size("q"), 250)
+        sizer.observe("q", 250, 0.001, 25000)
+        self.assertEqual(sizer.batch_size("q"), 100)
+
+    def test_partial_batches_and_bounds(self):
+        sizer = BatchSizer(target_latency=0.1, memory_budget=None,
+                           initial=100, minimum=50, maximum=200)
+        # The last batch of 10 documents projects to 100 documents in 200ms
+        sizer.observe("q", 10, 0.02, 100)
+        self.assertEqual(sizer.batch_size("q"), 50)
+        sizer.observe("q", 50, 0.0, 100)
+        self.assertEqual(sizer.batch_size("q"), 200)
+        sizer.observe("q", 0, 1, 0)
+        self.assertEqual(sizer.batch_size("q"), 200)
+        self.assertRaises(ValueError, BatchSizer, initial=1, minimum=10)
+
+    def test_unknown_latency(self):
+        sizer = BatchSizer(target_latency=0.1, memory_budget=10000,
+                           initial=100)
+        sizer.observe("q", 100, None, 1000)
+        self.assertEqual(sizer.batch_size("q"), 100)
+        sizer.observe("q", 100, None, 20000)
+        self.assertEqual(sizer.batch_size("q"), 50)
+
+    def test_remembers_recent_queries(self):
+        sizer = BatchSizer(memory_budget=None, initial=100, max_queries=2)
+        for query in ("a", "b"):
+            sizer.observe(query, 100, 1, 0)
+        sizer.batch_size("a")
+        sizer.observe("c", 100, 1, 0)
+        self.assertEqual(sizer.batch_size("a"), 25)
+        self.assertEqual(sizer.batch_size("b"), 100)
+        sizer.clear()
+        self.assertEqual(sizer.batch_size("a"), 100)
+
+
+class CursorTest(unittest.TestCase):
+
+    def test_iteration_and_batches(self):
+        fetched = []
+
+        def batches():
+            for batch in ([1, 2], [], [3], [4, 5]):
+                fetched.append(batch)
+                yield batch
+
+        cursor = Cursor(batches(), count=5)
+        self.assertEqual(cursor.count, 5)
+        self.assertEqual(next(cursor), 1)
+        self.assertEqual(len(fetched), 1)
+        self.assertEqual(list(cursor.batches()), [[2], [], [3], [4, 5]])
+        self.assertEqual(list(cursor), [])
+
+    def test_to_columns(self):
+        docs = [
+            {"value": 1, "name": "a", "nested": {"flag": True}},
+            {"value": None, "name": "b"},
+            {"name": None, "nested": {"flag": False}},
+        ]
+        cols = Cursor([docs[:2], docs[2:]]).to_columns(
+            ["value", "name", "nested.flag"],
+            {"value": "int64", "name": "object", "nested.flag": "bool"}
+        )
+        self.assertEqual(list(cols), ["value", "name", "nested.flag"])
+        self.assertEqual(cols["value"].values.dtype.name, "int64")
+        self.assertEqual(list(cols["value"].values), [1, 0, 0])
+        self.assertEqual(list(cols["value"].mask), [False, True, True])
+        self.assertEqual(list(cols["name"].values), ["a", "b", None])
+        self.assertEqual(list(cols["name"].mask), [False, False, True])
+        self.assertEqual(
+            list(cols["nested.flag"].values), [True, False, False]
+        )
+        self.assertEqual(list(cols["nested.flag"].mask), [False, True, False])
+
+    def test_to_columns_grows(self):
+        batches = [[{"x": float(i)} for i in range(j, j + 700)]
+                   for j in range(0, 2100, 700)]
+        column = Cursor(batches).to_columns(["x"])["x"]
+        self.assertEqual(column.values.dtype.name, "float64")
+        self.assertEqual(list(column.values), [float(i) for i in range(2100)])
+        self.assertFalse(column.mask.any())
+
+    def test_to_columns_without_numpy(self):
+        numpy = columns.numpy
+        columns.numpy = None
+        try:
+            cols = Cursor([[{"x": 1.5, "y": 2}, {"y": "s"}]]).to_columns(
+                ["x", "y"], {"y": "object"}
+            )
+            self.assertRaises(
+                ValueError, Cursor([]).to_columns, ["x"], {"x": "U10"}
+            )
+        finally:
+            columns.numpy = numpy
+        self.assertEqual(cols["x"].values, array.array("d", [1.5, 0]))
+        self.assertEqual(cols["x"].mask, array.array("b", [0, 1]))
+        self.assertEqual(cols["y"].values, [2, "s"])
+
+    def test_to_columns_int64_without_numpy(self):
+        numpy = columns.numpy
+        columns.numpy = None
+        try:
+            cols = Cursor([[{"x": 2 ** 40}, {}]]).to_columns(
+                ["x"], {"x": "int64"}
+            )
+        finally:
+            columns.numpy = numpy
+        self.assertEqual(cols["x"].values.itemsize, 8)
+        self.assertEqual(list(cols["x"].values), [2 ** 40, 0])
+        self.assertEqual(cols["x"].mask, array.array("b", [0, 1]))
+
+
+class CursorExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.docs = [
+            {"_key": "1", "value": 1.5, "name": "caf\u00e9",
+             "nested": {"a": [1, 2]}, "flag": True},
+            {"_key": "2", "value": None, "name": "a,\"b\"\nc"},
+            {"_key": "3", "value": 3, "nested": {"a": None}},
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_export_jsonl(self):
+        path = os.path.join(self.tmp_dir, "out.jsonl")
+        progress = []
+        written = Cursor([self.docs[:2], [], self.docs[2:]]).export(
+            path, progress=progress.append
+        )
+        self.assertEqual(written, 3)
+        self.assertEqual(progress, [2, 3])
+        with io.open(path, encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        self.assertEqual(lines[-1], "")
+        self.assertEqual([json.loads(line) for line in lines[:-1]], self.docs)
+
+    def test_export_csv(self):
+        path = os.path.join(self.tmp_dir, "out.csv.gz")
+        Cursor([self.docs]).export(
+            path, format="csv", compress="gzip",
+            fields=["_key", "value", "name", "nested.a", "flag"]
+        )
+        with gzip.open(path, "rb") as f:
+            rows = list(csv.reader(io.StringIO(f.read().decode("utf-8"))))
+        self.assertEqual(rows, [
+            ["_key", "value", "name", "nested.a", "flag"],
+            ["1", "1.5", "caf\u00e9", "[1,2]", "true"],
+            ["2", "", "a,\"b\"\nc", "", ""],
+            ["3", "3", "", "", ""],
+        ])
+
+    def test_export_csv_default_fields(self):
+        path = os.path.join(self.tmp_dir, "out.csv")
+        Cursor([[{"a": 1, "b": 2}, {"b": 3, "c": 4}]]).export(
+            path, format="csv", compress="bz2"
+        )
+        with bz2.BZ2File(path) as f:
+            self.assertEqual(f.read(), b"a,b\r\n1,2\r\n,3\r\n")
+        self.assertEqual(Cursor([]).export(path, format="csv"), 0)
+        with io.open(path, "rb") as f:
+            self.assertEqual(f.read(), b"")
+        self.assertRaises(ValueError, Cursor([]).export, path, format="xml")
+        self.assertRaises(ValueError, Cursor([]).export, path, compress="xz")
+
+    def test_export_csv_not_objects(self):
+        path = os.path.join(self.tmp_dir, "out.csv")
+        for results in (["a", "b"], [[1, 2]], [None]):
+            self.assertRaises(ValueError, Cursor([results]).export, path,
+                              format="csv")
+        Cursor([[{"a": 1}, "b"]]).export(path, format="csv")
+        with io.open(path, "rb") as f:
+            self.assertEqual(f.read(), b"a\r\n1\r\n\"\"\r\n")
+
+
+class AdaptiveBatchSizeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeArangoServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.arango = self.server.connect()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.col = self.db.add_collection(self.col_name)
+        self.col.bulk_import([{"value": i} for i in range(500)])
+        self.query = "FOR d IN {} RETURN d".format(self.col_name)
+
+    def tearDown(self):
+        self.server.latency = 0
+        self.arango.remove_database(self.db_name)
+
+    def test_auto_batch_size(self):
+        self.server.latency = 0.005
+        self.db.batch_sizer = BatchSizer(
+            target_latency=600, memory_budget=None, initial=10
+        )
+        count = self.server.request_count
+        values = [d["value"] for d in
+                  self.db.execute_query(self.query, batch_size="auto")]
+        self.assertEqual(values, list(range(500)))
+        # 50 batches and the removal of the cursor
+        self.assertEqual(self.server.request_count - count, 51)
+        self.assertEqual(
+            self.db.batch_sizer.batch_size(self.query),
+            self.db.batch_sizer.maximum
+        )
+        count = self.server.request_count
+        self.assertEqual(
+            len(list(self.db.execute_query(self.query, batch_size="auto"))),
+            500
+        )
+        self.assertEqual(self.server.request_count - count, 1)
+
+    def test_auto_batch_size_slow_query(self):
+        self.db.batch_sizer = BatchSizer(
+            target_latency=0.05, memory_budget=None, initial=1000
+        )
+        # Only the execution of the query (the first batch) is slow
+        self.server.latency = \
+            lambda method, path: 0.3 if method == "POST" else 0
+        self.assertEqual(
+            len(list(self.db.execute_query(self.query, batch_size="auto"))),
+            500
+        )
+        self.assertEqual(self.db.batch_sizer.batch_size(self.query), 1000)
+
+    def test_query_to_columns(self):
+        cursor = self.db.execute_query(
+            "FOR d IN {} SORT d.value RETURN d".format(self.col_name),
+            batch_size=64, count=True
+        )
+        self.assertEqual(cursor.count, 500)
+        column = cursor.to_columns(["value"], {"value": "int32"})["value"]
+        self.assertEqual(column.values.tolist(), list(range(500)))
+        self.assertEqual(column.values.dtype.name, "int32")
+
+    def test_query_export(self):
+        path = os.path.join(tempfile.mkdtemp(), "out.jsonl")
+        try:
+            progress = []
+            written = self.db.execute_query(
+                "FOR d IN {} RETURN d.value".format(self.col_name),
+                batch_size=200
+            ).export(path, progress=progress.append)
+            self.assertEqual(written, 500)
+            self.assertEqual(progress, [200, 400, 500])
+            with io.open(path, encoding="utf-8") as f:
+                self.assertEqual(
+                    [int(line) for line in f], list(range(500))
+                )
+        finally:
+            shutil.rmtree(os.path.dirname(path))
+
+    def test_auto_batch_size_memory_budget(self):
+        self.db.batch_sizer = BatchSizer(
+            target_latency=60, memory_budget=4096, initial=500
+        )
+        for _ in range(3):
+            list(self.db.execute_query(self.query, batch_size="auto"))
+        size = self.db.batch_sizer.batch_size(self.query)
+        self.assertLess(size, 100)
+        res = self.db._api.post(
+            "/_api/cursor", data={"query": self.query, "batchSize": size}
+        )
+        self.assertLessEqual(len(res.text), 4096 * 1.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
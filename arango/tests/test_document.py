@@ -4,6 +4,7 @@ import unittest
 
 from arango import Arango
 from arango.exceptions import *
+from arango.tests.server import FakeArangoServer
 from arango.tests.utils import (
     get_next_col_name,
     get_next_db_name,
@@ -32,6 +33,100 @@ class DocumentManagementTest(unittest.TestCase):
         self.assertEqual(len(self.col), 1)
         self.assertIn("test_doc", self.col)
 
+    def test_contains_many(self):
+        self.col.bulk_import([{"_key": str(i)} for i in range(0, 100, 2)])
+        keys = [str(i) for i in range(100)] + ["0", "missing"]
+        expected = set(str(i) for i in range(0, 100, 2))
+        self.assertEqual(self.col.contains_many(keys), expected)
+        self.assertEqual(
+            self.col.contains_many(keys, chunk_size=7, max_workers=4),
+            expected
+        )
+        self.assertEqual(
+            self.col.contains_many(keys, chunk_size=10, as_mask=True),
+            [i % 2 == 0 for i in range(100)] + [True, False]
+        )
+        self.assertEqual(self.col.contains_many([]), set())
+        self.assertEqual(self.col.contains_many([], as_mask=True), [])
+
+    def test_update_many(self):
+        revs = {}
+        for i in range(10):
+            revs[str(i)] = self.col.add_document(
+                {"_key": str(i), "value": i, "extra": True}
+            )["_rev"]
+        self.col.update_document("6", {"value": 6})
+        outcomes = self.col.update_many(
+            [(str(i), {"value": i * 10}) for i in range(5)] +
+            [("5", {"value": 50}, revs["5"]),
+             ("6", {"value": 60}, revs["6"]),
+             ("missing", {"value": 0})],
+            chunk_size=3, max_workers=2
+        )
+        self.assertEqual(
+            [outcome["_key"] for outcome in outcomes],
+            ["0", "1", "2", "3", "4", "5", "6", "missing"]
+        )
+        self.assertEqual(
+            [outcome["error"] for outcome in outcomes],
+            [False] * 6 + [True, True]
+        )
+        self.assertNotEqual(outcomes[5]["_rev"], revs["5"])
+        self.assertEqual(outcomes[5]["_id"], "{}/5".format(self.col_name))
+        self.assertTrue(outcomes[6]["conflict"])
+        self.assertEqual(outcomes[6]["code"], 412)
+        self.assertFalse(outcomes[7]["conflict"])
+        self.assertEqual(outcomes[7]["code"], 404)
+        self.assertEqual(outcomes[7]["error_num"], 1202)
+        self.assertEqual(self.col["3"]["value"], 30)
+        self.assertTrue(self.col["3"]["extra"])
+        self.assertEqual(self.col["6"]["value"], 6)
+
+    def test_replace_many(self):
+        rev = self.col.add_document({"_key": "a", "value": 1})["_rev"]
+        self.col.add_document({"_key": "b", "value": 2})
+        outcomes = self.col.replace_many(
+            [("a", {"other": 1}, rev), ("b", {"other": 2}, rev)]
+        )
+        self.assertFalse(outcomes[0]["error"])
+        self.assertTrue(outcomes[1]["conflict"])
+        self.assertEqual(strip_system_keys(self.col["a"]), {"other": 1})
+        self.assertEqual(self.col["b"]["value"], 2)
+
+    def test_remove_many(self):
+        revs = [
+            self.col.add_document({"_key": str(i)})["_rev"] for i in range(5)
+        ]
+        outcomes = self.col.remove_many(
+            ["0", "1", ("2", revs[2]), ("3", revs[0]), "missing"],
+            chunk_size=2
+        )
+        self.assertEqual(
+            [(outcome["_key"], outcome["error"]) for outcome in outcomes],
+            [("0", False), ("1", False), ("2", False), ("3", True),
+             ("missing", True)]
+        )
+        self.assertTrue(outcomes[3]["conflict"])
+        self.assertEqual(len(self.col), 2)
+        self.assertEqual(self.col.remove_many([]), [])
+
+    def test_remove_many_generator(self):
+        for i in range(6):
+            self.col.add_document({"_key": str(i)})
+        counts = []
+
+        def keys():
+            for i in range(6):
+                counts.append(len(self.col))
+                yield str(i)
+
+        outcomes = self.col.remove_many(keys(), chunk_size=2)
+        self.assertEqual([outcome["error"] for outcome in outcomes],
+                         [False] * 6)
+        # Each chunk is read only once the previous one was removed
+        self.assertEqual(counts, [6, 6, 4, 4, 2, 2])
+        self.assertEqual(len(self.col), 0)
+
     def test_remove_document(self):
         rev = self.col.add_document({"_key": "test_doc"})["_rev"]
         self.assertEqual(len(self.col), 1)
@@ -314,5 +409,235 @@ class DocumentManagementTest(unittest.TestCase):
         )
 
 
+class UpsertTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # UPSERT queries need ArangoDB 2.6
+        cls.server = FakeArangoServer(version="2.6.0").start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.arango = self.server.connect()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.col = self.db.add_collection(self.col_name)
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def test_upsert(self):
+        outcome = self.col.upsert(
+            {"name": "a"}, {"name": "a", "value": 1}, {"value": 2}
+        )
+        self.assertEqual(outcome["type"], "insert")
+        self.assertEqual(self.col[outcome["_key"]]["value"], 1)
+        updated = self.col.upsert(
+            {"name": "a"}, {"name": "a", "value": 1}, {"value": 2}
+        )
+        self.assertEqual(updated["type"], "update")
+        self.assertEqual(updated["_key"], outcome["_key"])
+        self.assertNotEqual(updated["_rev"], outcome["_rev"])
+        self.assertEqual(self.col[outcome["_key"]]["value"], 2)
+        self.assertEqual(len(self.col), 1)
+        self.assertEqual(
+            self.col.upsert({"name": "a"}, {"name": "a", "value": 3})["type"],
+            "update"
+        )
+        self.assertEqual(self.col[outcome["_key"]]["value"], 3)
+        self.assertRaises(ValueError, self.col.upsert, {}, {"value": 1})
+        self.assertRaises(
+            DocumentUpsertError,
+            self.db.collection(self.col_name).upsert,
+            {"name": "b"}, {"_key": "illegal/key"}
+        )
+
+    def test_upsert_many(self):
+        self.col.add_hash_index(["email"], unique=True)
+        self.col.add_document({"_key": "taken", "email": "taken@example"})
+        self.col.add_document({"name": "b", "group": 1, "value": 0})
+        outcomes = self.col.upsert_many(
+            [{"name": "a", "group": 1, "value": 1},
+             {"name": "b", "group": 1, "value": 2},
+             {"name": "b", "group": 2, "value": 3},
+             {"_key": "x", "name": "c", "group": 1,
+              "email": "taken@example"},
+             {"name": "a", "group": 3, "value": 4}],
+            key_fields=["name", "group"], chunk_size=2, max_workers=2
+        )
+        self.assertEqual(
+            [(outcome["error"], outcome.get("type")) for outcome in outcomes],
+            [(False, "insert"), (False, "update"), (False, "insert"),
+             (True, None), (False, "insert")]
+        )
+        self.assertEqual(outcomes[3]["_key"], "x")
+        self.assertEqual(outcomes[3]["error_num"], 1210)
+        values = sorted(
+            (d["name"], d.get("group"), d.get("value")) for d in self.col
+            if "name" in d
+        )
+        self.assertEqual(
+            values, [("a", 1, 1), ("a", 3, 4), ("b", 1, 2), ("b", 2, 3)]
+        )
+
+    def test_upsert_old_server(self):
+        self.server.version = "2.4.0"
+        try:
+            col = self.server.connect().db(self.db_name).collection(
+                self.col_name
+            )
+            self.assertRaises(ServerVersionError, col.upsert,
+                              {"name": "a"}, {"name": "a"})
+            self.assertRaises(ServerVersionError, col.upsert_many,
+                              [{"name": "a"}], "name")
+        finally:
+            self.server.version = "2.6.0"
+        self.assertEqual(len(self.col), 0)
+
+
+class TrackedDocumentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.arango = Arango()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.col = self.db.add_collection(self.col_name)
+        self.col.add_document({
+            "_key": "doc",
+            "name": "test",
+            "address": {"city": "Berlin", "zip": "10115"},
+            "tags": ["a", {"b": 1}],
+            "blob": "x" * 1000,
+        })
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def test_changes(self):
+        doc = self.col.get_document("doc", tracked=True)
+        self.assertFalse(doc.dirty)
+        self.assertEqual(doc.patch(), {})
+        doc["address"]["city"] = "Paris"
+        doc["tags"][1]["b"] = 2
+        doc["new"] = {"x": 1}
+        doc["new"]["y"] = 2
+        del doc["name"]
+        self.assertTrue(doc.dirty)
+        self.assertEqual(doc.changes, {
+            ("address", "city"): "set",
+            ("tags",): "set",
+            ("new",): "set",
+            ("name",): "remove",
+        })
+        self.assertEqual(doc.patch(), {
+            "address": {"city": "Paris"},
+            "tags": ["a", {"b": 2}],
+            "new": {"x": 1, "y": 2},
+            "name": None,
+        })
+
+    def test_detached_values_untracked(self):
+        doc = self.col.get_document("doc", tracked=True)
+        address = doc.pop("address")
+        address["city"] = "Paris"
+        tags = doc["tags"]
+        doc["tags"] = []
+        tags.append("c")
+        self.assertEqual(doc.patch(), {"address": None, "tags": []})
+
+    def test_save(self):
+        doc = self.col.get_document("doc", tracked=True)
+        self.assertIsNone(doc.save())
+        rev = doc["_rev"]
+        doc["address"]["city"] = "Paris"
+        doc["tags"].append("c")
+        result = doc.save()
+        self.assertNotEqual(result["_rev"], rev)
+        self.assertEqual(doc["_rev"], result["_rev"])
+        self.assertFalse(doc.dirty)
+        stored = self.col["doc"]
+        self.assertEqual(
+            stored["address"], {"city": "Paris", "zip": "10115"}
+        )
+        self.assertEqual(stored["tags"], ["a", {"b": 1}, "c"])
+        self.assertEqual(stored["blob"], "x" * 1000)
+
+        del doc["name"]
+        doc.save()
+        self.assertNotIn("name", self.col["doc"])
+
+        # Setting None while removing attributes falls back to a replace
+        doc["address"]["zip"] = None
+        del doc["tags"]
+        doc.save()
+        stored = self.col["doc"]
+        self.assertEqual(stored["address"], {"city": "Paris", "zip": None})
+        self.assertNotIn("tags", stored)
+        self.assertEqual(stored["blob"], "x" * 1000)
+
+    def test_save_object_set_whole(self):
+        doc = self.col.get_document("doc", tracked=True)
+        doc["address"]["zip"] = "75001"
+        doc["address"] = {"city": "Paris", "geo": {"lat": 48.8}}
+        self.assertEqual(doc.patch(), {
+            "address": {"city": "Paris", "geo": {"lat": 48.8},
+                        "zip": None},
+        })
+        doc.save()
+        self.assertEqual(self.col["doc"]["address"],
+                         {"city": "Paris", "geo": {"lat": 48.8}})
+        # Dropped keys of nested objects are removed as well
+        doc["address"] = {"geo": {"lng": 2.3}}
+        doc.save()
+        self.assertEqual(self.col["doc"]["address"], {"geo": {"lng": 2.3}})
+        self.assertEqual(dict(doc), dict(self.col["doc"]))
+        # Setting None as well falls back to a replace
+        doc["address"] = {"zip": None}
+        doc.save()
+        self.assertEqual(self.col["doc"]["address"], {"zip": None})
+        self.assertEqual(self.col["doc"]["blob"], "x" * 1000)
+
+    def test_save_conflict(self):
+        doc = self.col.get_document("doc", tracked=True)
+        self.col.update_document("doc", {"name": "other"})
+        doc["name"] = "mine"
+        self.assertRaises(RevisionMismatchError, doc.save)
+        self.assertTrue(doc.dirty)
+        self.assertEqual(self.col["doc"]["name"], "other")
+
+    def test_save_many(self):
+        self.col.bulk_import([{"_key": str(i), "value": i} for i in range(5)])
+        docs = [self.col.track(d) for d in self.col.get_by_example({})]
+        docs.sort(key=lambda d: d["_key"])
+        for doc in docs[1:]:
+            doc["value"] = -1
+        self.col.update_document("0", {"value": 10})
+        self.col.update_document("1", {"value": 10})
+        outcomes = self.col.save_many(docs, chunk_size=2, max_workers=2)
+        self.assertIsNone(outcomes[0])
+        self.assertEqual(
+            [outcome["error"] for outcome in outcomes[1:]],
+            [True] + [False] * 4
+        )
+        self.assertTrue(outcomes[1]["conflict"])
+        self.assertTrue(docs[1].dirty)
+        self.assertFalse(docs[2].dirty)
+        self.assertEqual(docs[2]["_rev"], self.col["2"]["_rev"])
+        self.assertEqual(
+            [self.col[str(i)]["value"] for i in range(5)],
+            [10, 10, -1, -1, -1]
+        )
+
+    def test_missing_key(self):
+        doc = self.col.track({"name": "projection"})
+        doc["name"] = "changed"
+        self.assertRaises(DocumentInvalidError, doc.save)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,6 +3,7 @@
 import unittest
 
 from arango import Arango
+from arango.exceptions import GraphBulkLoadError
 from arango.tests.utils import (
     get_next_graph_name,
     get_next_col_name,
@@ -194,5 +195,85 @@ class GraphManagementTest(unittest.TestCase):
         )
 
 
+class GraphBulkLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.arango = Arango()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.people = get_next_col_name(self.db)
+        self.db.add_collection(self.people)
+        self.places = get_next_col_name(self.db)
+        self.db.add_collection(self.places)
+        self.knows = get_next_col_name(self.db)
+        self.db.add_collection(self.knows, is_edge=True)
+        self.graph = self.db.add_graph(get_next_graph_name(self.db))
+        self.graph.add_edge_definition(
+            self.knows, [self.people], [self.people]
+        )
+        self.graph.add_vertex_collection(self.places)
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def test_bulk_load(self):
+        read = []
+
+        def people():
+            for i in range(25):
+                read.append(i)
+                yield {"_key": str(i)}
+
+        edges = [
+            {"_from": "{}/{}".format(self.people, i),
+             "_to": "{}/{}".format(self.people, i + 1)}
+            for i in range(24)
+        ]
+        # Not allowed by the edge definition
+        edges.insert(3, {"_from": "{}/0".format(self.places),
+                         "_to": "{}/1".format(self.people)})
+        reports = self.graph.bulk_load(
+            {self.people: people(), self.places: iter([{"_key": "x"}])},
+            {self.knows: iter(edges)},
+            chunk_size=4, max_workers=3
+        )
+        self.assertEqual(read, list(range(25)))
+        self.assertEqual(
+            sorted(reports), sorted([self.people, self.places, self.knows])
+        )
+        report = reports[self.people]
+        self.assertEqual(report["documents"], 25)
+        self.assertEqual(report["created"], 25)
+        self.assertEqual(report["errors"], 0)
+        self.assertGreaterEqual(report["documents_per_second"], 0)
+        self.assertEqual(reports[self.places]["created"], 1)
+        report = reports[self.knows]
+        self.assertEqual((report["created"], report["errors"]), (24, 1))
+        self.assertEqual(len(report["details"]), 1)
+        self.assertTrue(report["details"][0].startswith("at position 4:"))
+        self.assertEqual(self.db.collection(self.knows).count, 24)
+
+    def test_bulk_load_errors(self):
+        self.db.collection(self.people).add_document({"_key": "taken"})
+        documents = [{"_key": str(i)} for i in range(6)]
+        documents[4]["_key"] = "taken"
+        report = self.graph.bulk_load(
+            {self.people: documents}, chunk_size=3, max_details=5
+        )[self.people]
+        self.assertEqual((report["created"], report["errors"]), (5, 1))
+        self.assertTrue(report["details"][0].startswith("at position 5:"))
+
+    def test_bulk_load_unknown_collection(self):
+        self.assertRaises(
+            GraphBulkLoadError, self.graph.bulk_load,
+            {self.people: [], "missing": []}
+        )
+        self.assertRaises(
+            GraphBulkLoadError, self.graph.bulk_load,
+            {}, {self.places: []}
+        )
+        self.assertEqual(self.db.collection(self.people).count, 0)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,153 @@
+"""Tests for the client-side allocation of document keys."""
+
+import threading
+import unittest
+import uuid
+
+from arango import Arango
+from arango.keys import (
+    KeyAllocator,
+    ShardedCounterKeys,
+    TimeOrderedKeys,
+    UUID7Keys,
+    key_allocator,
+)
+from arango.tests.utils import (
+    get_next_col_name,
+    get_next_db_name
+)
+
+
+class KeyAllocatorTest(unittest.TestCase):
+
+    def assert_unique_and_ordered(self, allocator, count=5000):
+        keys = allocator.allocate(count)
+        self.assertEqual(len(set(keys)), count)
+        self.assertEqual(keys, sorted(keys))
+
+    def test_time_ordered(self):
+        allocator = TimeOrderedKeys(node="a1b2")
+        key = allocator.next_key()
+        self.assertEqual(len(key), 19)
+        self.assertTrue(key.endswith("a1b2"))
+        self.assert_unique_and_ordered(allocator, 100000)
+        self.assertRaises(ValueError, TimeOrderedKeys, node="xyz")
+        self.assertNotEqual(TimeOrderedKeys().node, TimeOrderedKeys().node)
+
+    def test_sharded_counter(self):
+        allocator = ShardedCounterKeys("loader3", start=41, width=4)
+        self.assertEqual(allocator.next_key(), "loader3-0041")
+        self.assertEqual(allocator.allocate(2),
+                         ["loader3-0042", "loader3-0043"])
+        self.assert_unique_and_ordered(ShardedCounterKeys(7))
+
+    def test_uuid7(self):
+        allocator = UUID7Keys()
+        parsed = uuid.UUID(allocator.next_key())
+        self.assertEqual(parsed.version, 7)
+        self.assertEqual(parsed.variant, uuid.RFC_4122)
+        self.assert_unique_and_ordered(allocator, 100000)
+
+    def test_threads(self):
+        allocator = TimeOrderedKeys()
+        keys = []
+
+        def allocate():
+            keys.extend(allocator.next_key() for _ in range(2000))
+
+        threads = [threading.Thread(target=allocate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(keys)), 8000)
+
+    def test_reseeded_after_fork(self):
+        uuid_allocator = UUID7Keys()
+        time_allocator = TimeOrderedKeys()
+        fixed_allocator = TimeOrderedKeys("ab")
+        generator, node = uuid_allocator._random, time_allocator.node
+        # Pretend the allocators were created in the parent process
+        for allocator in (uuid_allocator, time_allocator, fixed_allocator):
+            allocator._pid = -1
+            allocator.next_key()
+        self.assertIsNot(uuid_allocator._random, generator)
+        self.assertNotEqual(time_allocator.node, node)
+        self.assertEqual(fixed_allocator.node, "ab")
+
+    def test_assign(self):
+        documents = [{"_key": "given"}, {}, {"value": 1}]
+        ShardedCounterKeys("s").assign(documents)
+        self.assertEqual(
+            [doc["_key"] for doc in documents],
+            ["given", "s-000000000000", "s-000000000001"]
+        )
+
+    def test_key_allocator(self):
+        self.assertIsInstance(key_allocator("time"), TimeOrderedKeys)
+        self.assertIsInstance(key_allocator("uuid7"), UUID7Keys)
+        allocator = ShardedCounterKeys("s")
+        self.assertIs(key_allocator(allocator), allocator)
+        self.assertRaises(ValueError, key_allocator, "serial")
+        self.assertRaises(NotImplementedError, KeyAllocator().next_key)
+
+
+class KeyAllocationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.arango = Arango(key_allocator=ShardedCounterKeys("test"))
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.col = self.db.add_collection(self.col_name)
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def test_add_document(self):
+        data = {"value": 1}
+        result = self.col.add_document(data)
+        self.assertEqual(data["_key"], "test-000000000000")
+        self.assertEqual(result["_key"], data["_key"])
+        self.col.add_document({"_key": "given"})
+        self.assertIn("given", self.col)
+
+    def test_bulk_import(self):
+        vertices = [{"value": i} for i in range(3)]
+        col = self.db.collection(self.col_name)
+        edge_col_name = get_next_col_name(self.db)
+        edge_col = self.db.add_collection(edge_col_name, is_edge=True)
+        # The keys are known before the vertices are imported
+        self.arango.key_allocator.assign(vertices)
+        edges = [
+            {"_from": "{}/{}".format(self.col_name, a["_key"]),
+             "_to": "{}/{}".format(self.col_name, b["_key"])}
+            for a, b in zip(vertices, vertices[1:])
+        ]
+        self.assertEqual(edge_col.bulk_import(edges)["created"], 2)
+        self.assertEqual(col.bulk_import(vertices)["created"], 3)
+        self.assertEqual(
+            sorted(doc["_key"] for doc in self.col),
+            ["test-000000000000", "test-000000000001", "test-000000000002"]
+        )
+        # The documents without a key get one from the allocator
+        self.assertEqual(
+            [edge["_key"] for edge in edges],
+            ["test-000000000003", "test-000000000004"]
+        )
+
+    def test_bulk_import_generator(self):
+        result = self.col.bulk_import({"value": i} for i in range(5))
+        self.assertEqual(result["created"], 5)
+        self.assertEqual(
+            sorted(doc["value"] for doc in self.col), list(range(5))
+        )
+        self.assertIn("test-000000000004", self.col)
+
+    def test_add_vertex(self):
+        graph = self.db.add_graph(get_next_col_name(self.db))
+        graph.add_vertex_collection(self.col_name)
+        data = {"value": 1}
+        vertex = graph.add_vertex(self.col_name, data)
+        self.assertEqual(vertex["_key"], data["_key"])
+        self.assertEqual(data["_key"], "test-000000000000")
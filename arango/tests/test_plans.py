@@ -0,0 +1,127 @@
+"""Tests for the plan cache and plan regression detection."""
+
+import unittest
+
+from arango import Arango
+from arango.plans import PlanCache, compare_plans
+from arango.tests.utils import (
+    get_next_col_name,
+    get_next_db_name
+)
+
+
+def plan(cost, *nodes):
+    return {"nodes": list(nodes), "estimated_cost": cost}
+
+
+INDEX_NODE = {
+    "type": "index_range_node",
+    "collection": "students",
+    "index": {"type": "hash", "fields": ["name"], "id": "students/1"},
+}
+SCAN_NODE = {"type": "enumerate_collection_node", "collection": "students"}
+
+
+class ComparePlansTest(unittest.TestCase):
+
+    def test_no_regression(self):
+        self.assertEqual(compare_plans(plan(10, INDEX_NODE),
+                                       plan(10.5, INDEX_NODE)), [])
+        self.assertEqual(compare_plans(plan(10, SCAN_NODE),
+                                       plan(5, INDEX_NODE)), [])
+
+    def test_regressions(self):
+        self.assertEqual(
+            compare_plans(plan(10, INDEX_NODE), plan(100, SCAN_NODE)),
+            ["hash index on name of students no longer used",
+             "full scan of students",
+             "estimated cost up from 10 to 100"]
+        )
+        self.assertEqual(
+            compare_plans([plan(10)], [plan(20), plan(5)], 1.0), []
+        )
+        self.assertEqual(
+            compare_plans(plan(10), plan(20), 0.5),
+            ["estimated cost up from 10 to 20"]
+        )
+
+    def test_cache_is_bounded(self):
+        cache = PlanCache(max_size=2)
+        for query in ("a", "b", "c"):
+            cache.set(cache.key(query, {}), plan(1), query, {})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(cache.key("a", {})))
+        self.assertEqual(cache.get(cache.key("b", {})), plan(1))
+        self.assertNotEqual(cache.key("a", {}), cache.key("a", {}, {"x": 1}))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+class PlanCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.arango = Arango()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.col = self.db.add_collection(self.col_name)
+        self.col.bulk_import([
+            {"name": "student{}".format(i)} for i in range(100)
+        ])
+        self.query = "FOR d IN {} FILTER d.name == @name RETURN d".format(
+            self.col_name
+        )
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def test_explain_query_cache(self):
+        bind_vars = {"name": "student1"}
+        plan = self.db.explain_query(self.query, bind_vars=bind_vars,
+                                     cache=True)
+        self.assertIs(
+            self.db.explain_query(self.query, bind_vars=bind_vars,
+                                  cache=True),
+            plan
+        )
+        self.assertIsNot(
+            self.db.explain_query(self.query, bind_vars=bind_vars), plan
+        )
+        self.assertIsNot(
+            self.db.explain_query(self.query, bind_vars=bind_vars,
+                                  optimizer_rules=["-all"], cache=True),
+            plan
+        )
+        self.assertEqual(len(self.db.plan_cache), 2)
+
+    def test_check_plans(self):
+        bind_vars = {"name": "student1"}
+        self.col.add_hash_index(["name"])
+        self.db.explain_query(self.query, bind_vars=bind_vars, cache=True)
+        self.assertEqual(self.db.check_plans(), [])
+
+        for index_id, index in self.col.indexes.items():
+            if index["type"] == "hash":
+                self.col.remove_index(index_id)
+        regressions = self.db.check_plans()
+        self.assertEqual(len(regressions), 1)
+        regression = regressions[0]
+        self.assertEqual(regression["query"], self.query)
+        self.assertEqual(regression["bind_vars"], bind_vars)
+        self.assertIn(
+            "hash index on name of {} no longer used".format(self.col_name),
+            regression["reasons"]
+        )
+        self.assertIn("full scan of {}".format(self.col_name),
+                      regression["reasons"])
+        # The baseline is kept unless it is updated
+        self.assertEqual(len(self.db.check_plans(update=True)), 1)
+        self.assertEqual(self.db.check_plans(), [])
+
+        self.db.remove_collection(self.col_name)
+        reasons = self.db.check_plans()[0]["reasons"]
+        self.assertTrue(reasons[0].startswith("explain failed"))
+
+
+if __name__ == "__main__":
+    unittest.main()
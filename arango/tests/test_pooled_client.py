@@ -0,0 +1,105 @@
+"""Tests for the thread-safe pooled client."""
+
+import os
+import threading
+import unittest
+from arango.exceptions import *
+from arango.clients.pooled import PooledArangoClient, SessionPool
+from arango.tests.server import FakeArangoServer
+from arango.tests.utils import (
+    get_next_db_name,
+    get_next_col_name,
+)
+
+
+class PooledClientTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeArangoServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.client = PooledArangoClient(pool_size=3)
+        self.arango = self.server.connect(client=self.client)
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.col = self.db.add_collection(self.col_name)
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+        self.client.close()
+
+    def test_concurrent_requests(self):
+        errors = []
+
+        def work(thread_id):
+            try:
+                for i in range(20):
+                    self.col.add_document(
+                        {"_key": "{}_{}".format(thread_id, i)}
+                    )
+            except Exception as err:
+                errors.append(err)
+
+        threads = [
+            threading.Thread(target=work, args=(i,)) for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.col.count, 160)
+        self.assertLessEqual(self.client.pool._created, 3)
+
+    def test_pool_timeout(self):
+        pool = SessionPool(size=1, timeout=0.05)
+        session = pool.acquire()
+        self.assertRaises(ConnectionPoolTimeoutError, pool.acquire)
+        pool.release(session)
+        self.assertIs(pool.acquire(), session)
+
+    def test_thread_affinity(self):
+        pool = SessionPool(size=2, thread_affinity=True)
+        mine = pool.acquire()
+        pool.release(mine)
+        sessions = []
+
+        def work():
+            sessions.append(pool.acquire())
+            sessions.append(pool.acquire())
+            for session in sessions:
+                pool.release(session)
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        # The other thread released its own session last, yet this thread
+        # gets back the session it used before
+        self.assertIsNot(sessions[1], mine)
+        self.assertIs(pool.acquire(), mine)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "os.fork is not available")
+    def test_fork(self):
+        self.col.add_document({"_key": "parent"})
+        pid = os.fork()
+        if pid == 0:
+            try:
+                ok = (self.client.pool._created == 0 and
+                      self.col.get_document("parent") is not None)
+                self.col.add_document({"_key": "child"})
+            except Exception:
+                ok = False
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+        self.assertIn("child", self.col)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,12 @@
 """Tests for ArangoDB queries."""
 
+import time
 import unittest
 
 from arango import Arango
 from arango.exceptions import *
+from arango.cursor import BatchSizer
+from arango.tests.server import FakeArangoServer
 from arango.tests.utils import (
     get_next_col_name,
     get_next_db_name
@@ -99,5 +102,155 @@ class ArangoDBQueryTest(unittest.TestCase):
         )
 
 
+class ParallelQueryTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeArangoServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.arango = self.server.connect()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.db.add_collection(self.col_name).bulk_import(
+            [{"value": i} for i in range(10)]
+        )
+
+    def tearDown(self):
+        self.server.latency = 0
+        self.arango.remove_database(self.db_name)
+
+    def test_execute_queries(self):
+        query = "FOR d IN {} FILTER d.value < @max SORT d.value " \
+                "RETURN d.value".format(self.col_name)
+        queries = [
+            {"query": query, "bind_vars": {"max": i}, "batch_size": 2}
+            for i in range(8)
+        ]
+        queries[3] = "THIS IS AN INVALID QUERY"
+        self.server.latency = 0.05
+        start = time.time()
+        results = self.db.execute_queries(queries, max_workers=8)
+        # Sequentially the 13 requests would take at least 0.65 seconds
+        self.assertLess(time.time() - start, 0.5)
+        self.assertIsInstance(results[3], QueryExecuteError)
+        for i, result in enumerate(results):
+            if i != 3:
+                self.assertEqual(result, list(range(i)))
+        self.assertEqual(self.db.execute_queries([]), [])
+
+    def test_execute_queries_timeout(self):
+        query = "FOR d IN {} RETURN d".format(self.col_name)
+        self.server.latency = 0.2
+        count = self.server.request_count
+        results = self.db.execute_queries(
+            [query] * 4, max_workers=2, timeout=0.05
+        )
+        self.assertEqual(len(results), 4)
+        for result in results:
+            self.assertIsInstance(result, QueryTimeoutError)
+        time.sleep(0.3)
+        # The queries not started before the timeout are never executed
+        self.assertEqual(self.server.request_count - count, 2)
+
+    def test_execute_queries_timeout_stops_reading(self):
+        query = {"query": "FOR d IN {} RETURN d".format(self.col_name),
+                 "batch_size": 2}
+        self.server.latency = 0.2
+        count = self.server.request_count
+        results = self.db.execute_queries([query], timeout=0.05)
+        self.assertIsInstance(results[0], QueryTimeoutError)
+        time.sleep(0.6)
+        # No further batch is fetched once the timeout expired
+        self.assertEqual(self.server.request_count - count, 1)
+
+    def test_execute_queries_no_workers(self):
+        self.assertRaises(ValueError, self.db.execute_queries, ["RETURN 1"],
+                          max_workers=0)
+
+
+class QueryProfileTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeArangoServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.arango = self.server.connect()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.db.add_collection(self.col_name).bulk_import(
+            [{"value": i} for i in range(10)]
+        )
+        self.query = "FOR d IN {} FILTER d.value >= @min RETURN d".format(
+            self.col_name
+        )
+
+    def tearDown(self):
+        self.server.latency = 0
+        self.arango.remove_database(self.db_name)
+
+    def test_profile(self):
+        self.server.latency = 0.01
+        cursor = self.db.execute_query(
+            self.query, bind_vars={"min": 2}, batch_size=3, profile=True
+        )
+        profile = cursor.profile
+        self.assertEqual(profile.query, self.query)
+        self.assertEqual(profile.bind_vars, {"min": 2})
+        self.assertIsNone(profile.plan)
+        self.assertEqual(len(profile.batches), 1)
+        self.assertGreaterEqual(profile.time_to_first_batch, 0.01)
+        self.assertIsNone(profile.total_time)
+        self.assertEqual(len(list(cursor)), 8)
+        self.assertEqual(
+            [batch["documents"] for batch in profile.batches], [3, 3, 2]
+        )
+        self.assertEqual(profile.documents, 8)
+        self.assertGreater(profile.bytes, 0)
+        self.assertGreaterEqual(profile.fetch_time, 0.03)
+        self.assertGreaterEqual(profile.decode_time, 0)
+        self.assertGreaterEqual(profile.total_time, profile.fetch_time)
+        self.assertIn("stats", profile.extra)
+        summary = profile.summary()
+        self.assertEqual(summary["batches"], 3)
+        self.assertEqual(summary["documents"], 8)
+        # Queries are not profiled by default
+        self.assertIsNone(self.db.execute_query(self.query, bind_vars={
+            "min": 2
+        }).profile)
+
+    def test_profile_with_plan(self):
+        cursor = self.db.execute_query(
+            self.query, bind_vars={"min": 2}, explain=True
+        )
+        self.assertEqual(len(list(cursor)), 8)
+        self.assertIn("nodes", cursor.profile.plan)
+        self.assertEqual(cursor.profile.documents, 8)
+
+    def test_profile_with_auto_batch_size(self):
+        self.db.batch_sizer = BatchSizer(memory_budget=None, initial=4,
+                                         minimum=1)
+        cursor = self.db.execute_query(
+            self.query, bind_vars={"min": 0}, batch_size="auto", profile=True
+        )
+        self.assertEqual(len(list(cursor)), 10)
+        self.assertEqual(cursor.profile.documents, 10)
+        self.assertNotEqual(
+            self.db.batch_sizer.batch_size(self.query),
+            self.db.batch_sizer.initial
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+"""Tests for compact document rows."""
+
+import unittest
+from collections import namedtuple
+
+from arango import Arango
+from arango.cursor import Cursor
+from arango.rows import RowFactory, batch_converter
+from arango.tests.utils import (
+    get_next_col_name,
+    get_next_db_name
+)
+
+User = namedtuple("User", ["key", "name", "age"])
+
+
+class Point(object):
+    __slots__ = ("x", "y")
+
+
+class Point3D(Point):
+    __slots__ = "z"
+
+
+class RowFactoryTest(unittest.TestCase):
+
+    def test_namedtuple(self):
+        factory = RowFactory(User, attributes={"key": "_key"})
+        self.assertEqual(factory.fields, ["key", "name", "age"])
+        self.assertEqual(factory.attributes, ("_key", "name", "age"))
+        rows = factory.convert([
+            {"_key": "1", "_rev": "2", "name": "a", "age": 3, "extra": 4},
+            {"_key": "2", "name": "b"},
+        ])
+        self.assertEqual(rows, [User("1", "a", 3), User("2", "b", None)])
+        self.assertIsInstance(rows[0], User)
+        self.assertEqual(factory({"name": "c"}), User(None, "c", None))
+
+    def test_slots(self):
+        factory = RowFactory(Point3D, attributes={"z": "height"})
+        self.assertEqual(factory.fields, ["x", "y", "z"])
+        row = factory({"x": 1, "height": 3})
+        self.assertIsInstance(row, Point3D)
+        self.assertEqual((row.x, row.y, row.z), (1, None, 3))
+        self.assertFalse(hasattr(row, "__dict__"))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, RowFactory, dict)
+        self.assertRaises(ValueError, RowFactory, lambda doc: doc)
+        self.assertRaises(ValueError, RowFactory, User, {"_key": "_key"})
+
+    def test_batch_converter(self):
+        documents = [{"x": 1, "y": 2}]
+        self.assertEqual(batch_converter(Point)(documents)[0].y, 2)
+        self.assertEqual(
+            batch_converter(lambda doc: doc["x"] * 10)(documents), [10]
+        )
+        self.assertEqual(
+            batch_converter(RowFactory(User))([{"name": "a"}]),
+            [User(None, "a", None)]
+        )
+
+    def test_cursor(self):
+        cursor = Cursor(
+            [[{"x": 1}, {"x": 2}], [{"x": 3}]],
+            row_factory=lambda doc: doc["x"]
+        )
+        self.assertEqual(next(cursor), 1)
+        self.assertEqual(list(cursor.batches()), [[2], [3]])
+
+
+class RowQueryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.arango = Arango()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.col = self.db.add_collection(self.col_name)
+        self.col.bulk_import([
+            {"_key": str(i), "name": "user{}".format(i), "age": i}
+            for i in range(10)
+        ])
+        self.factory = RowFactory(User, attributes={"key": "_key"})
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def test_execute_query(self):
+        rows = list(self.db.execute_query(
+            "FOR d IN {} SORT d.age ASC RETURN d".format(self.col_name),
+            batch_size=3, row_factory=self.factory
+        ))
+        self.assertEqual(
+            rows, [User(str(i), "user{}".format(i), i) for i in range(10)]
+        )
+
+    def test_all(self):
+        rows = sorted(self.col.all(row_factory=self.factory))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0], User("0", "user0", 0))
+
+    def test_get_by_example(self):
+        rows = list(self.col.get_by_example(
+            {"age": 4}, row_factory=Point
+        ))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0].x, rows[0].y), (None, None))
@@ -0,0 +1,98 @@
+"""Tests for the in-process ArangoDB stand-in server."""
+
+import time
+import unittest
+from arango.exceptions import *
+from arango.tests.server import FakeArangoServer
+from arango.tests.utils import (
+    get_next_db_name,
+    get_next_col_name,
+)
+
+
+class FakeArangoServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeArangoServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.latency = 0
+        self.arango = self.server.connect()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.col = self.db.add_collection(self.col_name)
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def test_document_round_trip(self):
+        self.col.add_document({"_key": "doc01", "value": 1})
+        self.col.update_document("doc01", {"value": 2})
+        self.assertEqual(self.col["doc01"]["value"], 2)
+        self.assertEqual(
+            self.server.database(self.db_name)
+                .collection(self.col_name).get("doc01")["value"],
+            2
+        )
+        self.col.remove_document("doc01")
+        self.assertNotIn("doc01", self.col)
+
+    def test_query_subset(self):
+        self.col.bulk_import([{"value": i} for i in range(10)])
+        cursor = self.db.execute_query(
+            "FOR d IN @@col FILTER d.value >= @min SORT d.value DESC "
+            "LIMIT 3 RETURN d.value",
+            batch_size=2,
+            bind_vars={"@col": self.col_name, "min": 4}
+        )
+        self.assertEqual(list(cursor), [9, 8, 7])
+        cursor = self.db.execute_query(
+            "FOR d IN @@col FILTER d.value < 2 SORT d.value "
+            "RETURN [d.value, d.missing]",
+            bind_vars={"@col": self.col_name}
+        )
+        self.assertEqual(list(cursor), [[0, None], [1, None]])
+
+    def test_unsupported_query(self):
+        self.assertRaises(
+            QueryExecuteError,
+            self.db.execute_query,
+            "FOR d IN {} COLLECT v = d.value RETURN v".format(self.col_name)
+        )
+
+    def test_query_handler(self):
+        self.server.add_query_handler(
+            r"^RETURN LENGTH\(",
+            lambda db, query, bind_vars: [len(bind_vars["list"])]
+        )
+        cursor = self.db.execute_query(
+            "RETURN LENGTH(@list)", bind_vars={"list": [1, 2, 3]}
+        )
+        self.assertEqual(list(cursor), [3])
+
+    def test_latency(self):
+        self.server.latency = 0.05
+        start = time.time()
+        self.col.count
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    def test_request_history(self):
+        count = self.server.request_count
+        self.col.count
+        self.assertEqual(self.server.request_count, count + 1)
+        self.assertEqual(
+            self.server.history[-1],
+            ("GET", "/_db/{}/_api/collection/{}/count".format(
+                self.db_name, self.col_name
+            ))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
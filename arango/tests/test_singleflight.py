@@ -0,0 +1,186 @@
+"""Tests for coalescing identical concurrent requests."""
+
+import threading
+import unittest
+from arango.singleflight import SingleFlight
+from arango.tests.server import FakeArangoServer
+from arango.tests.utils import (
+    get_next_db_name,
+    get_next_col_name,
+    get_next_graph_name,
+)
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_error_is_shared(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            release.wait()
+            raise ValueError("boom")
+
+        def call():
+            try:
+                flight.do("key", fail)
+            except ValueError as err:
+                errors.append(err)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        while flight.coalesced == 0:
+            pass
+        release.set()
+        leader.join()
+        follower.join()
+        self.assertEqual(len(errors), 2)
+        self.assertIs(errors[0], errors[1])
+        # Nothing is cached once the call is done
+        self.assertEqual(flight.do("key", lambda: 1), 1)
+
+    def test_result_copies(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def work():
+            started.set()
+            release.wait()
+            return {"value": 1}
+
+        def call():
+            results.append(flight.do("key", work, copy=dict))
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        while flight.coalesced < 2:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [{"value": 1}] * 3)
+        self.assertEqual(len(set(map(id, results))), 3)
+        # Not copied when the call was not shared
+        result = {}
+        self.assertIs(flight.do("key", lambda: result, copy=dict), result)
+
+
+class CoalescingTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeArangoServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.server.latency = 0
+        self.arango = self.server.connect(coalesce=True)
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.col = self.db.add_collection(self.col_name)
+
+    def tearDown(self):
+        self.server.latency = 0
+        self.arango.remove_database(self.db_name)
+
+    def run_concurrently(self, func, threads=8):
+        """Call ``func`` from several threads at once.
+
+        :returns: the results and the number of requests made
+        :rtype: tuple
+        """
+        results = []
+        barrier = threading.Event()
+
+        def work():
+            barrier.wait()
+            results.append(func())
+
+        workers = [threading.Thread(target=work) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        count = self.server.request_count
+        self.server.latency = 0.2
+        barrier.set()
+        for worker in workers:
+            worker.join()
+        self.server.latency = 0
+        return results, self.server.request_count - count
+
+    def test_get_document(self):
+        self.col.add_document({"_key": "doc01", "value": 1})
+        results, requests = self.run_concurrently(
+            lambda: self.col.get_document("doc01")
+        )
+        self.assertEqual(requests, 1)
+        self.assertEqual([r["value"] for r in results], [1] * 8)
+        # Every caller gets its own document
+        self.assertEqual(len(set(map(id, results))), 8)
+        results[0]["value"] = 2
+        self.assertEqual([r["value"] for r in results[1:]], [1] * 7)
+
+    def test_properties_and_collections(self):
+        results, requests = self.run_concurrently(
+            lambda: self.col.properties
+        )
+        self.assertEqual(requests, 1)
+        self.assertEqual(results[0]["name"], self.col_name)
+        results, requests = self.run_concurrently(
+            lambda: self.db.collections
+        )
+        self.assertEqual(requests, 1)
+        self.assertIn(self.col_name, results[0]["user"])
+
+    def test_graph_properties(self):
+        graph_name = get_next_graph_name(self.db)
+        graph = self.db.add_graph(graph_name)
+        results, requests = self.run_concurrently(lambda: graph.properties)
+        self.assertEqual(requests, 1)
+        self.assertEqual(results[0]["name"], graph_name)
+
+    def test_execute_query(self):
+        self.col.bulk_import([{"value": i} for i in range(10)])
+        query = "FOR d IN {} RETURN d".format(self.col_name)
+        results, requests = self.run_concurrently(
+            lambda: list(self.db.execute_query(query, batch_size=4))
+        )
+        # One cursor is created, read to the end and deleted
+        self.assertEqual(requests, 4)
+        for result in results:
+            self.assertEqual(
+                sorted(doc["value"] for doc in result), list(range(10))
+            )
+        # Every caller gets its own documents
+        documents = [doc for result in results for doc in result]
+        self.assertEqual(len(set(map(id, documents))), 80)
+
+    def test_modifying_query_not_coalesced(self):
+        self.server.add_query_handler(
+            r"^INSERT", lambda db, query, bind_vars: []
+        )
+        _, requests = self.run_concurrently(
+            lambda: list(self.db.execute_query(
+                "INSERT {{}} IN {}".format(self.col_name)
+            )),
+            threads=3
+        )
+        self.assertEqual(requests, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""Tests for the slow operation log."""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from arango.response import ArangoResponse
+from arango.slowlog import SlowLog, shape, template_path
+from arango.tests.server import FakeArangoServer
+from arango.tests.utils import (
+    get_next_col_name,
+    get_next_db_name
+)
+
+
+class SlowLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.res = ArangoResponse(200, '{"result": []}')
+
+    def test_template_path(self):
+        self.assertEqual(
+            template_path("/_api/document/students/12345"),
+            "/_api/document/{}/{}"
+        )
+        self.assertEqual(
+            template_path("/_api/collection/students/properties"),
+            "/_api/collection/{}/properties"
+        )
+        self.assertEqual(
+            template_path("/_api/gharial/school/vertex/students/1"),
+            "/_api/gharial/{}/vertex/{}/{}"
+        )
+        self.assertEqual(template_path("/_api/cursor"), "/_api/cursor")
+
+    def test_shape(self):
+        self.assertEqual(
+            [shape(value) for value in
+             (None, True, "s", 1, 1.5, [1, 2], {"a": 1}, object())],
+            ["null", "bool", "string", "number", "number", "array[2]",
+             "object[1]", "object"]
+        )
+
+    def test_threshold_and_ring_buffer(self):
+        log = SlowLog(threshold=0.5, capacity=2)
+        self.assertIsNone(log.observe("GET", "/_api/version", "_system",
+                                      0.1, self.res))
+        for seconds in (0.5, 0.6, 0.7):
+            log.observe("GET", "/_api/version", "_system", seconds, self.res)
+        self.assertEqual(
+            [record["duration"] for record in log.records], [0.6, 0.7]
+        )
+        record = log.records[-1]
+        self.assertEqual(record["method"], "GET")
+        self.assertEqual(record["database"], "_system")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["bytes"], len(self.res.text))
+        self.assertNotIn("query", record)
+        log.clear()
+        self.assertEqual(log.records, [])
+
+    def test_query_record(self):
+        log = SlowLog(threshold=0)
+        record = log.observe(
+            "POST", "/_api/cursor", "db", 1.0, self.res,
+            {"query": "FOR d IN @@col RETURN d",
+             "bindVars": {"@col": "students", "keys": [1, 2, 3]}}
+        )
+        self.assertEqual(record["query"], "FOR d IN @@col RETURN d")
+        self.assertEqual(
+            record["bind_vars"], {"@col": "string", "keys": "array[3]"}
+        )
+
+    def test_sampling(self):
+        log = SlowLog(threshold=0, sample_rate=0.25, capacity=10000)
+        log._random.seed(0)
+        for _ in range(4000):
+            log.observe("GET", "/_api/version", "_system", 1, self.res)
+        self.assertTrue(800 < len(log.records) < 1200)
+        log = SlowLog(threshold=0, sample_rate=0)
+        log.observe("GET", "/_api/version", "_system", 1, self.res)
+        self.assertEqual(log.records, [])
+
+    def test_rotating_file(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, "slow.log")
+            log = SlowLog(threshold=0, path=path, max_bytes=1000,
+                          backup_count=2)
+            for i in range(50):
+                log.observe("GET", "/_api/document/col/{}".format(i), "db",
+                            i, self.res)
+            log.close()
+            self.assertEqual(
+                sorted(os.listdir(tmp_dir)),
+                ["slow.log", "slow.log.1", "slow.log.2"]
+            )
+            with io.open(path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+            self.assertEqual(records[-1]["duration"], 49)
+            self.assertEqual(records[-1]["path"], "/_api/document/{}/{}")
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class SlowLogConnectionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeArangoServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def tearDown(self):
+        self.server.latency = 0
+
+    def test_slow_operations_are_logged(self):
+        arango = self.server.connect(slow_log=0.05)
+        db_name = get_next_db_name(arango)
+        db = arango.add_database(db_name)
+        try:
+            col = db.add_collection(get_next_col_name(db))
+            col.add_document({"_key": "1"})
+            self.assertEqual(arango.slow_log.records, [])
+            self.server.latency = 0.05
+            col.get_document("1")
+            list(db.execute_query(
+                "FOR d IN @@col RETURN d", bind_vars={"@col": col.name}
+            ))
+            self.server.latency = 0
+            records = arango.slow_log.records
+            self.assertEqual(
+                [(r["method"], r["path"]) for r in records],
+                [("GET", "/_api/document/{}/{}"), ("POST", "/_api/cursor")]
+            )
+            self.assertEqual(records[0]["database"], db_name)
+            self.assertGreaterEqual(records[0]["duration"], 0.05)
+            self.assertEqual(records[1]["query"], "FOR d IN @@col RETURN d")
+            self.assertEqual(records[1]["bind_vars"], {"@col": "string"})
+        finally:
+            arango.remove_database(db_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
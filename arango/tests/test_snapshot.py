@@ -0,0 +1,189 @@
+"""Tests for local graph snapshots."""
+
+import unittest
+
+from arango import Arango
+from arango import snapshot
+from arango.tests.utils import (
+    get_next_graph_name,
+    get_next_col_name,
+    get_next_db_name
+)
+
+
+class GraphSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.arango = Arango()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.vertex_col_name = get_next_col_name(self.db)
+        self.vertex_col = self.db.add_collection(self.vertex_col_name)
+        self.edge_col_name = get_next_col_name(self.db)
+        self.edge_col = self.db.add_collection(
+            self.edge_col_name, is_edge=True
+        )
+        self.graph = self.db.add_graph(
+            name=get_next_graph_name(self.db),
+            edge_definitions=[{
+                "collection": self.edge_col_name,
+                "from": [self.vertex_col_name],
+                "to": [self.vertex_col_name]
+            }],
+        )
+        self.vertex_col.bulk_import(
+            [{"_key": key} for key in ("a", "b", "c", "d", "e")]
+        )
+        # a -> b -> c -> a, b -> d, d -> d, e isolated
+        self.edge_col.bulk_import([
+            self.edge(key, source, target) for key, source, target in (
+                ("ab", "a", "b"), ("bc", "b", "c"), ("ca", "c", "a"),
+                ("bd", "b", "d"), ("dd", "d", "d"),
+            )
+        ])
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def vertex(self, key):
+        return "{}/{}".format(self.vertex_col_name, key)
+
+    def edge(self, key, source, target):
+        return {"_key": key, "_from": self.vertex(source),
+                "_to": self.vertex(target)}
+
+    def test_contents(self):
+        snap = self.graph.snapshot(batch_size=2)
+        self.assertEqual((snap.vertex_count, snap.edge_count), (4, 5))
+        self.assertEqual(
+            sorted(snap.vertex_ids),
+            [self.vertex(key) for key in "abcd"]
+        )
+        self.assertIsNone(snap.index(self.vertex("e")))
+        self.assertEqual(
+            snap.neighbors(self.vertex("b")),
+            [self.vertex("c"), self.vertex("d")]
+        )
+        self.assertEqual(
+            snap.neighbors(self.vertex("b"), direction="inbound"),
+            [self.vertex("a")]
+        )
+        self.assertEqual(
+            snap.neighbors(self.vertex("d"), direction="any"),
+            [self.vertex("b"), self.vertex("d")]
+        )
+        offsets, neighbors, edges = snap.csr("outbound")
+        self.assertEqual(len(offsets), 5)
+        self.assertEqual(len(neighbors), 5)
+        vertex = snap.index(self.vertex("c"))
+        start = offsets[vertex]
+        self.assertEqual(offsets[vertex + 1] - start, 1)
+        self.assertEqual(snap.vertex_ids[neighbors[start]], self.vertex("a"))
+        self.assertEqual(
+            snap.edge_id(edges[start]),
+            "{}/ca".format(self.edge_col_name)
+        )
+        self.assertRaises(ValueError, snap.csr, "any")
+
+    def test_traverse_matches_server(self):
+        snap = self.graph.snapshot()
+        for options in (
+            {"direction": "outbound"},
+            {"direction": "inbound", "strategy": "breadthfirst"},
+            {"direction": "any", "max_depth": 3},
+            {"direction": "any", "min_depth": 2, "max_depth": 3,
+             "strategy": "breadthfirst"},
+            {"direction": "outbound",
+             "uniqueness": {"vertices": "global", "edges": "global"}},
+            {"direction": "any", "strategy": "breadthfirst",
+             "uniqueness": {"vertices": "path", "edges": "path"}},
+        ):
+            expected = self.graph.execute_traversal(
+                self.vertex("a"), **options
+            )["visited"]
+            visited = snap.traverse(self.vertex("a"), **options)["visited"]
+            self.assertEqual(
+                visited["vertices"],
+                [vertex["_id"] for vertex in expected["vertices"]]
+            )
+            self.assertEqual(visited["paths"], [
+                {"vertices": [v["_id"] for v in path["vertices"]],
+                 "edges": [e["_id"] for e in path["edges"]]}
+                for path in expected["paths"]
+            ])
+
+    def test_traverse(self):
+        snap = self.graph.snapshot()
+        visited = snap.traverse(
+            self.vertex("a"), min_depth=2, max_depth=2, paths=False
+        )["visited"]
+        self.assertEqual(
+            visited, {"vertices": [self.vertex("c"), self.vertex("d")]}
+        )
+        self.assertEqual(
+            snap.traverse(self.vertex("e"))["visited"]["vertices"],
+            [self.vertex("e")]
+        )
+        self.assertRaises(ValueError, snap.traverse, self.vertex("a"),
+                          direction="sideways")
+        self.assertRaises(ValueError, snap.traverse, self.vertex("a"),
+                          uniqueness={"vertices": "once"})
+
+    def test_refresh(self):
+        snap = self.graph.snapshot()
+        self.assertEqual(snap.refresh(), [])
+        self.edge_col.remove_document("bd")
+        self.edge_col.remove_document("dd")
+        self.edge_col.add_document(self.edge("ae", "a", "e"))
+        self.assertEqual(snap.refresh(), [self.edge_col_name])
+        self.assertIsNone(snap.index(self.vertex("d")))
+        self.assertEqual((snap.vertex_count, snap.edge_count), (4, 4))
+        self.assertEqual(
+            snap.neighbors(self.vertex("a")),
+            [self.vertex("b"), self.vertex("e")]
+        )
+        # A new edge collection of the graph is loaded as well
+        other_name = get_next_col_name(self.db)
+        self.graph.add_edge_definition(
+            other_name, [self.vertex_col_name], [self.vertex_col_name]
+        )
+        self.db.collection(other_name).add_document(self.edge("x", "e", "c"))
+        self.assertEqual(snap.refresh(), [other_name])
+        self.assertEqual(snap.edge_count, 5)
+        self.assertEqual(snap.neighbors(self.vertex("e")), [self.vertex("c")])
+        self.graph.remove_edge_definition(other_name)
+        self.assertEqual(snap.refresh(), [])
+        self.assertEqual(snap.neighbors(self.vertex("e")), [])
+
+    def test_isolated(self):
+        snap = self.graph.snapshot(isolated=True)
+        self.assertEqual((snap.vertex_count, snap.edge_count), (5, 5))
+        self.assertIsNotNone(snap.index(self.vertex("e")))
+        self.assertEqual(snap.neighbors(self.vertex("e")), [])
+        self.assertEqual(snap.refresh(), [])
+        # Vertices without edges come and go with their collection
+        self.vertex_col.add_document({"_key": "f"})
+        self.vertex_col.remove_document("e")
+        self.assertEqual(snap.refresh(), [self.vertex_col_name])
+        self.assertIsNone(snap.index(self.vertex("e")))
+        self.assertIsNotNone(snap.index(self.vertex("f")))
+        self.assertEqual(snap.vertex_count, 5)
+        self.assertEqual(
+            snap.neighbors(self.vertex("b")),
+            [self.vertex("c"), self.vertex("d")]
+        )
+
+    def test_without_numpy(self):
+        numpy = snapshot.numpy
+        snapshot.numpy = None
+        try:
+            snap = self.graph.snapshot()
+        finally:
+            snapshot.numpy = numpy
+        expected = self.graph.snapshot()
+        for direction in ("outbound", "inbound"):
+            self.assertEqual(snap.csr(direction), expected.csr(direction))
+
+
+if __name__ == "__main__":
+    unittest.main()
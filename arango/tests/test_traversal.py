@@ -3,6 +3,8 @@
 import unittest
 
 from arango import Arango
+from arango.exceptions import ServerVersionError
+from arango.tests.server import FakeArangoServer
 from arango.tests.utils import (
     get_next_graph_name,
     get_next_col_name,
@@ -102,5 +104,107 @@ class EdgeManagementTest(unittest.TestCase):
             ]
         )
 
+
+class StreamedTraversalTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # The AQL traversal syntax needs ArangoDB 2.8
+        cls.server = FakeArangoServer(version="2.8.0").start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.arango = self.server.connect()
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.vertex_col_name = get_next_col_name(self.db)
+        self.vertex_col = self.db.add_collection(self.vertex_col_name)
+        self.edge_col_name = get_next_col_name(self.db)
+        self.edge_col = self.db.add_collection(
+            self.edge_col_name, is_edge=True
+        )
+        self.graph = self.db.add_graph(
+            name=get_next_graph_name(self.db),
+            edge_definitions=[{
+                "collection": self.edge_col_name,
+                "from": [self.vertex_col_name],
+                "to": [self.vertex_col_name]
+            }],
+        )
+        self.vertex_col.bulk_import([{"_key": key} for key in "abcd"])
+        # a -> b -> c -> a, b -> d
+        self.edge_col.bulk_import([
+            {"_from": self.vertex(source), "_to": self.vertex(target)}
+            for source, target in (("a", "b"), ("b", "c"), ("c", "a"),
+                                   ("b", "d"))
+        ])
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def vertex(self, key):
+        return "{}/{}".format(self.vertex_col_name, key)
+
+    def test_stream_matches_traversal(self):
+        for options in (
+            {"direction": "outbound", "max_depth": 3},
+            {"direction": "any", "max_depth": 2,
+             "strategy": "breadthfirst"},
+            {"direction": "inbound", "min_depth": 1, "max_depth": 4,
+             "uniqueness": {"vertices": "global", "edges": "path"}},
+        ):
+            expected = self.graph.execute_traversal(
+                self.vertex("a"), **options
+            )["visited"]
+            cursor = self.graph.execute_traversal(
+                self.vertex("a"), stream=True, batch_size=2, **options
+            )
+            results = list(cursor)
+            self.assertEqual(
+                [result["vertex"] for result in results],
+                expected["vertices"]
+            )
+            self.assertEqual(
+                [result["path"] for result in results], expected["paths"]
+            )
+            vertices = self.graph.execute_traversal(
+                self.vertex("a"), stream=True, paths=False, **options
+            )
+            self.assertEqual(list(vertices), expected["vertices"])
+
+    def test_stream_unsupported(self):
+        start = self.vertex("a")
+        self.assertRaises(ValueError, self.graph.execute_traversal, start,
+                          direction="outbound", stream=True)
+        self.assertRaises(ValueError, self.graph.execute_traversal, start,
+                          max_depth=1, stream=True)
+        self.assertRaises(ValueError, self.graph.execute_traversal, start,
+                          direction="outbound", max_depth=1,
+                          order="postorder", stream=True)
+        self.assertRaises(ValueError, self.graph.execute_traversal, start,
+                          direction="outbound", max_depth=1,
+                          visitor="return;", stream=True)
+        self.assertRaises(ValueError, self.graph.execute_traversal, start,
+                          direction="outbound", max_depth=1,
+                          uniqueness={"edges": "global"}, stream=True)
+
+    def test_stream_old_server(self):
+        self.server.version = "2.4.0"
+        try:
+            graph = self.server.connect().db(self.db_name).graph(
+                self.graph.name
+            )
+            self.assertRaises(
+                ServerVersionError, graph.execute_traversal,
+                self.vertex("a"), direction="outbound", max_depth=1,
+                stream=True
+            )
+        finally:
+            self.server.version = "2.8.0"
+
+
 if __name__ == "__main__":
     unittest.main()
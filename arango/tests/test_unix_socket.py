@@ -0,0 +1,185 @@
+"""Tests for the unix domain socket transport."""
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from arango import Arango
+from arango.api import ArangoAPI
+from arango.clients.unix import UnixSocketArangoClient, split_unix_url
+from arango.tests.server import FakeArangoServer
+from arango.tests.utils import (
+    get_next_db_name,
+    get_next_col_name,
+)
+
+
+class UnixSocketURLTest(unittest.TestCase):
+
+    def test_tcp_url_prefix(self):
+        api = ArangoAPI(host="localhost", port=8529, db_name="db0")
+        self.assertFalse(api.is_unix)
+        self.assertEqual(api.url_prefix, "http://localhost:8529/_db/db0")
+
+    def test_unix_url_prefix(self):
+        api = ArangoAPI(protocol="unix", host="/tmp/arangodb.sock")
+        self.assertTrue(api.is_unix)
+        self.assertIsInstance(api.client, UnixSocketArangoClient)
+        self.assertEqual(
+            api.url_prefix,
+            "http+unix://%2Ftmp%2Farangodb.sock/_db/_system"
+        )
+
+    def test_unix_endpoint(self):
+        api = ArangoAPI(host="unix:///tmp/arangodb.sock", db_name="db0")
+        self.assertTrue(api.is_unix)
+        self.assertEqual(api.host, "/tmp/arangodb.sock")
+        self.assertEqual(
+            split_unix_url(api.url_prefix + "/_api/version?details=true"),
+            ("/tmp/arangodb.sock", "/_db/db0/_api/version?details=true")
+        )
+
+
+class UnixSocketTransportTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.socket_path = os.path.join(cls.tmp_dir, "arangodb.sock")
+        cls.server = FakeArangoServer(unix_socket=cls.socket_path).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        shutil.rmtree(cls.tmp_dir)
+
+    def setUp(self):
+        self.arango = Arango(host="unix://" + self.socket_path)
+        self.db_name = get_next_db_name(self.arango)
+        self.db = self.arango.add_database(self.db_name)
+        self.col_name = get_next_col_name(self.db)
+        self.col = self.db.add_collection(self.col_name)
+
+    def tearDown(self):
+        self.arango.remove_database(self.db_name)
+
+    def test_version(self):
+        self.assertEqual(self.arango.version, self.server.version)
+
+    def test_documents(self):
+        self.col.add_document({"_key": "doc01", "value": 1})
+        self.col.update_document("doc01", {"value": 2}, wait_for_sync=True)
+        self.assertEqual(self.col["doc01"]["value"], 2)
+        self.assertEqual(self.col.count, 1)
+        self.col.remove_document("doc01")
+        self.assertNotIn("doc01", self.col)
+
+    def test_cursor(self):
+        self.col.bulk_import([{"value": i} for i in range(25)])
+        cursor = self.db.execute_query(
+            "FOR d IN {} RETURN d.value".format(self.col_name),
+            batch_size=10
+        )
+        self.assertEqual(sorted(cursor), list(range(25)))
+
+    def test_batch(self):
+        self.db.execute_batch([
+            (self.col.add_document, [{"_key": "doc01"}], {}),
+            (self.col.add_document, [{"_key": "doc02"}], {}),
+        ])
+        self.assertEqual(self.col.count, 2)
+
+    def test_timeout_not_retried(self):
+        client = UnixSocketArangoClient(timeout=0.3)
+        arango = Arango(host="unix://" + self.socket_path, client=client)
+        col = arango.db(self.db_name).collection(self.col_name)
+        # The connection is reused by the slow request
+        col.add_document({"_key": "doc01"})
+        self.server.latency = lambda method, path: (
+            0.6 if method == "POST" else 0
+        )
+        try:
+            self.assertRaises(socket.timeout, col.add_document,
+                              {"value": 2})
+            time.sleep(0.5)
+        finally:
+            self.server.latency = 0
+        self.assertEqual(self.col.count, 2)
+
+    def test_threads_use_own_connections(self):
+        client = self.col._api.client
+        errors = []
+        connections = []
+
+        def read():
+            try:
+                for _ in range(20):
+                    self.col.count
+                connections.extend(client._local.connections.values())
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(set(map(id, connections))), 4)
+
+
+class StaleConnectionTest(unittest.TestCase):
+
+    RESPONSE = (
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        b"Content-Length: 2\r\n\r\n{}"
+    )
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmp_dir, "stale.sock")
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.socket_path)
+        self.listener.listen(1)
+        self.requests = []
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.listener.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def serve(self):
+        # Answer a single request per connection, then close it as an
+        # idle keep-alive connection would be closed
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except socket.error:
+                return
+            data = b""
+            while b"\r\n\r\n" not in data:
+                data += conn.recv(4096)
+            self.requests.append(data.split(b" ", 1)[0])
+            conn.sendall(self.RESPONSE)
+            time.sleep(0.05)
+            conn.close()
+
+    def test_stale_connection_retried(self):
+        client = UnixSocketArangoClient(timeout=5)
+        url = "http+unix://{}/_api/document".format(
+            self.socket_path.replace("/", "%2F")
+        )
+        self.assertEqual(client.get(url).status_code, 200)
+        time.sleep(0.2)
+        self.assertEqual(client.post(url, data="{}").status_code, 200)
+        self.assertEqual(self.requests, [b"GET", b"POST"])
+        client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Tests for the utility functions."""
+
+import threading
+import unittest
+
+from arango.utils import (
+    chunks,
+    consume_concurrently,
+    iter_chunks,
+    map_concurrently,
+)
+
+
+class ConcurrencyUtilsTest(unittest.TestCase):
+
+    def test_chunks(self):
+        self.assertEqual(chunks(range(5), 2), [[0, 1], [2, 3], [4]])
+        self.assertEqual(chunks([], 2), [])
+        self.assertRaises(ValueError, chunks, [1], 0)
+
+    def test_iter_chunks(self):
+        read = []
+
+        def generate():
+            for value in range(5):
+                read.append(value)
+                yield value
+
+        chunks_read = iter_chunks(generate(), 2)
+        self.assertEqual(next(chunks_read), [0, 1])
+        self.assertEqual(read, [0, 1])
+        self.assertEqual(list(chunks_read), [[2, 3], [4]])
+        self.assertEqual(list(iter_chunks([], 2)), [])
+        self.assertRaises(ValueError, next, iter_chunks([1], 0))
+
+    def test_consume_concurrently(self):
+        lock = threading.Lock()
+        state = {"held": 0, "max_held": 0}
+        done = []
+
+        def generate():
+            for value in range(40):
+                with lock:
+                    state["held"] += 1
+                    state["max_held"] = max(state["max_held"],
+                                            state["held"])
+                yield value
+
+        def consume(value):
+            with lock:
+                done.append(value)
+                state["held"] -= 1
+
+        consume_concurrently(consume, generate(), max_workers=4)
+        self.assertEqual(sorted(done), list(range(40)))
+        self.assertLessEqual(state["max_held"], 4)
+        del done[:]
+        consume_concurrently(done.append, iter(range(3)))
+        self.assertEqual(done, [0, 1, 2])
+
+    def test_consume_concurrently_error(self):
+        read = []
+
+        def generate():
+            for value in range(100):
+                read.append(value)
+                yield value
+
+        def check(value):
+            if value == 3:
+                raise ValueError(value)
+
+        with self.assertRaises(ValueError):
+            consume_concurrently(check, generate(), max_workers=2)
+        self.assertLess(len(read), 100)
+
+    def test_map_concurrently(self):
+        threads = set()
+
+        def square(value):
+            threads.add(threading.current_thread().name)
+            return value * value
+
+        self.assertEqual(
+            map_concurrently(square, range(50), max_workers=4),
+            [value * value for value in range(50)]
+        )
+        self.assertEqual(map_concurrently(square, [], max_workers=4), [])
+        threads.clear()
+        map_concurrently(square, range(5))
+        self.assertEqual(threads, {threading.current_thread().name})
+
+    def test_map_concurrently_error(self):
+        done = []
+
+        def check(value):
+            if value in (3, 7):
+                raise ValueError(value)
+            done.append(value)
+
+        with self.assertRaises(ValueError) as context:
+            map_concurrently(check, range(10), max_workers=3)
+        self.assertEqual(context.exception.args, (3,))
+        self.assertEqual(sorted(done), [0, 1, 2, 4, 5, 6, 8, 9])
+
+
+if __name__ == "__main__":
+    unittest.main()
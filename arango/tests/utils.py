@@ -1,6 +1,9 @@
 """Utility functions for testing."""
 
-import collections
+try:
+    from collections.abc import Iterable, Mapping
+except ImportError:
+    from collections import Iterable, Mapping
 
 
 def get_next_db_name(arango):
@@ -59,9 +62,9 @@ def strip_system_keys(obj):
     :returns: the document(s) with the system keys removed
     :rtype: list or dict
     """
-    if isinstance(obj, collections.Mapping):
+    if isinstance(obj, Mapping):
         return {k: v for k, v in obj.items() if not k.startswith("_")}
-    elif isinstance(obj, collections.Iterable):
+    elif isinstance(obj, Iterable):
         return [
             {k: v for k, v in document.items() if not k.startswith("_")}
             for document in obj
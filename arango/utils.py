@@ -1,7 +1,11 @@
 """Utility Functions."""
 
 import re
-import collections
+import threading
+try:
+    from collections.abc import Iterable, Mapping
+except ImportError:
+    from collections import Iterable, Mapping
 
 
 def is_string(obj):
@@ -28,9 +32,9 @@ def unicode_to_str(obj):
     """
     if is_string(obj):
         return str(obj)
-    elif isinstance(obj, collections.Mapping):
+    elif isinstance(obj, Mapping):
         return dict(map(unicode_to_str, obj.items()))
-    elif isinstance(obj, collections.Iterable):
+    elif isinstance(obj, Iterable):
         return type(obj)(map(unicode_to_str, obj))
     else:
         return obj
@@ -48,9 +52,9 @@ def camelify(obj):
     if is_string(obj):
         words = obj.split("_")
         return words[0] + "".join(word.title() for word in words[1:])
-    elif isinstance(obj, collections.Mapping):
+    elif isinstance(obj, Mapping):
         return dict(map(camelify, obj.items()))
-    elif isinstance(obj, collections.Iterable):
+    elif isinstance(obj, Iterable):
         return type(obj)(map(camelify, obj))
     else:
         return obj
@@ -67,9 +71,9 @@ def uncamelify(obj):
     """
     if is_string(obj):
         return re.sub('(?!^)([A-Z]+)', r'_\1', obj).lower()
-    elif isinstance(obj, collections.Mapping):
+    elif isinstance(obj, Mapping):
         return dict(map(uncamelify, obj.items()))
-    elif isinstance(obj, collections.Iterable):
+    elif isinstance(obj, Iterable):
         return type(obj)(map(uncamelify, obj))
     else:
         return obj
@@ -77,3 +81,145 @@ def uncamelify(obj):
 def filter_keys(dictionary, filtered):
     """Return a new dictionary with the specified keys filtered."""
     return {k: v for k, v in dictionary.items() if k not in filtered}
+
+
+def chunks(items, size):
+    """Split ``items`` into lists of at most ``size`` items.
+
+    :param items: the items to split
+    :type items: iterable
+    :param size: the maximum size of a chunk
+    :type size: int
+    :returns: the chunks
+    :rtype: list
+    """
+    if size < 1:
+        raise ValueError("chunk size must be at least 1")
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def iter_chunks(items, size):
+    """Yield lists of at most ``size`` items, reading ``items`` lazily.
+
+    Unlike ``chunks``, only the current chunk is held in memory, so the
+    items can come from a generator of any length.
+
+    :param items: the items to split
+    :type items: iterable
+    :param size: the maximum size of a chunk
+    :type size: int
+    :returns: the chunks
+    :rtype: generator
+    """
+    if size < 1:
+        raise ValueError("chunk size must be at least 1")
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def consume_concurrently(func, items, max_workers=1):
+    """Call ``func`` with each of ``items``, using threads if needed.
+
+    The items are read lazily, one at a time by whichever worker is free,
+    so at most ``max_workers`` of them are held at once. Once a call fails
+    no further items are read, and the exception of the first failed call
+    is raised when the calls in progress are done.
+
+    :param func: the function to call with each item
+    :type func: callable
+    :param items: the items
+    :type items: iterable
+    :param max_workers: the maximum number of concurrent calls
+    :type max_workers: int
+    """
+    items = iter(items)
+    if max_workers <= 1:
+        for item in items:
+            func(item)
+        return
+    errors = []
+    lock = threading.Lock()
+    missing = object()
+
+    def work():
+        while True:
+            with lock:
+                if errors:
+                    return
+                try:
+                    item = next(items, missing)
+                except Exception as err:
+                    errors.append(err)
+                    return
+            if item is missing:
+                return
+            try:
+                func(item)
+            except Exception as err:
+                with lock:
+                    errors.append(err)
+                return
+
+    workers = [threading.Thread(target=work) for _ in range(max_workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+
+
+def map_concurrently(func, items, max_workers=1):
+    """Return ``[func(item) for item in items]``, using threads if needed.
+
+    With more than one worker the items are processed by up to
+    ``max_workers`` threads. If any call fails, the exception of the first
+    failed item is raised once all calls are done.
+
+    :param func: the function to call with each item
+    :type func: callable
+    :param items: the items
+    :type items: list
+    :param max_workers: the maximum number of concurrent calls
+    :type max_workers: int
+    :returns: the results in the order of ``items``
+    :rtype: list
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    results = [None] * len(items)
+    errors = [None] * len(items)
+    pending = iter(range(len(items)))
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            with lock:
+                index = next(pending, None)
+            if index is None:
+                return
+            try:
+                results[index] = func(items[index])
+            except Exception as err:
+                errors[index] = err
+
+    workers = [
+        threading.Thread(target=work)
+        for _ in range(min(max_workers, len(items)))
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    for error in errors:
+        if error is not None:
+            raise error
+    return results
@@ -0,0 +1,374 @@
+"""Benchmark harness: registration, timing, allocation tracking and baselines.
+
+Benchmarks are registered with the :func:`benchmark` decorator. The decorated
+function receives a :class:`Context` and the benchmark parameter and returns
+the operation to time (a callable without arguments). The operation is
+called repeatedly and each call is timed individually, so every benchmark
+reports the throughput (ops/s) and the latency distribution (p50/p99). The
+operation is then run a few more times with ``tracemalloc`` enabled to
+measure the peak memory allocated per call.
+"""
+
+import gc
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    timer = time.perf_counter
+except AttributeError:
+    timer = time.time
+
+from arango import Arango
+
+
+# All registered benchmarks in registration order
+BENCHMARKS = []
+
+# The attributes compared against the baseline and whether higher is better
+METRICS = (
+    ("ops_per_sec", True),
+    ("p50_ms", False),
+    ("p99_ms", False),
+    ("alloc_kb", False),
+)
+
+
+class Benchmark(object):
+    """A registered benchmark.
+
+    :param name: the name of the benchmark (``group.case``)
+    :type name: str
+    :param func: the function returning the operation to time
+    :type func: callable
+    :param param: the parameter passed to ``func``
+    :type param: object
+    :param server: whether or not the benchmark needs the stand-in server
+    :type server: bool
+    :param iterations: the default number of timed calls
+    :type iterations: int
+    """
+
+    def __init__(self, name, func, param=None, server=True, iterations=200):
+        self.name = name
+        self.func = func
+        self.param = param
+        self.server = server
+        self.iterations = iterations
+
+    def __repr__(self):
+        return "<Benchmark {}>".format(self.name)
+
+
+def benchmark(group, params=(None,), server=True, iterations=200):
+    """Register the decorated function as one benchmark per parameter.
+
+    :param group: the name of the benchmark group
+    :type group: str
+    :param params: the parameters to run the benchmark with
+    :type params: list
+    :param server: whether or not the benchmark needs the stand-in server
+    :type server: bool
+    :param iterations: the number of timed calls, or a function mapping
+        the parameter to the number of timed calls
+    :type iterations: int or callable
+    """
+    def register(func):
+        for param in params:
+            name = group if param is None else "{}[{}]".format(group, param)
+            count = iterations(param) if callable(iterations) else iterations
+            BENCHMARKS.append(
+                Benchmark(name, func, param, server, max(1, count))
+            )
+        return func
+    return register
+
+
+class Context(object):
+    """What a benchmark needs to set itself up.
+
+    ``arango`` is None for benchmarks which do not need the server. Every
+    benchmark gets a fresh database which is removed afterwards. Metrics
+    specific to a benchmark (e.g. a compression ratio) can be added to
+    ``metrics``; they are reported along with the timings.
+
+    :param arango: the connection to the stand-in server
+    :type arango: arango.Arango or None
+    :param db_name: the name of the scratch database
+    :type db_name: str
+    :param server: the stand-in server process
+    :type server: ServerProcess or None
+    """
+
+    def __init__(self, arango=None, db_name=None, server=None):
+        self.arango = arango
+        self.db = arango.add_database(db_name) if arango else None
+        self.db_name = db_name
+        self.server = server
+        self.metrics = {}
+        self._col_count = 0
+        self._tmp_dir = None
+
+    def connect(self, **kwargs):
+        """Return the scratch database through a new connection.
+
+        :param kwargs: the keyword arguments for ``arango.Arango``
+        :returns: the scratch database
+        :rtype: arango.database.Database
+        """
+        return self.server.connect(**kwargs).db(self.db_name)
+
+    def new_collection(self, is_edge=False):
+        """Create and return a new collection in the scratch database."""
+        self._col_count += 1
+        return self.db.add_collection(
+            "col{}".format(self._col_count), is_edge=is_edge
+        )
+
+    def temp_path(self, name):
+        """Return a path in a scratch directory removed afterwards.
+
+        :param name: the file name
+        :type name: str
+        :returns: the file path
+        :rtype: str
+        """
+        if self._tmp_dir is None:
+            self._tmp_dir = tempfile.mkdtemp()
+        return os.path.join(self._tmp_dir, name)
+
+    def close(self):
+        if self.arango is not None:
+            self.arango.remove_database(self.db_name)
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir)
+
+
+def percentile(samples, fraction):
+    """Return the given percentile of the sorted ``samples``."""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(round(fraction * (len(samples) - 1))))
+    return samples[index]
+
+
+def measure(operation, iterations, alloc_iterations=5):
+    """Time ``operation`` and measure its allocations.
+
+    :param operation: the operation to run
+    :type operation: callable
+    :param iterations: the number of timed calls
+    :type iterations: int
+    :param alloc_iterations: the number of calls traced for allocations
+    :type alloc_iterations: int
+    :returns: the metrics of the operation
+    :rtype: dict
+    """
+    # Warm up caches, connections and lazily imported modules
+    operation()
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            start = timer()
+            operation()
+            samples.append(timer() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    samples.sort()
+    total = sum(samples)
+    result = {
+        "iterations": iterations,
+        "ops_per_sec": iterations / total if total else float("inf"),
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "alloc_kb": None,
+    }
+    if tracemalloc is not None and alloc_iterations:
+        peaks = []
+        for _ in range(alloc_iterations):
+            tracemalloc.start()
+            try:
+                operation()
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        result["alloc_kb"] = sum(peaks) / 1024.0 / len(peaks)
+    return result
+
+
+class ServerProcess(object):
+    """The stand-in ArangoDB server running in a child process.
+
+    Running it out of process keeps its CPU time and its allocations out of
+    the numbers reported for the driver.
+
+    :param latency: the delay the server injects into every request
+    :type latency: float
+    :param unix_socket: serve on this unix socket path instead of TCP
+    :type unix_socket: str or None
+    :param args: additional command line arguments for the server
+    :type args: list
+    """
+
+    def __init__(self, latency=0, unix_socket=None, args=()):
+        self.unix_socket = unix_socket
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        self.port = sock.getsockname()[1]
+        sock.close()
+        # The benchmarks cover features up to ArangoDB 2.8 (e.g. AQL
+        # graph traversals)
+        args = ["--port", str(self.port), "--latency", str(latency),
+                "--version", "2.8.0"] + list(args)
+        if unix_socket is not None:
+            args += ["--unix-socket", unix_socket]
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            [root] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+        )
+        self._devnull = open(os.devnull, "w")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "arango.tests.server"] + args,
+            env=env, stdout=self._devnull, stderr=self._devnull,
+        )
+
+    def connect(self, timeout=10, **kwargs):
+        """Return a connection once the server accepts requests."""
+        deadline = time.time() + timeout
+        while True:
+            try:
+                if self.unix_socket is not None:
+                    return Arango(
+                        protocol="unix", host=self.unix_socket, **kwargs
+                    )
+                return Arango(host="127.0.0.1", port=self.port, **kwargs)
+            except Exception:
+                if time.time() > deadline or self.process.poll() is not None:
+                    raise
+                time.sleep(0.05)
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait()
+        self._devnull.close()
+
+
+def run(benchmarks, latency=0, scale=1.0, unix_socket=None, server_args=(),
+        out=sys.stdout):
+    """Run the given benchmarks and return their results by name.
+
+    :param benchmarks: the benchmarks to run
+    :type benchmarks: list
+    :param latency: the delay the server injects into every request
+    :type latency: float
+    :param scale: the factor applied to the number of iterations
+    :type scale: float
+    :param unix_socket: talk to the server over this unix socket path
+    :type unix_socket: str or None
+    :param server_args: additional command line arguments for the server
+    :type server_args: list
+    :returns: the metrics of each benchmark
+    :rtype: dict
+    """
+    server = None
+    arango = None
+    results = {}
+    try:
+        for number, bench in enumerate(benchmarks):
+            if bench.server and server is None:
+                server = ServerProcess(latency, unix_socket, server_args)
+                arango = server.connect()
+            context = Context(
+                arango if bench.server else None, "bench{}".format(number),
+                server
+            )
+            try:
+                operation = bench.func(context, bench.param)
+                iterations = max(1, int(bench.iterations * scale))
+                results[bench.name] = measure(operation, iterations)
+                results[bench.name].update(context.metrics)
+            finally:
+                context.close()
+            out.write(format_row(bench.name, results[bench.name]) + "\n")
+            out.flush()
+    finally:
+        if server is not None:
+            server.stop()
+    return results
+
+
+def format_row(name, result):
+    alloc = result["alloc_kb"]
+    row = "{:<40} {:>12.1f} ops/s  p50 {:>9.3f} ms  p99 {:>9.3f} ms  " \
+          "alloc {:>10} KB".format(
+              name, result["ops_per_sec"], result["p50_ms"], result["p99_ms"],
+              "-" if alloc is None else "{:.1f}".format(alloc)
+          )
+    standard = set(metric for metric, _ in METRICS) | {"iterations"}
+    extra = sorted(key for key in result if key not in standard)
+    for key in extra:
+        value = result[key]
+        row += "  {}={}".format(
+            key, "{:.3f}".format(value) if isinstance(value, float) else value
+        )
+    return row
+
+
+def load_baseline(path):
+    """Return the results stored in the baseline file at ``path``."""
+    with open(path) as baseline_file:
+        return json.load(baseline_file)["benchmarks"]
+
+
+def save_baseline(path, results):
+    """Store ``results`` as the baseline at ``path``."""
+    with open(path, "w") as baseline_file:
+        json.dump(
+            {"python": sys.version.split()[0], "benchmarks": results},
+            baseline_file, indent=2, sort_keys=True
+        )
+        baseline_file.write("\n")
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Compare ``results`` against ``baseline``.
+
+    A metric regresses when it is worse than the baseline by more than
+    ``tolerance`` (a fraction of the baseline value).
+
+    :param results: the metrics of each benchmark
+    :type results: dict
+    :param baseline: the baseline metrics of each benchmark
+    :type baseline: dict
+    :param tolerance: the allowed relative regression
+    :type tolerance: float
+    :returns: the (name, metric, baseline, current) regressions
+    :rtype: list
+    """
+    regressions = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        for metric, higher_is_better in METRICS:
+            old = baseline[name].get(metric)
+            new = results[name].get(metric)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if higher_is_better \
+                else (new - old) / old
+            if change > tolerance:
+                regressions.append((name, metric, old, new))
+    return regressions
@@ -0,0 +1,117 @@
+"""Run the driver benchmarks against the stand-in ArangoDB server.
+
+Usage::
+
+    python benchmarks/run.py                      # run and compare
+    python benchmarks/run.py -k cursor            # only matching benchmarks
+    python benchmarks/run.py --save-baseline      # store a new baseline
+
+The exit status is 1 if any metric regressed beyond the tolerance compared
+to the baseline.
+"""
+
+import argparse
+import fnmatch
+import os
+import shutil
+import sys
+import tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import harness
+import suites
+
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="py-arango benchmarks")
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="only run benchmarks matching this substring "
+                             "or glob (may be repeated)")
+    parser.add_argument("--list", action="store_true",
+                        help="list the benchmarks and exit")
+    parser.add_argument("--latency", type=float, default=0,
+                        help="delay the server injects into every request")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="factor applied to the number of iterations")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="the baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative regression (default 0.25)")
+    parser.add_argument("--unix", action="store_true",
+                        help="talk to the server over a unix domain socket")
+    parser.add_argument("--bandwidth", type=int,
+                        help="simulated bandwidth in bytes per second")
+    parser.add_argument("--compression-threshold", type=int,
+                        help="let the server compress responses of at "
+                             "least this many bytes")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    benchmarks = [
+        bench for bench in harness.BENCHMARKS
+        if not args.filter or any(
+            pattern in bench.name or fnmatch.fnmatch(bench.name, pattern)
+            for pattern in args.filter
+        )
+    ]
+    if args.list:
+        for bench in benchmarks:
+            print(bench.name)
+        return 0
+
+    server_args = []
+    if args.bandwidth:
+        server_args += ["--bandwidth", str(args.bandwidth)]
+    if args.compression_threshold is not None:
+        server_args += [
+            "--compression-threshold", str(args.compression_threshold)
+        ]
+    tmp_dir = tempfile.mkdtemp() if args.unix else None
+    try:
+        results = harness.run(
+            benchmarks,
+            latency=args.latency,
+            scale=args.scale,
+            unix_socket=os.path.join(tmp_dir, "arangodb.sock")
+            if tmp_dir else None,
+            server_args=server_args,
+        )
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir)
+    if args.output:
+        harness.save_baseline(args.output, results)
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            baseline = harness.load_baseline(args.baseline)
+        baseline.update(results)
+        harness.save_baseline(args.baseline, baseline)
+        print("\nBaseline saved to {}".format(args.baseline))
+        return 0
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline at {}".format(args.baseline))
+        return 0
+
+    regressions = harness.compare(
+        results, harness.load_baseline(args.baseline), args.tolerance
+    )
+    if not regressions:
+        print("\nNo regressions against {}".format(args.baseline))
+        return 0
+    print("\nRegressions against {}:".format(args.baseline))
+    for name, metric, old, new in regressions:
+        print("  {:<40} {:<12} {:>12.3f} -> {:>12.3f}".format(
+            name, metric, old, new
+        ))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,541 @@
+"""Benchmarks of the driver's hot paths."""
+
+import collections
+import itertools
+import json
+
+from arango import analytics
+from arango.compression import Compression, compress, decompress
+from arango.keys import ShardedCounterKeys, key_allocator
+from arango.rows import RowFactory
+from arango.response import ArangoResponse
+from arango.utils import uncamelify
+
+from harness import benchmark
+
+
+###################
+# Single Document #
+###################
+
+@benchmark("document.add")
+def document_add(context, param):
+    col = context.new_collection()
+    return lambda: col.add_document({"value": 1, "text": "benchmark"})
+
+
+@benchmark("document.get")
+def document_get(context, param):
+    col = context.new_collection()
+    col.add_document({"_key": "doc", "value": 1})
+    return lambda: col.get_document("doc")
+
+
+@benchmark("document.update")
+def document_update(context, param):
+    col = context.new_collection()
+    col.add_document({"_key": "doc", "value": 1})
+    values = itertools.count()
+    return lambda: col.update_document("doc", {"value": next(values)})
+
+
+@benchmark("document.replace")
+def document_replace(context, param):
+    col = context.new_collection()
+    col.add_document({"_key": "doc", "value": 1})
+    values = itertools.count()
+    return lambda: col.replace_document("doc", {"value": next(values)})
+
+
+@benchmark("document.remove")
+def document_remove(context, param):
+    col = context.new_collection()
+    keys = itertools.count()
+
+    def remove():
+        key = str(next(keys))
+        col.add_document({"_key": key})
+        col.remove_document(key)
+    return remove
+
+
+@benchmark("document.save", params=("replace", "tracked"))
+def document_save(context, param):
+    col = context.new_collection()
+    col.add_document({
+        "_key": "doc", "counter": 0,
+        "items": [{"id": i, "text": "item {}".format(i)} for i in range(5000)],
+    })
+    doc = col.get_document("doc", tracked=param == "tracked")
+
+    def run():
+        doc["counter"] += 1
+        if param == "tracked":
+            doc.save()
+        else:
+            doc["_rev"] = col.replace_document("doc", doc)["_rev"]
+    return run
+
+
+@benchmark("document.contains_many", params=(1000, 10000),
+           iterations=lambda keys: max(5, 20000 // keys))
+def document_contains_many(context, keys):
+    col = context.new_collection()
+    col.bulk_import([{"_key": str(i)} for i in range(0, keys, 2)])
+    candidates = [str(i) for i in range(keys)]
+    return lambda: col.contains_many(candidates)
+
+
+@benchmark("document.update_many", params=(100, 1000),
+           iterations=lambda docs: max(5, 5000 // docs))
+def document_update_many(context, docs):
+    col = context.new_collection()
+    col.bulk_import([{"_key": str(i), "value": i} for i in range(docs)])
+    values = itertools.count()
+
+    def run():
+        value = next(values)
+        col.update_many([(str(i), {"value": value}) for i in range(docs)])
+    return run
+
+
+@benchmark("document.upsert_many", params=(100, 1000),
+           iterations=lambda docs: max(5, 5000 // docs))
+def document_upsert_many(context, docs):
+    col = context.new_collection()
+    col.bulk_import([{"name": str(i), "value": i} for i in range(0, docs, 2)])
+    values = itertools.count()
+
+    def run():
+        value = next(values)
+        col.upsert_many(
+            [{"name": str(i), "value": value} for i in range(docs)],
+            key_fields="name"
+        )
+    return run
+
+
+##################
+# Key Allocation #
+##################
+
+@benchmark("keys.allocate", params=("time", "uuid7", "sharded"),
+           server=False, iterations=20)
+def keys_allocate(context, scheme):
+    allocator = (ShardedCounterKeys("bench") if scheme == "sharded" else
+                 key_allocator(scheme))
+    return lambda: allocator.allocate(10000)
+
+
+@benchmark("bulk_import.with_edges", params=("server", "client"),
+           iterations=10)
+def bulk_import_with_edges(context, param):
+    vertex_col = context.new_collection()
+    edge_col = context.new_collection(is_edge=True)
+    allocator = ShardedCounterKeys("bench")
+
+    def run():
+        vertices = [{"value": i} for i in range(500)]
+        if param == "client":
+            allocator.assign(vertices)
+        else:
+            for vertex in vertices:
+                vertex["_key"] = vertex_col.add_document(dict(vertex))["_key"]
+        edge_col.bulk_import([
+            {"_from": "{}/{}".format(vertex_col.name, a["_key"]),
+             "_to": "{}/{}".format(vertex_col.name, b["_key"])}
+            for a, b in zip(vertices, vertices[1:])
+        ])
+        if param == "client":
+            vertex_col.bulk_import(vertices)
+        vertex_col.truncate()
+        edge_col.truncate()
+    return run
+
+
+###############
+# Bulk Import #
+###############
+
+@benchmark("bulk_import", params=(100, 1000, 10000),
+           iterations=lambda size: max(5, 20000 // size))
+def bulk_import(context, size):
+    col = context.new_collection()
+    documents = [
+        {"value": i, "text": "document {}".format(i)} for i in range(size)
+    ]
+
+    def run():
+        col.bulk_import(documents)
+        col.truncate()
+    return run
+
+
+@benchmark("bulk_import.graph_load", params=(1, 4), iterations=5)
+def bulk_import_graph_load(context, max_workers):
+    vertex_col = context.new_collection()
+    edge_col = context.new_collection(is_edge=True)
+    graph = context.db.add_graph(
+        name="graph",
+        edge_definitions=[{
+            "collection": edge_col.name,
+            "from": [vertex_col.name],
+            "to": [vertex_col.name],
+        }]
+    )
+
+    def run():
+        vertices = ({"_key": str(i), "value": i} for i in range(5000))
+        edges = (
+            {"_from": "{}/{}".format(vertex_col.name, i),
+             "_to": "{}/{}".format(vertex_col.name, i + 1)}
+            for i in range(4999)
+        )
+        reports = graph.bulk_load(
+            {vertex_col.name: vertices}, {edge_col.name: edges},
+            chunk_size=500, max_workers=max_workers
+        )
+        context.metrics["edges_per_second"] = int(
+            reports[edge_col.name]["documents_per_second"]
+        )
+        vertex_col.truncate()
+        edge_col.truncate()
+    return run
+
+
+###########
+# Cursors #
+###########
+
+@benchmark("cursor.drain", params=(10, 100, 1000),
+           iterations=lambda batch_size: max(5, batch_size // 10))
+def cursor_drain(context, batch_size):
+    col = context.new_collection()
+    col.bulk_import([{"value": i} for i in range(10000)])
+    query = "FOR d IN {} RETURN d".format(col.name)
+    return lambda: list(
+        context.db.execute_query(query, batch_size=batch_size)
+    )
+
+
+@benchmark("cursor.drain_auto", iterations=20)
+def cursor_drain_auto(context, param):
+    col = context.new_collection()
+    col.bulk_import([{"value": i} for i in range(10000)])
+    query = "FOR d IN {} RETURN d".format(col.name)
+    return lambda: list(context.db.execute_query(query, batch_size="auto"))
+
+
+class UserRow(object):
+    __slots__ = ("_key", "_id", "_rev", "name", "email", "age")
+
+
+UserTuple = collections.namedtuple(
+    "UserTuple", ["key", "id", "rev", "name", "email", "age"]
+)
+
+ROW_FACTORIES = {
+    "dict": None,
+    "namedtuple": RowFactory(
+        UserTuple, attributes={"key": "_key", "id": "_id", "rev": "_rev"}
+    ),
+    "slots": UserRow,
+}
+
+
+@benchmark("cursor.rows", params=("dict", "namedtuple", "slots"),
+           iterations=10)
+def cursor_rows(context, param):
+    col = context.new_collection()
+    col.bulk_import([
+        {"name": "user {}".format(i), "email": "user{}@example.com".format(i),
+         "age": i % 100}
+        for i in range(10000)
+    ])
+    query = "FOR d IN {} RETURN d".format(col.name)
+    return lambda: list(context.db.execute_query(
+        query, batch_size=1000, row_factory=ROW_FACTORIES[param]
+    ))
+
+
+@benchmark("cursor.export", params=("jsonl", "csv", "jsonl-gzip"),
+           iterations=10)
+def cursor_export(context, param):
+    col = context.new_collection()
+    col.bulk_import([
+        {"value": i, "text": "document {}".format(i)} for i in range(10000)
+    ])
+    query = "FOR d IN {} RETURN d".format(col.name)
+    file_format, _, compress = param.partition("-")
+    path = context.temp_path("export")
+    return lambda: context.db.execute_query(query, batch_size=1000).export(
+        path, format=file_format, compress=compress or None
+    )
+
+
+#################
+# Batch Request #
+#################
+
+@benchmark("execute_batch", params=(10, 100, 1000),
+           iterations=lambda parts: max(5, 2000 // parts))
+def execute_batch(context, parts):
+    col = context.new_collection()
+    requests = [
+        (col.add_document, [{"value": i}], {}) for i in range(parts)
+    ]
+    return lambda: context.db.execute_batch(requests)
+
+
+##################
+# Explain Plans #
+##################
+
+def explain_plan(nodes):
+    """Return an explain plan with the given number of nodes."""
+    return {
+        "plan": {
+            "nodes": [
+                {
+                    "type": "CalculationNode",
+                    "dependencies": [i],
+                    "id": i + 1,
+                    "estimatedCost": i * 2,
+                    "estimatedNrItems": i,
+                    "expression": {
+                        "type": "compare ==",
+                        "subNodes": [
+                            {"type": "attribute access", "name": "value",
+                             "subNodes": [{"type": "reference",
+                                           "name": "doc", "id": 0}]},
+                            {"type": "value", "value": i},
+                        ],
+                    },
+                    "outVariable": {"id": i, "name": "tmpVar{}".format(i)},
+                    "canThrow": False,
+                    "expressionType": "simple",
+                }
+                for i in range(nodes)
+            ],
+            "rules": ["move-calculations-up", "use-index-range"],
+            "collections": [{"name": "col", "type": "read"}],
+            "variables": [
+                {"id": i, "name": "tmpVar{}".format(i)} for i in range(nodes)
+            ],
+            "estimatedCost": nodes * 2,
+            "estimatedNrItems": nodes,
+        }
+    }
+
+
+@benchmark("uncamelify.explain_plan", params=(100, 1000), server=False,
+           iterations=lambda nodes: 100000 // nodes)
+def uncamelify_explain_plan(context, nodes):
+    plan = explain_plan(nodes)["plan"]
+    return lambda: uncamelify(plan)
+
+
+#############
+# Traversal #
+#############
+
+def traversal_result(vertices):
+    """Return the JSON of a traversal result visiting a chain of vertices."""
+    vertex_docs = [
+        {"_id": "v/{}".format(i), "_key": str(i), "_rev": str(i), "value": i}
+        for i in range(vertices)
+    ]
+    edge_docs = [
+        {"_id": "e/{}".format(i), "_key": str(i), "_rev": str(i),
+         "_from": "v/{}".format(i), "_to": "v/{}".format(i + 1)}
+        for i in range(vertices - 1)
+    ]
+    return json.dumps({
+        "result": {
+            "visited": {
+                "vertices": vertex_docs,
+                "paths": [
+                    {"vertices": vertex_docs[max(0, i - 3):i + 1],
+                     "edges": edge_docs[max(0, i - 3):i]}
+                    for i in range(vertices)
+                ],
+            }
+        },
+        "error": False,
+        "code": 200,
+    })
+
+
+@benchmark("traversal.decode", params=(1000, 10000), server=False,
+           iterations=lambda vertices: 100000 // vertices)
+def traversal_decode(context, vertices):
+    text = traversal_result(vertices)
+    return lambda: ArangoResponse(200, text).obj["result"]
+
+
+@benchmark("traversal.execute", params=(100,), iterations=20)
+def traversal_execute(context, vertices):
+    vertex_col = context.new_collection()
+    edge_col = context.new_collection(is_edge=True)
+    graph = context.db.add_graph(
+        name="graph",
+        edge_definitions=[{
+            "collection": edge_col.name,
+            "from": [vertex_col.name],
+            "to": [vertex_col.name],
+        }]
+    )
+    vertex_col.bulk_import([{"_key": str(i)} for i in range(vertices)])
+    edge_col.bulk_import([
+        {"_from": "{}/{}".format(vertex_col.name, i),
+         "_to": "{}/{}".format(vertex_col.name, i + 1)}
+        for i in range(vertices - 1)
+    ])
+    start = "{}/0".format(vertex_col.name)
+    return lambda: graph.execute_traversal(start, direction="outbound")
+
+
+def tree_graph(context, vertices):
+    """Return a graph of ``vertices`` vertices forming a binary tree."""
+    vertex_col = context.new_collection()
+    edge_col = context.new_collection(is_edge=True)
+    graph = context.db.add_graph(
+        name="tree",
+        edge_definitions=[{
+            "collection": edge_col.name,
+            "from": [vertex_col.name],
+            "to": [vertex_col.name],
+        }]
+    )
+    vertex_col.bulk_import([{"_key": str(i)} for i in range(vertices)])
+    edge_col.bulk_import([
+        {"_from": "{}/{}".format(vertex_col.name, (i - 1) // 2),
+         "_to": "{}/{}".format(vertex_col.name, i)}
+        for i in range(1, vertices)
+    ])
+    return graph, vertex_col
+
+
+@benchmark("traversal.two_hops", params=("server", "snapshot"),
+           iterations=50)
+def traversal_two_hops(context, param):
+    graph, vertex_col = tree_graph(context, 1000)
+    starts = itertools.cycle(
+        ["{}/{}".format(vertex_col.name, i) for i in range(0, 500, 7)]
+    )
+    if param == "server":
+        return lambda: graph.execute_traversal(
+            next(starts), direction="any", min_depth=1, max_depth=2
+        )
+    snap = graph.snapshot()
+    return lambda: snap.traverse(
+        next(starts), direction="any", min_depth=1, max_depth=2
+    )
+
+
+@benchmark("traversal.tree", params=("execute", "stream", "vertices",
+                                      "first"), iterations=10)
+def traversal_tree(context, param):
+    graph, vertex_col = tree_graph(context, 1000)
+    start = "{}/0".format(vertex_col.name)
+    if param == "execute":
+        return lambda: graph.execute_traversal(
+            start, direction="outbound", max_depth=10
+        )
+    paths = param != "vertices"
+    if param == "first":
+        # The time to the first batch of vertices
+        return lambda: next(iter(graph.execute_traversal(
+            start, direction="outbound", max_depth=10, stream=True,
+            batch_size=100
+        )))
+    return lambda: list(graph.execute_traversal(
+        start, direction="outbound", max_depth=10, stream=True,
+        paths=paths, batch_size=100
+    ))
+
+
+@benchmark("graph.neighbors", params=("uncached", "cached"),
+           iterations=200)
+def graph_neighbors(context, param):
+    graph, vertex_col = tree_graph(context, 1000)
+    # A hot set of 50 vertices, looked up over and over
+    vertices = itertools.cycle(
+        ["{}/{}".format(vertex_col.name, i) for i in range(50)]
+    )
+    cached = param == "cached"
+    return lambda: graph.neighbors(next(vertices), cached=cached)
+
+
+@benchmark("traversal.snapshot_load", params=(10000,), iterations=5)
+def traversal_snapshot_load(context, vertices):
+    graph, _ = tree_graph(context, vertices)
+    return lambda: graph.snapshot()
+
+
+@benchmark("analytics", params=("pagerank", "connected_components",
+                                "core_numbers"), iterations=10)
+def analytics_run(context, name):
+    graph, _ = tree_graph(context, 20000)
+    snapshot = graph.snapshot()
+    return lambda: getattr(analytics, name)(snapshot)
+
+
+###############
+# Compression #
+###############
+
+def import_body(documents):
+    """Return the body ``bulk_import`` sends for the given document count."""
+    return "\r\n".join(
+        json.dumps({"value": i, "text": "document {}".format(i),
+                    "tags": ["benchmark", "compression"]})
+        for i in range(documents)
+    )
+
+
+@benchmark("compression.compress",
+           params=("gzip-1-1k", "gzip-6-1k", "gzip-1-64k", "gzip-6-64k",
+                   "deflate-6-64k", "gzip-1-1m", "gzip-6-1m"),
+           server=False,
+           iterations=lambda param: 20 if param.endswith("1m") else 200)
+def compression_compress(context, param):
+    algorithm, level, size = param.split("-")
+    documents = {"1k": 16, "64k": 1000, "1m": 16000}[size]
+    body = import_body(documents)
+    compressed = compress(body, algorithm, int(level))
+    context.metrics["bytes"] = len(body)
+    context.metrics["ratio"] = float(len(compressed)) / len(body)
+    return lambda: compress(body, algorithm, int(level))
+
+
+@benchmark("compression.decompress", params=("1k", "64k", "1m"),
+           server=False,
+           iterations=lambda size: 20 if size == "1m" else 200)
+def compression_decompress(context, size):
+    documents = {"1k": 16, "64k": 1000, "1m": 16000}[size]
+    compressed = compress(import_body(documents), "gzip")
+    return lambda: decompress(compressed, "gzip")
+
+
+@benchmark("compression.bulk_import", params=("off", "gzip-1", "gzip-6"),
+           iterations=20)
+def compression_bulk_import(context, param):
+    compression = None
+    if param != "off":
+        algorithm, level = param.split("-")
+        compression = Compression(algorithm, threshold=1024,
+                                  level=int(level))
+    col = context.connect(compression=compression).collection(
+        context.new_collection().name
+    )
+    documents = [
+        {"value": i, "text": "document {}".format(i),
+         "tags": ["benchmark", "compression"]}
+        for i in range(5000)
+    ]
+
+    def run():
+        col.bulk_import(documents)
+        col.truncate()
+    return run